@@ -0,0 +1,5 @@
+"""
+Offline benchmarks for the MCP tools.
+
+See benchmarks/bench_tools.py; no lab devices or Ansible install required.
+"""
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Per-call Ansible overhead: ansible-playbook process vs the pre-forked worker.
+
+Runs a playbook that does nothing but a debug task on localhost (so no
+device and no network are involved, and all that is measured is what
+run_ansible_playbook() pays before and after the play) N times:
+
+    process - a new ansible-playbook process per run (the default)
+    worker  - a fork of helpers/ansible_worker.py per run (MCP_ANSIBLE_WORKER=1)
+
+Both use the JSON callback, as the read-only tools do. Also reports how long
+the worker takes to preload, and checks that both produce the same output.
+
+Needs Ansible installed in the running Python environment.
+
+Usage (from lab-02-mcp-server/):
+    python benchmarks/bench_ansible_worker.py
+    python benchmarks/bench_ansible_worker.py --runs 50 --json benchmarks/results/ansible-worker.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from helpers.ansible import _get_ansible_playbook_path, _load_callback_json  # noqa: E402
+from helpers.ansible_worker import WorkerUnavailable, run_in_worker  # noqa: E402
+
+PLAYBOOK = """\
+- name: Overhead probe
+  hosts: localhost
+  connection: local
+  gather_facts: false
+  tasks:
+    - name: Echo
+      ansible.builtin.debug:
+        msg: "{{ probe }}"
+"""
+
+ANSIBLE_CFG = """\
+[defaults]
+deprecation_warnings = False
+retry_files_enabled = False
+"""
+
+
+def _timed(run: Callable[[], subprocess.CompletedProcess], runs: int) -> Dict[str, Any]:
+    times: List[float] = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = run()
+        times.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            raise RuntimeError(f"Playbook failed ({result.returncode}): {result.stderr or result.stdout}")
+    return {
+        "runs": runs,
+        "mean_ms": round(statistics.mean(times) * 1000, 1),
+        "p50_ms": round(statistics.median(times) * 1000, 1),
+        "min_ms": round(min(times) * 1000, 1),
+        "max_ms": round(max(times) * 1000, 1),
+        "output": result.stdout,
+    }
+
+
+def _debug_msg(stdout: str) -> Any:
+    data, error = _load_callback_json(stdout)
+    if data is None:
+        return error
+    return data["plays"][0]["tasks"][-1]["hosts"]["localhost"]["msg"]
+
+
+def start_worker(workdir: str, sock: str) -> subprocess.Popen:
+    worker = subprocess.Popen(
+        [sys.executable, "-m", "helpers.ansible_worker", "--socket", sock, "--cwd", workdir, "--idle", "0"],
+        cwd=ROOT, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    )
+    for line in worker.stdout:
+        print(f"  worker: {line.strip()}")
+        if "listening" in line:
+            return worker
+    raise RuntimeError("Ansible worker did not start")
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as workdir:
+        Path(workdir, "probe.yml").write_text(PLAYBOOK)
+        Path(workdir, "ansible.cfg").write_text(ANSIBLE_CFG)
+        cmd = [_get_ansible_playbook_path(), "probe.yml", "--extra-vars", "probe=hello", "-v"]
+        env = {**os.environ, "ANSIBLE_STDOUT_CALLBACK": "json"}
+
+        print(f"process: {args.runs} runs")
+        process = _timed(lambda: subprocess.run(
+            cmd, cwd=workdir, env=env, capture_output=True, text=True, timeout=120
+        ), args.runs)
+
+        sock = os.path.join(workdir, "worker.sock")
+        start = time.perf_counter()
+        worker = start_worker(workdir, sock)
+        startup = time.perf_counter() - start
+        try:
+            print(f"worker: {args.runs} runs")
+            in_worker = _timed(lambda: run_in_worker(cmd, env, 120, sock), args.runs)
+        except WorkerUnavailable as e:
+            raise RuntimeError(f"Ansible worker not reachable: {e}")
+        finally:
+            worker.terminate()
+            worker.wait(10)
+
+    same = _debug_msg(process.pop("output")) == _debug_msg(in_worker.pop("output")) == "hello"
+    return {
+        "process": process,
+        "worker": in_worker,
+        "worker_startup_ms": round(startup * 1000, 1),
+        "saved_per_call_ms": round(process["mean_ms"] - in_worker["mean_ms"], 1),
+        "same_output": same,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Ansible per-call overhead: process vs worker")
+    parser.add_argument("--runs", type=int, default=20, help="Playbook runs per mode (default: 20)")
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+
+    results = run(args)
+    print(f"\n{'mode':<10}{'mean ms':>10}{'p50 ms':>10}{'min ms':>10}{'max ms':>10}")
+    print("-" * 50)
+    for mode in ("process", "worker"):
+        row = results[mode]
+        print(f"{mode:<10}{row['mean_ms']:>10}{row['p50_ms']:>10}{row['min_ms']:>10}{row['max_ms']:>10}")
+    print(f"\nWorker preload: {results['worker_startup_ms']} ms (once)")
+    print(f"Saved per call: {results['saved_per_call_ms']} ms; same output: {results['same_output']}")
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nResults written to {args.json}")
+    return 0 if results["same_output"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
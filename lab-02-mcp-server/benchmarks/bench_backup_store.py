@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Backup store simulation: full-file backups vs the deduplicated store.
+
+Simulates a fleet (default 500 devices) backed up repeatedly while a small
+fraction of devices change between rounds, and compares:
+
+    files  - one full .cfg per device per round (06-backup-config.yml)
+    store  - helpers/backup_store.py (section dedup + zlib, unchanged skipped)
+
+Reports storage used, storage ratio and wall time per round, and checks
+that sampled snapshots restore byte-for-byte.
+
+Usage (from lab-02-mcp-server/):
+    python benchmarks/bench_backup_store.py
+    python benchmarks/bench_backup_store.py --devices 2000 --rounds 24 --change-rate 0.05
+    python benchmarks/bench_backup_store.py --json benchmarks/results/backup-store.json
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from helpers.backup_store import BackupStore  # noqa: E402
+
+from benchmarks.fake_backend import FakeDeviceBackend, running_config  # noqa: E402
+
+
+def build_fleet(count: int, backend: FakeDeviceBackend) -> Dict[str, str]:
+    """Generate running-configs for `count` devices (1 spine per 10 devices)."""
+    fleet = {}
+    for n in range(count):
+        name = f"spine{n:04d}" if n % 10 == 0 else f"leaf{n:04d}"
+        fleet[name] = running_config(name, backend)
+    return fleet
+
+
+def mutate(config: str, rng: random.Random) -> str:
+    """Simulate a small change: edit one interface description."""
+    lines = config.splitlines(keepends=True)
+    candidates = [i for i, line in enumerate(lines) if line.startswith("   description")]
+    i = rng.choice(candidates)
+    lines[i] = f"   description changed-{rng.randint(0, 1_000_000)}\n"
+    return "".join(lines)
+
+
+def backup_files(root: Path, fleet: Dict[str, str], round_no: int, workers: int) -> float:
+    """Write one full file per device, like 06-backup-config.yml; returns seconds."""
+    def write(item):
+        name, config = item
+        (root / f"{name}_{round_no:04d}.cfg").write_text(config)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        list(pool.map(write, fleet.items()))
+    return time.perf_counter() - start
+
+
+def backup_store(store: BackupStore, fleet: Dict[str, str], workers: int) -> Dict[str, Any]:
+    """Back up every device into the store; returns timing and counts."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        results = list(pool.map(lambda item: store.backup(*item), fleet.items()))
+    return {
+        "seconds": time.perf_counter() - start,
+        "stored": sum(r["status"] == "stored" for r in results),
+        "unchanged": sum(r["status"] == "unchanged" for r in results),
+        "new_sections": sum(r["new_sections"] for r in results),
+    }
+
+
+def directory_size(root: Path) -> int:
+    return sum(p.stat().st_size for p in root.rglob("*") if p.is_file())
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    backend = FakeDeviceBackend(interfaces=args.interfaces, bgp_peers=args.bgp_peers)
+    fleet = build_fleet(args.devices, backend)
+    history: List[Dict[str, str]] = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files_root = Path(tmp) / "files"
+        files_root.mkdir()
+        store = BackupStore(str(Path(tmp) / "store"))
+
+        rounds = []
+        for round_no in range(args.rounds):
+            if round_no:
+                for name in rng.sample(sorted(fleet), int(len(fleet) * args.change_rate)):
+                    fleet[name] = mutate(fleet[name], rng)
+            history.append(dict(fleet))
+
+            files_seconds = backup_files(files_root, fleet, round_no, args.workers)
+            store_round = backup_store(store, fleet, args.workers)
+            rounds.append({
+                "round": round_no,
+                "files_seconds": round(files_seconds, 4),
+                "store_seconds": round(store_round["seconds"], 4),
+                "stored": store_round["stored"],
+                "unchanged": store_round["unchanged"],
+                "new_sections": store_round["new_sections"],
+            })
+            print(
+                f"  round {round_no:>3}: files {files_seconds * 1000:8.1f} ms, "
+                f"store {store_round['seconds'] * 1000:8.1f} ms "
+                f"({store_round['stored']} stored, {store_round['unchanged']} unchanged)",
+                file=sys.stderr,
+            )
+
+        # Restore a sample of snapshots and compare with what was backed up
+        mismatches = 0
+        samples = 0
+        for name in rng.sample(sorted(fleet), min(args.verify, len(fleet))):
+            for snapshot in store.snapshots(name):
+                samples += 1
+                config = store.restore(name, snapshot)
+                if config not in (h[name] for h in history):
+                    mismatches += 1
+
+        files_bytes = directory_size(files_root)
+        stats = store.stats()
+
+    later = rounds[1:] or rounds
+    return {
+        "config": {k: v for k, v in vars(args).items() if k != "json"},
+        "avg_config_bytes": round(sum(len(c) for c in fleet.values()) / len(fleet)),
+        "files": {
+            "bytes": files_bytes,
+            "first_round_seconds": rounds[0]["files_seconds"],
+            "avg_round_seconds": round(sum(r["files_seconds"] for r in later) / len(later), 4),
+        },
+        "store": {
+            **stats,
+            "first_round_seconds": rounds[0]["store_seconds"],
+            "avg_round_seconds": round(sum(r["store_seconds"] for r in later) / len(later), 4),
+        },
+        "storage_ratio_vs_files": round(files_bytes / stats["stored_bytes"], 2),
+        "restore_check": {"snapshots": samples, "mismatches": mismatches},
+        "rounds": rounds,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Backup store fleet simulation")
+    parser.add_argument("--devices", type=int, default=500, help="Fleet size (default: 500)")
+    parser.add_argument("--rounds", type=int, default=10, help="Backup rounds (default: 10)")
+    parser.add_argument("--change-rate", type=float, default=0.02,
+                        help="Fraction of devices changed per round (default: 0.02)")
+    parser.add_argument("--interfaces", type=int, default=52, help="Interfaces per device")
+    parser.add_argument("--bgp-peers", type=int, default=32, help="BGP neighbors per device")
+    parser.add_argument("--workers", type=int, default=8, help="Backup threads (default: 8)")
+    parser.add_argument("--verify", type=int, default=20,
+                        help="Devices whose snapshots are restored and checked (default: 20)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+
+    results = run(args)
+    files, store = results["files"], results["store"]
+    print(f"\n{args.devices} devices x {args.rounds} rounds, "
+          f"{args.change_rate:.0%} changed per round, ~{results['avg_config_bytes']} B/config")
+    print(f"  full files : {files['bytes'] / 1e6:8.2f} MB, "
+          f"first round {files['first_round_seconds']:.3f}s, later {files['avg_round_seconds']:.3f}s")
+    print(f"  store      : {store['stored_bytes'] / 1e6:8.2f} MB, "
+          f"first round {store['first_round_seconds']:.3f}s, later {store['avg_round_seconds']:.3f}s "
+          f"({store['objects']} objects, {store['snapshots']} snapshots)")
+    print(f"  storage ratio vs full files: {results['storage_ratio_vs_files']}x")
+    check = results["restore_check"]
+    print(f"  restore check: {check['snapshots']} snapshots, {check['mismatches']} mismatches")
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nResults written to {args.json}")
+    return 1 if check["mismatches"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
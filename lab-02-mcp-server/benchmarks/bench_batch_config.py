@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Batch config push benchmark: 04-add-vlan.yml per VLAN vs push_config_batch.
+
+Adds V VLANs to N leaves three ways against the simulated backend
+(benchmarks/fake_backend.py) and reports end-to-end time:
+
+    sequential   - one 04-add-vlan.yml run per VLAN per leaf, one at a time
+                   (what the add_vlan exercise tool does when called V x N times)
+    per-leaf     - the same runs, leaves in parallel, VLANs one at a time
+    batch        - one push_config_batch() call (one 10-batch-config.yml run)
+
+The backend charges --playbook-seconds for every playbook run (Ansible
+startup, SSH/eAPI connection, verify) and --command-seconds for every
+config command pushed. Sleeps are multiplied by --scale so the benchmark
+finishes quickly; reported times are divided by it again, i.e. they are
+estimated real-world seconds for that cost model.
+
+Usage (from lab-02-mcp-server/):
+    python benchmarks/bench_batch_config.py
+    python benchmarks/bench_batch_config.py --vlans 1 10 50 --leaves 1 4 --json benchmarks/results/batch.json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from helpers import VALID_LEAVES, run_ansible_playbook_async  # noqa: E402
+from tools.push_config_batch import push_config_batch  # noqa: E402
+
+from benchmarks.fake_backend import FakeDeviceBackend  # noqa: E402
+
+
+async def add_vlans_one_by_one(leaves: List[str], vlans: List[int], parallel: bool) -> None:
+    """One 04-add-vlan.yml run per (leaf, VLAN)."""
+    async def per_leaf(leaf: str) -> None:
+        for vlan in vlans:
+            result = await run_ansible_playbook_async(
+                "04-add-vlan.yml", {"target_host": leaf, "vlan_id": vlan, "vlan_name": f"VLAN{vlan}"}
+            )
+            assert result["success"], result
+
+    if parallel:
+        await asyncio.gather(*[per_leaf(leaf) for leaf in leaves])
+    else:
+        for leaf in leaves:
+            await per_leaf(leaf)
+
+
+async def add_vlans_batch(leaves: List[str], vlans: List[int]) -> None:
+    """One push_config_batch() call for every (leaf, VLAN)."""
+    result = await push_config_batch([
+        {"device": leaf, "vlan_id": vlan, "vlan_name": f"VLAN{vlan}"}
+        for leaf in leaves for vlan in vlans
+    ])
+    assert result.get("status") == "committed", result
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    backend = FakeDeviceBackend(
+        latency=args.playbook_seconds * args.scale,
+        command_latency=args.command_seconds * args.scale,
+    )
+    results = []
+    with backend:
+        for n in args.leaves:
+            leaves = VALID_LEAVES[:n]
+            for v in args.vlans:
+                vlans = list(range(100, 100 + v))
+                row = {"leaves": n, "vlans": v}
+                for name, coro in (
+                    ("sequential", lambda: add_vlans_one_by_one(leaves, vlans, parallel=False)),
+                    ("per_leaf", lambda: add_vlans_one_by_one(leaves, vlans, parallel=True)),
+                    ("batch", lambda: add_vlans_batch(leaves, vlans)),
+                ):
+                    before = sum(backend.calls.values())
+                    start = time.perf_counter()
+                    asyncio.run(coro())
+                    row[f"{name}_s"] = round((time.perf_counter() - start) / args.scale, 2)
+                    row[f"{name}_runs"] = sum(backend.calls.values()) - before
+                row["speedup"] = round(row["sequential_s"] / row["batch_s"], 1)
+                results.append(row)
+                print(
+                    f"  {n} leaves x {v:>3} VLANs: sequential {row['sequential_s']:8.2f} s | "
+                    f"per-leaf {row['per_leaf_s']:7.2f} s | batch {row['batch_s']:6.2f} s",
+                    file=sys.stderr,
+                )
+
+    return {
+        "config": {k: v for k, v in vars(args).items() if k != "json"},
+        "results": results,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Batch config push benchmark")
+    parser.add_argument("--leaves", type=int, nargs="+", default=[1, 4],
+                        help=f"Numbers of leaves to change (max {len(VALID_LEAVES)}, default: 1 4)")
+    parser.add_argument("--vlans", type=int, nargs="+", default=[1, 50],
+                        help="Numbers of VLANs to add (default: 1 50)")
+    parser.add_argument("--playbook-seconds", type=float, default=4.0,
+                        help="Simulated cost of one playbook run (default: 4.0)")
+    parser.add_argument("--command-seconds", type=float, default=0.02,
+                        help="Simulated cost of one pushed config command (default: 0.02)")
+    parser.add_argument("--scale", type=float, default=0.01,
+                        help="Multiply simulated sleeps by this (default: 0.01)")
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+    if max(args.leaves) > len(VALID_LEAVES):
+        parser.error(f"--leaves cannot exceed {len(VALID_LEAVES)}")
+
+    results = run(args)
+    print(f"\n{'leaves':>6} {'vlans':>6} {'sequential s':>13} {'per-leaf s':>11} "
+          f"{'batch s':>8} {'runs (seq/batch)':>17} {'speedup':>8}")
+    for r in results["results"]:
+        print(f"{r['leaves']:>6} {r['vlans']:>6} {r['sequential_s']:>13.2f} {r['per_leaf_s']:>11.2f} "
+              f"{r['batch_s']:>8.2f} {r['sequential_runs']:>9}/{r['batch_runs']:<7} {r['speedup']:>7}x")
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nResults written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
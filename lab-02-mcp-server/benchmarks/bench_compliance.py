@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Compliance engine benchmark: rules x configs, in-process vs process pool,
+and the per-(rule, config hash) verdict cache (helpers/compliance.py).
+
+Checks the rules in compliance_rules.yml plus generated ones (default 100
+rules in total) against a generated fleet (default 1,000 configs):
+
+    in-process  - every verdict evaluated in this process, cold caches
+    pool        - every verdict evaluated in worker processes, cold caches
+                  (workers started beforehand; same as in-process with 1 worker)
+    cached      - the same check again: every verdict from the cache
+    changed     - 1% of the configs changed: only their verdicts are evaluated
+    rule edit   - one rule changed: only that rule is evaluated, mostly
+                  against already parsed configs
+
+Usage (from lab-02-mcp-server/):
+    python benchmarks/bench_compliance.py
+    python benchmarks/bench_compliance.py --rules 100 --configs 1000 --workers 4
+    python benchmarks/bench_compliance.py --json benchmarks/results/compliance.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from helpers.compliance import ComplianceEngine, Rule, _config_lines, load_rules  # noqa: E402
+
+from benchmarks.fake_backend import FakeDeviceBackend, running_config  # noqa: E402
+
+
+def generated_rules(count: int, backend: FakeDeviceBackend) -> List[Rule]:
+    """compliance_rules.yml, then per-interface, per-VLAN and BGP rules up to `count`."""
+    rules = load_rules()
+    n = 0
+    while len(rules) < count:
+        kind = n % 4
+        if kind == 0:
+            port = n % backend.interfaces + 1
+            rules.append(Rule(f"eth{port}-description-{n}", section=f"interface Ethernet{port}$",
+                              require=r"^description \S+"))
+        elif kind == 1:
+            vlan = 100 + n % max(backend.vlans, 1)
+            rules.append(Rule(f"vlan{vlan}-named-{n}", section=f"vlan {vlan}$", require=r"^name \S+",
+                              if_missing="pass"))
+        elif kind == 2:
+            rules.append(Rule(f"bgp-no-shutdown-peer-{n}", section="router bgp ",
+                              forbid=rf"^neighbor \S+ shutdown$|^neighbor 10\.{n % 4}\.\d+\.\d+ remote-as 6{n}$"))
+        else:
+            rules.append(Rule(f"mtu-{n}", section="interface Ethernet", require=r"^mtu (\d+)$",
+                              min=1500, max=9214 + n, severity="low"))
+        n += 1
+    return rules[:count]
+
+
+def build_fleet(count: int, backend: FakeDeviceBackend) -> Dict[str, str]:
+    return {f"leaf{n:04d}": running_config(f"leaf{n:04d}", backend) for n in range(count)}
+
+
+def timed(func: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    start = time.perf_counter()
+    result = func()
+    return {"ms": round((time.perf_counter() - start) * 1000, 1),
+            "evaluated": result["evaluated"], "cached": result["cached"]}
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    backend = FakeDeviceBackend(interfaces=args.interfaces, bgp_peers=args.bgp_peers, vlans=args.vlans)
+    rules = generated_rules(args.rules, backend)
+    fleet = build_fleet(args.configs, backend)
+
+    local = ComplianceEngine(workers=1)
+    pool = ComplianceEngine(workers=args.workers, pool_min=1)
+    pool.check({"warmup": "hostname warmup\n"}, rules[:1])  # start the workers outside the timing
+    pool.clear()
+
+    changed = dict(fleet)
+    for device in rng.sample(sorted(fleet), max(1, len(fleet) // 100)):
+        changed[device] = fleet[device].replace("idle-timeout 60", "idle-timeout 120")
+    edited = list(rules)
+    edited[1] = Rule(edited[1].id, section="management ssh$", require=r"^idle-timeout (\d+)$", max=30)
+
+    def cold(engine: ComplianceEngine) -> Dict[str, Any]:
+        _config_lines.cache_clear()
+        return engine.check(fleet, rules)
+
+    runs = {
+        "in_process": timed(lambda: cold(local)),
+        "pool": timed(lambda: cold(pool)),
+        "cached": timed(lambda: pool.check(fleet, rules)),
+        "changed_1pct": timed(lambda: pool.check(changed, rules)),
+        "rule_edit": timed(lambda: pool.check(changed, edited)),
+    }
+    pool.close()
+    for name, r in runs.items():
+        print(f"  {name:>12}: {r['ms']:9.1f} ms  evaluated {r['evaluated']:>7}  cached {r['cached']:>7}",
+              file=sys.stderr)
+
+    return {
+        "config": {k: v for k, v in vars(args).items() if k != "json"},
+        "config_lines": len(next(iter(fleet.values())).splitlines()),
+        "cpus": os.cpu_count(),
+        "results": runs,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compliance engine benchmark")
+    parser.add_argument("--rules", type=int, default=100, help="Rules checked (default: 100)")
+    parser.add_argument("--configs", type=int, default=1000, help="Configs checked (default: 1000)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Pool processes (default: one per CPU)")
+    parser.add_argument("--interfaces", type=int, default=52, help="Interfaces per config (default: 52)")
+    parser.add_argument("--bgp-peers", type=int, default=32, help="BGP neighbors per config (default: 32)")
+    parser.add_argument("--vlans", type=int, default=20, help="VLANs per config (default: 20)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+
+    results = run(args)
+    print(f"\n{args.rules} rules x {args.configs} configs ({results['config_lines']} lines each), "
+          f"{args.workers} workers on {results['cpus']} CPUs")
+    print(f"{'run':>12} {'ms':>9} {'evaluated':>10} {'cached':>8}")
+    for name, r in results["results"].items():
+        print(f"{name:>12} {r['ms']:>9.1f} {r['evaluated']:>10} {r['cached']:>8}")
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nResults written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Config diff benchmark: difflib vs the section-hash tree (helpers/config_tree.py).
+
+Builds a ~10k-line EOS running-config, changes k interface sections and
+times four ways of finding what changed:
+
+    difflib        - difflib.unified_diff over the full line lists
+    tree           - parse both configs + diff_trees()
+    tree (cached)  - diff_trees() on already-parsed trees (e.g. cached intended config)
+    manifest       - diff_chunks() on backup-store section hashes; only changed
+                     sections are loaded and parsed
+
+Usage (from lab-02-mcp-server/):
+    python benchmarks/bench_config_diff.py
+    python benchmarks/bench_config_diff.py --changes 1 10 100 1000 --json benchmarks/results/diff.json
+"""
+
+import argparse
+import difflib
+import hashlib
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from helpers.backup_store import split_sections  # noqa: E402
+from helpers.config_tree import diff_chunks, diff_trees, parse_config  # noqa: E402
+
+from benchmarks.fake_backend import FakeDeviceBackend, running_config  # noqa: E402
+
+
+def change_interfaces(config: str, count: int, rng: random.Random) -> str:
+    """Change the description of `count` different interfaces."""
+    lines = config.splitlines(keepends=True)
+    targets = [i for i, line in enumerate(lines) if line.startswith("   description to-host")]
+    for i in rng.sample(targets, min(count, len(targets))):
+        lines[i] = f"   description changed-{i}\n"
+    return "".join(lines)
+
+
+def timed(func: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """Median wall time of `repeat` runs (ms) and the last result."""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"ms": round(statistics.median(samples), 3), "result": result}
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    backend = FakeDeviceBackend(
+        interfaces=args.interfaces, bgp_peers=args.bgp_peers, vlans=args.vlans
+    )
+    base = running_config("leaf1", backend)
+    base_lines = base.splitlines()
+    base_tree = parse_config(base)
+
+    # Backup-store view of the base config: section hash list + object table
+    objects: Dict[str, str] = {}
+
+    def chunk_hashes(config: str) -> List[str]:
+        hashes = []
+        for section in split_sections(config):
+            digest = hashlib.sha256(section.encode()).hexdigest()
+            objects[digest] = section
+            hashes.append(digest)
+        return hashes
+
+    base_chunks = chunk_hashes(base)
+    results = []
+    for count in args.changes:
+        changed = change_interfaces(base, count, rng)
+        changed_lines = changed.splitlines()
+        changed_tree = parse_config(changed)
+        changed_chunks = chunk_hashes(changed)
+
+        runs = {
+            "difflib": timed(
+                lambda: list(difflib.unified_diff(base_lines, changed_lines, n=0, lineterm="")),
+                args.repeat),
+            "tree": timed(
+                lambda: diff_trees(parse_config(base), parse_config(changed)), args.repeat),
+            "tree_cached": timed(
+                lambda: diff_trees(base_tree, changed_tree), args.repeat),
+            "manifest": timed(
+                lambda: diff_chunks(base_chunks, changed_chunks, objects.__getitem__), args.repeat),
+        }
+        reported = {name: len(r["result"]) for name, r in runs.items() if name != "difflib"}
+        results.append({
+            "changed_sections": count,
+            "difflib_ms": runs["difflib"]["ms"],
+            "tree_ms": runs["tree"]["ms"],
+            "tree_cached_ms": runs["tree_cached"]["ms"],
+            "manifest_ms": runs["manifest"]["ms"],
+            "sections_reported": reported,
+            "difflib_output_lines": len(runs["difflib"]["result"]),
+        })
+        print(
+            f"  {count:>5} changed: difflib {runs['difflib']['ms']:8.2f} ms | "
+            f"tree {runs['tree']['ms']:7.2f} ms | cached {runs['tree_cached']['ms']:7.3f} ms | "
+            f"manifest {runs['manifest']['ms']:7.3f} ms",
+            file=sys.stderr,
+        )
+
+    return {
+        "config": {k: v for k, v in vars(args).items() if k != "json"},
+        "config_lines": len(base_lines),
+        "top_level_sections": len(base_tree.children),
+        "results": results,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Config diff benchmark")
+    parser.add_argument("--interfaces", type=int, default=1700,
+                        help="Interfaces in the generated config (default: 1700, ~10k lines)")
+    parser.add_argument("--bgp-peers", type=int, default=500, help="BGP neighbors (default: 500)")
+    parser.add_argument("--vlans", type=int, default=400, help="VLANs (default: 400)")
+    parser.add_argument("--changes", type=int, nargs="+", default=[1, 10, 100, 1000],
+                        help="Numbers of changed sections to test (default: 1 10 100 1000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (median)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+
+    results = run(args)
+    print(f"\n{results['config_lines']} lines, {results['top_level_sections']} top-level sections")
+    print(f"{'changed':>8} {'difflib ms':>11} {'tree ms':>9} {'cached ms':>10} {'manifest ms':>12}")
+    for r in results["results"]:
+        print(f"{r['changed_sections']:>8} {r['difflib_ms']:>11.2f} {r['tree_ms']:>9.2f} "
+              f"{r['tree_cached_ms']:>10.3f} {r['manifest_ms']:>12.3f}")
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nResults written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Concurrent-client load test for serve_http.py.
+
+Starts the HTTP server with 1..N workers against the simulated device
+backend (benchmarks/fake_backend.py, installed in every worker), then
+runs C MCP clients that call get_interfaces, get_bgp_neighbors and
+get_device_info in a loop for a fixed time. Clients run in several
+processes so the client side is not the bottleneck.
+
+Reports calls/s, p50/p99 latency and errors per worker count.
+
+Usage (from lab-02-mcp-server/):
+    python benchmarks/bench_http_load.py
+    python benchmarks/bench_http_load.py --workers 1 2 4 --clients 32 --seconds 15
+    python benchmarks/bench_http_load.py --interfaces 2000 --device-latency 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+CALLS = [
+    ("get_interfaces", lambda rng: {"device": rng.choice(["leaf1", "leaf2", "leaf3", "leaf4"])}),
+    ("get_bgp_neighbors", lambda rng: {"device": rng.choice(["spine1", "spine2"])}),
+    ("get_device_info", lambda rng: {"device": rng.choice(["spine1", "leaf1"])}),
+]
+
+
+def fake_app():
+    """serve_http.create_app() with the simulated backend (MCP_FAKE_BACKEND JSON kwargs)."""
+    from serve_http import create_app
+
+    from benchmarks.fake_backend import FakeDeviceBackend
+
+    FakeDeviceBackend(**json.loads(os.environ.get("MCP_FAKE_BACKEND", "{}"))).install()
+    return create_app()
+
+
+# =============================================================================
+# Server
+# =============================================================================
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, port: int, backend: Dict[str, Any], state_dir: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "MCP_FAKE_BACKEND": json.dumps(backend),
+        "MCP_SHARED_STATE": os.path.join(state_dir, f"shared-{workers}.sqlite"),
+    }
+    code = (
+        "import serve_http; serve_http.serve('127.0.0.1', %d, %d, "
+        "app='benchmarks.bench_http_load:fake_app', log_level='warning')" % (port, workers)
+    )
+    log = open(os.path.join(state_dir, f"server-{workers}.log"), "w")
+    return subprocess.Popen([sys.executable, "-c", code], cwd=ROOT, env=env, stdout=log, stderr=log)
+
+
+def wait_ready(port: int, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not start")
+
+
+# =============================================================================
+# Clients
+# =============================================================================
+
+async def _client(url: str, seconds: float, seed: int) -> Tuple[List[float], int]:
+    from mcp import ClientSession
+    from mcp.client.streamable_http import streamablehttp_client
+
+    rng = random.Random(seed)
+    latencies, errors = [], 0
+    async with streamablehttp_client(url, timeout=120) as (read, write, _):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                tool, args = rng.choice(CALLS)
+                start = time.perf_counter()
+                try:
+                    result = await session.call_tool(tool, args(rng))
+                    errors += bool(result.isError)
+                except Exception:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+    return latencies, errors
+
+
+def _client_process(url: str, clients: int, seconds: float, seed: int) -> Tuple[List[float], int]:
+    async def run():
+        results = await asyncio.gather(*[
+            _client(url, seconds, seed * 1000 + i) for i in range(clients)
+        ])
+        return [lat for r in results for lat in r[0]], sum(r[1] for r in results)
+    return asyncio.run(run())
+
+
+def load(url: str, clients: int, seconds: float, procs: int) -> Dict[str, Any]:
+    procs = max(1, min(procs, clients))
+    share = [clients // procs + (i < clients % procs) for i in range(procs)]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(procs) as pool:
+        parts = list(pool.map(_client_process, [url] * procs, share, [seconds] * procs, range(procs)))
+    elapsed = time.perf_counter() - start
+    latencies = sorted(lat for part in parts for lat in part[0])
+    if not latencies:
+        return {"calls": 0, "errors": sum(p[1] for p in parts)}
+    return {
+        "calls": len(latencies),
+        "errors": sum(p[1] for p in parts),
+        "calls_per_second": round(len(latencies) / seconds, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 1),
+        "wall_seconds": round(elapsed, 1),
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    backend = {"interfaces": args.interfaces, "bgp_peers": args.bgp_peers,
+               "latency": args.device_latency}
+    results = []
+    with tempfile.TemporaryDirectory() as state_dir:
+        for workers in args.workers:
+            port = _free_port()
+            server = start_server(workers, port, backend, state_dir)
+            try:
+                wait_ready(port)
+                url = f"http://127.0.0.1:{port}/mcp"
+                load(url, min(args.clients, 4), 1.0, 1)  # warm up every worker's imports
+                row = {"workers": workers, "clients": args.clients,
+                       **load(url, args.clients, args.seconds, args.client_procs)}
+            finally:
+                server.terminate()
+                try:
+                    server.wait(30)
+                except subprocess.TimeoutExpired:
+                    server.kill()
+            results.append(row)
+            print(f"  workers={workers}: {row.get('calls_per_second', 0)} calls/s")
+    return {"backend": backend, "seconds": args.seconds, "results": results}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Concurrent-client load test for serve_http.py")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4],
+                        help="Server worker counts to compare (default: 1 4)")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent MCP clients (default: 16)")
+    parser.add_argument("--seconds", type=float, default=10, help="Load duration per run (default: 10)")
+    parser.add_argument("--client-procs", type=int, default=4, help="Client processes (default: 4)")
+    parser.add_argument("--interfaces", type=int, default=500, help="Interfaces per device (default: 500)")
+    parser.add_argument("--bgp-peers", type=int, default=64, help="BGP neighbors per device (default: 64)")
+    parser.add_argument("--device-latency", type=float, default=0.05,
+                        help="Simulated seconds per playbook run (default: 0.05)")
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+
+    results = run(args)
+    print(f"\n{'workers':>8}{'clients':>9}{'calls/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    print("-" * 53)
+    for row in results["results"]:
+        print(f"{row['workers']:>8}{row['clients']:>9}{row.get('calls_per_second', 0):>10}"
+              f"{row.get('p50_ms', '-'):>9}{row.get('p99_ms', '-'):>9}{row['errors']:>8}")
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nResults written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Result model benchmark: per-row dicts vs slotted models (helpers/models.py).
+
+Decodes a large "show interfaces status | json" and "show ip bgp summary |
+json" and builds the tools' tables two ways:
+
+    dicts  - one dict per row, as the tools used to build them
+    models - InterfaceStatus / BgpNeighbor (slots, interned values)
+
+For each it reports decode + build time, peak memory and the memory still
+held once the decoded JSON is released - what the delta store and other
+caches keep per state.
+
+Usage (from lab-02-mcp-server/):
+    python benchmarks/bench_models.py
+    python benchmarks/bench_models.py --interfaces 10000 --bgp-peers 2000 --json benchmarks/results/models.json
+"""
+
+import argparse
+import gc
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from helpers.models import BgpNeighbor, InterfaceStatus  # noqa: E402
+
+from benchmarks.fake_backend import FakeDeviceBackend, show_interfaces_status, show_ip_bgp_summary  # noqa: E402
+
+
+def interface_dicts(data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    return {
+        name: {
+            "status": info.get("linkStatus", "unknown"),
+            "description": info.get("description", ""),
+            "line_protocol": info.get("lineProtocolStatus", "unknown")
+        }
+        for name, info in data.get("interfaceStatuses", {}).items()
+    }
+
+
+def bgp_dicts(vrf: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    return {
+        peer: {
+            "remote_asn": info.get("asn", "unknown"),
+            "state": info.get("peerState", "unknown"),
+            "prefixes_received": info.get("prefixReceived", 0)
+        }
+        for peer, info in vrf.get("peers", {}).items()
+    }
+
+
+def measure(build: Callable[[Any], Any], text: str, repeat: int) -> Dict[str, Any]:
+    """Median decode + build time, peak bytes, and bytes held by the table alone."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        build(json.loads(text))
+        samples.append((time.perf_counter() - start) * 1000)
+
+    gc.collect()
+    tracemalloc.start()
+    data = json.loads(text)
+    table = build(data)
+    del data
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "ms": round(statistics.median(samples), 3),
+        "peak_kb": round(peak / 1024, 1),
+        "retained_kb": round(retained / 1024, 1),
+        "bytes_per_row": round(retained / max(1, len(table)), 1),
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    backend = FakeDeviceBackend(interfaces=args.interfaces, bgp_peers=args.bgp_peers)
+    interfaces = json.dumps(show_interfaces_status("leaf1", backend))
+    bgp = json.dumps(show_ip_bgp_summary("spine1", backend))
+
+    def vrf(build: Callable[[Any], Any]) -> Callable[[Any], Any]:
+        return lambda data: build(data["vrfs"]["default"])
+
+    results = {}
+    for table, text, ways in (
+        ("interfaces", interfaces, {"dicts": interface_dicts, "models": InterfaceStatus.table}),
+        ("bgp", bgp, {"dicts": vrf(bgp_dicts), "models": vrf(BgpNeighbor.table)}),
+    ):
+        results[table] = {way: measure(build, text, args.repeat) for way, build in ways.items()}
+        results[table]["rows"] = len(ways["models"](json.loads(text)))
+        results[table]["retained_ratio"] = round(
+            results[table]["dicts"]["retained_kb"] / results[table]["models"]["retained_kb"], 2
+        )
+    return {"interfaces": args.interfaces, "bgp_peers": args.bgp_peers, "results": results}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Dict rows vs slotted result models")
+    parser.add_argument("--interfaces", type=int, default=10000, help="Interfaces (default: 10000)")
+    parser.add_argument("--bgp-peers", type=int, default=2000, help="BGP neighbors (default: 2000)")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed builds per table")
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+
+    results = run(args)
+    print(f"\n{'table':<12}{'rows':>7}  {'way':<8}{'build ms':>10}{'peak KB':>11}"
+          f"{'held KB':>10}{'B/row':>8}")
+    print("-" * 66)
+    for table, row in results["results"].items():
+        for way in ("dicts", "models"):
+            r = row[way]
+            print(f"{table:<12}{row['rows']:>7}  {way:<8}{r['ms']:>10}{r['peak_kb']:>11}"
+                  f"{r['retained_kb']:>10}{r['bytes_per_row']:>8}")
+        print(f"{'':<21}held by dicts / models: {row['retained_ratio']}x")
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nResults written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
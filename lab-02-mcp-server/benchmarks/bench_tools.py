@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for every MCP tool in tools/.
+
+Runs each tool against the simulated device backend (fake_backend.py), so
+no containerlab topology or Ansible install is needed, and reports:
+
+    - p50/p99/mean latency of sequential calls
+    - throughput (calls/s) with N concurrent clients
+    - peak Python memory allocated during a single call (tracemalloc)
+
+Results are written as JSON under benchmarks/results/ so runs from
+different commits can be compared with --compare.
+
+Usage (from lab-02-mcp-server/):
+    python benchmarks/bench_tools.py
+    python benchmarks/bench_tools.py --iterations 500 --concurrency 1 8 32
+    python benchmarks/bench_tools.py --device-latency 0.05 --tools get_interfaces
+    python benchmarks/bench_tools.py --compare benchmarks/results/baseline.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import inspect
+import io
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Make helpers/, tools/ and benchmarks/ importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from helpers import VALID_DEVICES  # noqa: E402
+from helpers.collector import StateCollector  # noqa: E402
+
+from benchmarks.fake_backend import FakeDeviceBackend  # noqa: E402
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Arguments for tool parameters that cannot be derived automatically.
+# "device" parameters cycle through VALID_DEVICES.
+BENCH_ARGS: Dict[str, Any] = {
+    "changes": [{"device": "leaves", "vlan_id": 30, "vlan_name": "Bench"}],
+    "commands": ["show version", "show interfaces status", "show ip bgp summary"],
+    "include_metrics": False,  # no Prometheus offline
+    "query": "router bgp",
+}
+
+# Per-tool arguments, for parameter names that mean different things in
+# different tools; these take precedence over BENCH_ARGS.
+BENCH_ARGS_BY_TOOL: Dict[str, Dict[str, Any]] = {
+    "get_leaf_paths": {"source": "leaf1", "destination": "leaf4"},
+    "check_compliance": {"source": "running"},
+}
+
+
+# =============================================================================
+# Tool discovery
+# =============================================================================
+
+class ToolCollector:
+    """Minimal stand-in for FastMCP that records registered tool functions."""
+
+    def __init__(self):
+        self.tools: Dict[str, Callable] = {}
+
+    def tool(self, *args, **kwargs):
+        def decorator(func: Callable) -> Callable:
+            name = kwargs.get("name") or (args[0] if args and isinstance(args[0], str) else None)
+            self.tools[name or func.__name__] = func
+            return func
+        return decorator
+
+    def __getattr__(self, attr):
+        # resource()/prompt() registrations are not benchmarked
+        return lambda *args, **kwargs: (lambda func: func)
+
+
+def discover_tools() -> Dict[str, Callable]:
+    """Register all tools through register_all_tools() and return them by name."""
+    from tools import register_all_tools
+
+    collector = ToolCollector()
+    with contextlib.redirect_stdout(io.StringIO()):
+        register_all_tools(collector)
+    return collector.tools
+
+
+def tool_arguments(func: Callable, call: int) -> Optional[Dict[str, Any]]:
+    """
+    Build keyword arguments for one call of a tool.
+
+    Returns None if the tool has a required parameter we cannot fill.
+    """
+    kwargs = {}
+    overrides = BENCH_ARGS_BY_TOOL.get(func.__name__, {})
+    for name, param in inspect.signature(func).parameters.items():
+        if name in overrides:
+            kwargs[name] = overrides[name]
+        elif name == "device":
+            kwargs[name] = VALID_DEVICES[call % len(VALID_DEVICES)]
+        elif name in BENCH_ARGS:
+            kwargs[name] = BENCH_ARGS[name]
+        elif param.default is inspect.Parameter.empty:
+            return None
+    return kwargs
+
+
+async def _call(func: Callable, kwargs: Dict[str, Any]) -> Any:
+    result = func(**kwargs)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+# =============================================================================
+# Measurements
+# =============================================================================
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+async def measure_latency(func: Callable, iterations: int, warmup: int) -> Dict[str, Any]:
+    """Sequential calls; returns latency stats in milliseconds."""
+    for call in range(warmup):
+        await _call(func, tool_arguments(func, call))
+
+    samples = []
+    errors = 0
+    last_error = None
+    for call in range(iterations):
+        kwargs = tool_arguments(func, call)
+        start = time.perf_counter()
+        result = await _call(func, kwargs)
+        samples.append((time.perf_counter() - start) * 1000)
+        if isinstance(result, dict) and "error" in result:
+            errors += 1
+            last_error = str(result["error"])
+
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+        "mean_ms": round(sum(samples) / len(samples), 3),
+        "min_ms": round(min(samples), 3),
+        "max_ms": round(max(samples), 3),
+        "error_rate": round(errors / iterations, 4),
+        "last_error": last_error,
+    }
+
+
+async def measure_throughput(func: Callable, clients: int, calls: int) -> Dict[str, Any]:
+    """`clients` concurrent callers sharing `calls` calls; returns calls/s."""
+    per_client = max(1, calls // clients)
+
+    async def client(offset: int) -> None:
+        for call in range(per_client):
+            await _call(func, tool_arguments(func, offset + call))
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client(c * per_client) for c in range(clients)])
+    elapsed = time.perf_counter() - start
+    total = clients * per_client
+    return {
+        "clients": clients,
+        "calls": total,
+        "seconds": round(elapsed, 4),
+        "calls_per_second": round(total / elapsed, 2) if elapsed else None,
+    }
+
+
+async def measure_memory(func: Callable, calls: int) -> Dict[str, Any]:
+    """Peak traced allocation during a single call (max over `calls` calls)."""
+    tracemalloc.start()
+    peak = 0
+    try:
+        for call in range(calls):
+            kwargs = tool_arguments(func, call)
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            await _call(func, kwargs)
+            _, call_peak = tracemalloc.get_traced_memory()
+            peak = max(peak, call_peak - baseline)
+    finally:
+        tracemalloc.stop()
+    return {"peak_kb": round(peak / 1024, 1)}
+
+
+async def benchmark_tool(name: str, func: Callable, args: argparse.Namespace) -> Dict[str, Any]:
+    """Run all measurements for one tool."""
+    result = await measure_latency(func, args.iterations, args.warmup)
+    result["throughput"] = [
+        await measure_throughput(func, clients, args.iterations)
+        for clients in args.concurrency
+    ]
+    result["memory"] = await measure_memory(func, min(args.iterations, args.memory_calls))
+    return result
+
+
+# =============================================================================
+# Reporting
+# =============================================================================
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5,
+            cwd=Path(__file__).parent,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def print_results(results: Dict[str, Any]) -> None:
+    """Print a summary table."""
+    header = f"{'tool':<22} {'p50 ms':>9} {'p99 ms':>9} {'peak KB':>9}  throughput (clients: calls/s)"
+    print(header)
+    print("-" * len(header))
+    for name, data in results["tools"].items():
+        if "skipped" in data:
+            print(f"{name:<22} skipped: {data['skipped']}")
+            continue
+        throughput = ", ".join(
+            f"{t['clients']}: {t['calls_per_second']}" for t in data["throughput"]
+        )
+        errors = f"  [{data['error_rate']:.0%} errors]" if data["error_rate"] else ""
+        print(
+            f"{name:<22} {data['p50_ms']:>9.3f} {data['p99_ms']:>9.3f} "
+            f"{data['memory']['peak_kb']:>9.1f}  {throughput}{errors}"
+        )
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> int:
+    """
+    Print per-tool changes against a previous results file.
+
+    Returns:
+        Number of metrics that regressed by more than `threshold` (fraction)
+    """
+    print(f"\nCompared with {baseline['meta'].get('commit') or 'baseline'} "
+          f"({baseline['meta'].get('timestamp', '?')}):")
+    if baseline["meta"].get("config") != current["meta"]["config"]:
+        print("  note: benchmark settings differ between runs; deltas are not like-for-like")
+    regressions = 0
+
+    def change(old: float, new: float, higher_is_better: bool = False) -> str:
+        nonlocal regressions
+        if not old:
+            return "n/a"
+        delta = (new - old) / old
+        worse = -delta if higher_is_better else delta
+        flag = ""
+        if worse > threshold:
+            regressions += 1
+            flag = " REGRESSION"
+        return f"{delta:+.1%}{flag}"
+
+    for name, new in current["tools"].items():
+        old = baseline["tools"].get(name)
+        if not old or "skipped" in old or "skipped" in new:
+            continue
+        old_tp = {t["clients"]: t["calls_per_second"] for t in old.get("throughput", [])}
+        tp = [
+            f"{t['clients']}c {change(old_tp[t['clients']], t['calls_per_second'], True)}"
+            for t in new["throughput"] if old_tp.get(t["clients"])
+        ]
+        print(
+            f"  {name:<22} p50 {change(old['p50_ms'], new['p50_ms'])}, "
+            f"p99 {change(old['p99_ms'], new['p99_ms'])}, "
+            f"peak {change(old['memory']['peak_kb'], new['memory']['peak_kb'])}, "
+            f"throughput {', '.join(tp) or 'n/a'}"
+        )
+    return regressions
+
+
+# =============================================================================
+# Main
+# =============================================================================
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    tools = discover_tools()
+    if args.tools:
+        tools = {name: func for name, func in tools.items() if name in args.tools}
+
+    results: Dict[str, Any] = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {
+                "iterations": args.iterations,
+                "warmup": args.warmup,
+                "concurrency": args.concurrency,
+                "device_latency": args.device_latency,
+                "interfaces": args.interfaces,
+                "bgp_peers": args.bgp_peers,
+            },
+        },
+        "tools": {},
+    }
+
+    backend = FakeDeviceBackend(
+        interfaces=args.interfaces,
+        bgp_peers=args.bgp_peers,
+        latency=args.device_latency,
+    )
+    # Tools that write local state (e.g. the backup store) write to a scratch dir
+    with backend, tempfile.TemporaryDirectory() as scratch:
+        os.environ["MCP_BACKUP_STORE"] = os.path.join(scratch, "backups")
+        # Snapshot tools answer from collected state: collect one round first
+        os.environ["MCP_SNAPSHOT_DB"] = os.path.join(scratch, "snapshots.sqlite")
+        StateCollector(interval=0).collect_once()
+        for name, func in tools.items():
+            if tool_arguments(func, 0) is None:
+                results["tools"][name] = {"skipped": "no benchmark arguments (see BENCH_ARGS)"}
+                continue
+            print(f"  benchmarking {name}...", file=sys.stderr)
+            results["tools"][name] = await benchmark_tool(name, func, args)
+
+    results["meta"]["playbook_calls"] = backend.calls
+    # A tool that only returned errors measured its error path, not the tool
+    results["meta"]["failed_tools"] = sorted(
+        name for name, data in results["tools"].items() if data.get("error_rate") == 1
+    )
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline MCP tool benchmark")
+    parser.add_argument("--iterations", type=int, default=200,
+                        help="Sequential calls per tool (default: 200)")
+    parser.add_argument("--warmup", type=int, default=10,
+                        help="Untimed calls before measuring (default: 10)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16],
+                        help="Concurrent client counts for throughput (default: 1 4 16)")
+    parser.add_argument("--memory-calls", type=int, default=20,
+                        help="Calls traced for peak memory (default: 20)")
+    parser.add_argument("--device-latency", type=float, default=0.0,
+                        help="Simulated playbook time in seconds (default: 0)")
+    parser.add_argument("--interfaces", type=int, default=52,
+                        help="Ethernet interfaces per device (default: 52)")
+    parser.add_argument("--bgp-peers", type=int, default=32,
+                        help="BGP neighbors per device (default: 32)")
+    parser.add_argument("--tools", nargs="+",
+                        help="Only benchmark these tools")
+    parser.add_argument("--output", type=Path,
+                        help="Results file (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", type=Path,
+                        help="Previous results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Regression threshold as a fraction (default: 0.10)")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print_results(results)
+
+    output = args.output
+    if output is None:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = RESULTS_DIR / f"{stamp}-{results['meta']['commit'] or 'local'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"\nResults written to {output}")
+
+    failed = results["meta"]["failed_tools"]
+    if failed:
+        for name in failed:
+            print(f"ERROR: {name} returned only errors: {results['tools'][name]['last_error']}",
+                  file=sys.stderr)
+        print("Fix the tool or its arguments (BENCH_ARGS, BENCH_ARGS_BY_TOOL)", file=sys.stderr)
+        return 2
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        regressions = compare_results(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{regressions} metric(s) regressed by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,764 @@
+"""
+Simulated device backend for offline benchmarks and tests.
+
+Replaces helpers.ansible._run_process so run_ansible_playbook() returns
+canned ansible-playbook output (JSON callback format) instead of starting
+a process. Everything above the process boundary - command building,
+_extract_device_json(), the tools themselves - runs unchanged.
+
+Usage:
+    from benchmarks.fake_backend import FakeDeviceBackend
+
+    with FakeDeviceBackend(interfaces=52, bgp_peers=32, latency=0.05):
+        result = await get_interfaces("leaf1")
+
+Canned outputs follow the EOS "| json" structures the tools parse:
+    07-device-info.yml        show version | json
+    08-interfaces-status.yml  show interfaces status | json
+    09-bgp-neighbors.yml      show ip bgp summary | json
+    05-show-config.yml        show running-config (text)
+
+    11-show-commands.yml      any of the "| json" commands above, or
+                              show lldp neighbors | json; several per
+                              device, many devices per run
+
+Config pushes are simulated too (nothing is stored):
+    04-add-vlan.yml           one VLAN on one device
+    10-batch-config.yml       per-device change sets; the batch rolls back
+                              when any target is unreachable
+"""
+
+import json
+import math
+import random
+import subprocess
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from helpers import ansible
+from helpers.constants import DEVICE_IPS, FABRIC_LINKS
+
+# =============================================================================
+# Canned EOS command output
+# =============================================================================
+
+def _device_index(device: str) -> int:
+    """Small per-device number used to vary addresses, ASNs and serials."""
+    if device in DEVICE_IPS:
+        return sorted(DEVICE_IPS).index(device)
+    return zlib.crc32(device.encode()) % 200
+
+def show_version(device: str, backend: "FakeDeviceBackend") -> Dict[str, Any]:
+    """show version | json"""
+    index = _device_index(device)
+    return {
+        "mfgName": "Arista",
+        "modelName": "cEOSLab",
+        "hardwareRevision": "",
+        "serialNumber": f"SN-{device.upper()}-{index:04d}",
+        "systemMacAddress": f"00:1c:73:00:00:{index + 1:02x}",
+        "hwMacAddress": "00:00:00:00:00:00",
+        "configMacAddress": "00:00:00:00:00:00",
+        "version": "4.35.0.1F-46212917.43501F (engineering build)",
+        "architecture": "x86_64",
+        "internalVersion": "4.35.0.1F-46212917.43501F",
+        "internalBuildId": "a0c2e8e4-1d53-4d6a-9b4a-0c4b0b1d4ef1",
+        "imageFormatVersion": "1.0",
+        "imageOptimization": "None",
+        "cEosToolsVersion": "(unknown)",
+        "kernelVersion": "6.8.0-45-generic",
+        "bootupTimestamp": 1760000000.0 + index,
+        "uptime": 123456.78 + index,
+        "memTotal": 32827288,
+        "memFree": 21349144,
+        "isIntlVersion": False,
+        "hostname": device,
+    }
+
+
+def show_interfaces_status(device: str, backend: "FakeDeviceBackend") -> Dict[str, Any]:
+    """show interfaces status | json with backend.interfaces Ethernet ports."""
+    rng = random.Random(f"{backend.seed}:{device}:interfaces")
+    statuses = {
+        "Management0": {
+            "description": "oob",
+            "linkStatus": "connected",
+            "lineProtocolStatus": "up",
+            "vlanInformation": {"interfaceMode": "routed", "interfaceForwardingModel": "routed"},
+            "bandwidth": 1000000000,
+            "interfaceType": "10/100/1000",
+            "duplex": "duplexFull",
+            "autoNegotigateActive": True,
+            "autoNegotiateActive": True,
+        }
+    }
+    for port in range(1, backend.interfaces + 1):
+        up = rng.random() > 0.1
+        access = port > backend.uplinks
+        statuses[f"Ethernet{port}"] = {
+            "description": f"to-host{port}" if access else f"to-spine{port}",
+            "linkStatus": "connected" if up else "notconnect",
+            "lineProtocolStatus": "up" if up else "down",
+            "vlanInformation": (
+                {"interfaceMode": "bridged", "vlanId": 100 + port % 20,
+                 "interfaceForwardingModel": "bridged"}
+                if access else
+                {"interfaceMode": "routed", "interfaceForwardingModel": "routed"}
+            ),
+            "bandwidth": 10000000000 if access else 100000000000,
+            "interfaceType": "EbraTestPhyPort",
+            "duplex": "duplexFull",
+            "autoNegotigateActive": False,
+            "autoNegotiateActive": False,
+        }
+    if backend.fabric:
+        for link in FABRIC_LINKS:
+            for side, peer in (("spine", "leaf"), ("leaf", "spine")):
+                if link[side] != device:
+                    continue
+                name = link[f"{side}_interface"]
+                up = backend.faults.get((device, name)) != "down"
+                statuses[name] = {
+                    **statuses.get(name, {}),
+                    "description": f"to-{link[peer]}",
+                    "linkStatus": "connected" if up else "notconnect",
+                    "lineProtocolStatus": "up" if up else "down",
+                }
+    return {"interfaceStatuses": statuses}
+
+
+def show_ip_bgp_summary(device: str, backend: "FakeDeviceBackend") -> Dict[str, Any]:
+    """show ip bgp summary | json with backend.bgp_peers neighbors."""
+    rng = random.Random(f"{backend.seed}:{device}:bgp")
+    index = _device_index(device)
+    peers = {}
+    if backend.fabric:
+        return _fabric_bgp_summary(device, backend, index)
+    for n in range(backend.bgp_peers):
+        established = rng.random() > 0.05
+        peers[f"10.{n // 250}.{n % 250}.{2 * index + 1}"] = {
+            "description": f"peer-{n}",
+            "version": 4,
+            "msgReceived": rng.randint(1000, 100000),
+            "msgSent": rng.randint(1000, 100000),
+            "inMsgQueue": 0,
+            "outMsgQueue": 0,
+            "asn": str(65100 + n),
+            "prefixAccepted": rng.randint(0, 500) if established else 0,
+            "prefixReceived": rng.randint(0, 500) if established else 0,
+            "upDownTime": 1760000000.0 + n,
+            "underMaintenance": False,
+            "peerState": "Established" if established else "Active",
+        }
+    return {
+        "vrfs": {
+            "default": {
+                "routerId": f"10.255.0.{index + 1}",
+                "asn": str(65000 + index),
+                "peers": peers,
+            }
+        }
+    }
+
+
+def _fabric_bgp_summary(device: str, backend: "FakeDeviceBackend", index: int) -> Dict[str, Any]:
+    """show ip bgp summary for the lab's spine-leaf sessions (FABRIC_LINKS)."""
+    peers = {}
+    for link in FABRIC_LINKS:
+        if device == link["spine"]:
+            peer, asn, prefixes = link["leaf_ip"], 65100 + int(link["leaf"][-1]), 2
+        elif device == link["leaf"]:
+            peer, asn, prefixes = link["spine_ip"], 65100, 6
+        else:
+            continue
+        fault = backend.faults.get((device, peer))
+        established = fault != "down"
+        if isinstance(fault, int):
+            prefixes = fault
+        peers[peer] = {
+            "description": link["spine"] if device == link["leaf"] else link["leaf"],
+            "version": 4,
+            "asn": str(asn),
+            "prefixAccepted": prefixes if established else 0,
+            "prefixReceived": prefixes if established else 0,
+            "upDownTime": 1760000000.0,
+            "peerState": "Established" if established else "Active",
+        }
+    local_asn = 65100 if device.startswith("spine") else 65100 + int(device[-1])
+    return {"vrfs": {"default": {
+        "routerId": f"10.255.0.{index + 1}", "asn": str(local_asn), "peers": peers,
+    }}}
+
+
+def running_config(device: str, backend: "FakeDeviceBackend") -> str:
+    """show running-config in the style of lab-01-copilots/config/*.cfg."""
+    index = _device_index(device)
+    lines = [
+        "! Command: show running-config",
+        f"! device: {device} (cEOSLab, EOS-4.35.0.1F)",
+        "!",
+        "! boot system flash:/cEOS-lab.swi",
+        "!",
+        "no aaa root",
+        "!",
+        "username admin privilege 15 role network-admin secret sha512 $6$workshop$hash",
+        "!",
+        "service routing protocols model multi-agent",
+        "!",
+        f"hostname {device}",
+        "ip domain-name workshop.local",
+        "!",
+        "spanning-tree mode mstp",
+        "!",
+        "clock timezone UTC",
+        "!",
+    ]
+    for vlan in range(100, 100 + backend.vlans):
+        lines += [f"vlan {vlan}", f"   name VLAN{vlan}", "!"]
+    lines += [
+        "management api http-commands",
+        "   no shutdown",
+        "!",
+        "management ssh",
+        "   idle-timeout 60",
+        "   authentication mode password",
+        "!",
+    ]
+    for port in range(1, backend.interfaces + 1):
+        lines.append(f"interface Ethernet{port}")
+        if port <= backend.uplinks:
+            lines += [
+                f"   description to-spine{port}",
+                "   mtu 9214",
+                "   no switchport",
+                f"   ip address 10.{index}.{port}.1/31",
+            ]
+        else:
+            lines += [
+                f"   description to-host{port}",
+                f"   switchport access vlan {100 + port % max(backend.vlans, 1)}",
+                "   spanning-tree portfast",
+            ]
+        lines.append("!")
+    lines += [
+        "interface Loopback0",
+        '   description "BGP Router ID"',
+        f"   ip address 10.255.0.{index + 1}/32",
+        "!",
+        "interface Management0",
+        '   description "Out of Band Management"',
+        f"   ip address {DEVICE_IPS.get(device, '198.18.1.99')}/24",
+        "!",
+        "ip routing",
+        "!",
+        f"router bgp {65000 + index}",
+        f"   router-id 10.255.0.{index + 1}",
+        "   maximum-paths 4 ecmp 4",
+    ]
+    for n in range(backend.bgp_peers):
+        peer = f"10.{n // 250}.{n % 250}.{2 * index + 1}"
+        lines += [
+            f"   neighbor {peer} remote-as {65100 + n}",
+            f"   neighbor {peer} description peer-{n}",
+        ]
+    lines += [
+        f"   network 10.255.0.{index + 1}/32",
+        "!",
+        "lldp run",
+        "!",
+        "line vty",
+        "   transport input ssh",
+        "   exec-timeout 30",
+        "!",
+        "end",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def show_lldp_neighbors(device: str, backend: "FakeDeviceBackend") -> Dict[str, Any]:
+    """show lldp neighbors | json from backend.links (ports that are "down" are not seen)."""
+    neighbors = []
+    for a, a_port, b, b_port in backend.cabling():
+        for local, port, peer, peer_port in ((a, a_port, b, b_port), (b, b_port, a, a_port)):
+            if local == device and "down" not in (backend.faults.get((a, a_port)), backend.faults.get((b, b_port))):
+                neighbors.append({"port": port, "neighborDevice": f"{peer}.lab",
+                                  "neighborPort": peer_port, "ttl": 120})
+    return {
+        "tablesLastChangeTime": 1760000000.0,
+        "tablesAgeOuts": 0,
+        "tablesInserts": len(neighbors),
+        "tablesDeletes": 0,
+        "tablesDrops": 0,
+        "lldpNeighbors": neighbors,
+    }
+
+
+# Commands only 11-show-commands.yml runs -> output generator
+SHOW_ONLY_COMMANDS: Dict[str, Callable] = {
+    "show lldp neighbors | json": show_lldp_neighbors,
+}
+
+
+# Playbook -> (task name, command, output generator)
+PLAYBOOK_OUTPUTS: Dict[str, tuple] = {
+    "07-device-info.yml": ("Get device version info", "show version | json", show_version),
+    "08-interfaces-status.yml": (
+        "Get interface status", "show interfaces status | json", show_interfaces_status
+    ),
+    "09-bgp-neighbors.yml": (
+        "Get BGP summary", "show ip bgp summary | json", show_ip_bgp_summary
+    ),
+    "05-show-config.yml": (
+        "Get full running configuration", "show running-config", running_config
+    ),
+}
+
+
+# =============================================================================
+# Ansible JSON callback rendering
+# =============================================================================
+
+def _duration(start: datetime, seconds: float) -> Dict[str, str]:
+    end = start + timedelta(seconds=seconds)
+    return {
+        "start": start.isoformat().replace("+00:00", "Z"),
+        "end": end.isoformat().replace("+00:00", "Z"),
+    }
+
+
+def render_callback(
+    playbook: str,
+    device: str,
+    task_name: str,
+    output: Any = None,
+    unreachable: bool = False,
+    latency: float = 0.0,
+) -> str:
+    """
+    Render ansible-playbook stdout as ANSIBLE_STDOUT_CALLBACK=json would.
+
+    Args:
+        playbook: Playbook file name (used for the play name)
+        device: target_host
+        task_name: Name of the device command task
+        output: Parsed device output (eos_command stdout[0])
+        unreachable: Render the command task as unreachable instead
+        latency: Simulated device time, used for the task durations
+
+    Returns:
+        JSON string (the raw stdout)
+    """
+    now = datetime.now(timezone.utc)
+    assert_task = {
+        "task": {"name": "Validate required variables", "duration": _duration(now, 0.001)},
+        "hosts": {device: {"changed": False, "msg": f"Target host: {device}"}},
+    }
+
+    if unreachable:
+        command_host = {
+            "unreachable": True,
+            "changed": False,
+            "msg": "Failed to connect to the host via ssh: timed out",
+        }
+        tasks = [assert_task, {
+            "task": {"name": task_name, "duration": _duration(now, latency)},
+            "hosts": {device: command_host},
+        }]
+    else:
+        tasks = [
+            assert_task,
+            {
+                "task": {"name": task_name, "duration": _duration(now, latency)},
+                "hosts": {device: {
+                    "changed": False,
+                    "stdout": [output],
+                    "stdout_lines": [output],
+                }},
+            },
+            {
+                "task": {"name": "Display output as JSON", "duration": _duration(now, 0.001)},
+                "hosts": {device: {"changed": False, "msg": output}},
+            },
+        ]
+
+    return json.dumps({
+        "custom_stats": {},
+        "global_custom_stats": {},
+        "plays": [{
+            "play": {"name": playbook, "duration": _duration(now, latency + 0.002)},
+            "tasks": tasks,
+        }],
+        "stats": {device: {
+            "ok": len(tasks) - (1 if unreachable else 0),
+            "changed": 0,
+            "failures": 0,
+            "unreachable": 1 if unreachable else 0,
+            "skipped": 0,
+        }},
+    })
+
+
+def render_batch_callback(
+    devices: Dict[str, Dict[str, Any]],
+    batch_id: str,
+    committed: bool,
+    latency: float = 0.0,
+    not_restored: Iterable[str] = (),
+) -> str:
+    """
+    Render 10-batch-config.yml output: one result per device and the
+    run_once "Batch summary" task the tool reads. Devices in not_restored
+    are left out of rolled_back, as when their configure replace fails.
+    """
+    now = datetime.now(timezone.utc)
+    first = next(iter(devices))
+    rolled_back = [] if committed else [
+        d for d, r in devices.items() if r["status"] != "unreachable" and d not in not_restored
+    ]
+    tasks = [
+        {
+            "task": {"name": "Apply change set in a configuration session",
+                     "duration": _duration(now, latency)},
+            "hosts": {
+                d: ({"unreachable": True, "changed": False,
+                     "msg": "Failed to connect to the host via ssh: timed out"}
+                    if r["status"] == "unreachable" else {"changed": True})
+                for d, r in devices.items()
+            },
+        },
+        {
+            "task": {"name": "Batch summary", "duration": _duration(now, 0.001)},
+            "hosts": {first: {"changed": False, "msg": {
+                "batch_id": batch_id,
+                "committed": committed,
+                "devices": devices,
+                "rolled_back": rolled_back,
+            }}},
+        },
+    ]
+    return json.dumps({
+        "custom_stats": {},
+        "global_custom_stats": {},
+        "plays": [{
+            "play": {"name": "10-batch-config.yml", "duration": _duration(now, latency)},
+            "tasks": tasks,
+        }],
+        "stats": {d: {
+            "ok": len(tasks), "changed": 1, "failures": 0,
+            "unreachable": int(r["status"] == "unreachable"), "skipped": 0,
+        } for d, r in devices.items()},
+    })
+
+
+def render_show_callback(devices: Dict[str, Dict[str, Any]], latency: float = 0.0) -> str:
+    """
+    Render 11-show-commands.yml output: the command task per device and the
+    run_once "Show command results" task the helper reads.
+    """
+    now = datetime.now(timezone.utc)
+    first = next(iter(devices))
+    tasks = [
+        {
+            "task": {"name": "Run show commands in one session", "duration": _duration(now, latency)},
+            "hosts": {
+                d: ({"unreachable": True, "changed": False, "msg": r["error"]} if r["unreachable"]
+                    else {"failed": True, "changed": False, "msg": r["error"]} if r["error"]
+                    else {"changed": False, "stdout": r["stdout"]})
+                for d, r in devices.items()
+            },
+        },
+        {
+            "task": {"name": "Show command results", "duration": _duration(now, 0.001)},
+            "hosts": {first: {"changed": False, "msg": devices}},
+        },
+    ]
+    return json.dumps({
+        "custom_stats": {},
+        "global_custom_stats": {},
+        "plays": [{
+            "play": {"name": "11-show-commands.yml", "duration": _duration(now, latency)},
+            "tasks": tasks,
+        }],
+        "stats": {d: {
+            "ok": len(tasks), "changed": 0, "failures": int(bool(r["error"]) and not r["unreachable"]),
+            "unreachable": int(r["unreachable"]), "skipped": 0,
+        } for d, r in devices.items()},
+    })
+
+
+def render_push_callback(devices: Dict[str, Dict[str, Any]], latency: float = 0.0) -> str:
+    """
+    Render 12-push-rendered-config.yml output: the push task per device and
+    the run_once "Push summary" task the tool reads.
+    """
+    now = datetime.now(timezone.utc)
+    first = next(iter(devices))
+    tasks = [
+        {
+            "task": {"name": "Push rendered configuration in a configuration session",
+                     "duration": _duration(now, latency)},
+            "hosts": {
+                d: ({"unreachable": True, "changed": False, "msg": r["error"]}
+                    if r["status"] == "unreachable" else {"changed": True})
+                for d, r in devices.items()
+            },
+        },
+        {
+            "task": {"name": "Push summary", "duration": _duration(now, 0.001)},
+            "hosts": {first: {"changed": False, "msg": devices}},
+        },
+    ]
+    return json.dumps({
+        "custom_stats": {},
+        "global_custom_stats": {},
+        "plays": [{
+            "play": {"name": "12-push-rendered-config.yml", "duration": _duration(now, latency)},
+            "tasks": tasks,
+        }],
+        "stats": {d: {
+            "ok": len(tasks), "changed": int(r["status"] == "pushed"), "failures": 0,
+            "unreachable": int(r["status"] == "unreachable"), "skipped": 0,
+        } for d, r in devices.items()},
+    })
+
+
+# =============================================================================
+# Backend
+# =============================================================================
+
+class FakeDeviceBackend:
+    """
+    Stand-in for ansible-playbook + devices.
+
+    Output for each (playbook, device) is generated once and cached, so the
+    backend itself adds almost no overhead to what is being measured.
+
+    Args:
+        interfaces: Ethernet ports per device (plus Management0)
+        bgp_peers: BGP neighbors per device
+        uplinks: How many of the Ethernet ports are routed uplinks
+        vlans: VLANs in the running-config
+        latency: Simulated device + Ansible time per playbook run (seconds);
+            blocks the calling thread, like subprocess.run() does
+        command_latency: Extra simulated time per config command pushed
+            (seconds); devices in a batch are changed in parallel
+        fabric: Generate the lab's spine-leaf links and BGP sessions
+            (FABRIC_LINKS) instead of bgp_peers random neighbors
+        faults: With fabric, {(device, interface or peer IP): "down"} takes
+            that end down; an int instead overrides a peer's prefix count
+        jitter: Random extra latency, uniformly 0..jitter seconds
+        unreachable: Devices that report as unreachable
+        not_restored: Devices whose rollback fails when a batch rolls back
+        seed: Seed for the generated data
+        links: Cabling seen by LLDP, [(device, interface, peer, peer interface)];
+            default with fabric: FABRIC_LINKS
+    """
+
+    def __init__(
+        self,
+        interfaces: int = 52,
+        bgp_peers: int = 32,
+        uplinks: int = 4,
+        vlans: int = 20,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        unreachable: Iterable[str] = (),
+        seed: int = 0,
+        command_latency: float = 0.0,
+        fabric: bool = False,
+        faults: Optional[Dict[tuple, Any]] = None,
+        links: Optional[list] = None,
+        not_restored: Iterable[str] = (),
+    ):
+        self.interfaces = interfaces
+        self.bgp_peers = bgp_peers
+        self.uplinks = uplinks
+        self.vlans = vlans
+        self.latency = latency
+        self.command_latency = command_latency
+        self.fabric = fabric
+        self.faults = dict(faults or {})
+        self.links = links
+        self.jitter = jitter
+        self.unreachable = set(unreachable)
+        self.not_restored = set(not_restored)
+        self.seed = seed
+        self.calls: Dict[str, int] = {}
+        self.pushed: Dict[str, str] = {}  # device -> last config pushed by 12-push-rendered-config.yml
+        self._cache: Dict[tuple, str] = {}
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._original: Optional[Callable] = None
+
+    def cabling(self) -> list:
+        """The links LLDP sees: backend.links, or FABRIC_LINKS with fabric."""
+        if self.links is not None:
+            return self.links
+        if self.fabric:
+            return [(link["spine"], link["spine_interface"], link["leaf"], link["leaf_interface"]) for link in FABRIC_LINKS]
+        return []
+
+    def stdout_for(self, playbook: str, device: str) -> Optional[str]:
+        """Return the cached ansible-playbook stdout for a playbook/device."""
+        key = (playbook, device)
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+
+        spec = PLAYBOOK_OUTPUTS.get(playbook)
+        if spec is None:
+            return None
+        task_name, _command, generate = spec
+        if device in self.unreachable:
+            stdout = render_callback(playbook, device, task_name, unreachable=True,
+                                     latency=self.latency)
+        else:
+            stdout = render_callback(playbook, device, task_name, generate(device, self),
+                                     latency=self.latency)
+
+        with self._lock:
+            self._cache[key] = stdout
+        return stdout
+
+    def run(
+        self,
+        playbook: str,
+        extra_vars: Dict[str, Any],
+        cmd: list,
+        env: Dict[str, str]
+    ) -> subprocess.CompletedProcess:
+        """Drop-in replacement for helpers.ansible._run_process."""
+        device = extra_vars.get("target_host", "")
+        with self._lock:
+            self.calls[playbook] = self.calls.get(playbook, 0) + 1
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+
+        if playbook == "10-batch-config.yml":
+            return self._run_batch(extra_vars, cmd, delay)
+        if playbook == "04-add-vlan.yml":
+            return self._run_add_vlan(extra_vars, cmd, delay)
+        if playbook == "11-show-commands.yml":
+            return self._run_show(extra_vars, cmd, delay)
+        if playbook == "12-push-rendered-config.yml":
+            return self._run_push(extra_vars, cmd, delay)
+
+        if delay:
+            time.sleep(delay)
+
+        stdout = self.stdout_for(playbook, device)
+        if stdout is None:
+            return subprocess.CompletedProcess(
+                cmd, 2, "", f"ERROR! the playbook: {playbook} has no canned output"
+            )
+        returncode = 4 if device in self.unreachable else 0
+        return subprocess.CompletedProcess(cmd, returncode, stdout, "")
+
+    def _run_add_vlan(self, extra_vars: Dict[str, Any], cmd: list, delay: float):
+        """04-add-vlan.yml: vlan + name on one device."""
+        device = extra_vars.get("target_host", "")
+        time.sleep(delay + 2 * self.command_latency)
+        if device in self.unreachable:
+            stdout = render_callback("04-add-vlan.yml", device, "Create VLAN", unreachable=True)
+            return subprocess.CompletedProcess(cmd, 4, stdout, "")
+        message = (f"VLAN {extra_vars.get('vlan_id')} ({extra_vars.get('vlan_name')}) "
+                   f"successfully created on {device}")
+        stdout = render_callback("04-add-vlan.yml", device, "Create VLAN", message)
+        return subprocess.CompletedProcess(cmd, 0, stdout, "")
+
+    def _run_batch(self, extra_vars: Dict[str, Any], cmd: list, delay: float):
+        """10-batch-config.yml: all devices in waves of batch_concurrency."""
+        changes: Dict[str, list] = extra_vars.get("changes", {})
+        devices = [d for d in str(extra_vars.get("target_hosts", "")).split(",") if d]
+        if not devices:
+            return subprocess.CompletedProcess(cmd, 2, "", "ERROR! no target_hosts")
+
+        concurrency = max(1, int(extra_vars.get("batch_concurrency", 5)))
+        waves = math.ceil(len(devices) / concurrency)
+        largest = max(len(changes.get(d, [])) for d in devices)
+        time.sleep(delay + waves * largest * self.command_latency)
+
+        results = {
+            d: {
+                "status": "unreachable" if d in self.unreachable else "verified",
+                "commands": len(changes.get(d, [])),
+                "missing": [],
+                "error": "",
+            }
+            for d in devices
+        }
+        committed = not (self.unreachable & set(devices))
+        stdout = render_batch_callback(
+            results, str(extra_vars.get("batch_id", "")), committed, delay, self.not_restored
+        )
+        return subprocess.CompletedProcess(cmd, 0 if committed else 4, stdout, "")
+
+    def _run_show(self, extra_vars: Dict[str, Any], cmd: list, delay: float):
+        """11-show-commands.yml: every device's command list in one session."""
+        commands: Dict[str, list] = extra_vars.get("commands", {})
+        devices = [d for d in str(extra_vars.get("target_hosts", "")).split(",") if d]
+        if not devices:
+            return subprocess.CompletedProcess(cmd, 2, "", "ERROR! no target_hosts")
+        time.sleep(delay)
+
+        generators = {command: generate for _task, command, generate in PLAYBOOK_OUTPUTS.values()
+                      if command.endswith("| json")}
+        generators.update(SHOW_ONLY_COMMANDS)
+        results = {}
+        for device in devices:
+            if device in self.unreachable:
+                results[device] = {"stdout": [], "unreachable": True,
+                                   "error": "Failed to connect to the host via ssh: timed out"}
+                continue
+            unknown = [c for c in commands.get(device, []) if c not in generators]
+            if unknown:
+                results[device] = {"stdout": [], "unreachable": False,
+                                   "error": f"Invalid input (at token 1: '{unknown[0]}')"}
+                continue
+            results[device] = {"stdout": [generators[c](device, self) for c in commands[device]],
+                               "unreachable": False, "error": ""}
+        stdout = render_show_callback(results, delay)
+        returncode = 4 if self.unreachable & set(devices) else 0
+        return subprocess.CompletedProcess(cmd, returncode, stdout, "")
+
+    def _run_push(self, extra_vars: Dict[str, Any], cmd: list, delay: float):
+        """12-push-rendered-config.yml: every device's config file in one session, in parallel."""
+        configs: Dict[str, str] = extra_vars.get("configs", {})
+        devices = [d for d in str(extra_vars.get("target_hosts", "")).split(",") if d]
+        if not devices:
+            return subprocess.CompletedProcess(cmd, 2, "", "ERROR! no target_hosts")
+
+        forks = int(cmd[cmd.index("--forks") + 1]) if "--forks" in cmd else 5
+        time.sleep(delay + math.ceil(len(devices) / forks) * self.command_latency)
+        results = {}
+        for device in devices:
+            if device in self.unreachable:
+                results[device] = {"status": "unreachable",
+                                   "error": "Failed to connect to the host via ssh: timed out"}
+                continue
+            with open(configs[device]) as f:
+                self.pushed[device] = f.read()
+            results[device] = {"status": "pushed", "error": ""}
+        stdout = render_push_callback(results, delay)
+        return subprocess.CompletedProcess(cmd, 4 if self.unreachable & set(devices) else 0, stdout, "")
+
+    def install(self) -> "FakeDeviceBackend":
+        """Route run_ansible_playbook() through this backend."""
+        if self._original is None:
+            self._original = ansible._run_process
+            ansible._run_process = self.run
+        return self
+
+    def uninstall(self) -> None:
+        """Restore the real subprocess runner."""
+        if self._original is not None:
+            ansible._run_process = self._original
+            self._original = None
+
+    def __enter__(self) -> "FakeDeviceBackend":
+        return self.install()
+
+    def __exit__(self, *exc) -> None:
+        self.uninstall()
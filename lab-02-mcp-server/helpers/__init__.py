@@ -5,12 +5,14 @@ Import helpers directly:
     from helpers import run_ansible_playbook, VALID_DEVICES
 """
 
-from .ansible import run_ansible_playbook
+from .ansible import run_ansible_playbook, run_ansible_playbook_async, task_message
 from .constants import (
     DEVICE_USERNAME,
     DEVICE_PASSWORD,
     VALID_DEVICES,
     VALID_LEAVES,
+    DEVICE_GROUPS,
+    expand_devices,
     DEVICE_IPS,
     IP_TO_DEVICE,
     ANSIBLE_DIR
@@ -18,10 +20,14 @@ from .constants import (
 
 __all__ = [
     'run_ansible_playbook',
+    'run_ansible_playbook_async',
+    'task_message',
     'DEVICE_USERNAME',
     'DEVICE_PASSWORD',
     'VALID_DEVICES',
     'VALID_LEAVES',
+    'DEVICE_GROUPS',
+    'expand_devices',
     'DEVICE_IPS',
     'IP_TO_DEVICE',
     'ANSIBLE_DIR'
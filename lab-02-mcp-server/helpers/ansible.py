@@ -2,14 +2,50 @@
 Ansible helper function for running playbooks.
 """
 
+import asyncio
+import contextvars
+import functools
 import subprocess
 import json
 import os
 import shutil
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Any, Optional, Tuple
-from .constants import ANSIBLE_DIR
+from .config_cache import WRITE_PLAYBOOKS, invalidate_config
+from .constants import ANSIBLE_DIR, VALID_DEVICES
+from .metrics import observe_parse, observe_playbook
+from .tracing import record_ansible_tasks, set_attributes, span, tracing_enabled
+
+
+# Threads for run_ansible_playbook_async(); asyncio's default pool has only
+# cpu_count + 4 threads, which would cap concurrent playbooks on small VMs
+PLAYBOOK_THREADS = int(os.getenv("MCP_PLAYBOOK_THREADS", "16"))
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+
+# Playbooks currently running, so a shutting-down server can let them finish
+_IN_FLIGHT = 0
+_IN_FLIGHT_DONE = threading.Condition()
+
+
+def playbooks_in_flight() -> int:
+    """Number of ansible-playbook runs in progress in this process."""
+    return _IN_FLIGHT
+
+
+def wait_for_playbooks(timeout: float) -> int:
+    """
+    Wait until no playbook is running, or timeout seconds.
+
+    Returns:
+        Playbooks still running when the wait ended (0 = drained)
+    """
+    with _IN_FLIGHT_DONE:
+        _IN_FLIGHT_DONE.wait_for(lambda: _IN_FLIGHT == 0, timeout)
+        return _IN_FLIGHT
 
 
 def _get_ansible_playbook_path() -> str:
@@ -38,20 +74,15 @@ def _get_ansible_playbook_path() -> str:
     return shutil.which("ansible-playbook") or "ansible-playbook"
 
 
-def _extract_device_json(ansible_json_output: str) -> Tuple[Optional[Any], Optional[str]]:
+def _load_callback_json(ansible_json_output: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
     """
-    Extract device command output from Ansible JSON callback format.
-
-    The JSON callback outputs structured data. We look for the 'msg' field
-    from debug tasks which contains the device's JSON response.
+    Parse the raw stdout of the Ansible JSON callback.
 
     Args:
         ansible_json_output: Raw stdout from ansible-playbook with JSON callback
 
     Returns:
-        Tuple of (data, error):
-            - On success: (parsed_data, None)
-            - On failure: (None, descriptive_error_string)
+        Tuple of (callback_data, error)
     """
     # Ansible may output text before JSON (e.g., "Using ... config file")
     # Find the start of JSON data
@@ -62,10 +93,50 @@ def _extract_device_json(ansible_json_output: str) -> Tuple[Optional[Any], Optio
     json_text = ansible_json_output[json_start:]
 
     try:
-        data = json.loads(json_text)
+        return json.loads(json_text), None
     except json.JSONDecodeError as e:
         return None, f"JSON decode error at position {e.pos}: {e.msg}"
 
+
+def task_message(stdout: str, task: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    The dict a debug task printed, from a parse_json=True run's stdout.
+
+    Args:
+        stdout: Raw stdout from ansible-playbook with the JSON callback
+        task: Task name (e.g. "Batch summary"); None for the last task
+            that printed a dict
+
+    Returns:
+        The task's msg, or None if no such task printed a dict
+    """
+    data, _error = _load_callback_json(stdout or "")
+    for play in (data or {}).get("plays", []):
+        for entry in reversed(play.get("tasks", [])):
+            if task is not None and entry.get("task", {}).get("name") != task:
+                continue
+            for host_data in entry.get("hosts", {}).values():
+                if isinstance(host_data.get("msg"), dict):
+                    return host_data["msg"]
+    return None
+
+
+def _device_data_from_callback(
+    data: Dict[str, Any],
+    text: bool = False
+) -> Tuple[Optional[Any], Optional[str]]:
+    """
+    Find the device's JSON response in parsed Ansible JSON callback data.
+
+    Args:
+        data: Parsed JSON callback output (see _load_callback_json)
+        text: Return the debug message as-is instead of decoding it as JSON
+
+    Returns:
+        Tuple of (data, error):
+            - On success: (parsed_data, None)
+            - On failure: (None, descriptive_error_string)
+    """
     # Navigate Ansible JSON callback structure:
     # plays[0].tasks[-1].hosts.<hostname>.msg contains our data
     plays = data.get("plays", [])
@@ -94,7 +165,7 @@ def _extract_device_json(ansible_json_output: str) -> Tuple[Optional[Any], Optio
             if "msg" in host_data:
                 msg = host_data["msg"]
                 # msg might be string (needs parsing) or already dict
-                if isinstance(msg, str):
+                if isinstance(msg, str) and not text:
                     try:
                         return json.loads(msg), None
                     except json.JSONDecodeError as e:
@@ -104,10 +175,33 @@ def _extract_device_json(ansible_json_output: str) -> Tuple[Optional[Any], Optio
     return None, "No debug task output found in Ansible response"
 
 
+def _extract_device_json(ansible_json_output: str) -> Tuple[Optional[Any], Optional[str]]:
+    """
+    Extract device command output from Ansible JSON callback format.
+
+    The JSON callback outputs structured data. We look for the 'msg' field
+    from debug tasks which contains the device's JSON response.
+
+    Args:
+        ansible_json_output: Raw stdout from ansible-playbook with JSON callback
+
+    Returns:
+        Tuple of (data, error):
+            - On success: (parsed_data, None)
+            - On failure: (None, descriptive_error_string)
+    """
+    data, error = _load_callback_json(ansible_json_output)
+    if data is None:
+        return None, error
+    return _device_data_from_callback(data)
+
+
 def run_ansible_playbook(
     playbook: str,
     extra_vars: Dict[str, Any],
-    parse_json: bool = False
+    parse_json: bool = False,
+    text: bool = False,
+    forks: Optional[int] = None
 ) -> Dict[str, Any]:
     """
     Run an Ansible playbook with extra variables.
@@ -117,8 +211,13 @@ def run_ansible_playbook(
 
     Args:
         playbook: Playbook filename (e.g., '04-add-vlan.yml')
-        extra_vars: Dictionary of extra variables to pass
+        extra_vars: Dictionary of extra variables to pass (sent as JSON
+            when any value is a dict or list)
         parse_json: If True, use JSON callback and parse device output
+        text: If True, return the device output as text instead of decoding
+            it as JSON (e.g. show running-config); implies parse_json
+        forks: Devices Ansible works on in parallel (default: ansible.cfg,
+            i.e. 5); for playbooks that target many devices
 
     Returns:
         Dictionary with:
@@ -126,7 +225,8 @@ def run_ansible_playbook(
             - return_code: Process exit code
             - stdout: Playbook output
             - stderr: Error output if any
-            - data: Parsed JSON data (only if parse_json=True and successful)
+            - data: Parsed JSON data (only if parse_json=True and successful),
+                or the output string when text=True
 
     Example:
         result = run_ansible_playbook("04-add-vlan.yml", {
@@ -135,7 +235,13 @@ def run_ansible_playbook(
             "vlan_name": "Management"
         })
     """
-    extra_vars_str = " ".join(f"{k}={v}" for k, v in extra_vars.items())
+    global _IN_FLIGHT
+    parse_json = parse_json or text
+    if any(isinstance(v, (dict, list)) for v in extra_vars.values()):
+        # key=value cannot carry nested data; Ansible also accepts JSON
+        extra_vars_str = json.dumps(extra_vars)
+    else:
+        extra_vars_str = " ".join(f"{k}={v}" for k, v in extra_vars.items())
 
     cmd = [
         _get_ansible_playbook_path(),
@@ -143,21 +249,113 @@ def run_ansible_playbook(
         "--extra-vars", extra_vars_str,
         "-v"
     ]
+    if forks:
+        cmd += ["--forks", str(forks)]
 
     # Set up environment for JSON callback if parsing
     env = os.environ.copy()
     if parse_json:
         env["ANSIBLE_STDOUT_CALLBACK"] = "json"
 
+    with _IN_FLIGHT_DONE:
+        _IN_FLIGHT += 1
+    try:
+        with span(
+            f"ansible-playbook {playbook}",
+            **{"ansible.playbook": playbook, "ansible.target_host": extra_vars.get("target_host")}
+        ) as playbook_span:
+            return _execute_playbook(playbook, extra_vars, cmd, env, parse_json, text, playbook_span)
+    finally:
+        if playbook in WRITE_PLAYBOOKS:
+            # Even a failed run may have applied part of the change
+            target = extra_vars.get("target_host")
+            invalidate_config(target if target in VALID_DEVICES else None)
+            from .prefetch import invalidate_prefetched  # imports this module
+            invalidate_prefetched(target if target in VALID_DEVICES else None)
+        with _IN_FLIGHT_DONE:
+            _IN_FLIGHT -= 1
+            _IN_FLIGHT_DONE.notify_all()
+
+
+async def run_ansible_playbook_async(
+    playbook: str,
+    extra_vars: Dict[str, Any],
+    parse_json: bool = False,
+    text: bool = False,
+    forks: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    run_ansible_playbook() in a worker thread.
+
+    ansible-playbook blocks for seconds; awaiting this instead keeps the
+    event loop free, so several devices can be queried concurrently. Up to
+    MCP_PLAYBOOK_THREADS (default 16) playbooks run at the same time.
+    """
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        _EXECUTOR = ThreadPoolExecutor(PLAYBOOK_THREADS, thread_name_prefix="ansible")
+    # Like asyncio.to_thread: the worker thread sees the caller's context (trace spans)
+    call = functools.partial(run_ansible_playbook, playbook, extra_vars, parse_json, text, forks)
+    return await asyncio.get_running_loop().run_in_executor(
+        _EXECUTOR, contextvars.copy_context().run, call
+    )
+
+
+def _run_process(
+    playbook: str,
+    extra_vars: Dict[str, Any],
+    cmd: list,
+    env: Dict[str, str]
+) -> subprocess.CompletedProcess:
+    """
+    Execute ansible-playbook and capture its output.
+
+    This is the only place a process is started, so benchmarks can swap in
+    a simulated device backend (see benchmarks/fake_backend.py).
+
+    With MCP_DETACH_PLAYBOOKS=1 (set by serve_http.py) the playbook runs in
+    its own session, so Ctrl-C on the server does not interrupt a change
+    half-way; the server waits for it instead.
+
+    With MCP_ANSIBLE_WORKER=1 the run goes to the pre-forked Ansible worker
+    (helpers/ansible_worker.py), which skips interpreter and Ansible startup;
+    while the worker is not reachable, ansible-playbook is started as usual.
+    """
+    # Imported here so `python -m helpers.ansible_worker` does not import itself
+    from . import ansible_worker
+
+    if ansible_worker.WORKER_ENABLED:
+        try:
+            return ansible_worker.run_in_worker(cmd, env, timeout=120)
+        except ansible_worker.WorkerUnavailable:
+            ansible_worker.ensure_worker()
+    return subprocess.run(
+        cmd,
+        cwd=ANSIBLE_DIR,
+        capture_output=True,
+        text=True,
+        timeout=120,
+        env=env,
+        start_new_session=os.getenv("MCP_DETACH_PLAYBOOKS", "") == "1"
+    )
+
+
+def _execute_playbook(
+    playbook: str,
+    extra_vars: Dict[str, Any],
+    cmd: list,
+    env: Dict[str, str],
+    parse_json: bool,
+    text: bool,
+    playbook_span: Any
+) -> Dict[str, Any]:
+    """Run ansible-playbook and build the response (inside the playbook span)."""
+    start = time.perf_counter()
     try:
-        result = subprocess.run(
-            cmd,
-            cwd=ANSIBLE_DIR,
-            capture_output=True,
-            text=True,
-            timeout=120,
-            env=env
-        )
+        result = _run_process(playbook, extra_vars, cmd, env)
+        elapsed = time.perf_counter() - start
+        observe_playbook(playbook, elapsed, "ok" if result.returncode == 0 else "failed")
+        set_attributes(playbook_span, **{"ansible.return_code": result.returncode})
 
         response = {
             "success": result.returncode == 0,
@@ -168,7 +366,22 @@ def run_ansible_playbook(
 
         # Parse JSON output if requested and successful
         if parse_json and result.returncode == 0:
-            data, parse_error = _extract_device_json(result.stdout)
+            with span("ansible.parse"):
+                parse_start = time.perf_counter()
+                callback, parse_error = _load_callback_json(result.stdout)
+                data = None
+                if callback is not None:
+                    data, parse_error = _device_data_from_callback(callback, text)
+                observe_parse(time.perf_counter() - parse_start)
+
+            if callback is not None and tracing_enabled():
+                # Whatever is not spent inside plays is interpreter/plugin startup
+                in_plays = record_ansible_tasks(callback)
+                set_attributes(playbook_span, **{
+                    "ansible.in_plays_seconds": round(in_plays, 4),
+                    "ansible.startup_seconds": round(max(0.0, elapsed - in_plays), 4),
+                })
+
             if data is not None:
                 response["data"] = data
             elif parse_error:
@@ -177,18 +390,21 @@ def run_ansible_playbook(
         return response
 
     except subprocess.TimeoutExpired:
+        observe_playbook(playbook, time.perf_counter() - start, "timeout")
         return {
             "success": False,
             "return_code": -1,
             "error": "Playbook execution timed out after 120 seconds"
         }
     except FileNotFoundError:
+        observe_playbook(playbook, time.perf_counter() - start, "error")
         return {
             "success": False,
             "return_code": -1,
             "error": "ansible-playbook not found. Ensure Ansible is installed."
         }
     except Exception as e:
+        observe_playbook(playbook, time.perf_counter() - start, "error")
         return {
             "success": False,
             "return_code": -1,
@@ -0,0 +1,324 @@
+"""
+Pre-forked Ansible worker ("zygote") for run_ansible_playbook().
+
+Every ansible-playbook process spends a second or more importing Python and
+Ansible, loading plugins and finding the arista.eos collection before it
+touches a device. The worker pays that once: it imports Ansible and the
+collection's plugins, then listens on a Unix socket and forks one child per
+playbook run. The child starts with everything already imported, runs the
+playbook in-process and sends back the exit code, stdout and stderr, exactly
+as the ansible-playbook process would have produced them.
+
+Enable it with MCP_ANSIBLE_WORKER=1. helpers/ansible.py then starts the
+worker on first use and sends later runs to it; runs made while the worker
+is not reachable (including that first one) use a normal ansible-playbook
+process. The worker exits after MCP_ANSIBLE_WORKER_IDLE seconds (default
+600) without a request. It can also be started by hand:
+
+    python -m helpers.ansible_worker
+"""
+
+import argparse
+import importlib
+import json
+import os
+import signal
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .constants import ANSIBLE_DIR
+
+WORKER_ENABLED = os.getenv("MCP_ANSIBLE_WORKER", "").lower() in ("1", "true", "yes")
+SOCKET_PATH = os.getenv(
+    "MCP_ANSIBLE_WORKER_SOCKET",
+    str(Path(__file__).resolve().parent.parent / "data" / "ansible-worker.sock")
+)
+IDLE_SECONDS = float(os.getenv("MCP_ANSIBLE_WORKER_IDLE", "600"))
+ENTRY = "ansible.cli.playbook:main"
+
+# Imported once in the worker; every forked child inherits them
+PRELOAD_MODULES = (
+    "ansible.cli.playbook",
+    "ansible.executor.playbook_executor",
+    "ansible.executor.task_executor",
+    "ansible.inventory.manager",
+    "ansible.plugins.callback.default",
+    "ansible.plugins.inventory.yaml",
+)
+PRELOAD_PLUGINS = (
+    ("callback_loader", "ansible.posix.json"),
+    ("action_loader", "arista.eos.eos"),
+    ("cliconf_loader", "arista.eos.eos"),
+    ("terminal_loader", "arista.eos.eos"),
+    ("connection_loader", "ansible.netcommon.network_cli"),
+    ("connection_loader", "ansible.netcommon.httpapi"),
+)
+
+
+class WorkerUnavailable(Exception):
+    """The worker is not running; use a normal ansible-playbook process."""
+
+
+# =============================================================================
+# Wire format: 4-byte length + JSON, one request and one response per connection
+# =============================================================================
+
+def _send(sock: socket.socket, message: Dict[str, Any]) -> None:
+    data = json.dumps(message).encode()
+    sock.sendall(struct.pack("!I", len(data)) + data)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Ansible worker closed the connection")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv(sock: socket.socket) -> Dict[str, Any]:
+    (size,) = struct.unpack("!I", _recv_exact(sock, 4))
+    return json.loads(_recv_exact(sock, size))
+
+
+# =============================================================================
+# Client (the MCP server)
+# =============================================================================
+
+def run_in_worker(
+    cmd: List[str],
+    env: Dict[str, str],
+    timeout: float,
+    socket_path: Optional[str] = None
+) -> subprocess.CompletedProcess:
+    """
+    Run an ansible-playbook command line in a forked worker child.
+
+    Args:
+        cmd: The ansible-playbook command (cmd[0], the executable, is not used)
+        env: Environment for the run
+        timeout: Seconds before the run is abandoned
+        socket_path: Worker socket (default: SOCKET_PATH)
+
+    Raises:
+        WorkerUnavailable: No worker listens on the socket
+        subprocess.TimeoutExpired: The run took longer than timeout
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            sock.connect(socket_path or SOCKET_PATH)
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            raise WorkerUnavailable(str(e)) from e
+        sock.settimeout(timeout)
+        _send(sock, {"args": cmd[1:], "env": env, "timeout": timeout})
+        try:
+            reply = _recv(sock)
+        except socket.timeout:
+            raise subprocess.TimeoutExpired(cmd, timeout)
+    finally:
+        sock.close()
+    return subprocess.CompletedProcess(cmd, reply["returncode"], reply["stdout"], reply["stderr"])
+
+
+_START_LOCK = threading.Lock()
+_LAST_START = 0.0
+RESTART_SECONDS = 60
+
+
+def ensure_worker(socket_path: Optional[str] = None) -> bool:
+    """
+    Start the worker in the background (at most once a minute per process).
+
+    Returns:
+        True if a worker was started by this call
+    """
+    global _LAST_START
+    path = socket_path or SOCKET_PATH
+    with _START_LOCK:
+        if _LAST_START and time.monotonic() - _LAST_START < RESTART_SECONDS:
+            return False
+        _LAST_START = time.monotonic()
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(f"{path}.log", "a") as log:
+        subprocess.Popen(
+            [sys.executable, "-m", "helpers.ansible_worker", "--socket", path],
+            cwd=Path(__file__).resolve().parent.parent,
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True
+        )
+    return True
+
+
+# =============================================================================
+# Worker
+# =============================================================================
+
+def _load_entry(entry: str) -> Callable[[List[str]], Any]:
+    module, _, name = entry.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def preload() -> List[str]:
+    """Import Ansible and the EOS collection plugins; returns what could not be loaded."""
+    missing = []
+    for module in PRELOAD_MODULES:
+        try:
+            importlib.import_module(module)
+        except Exception:
+            missing.append(module)
+    try:
+        from ansible.plugins import loader
+        loader.init_plugin_loader()
+        # Each run's CLI configures the loader again; keep that out of stderr
+        warnings.filterwarnings("ignore", "AnsibleCollectionFinder has already been configured")
+        for loader_name, plugin in PRELOAD_PLUGINS:
+            if getattr(loader, loader_name).get(plugin, class_only=True) is None:
+                missing.append(plugin)
+        if not loader.module_loader.find_plugin("arista.eos.eos_command"):
+            missing.append("arista.eos.eos_command")
+    except Exception:
+        missing.append("ansible.plugins.loader")
+    return missing
+
+
+def _run_child(conn: socket.socket, entry: Callable[[List[str]], Any]) -> None:
+    """In a forked child: run one request and reply."""
+    request = _recv(conn)
+    # Own process group: Ctrl-C on the server does not reach the run, and
+    # the timeout below can stop Ansible's own worker processes too
+    os.setsid()
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)  # Ansible waits for its own processes
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGALRM, lambda *_: os.killpg(0, signal.SIGKILL))
+    signal.alarm(int(request["timeout"]) + 5)
+
+    # ansible.constants is read from the environment at import time; re-read
+    # it when this run's ANSIBLE_* settings differ from the worker's
+    env = request["env"]
+    reload_config = any(
+        os.environ.get(k) != env.get(k)
+        for k in set(os.environ) | set(env) if k.startswith("ANSIBLE_")
+    )
+    os.environ.clear()
+    os.environ.update(env)
+    if reload_config and "ansible.constants" in sys.modules:
+        importlib.reload(sys.modules["ansible.constants"])
+
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        os.dup2(out.fileno(), 1)
+        os.dup2(err.fileno(), 2)
+        try:
+            entry(["ansible-playbook", *request["args"]])
+            code = 0
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except BaseException as e:
+            print(f"ERROR! {type(e).__name__}: {e}", file=sys.stderr)
+            code = 250
+        sys.stdout.flush()
+        sys.stderr.flush()
+        out.seek(0)
+        err.seek(0)
+        _send(conn, {
+            "returncode": code,
+            "stdout": out.read().decode(errors="replace"),
+            "stderr": err.read().decode(errors="replace"),
+        })
+
+
+def serve(
+    socket_path: str = SOCKET_PATH,
+    idle: float = IDLE_SECONDS,
+    entry: str = ENTRY,
+    cwd: str = ANSIBLE_DIR
+) -> int:
+    """
+    Preload Ansible, then fork a child per connection until idle for `idle` seconds.
+
+    Returns:
+        Exit code (0 also when another worker already owns the socket)
+    """
+    import fcntl
+
+    Path(socket_path).parent.mkdir(parents=True, exist_ok=True)
+    lock = open(f"{socket_path}.lock", "w")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        print(f"[INFO] Ansible worker already running on {socket_path}")
+        return 0
+
+    os.chdir(cwd)  # ansible.cfg is found relative to the working directory
+    # Most runs use the JSON callback; runs that do not re-read the config
+    os.environ.setdefault("ANSIBLE_STDOUT_CALLBACK", "json")
+    start = time.perf_counter()
+    run = _load_entry(entry)
+    missing = preload() if entry == ENTRY else []
+    print(f"[INFO] Ansible preloaded in {time.perf_counter() - start:.2f}s"
+          + (f" (not found: {', '.join(missing)})" if missing else ""), flush=True)
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)  # socket readable by this user only
+    try:
+        server.bind(socket_path)
+    finally:
+        os.umask(old_umask)
+    server.listen(64)
+    server.settimeout(idle if idle > 0 else None)
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)  # children are reaped automatically
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))  # remove the socket on the way out
+    print(f"[INFO] Ansible worker listening on {socket_path}", flush=True)
+
+    try:
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                print(f"[INFO] No requests for {idle:.0f}s, exiting", flush=True)
+                return 0
+            except InterruptedError:
+                continue
+            if os.fork() == 0:
+                server.close()
+                try:
+                    conn.settimeout(None)
+                    _run_child(conn, run)
+                finally:
+                    os._exit(0)
+            conn.close()
+    finally:
+        server.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Pre-forked Ansible worker")
+    parser.add_argument("--socket", default=SOCKET_PATH, help=f"Unix socket (default: {SOCKET_PATH})")
+    parser.add_argument("--idle", type=float, default=IDLE_SECONDS,
+                        help="Exit after this many seconds without requests (0 = never)")
+    parser.add_argument("--entry", default=ENTRY,
+                        help="module:function run for each request with the command line")
+    parser.add_argument("--cwd", default=ANSIBLE_DIR, help="Directory with ansible.cfg (default: lab 1)")
+    args = parser.parse_args()
+    return serve(args.socket, args.idle, args.entry, args.cwd)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
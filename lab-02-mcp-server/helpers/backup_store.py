@@ -0,0 +1,339 @@
+"""
+Content-addressed, deduplicated configuration backup store.
+
+playbooks/06-backup-config.yml writes a full copy of the running-config on
+every run, even though almost every file is identical to the previous one.
+This store keeps each backup as a manifest of config sections instead:
+
+    <root>/
+      objects/ab/ab12...ef              zlib-compressed section, named by sha256
+      manifests/<device>/<id>.manifest  zlib-compressed JSON: ordered section hashes
+      manifests/<device>/LATEST         id of the newest snapshot
+
+Sections shared between snapshots (and between devices) are stored once,
+and a device whose config has not changed since its last snapshot is
+skipped without writing anything. Any snapshot can be rebuilt byte-for-byte
+with restore().
+
+The store lives in lab-01-copilots/ansible/backups/store unless
+MCP_BACKUP_STORE is set.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .constants import ANSIBLE_DIR
+
+DEFAULT_STORE = os.path.join(ANSIBLE_DIR, "backups", "store")
+
+
+def split_sections(config: str) -> List[str]:
+    """
+    Split an EOS running-config into top-level sections.
+
+    A section is a run of lines closed by a top-level "!" separator, so a
+    block such as "interface Ethernet1" and its indented lines (plus any
+    "! comment" lines right before it) becomes one chunk. Joining the
+    chunks gives back the original text exactly.
+
+    Args:
+        config: Running-config text
+
+    Returns:
+        List of section strings, in order
+    """
+    sections = []
+    current: List[str] = []
+    has_content = False
+
+    for line in config.splitlines(keepends=True):
+        current.append(line)
+        if line.startswith("!"):
+            if has_content:
+                sections.append("".join(current))
+                current, has_content = [], False
+        elif line.strip():
+            has_content = True
+
+    if current:
+        sections.append("".join(current))
+    return sections
+
+
+def _digest(data: str) -> str:
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+class BackupStore:
+    """
+    Deduplicated backup store on the local filesystem.
+
+    Safe to use from several threads at once (e.g. backing up devices
+    concurrently); writes are atomic renames.
+
+    Args:
+        root: Store directory (default: MCP_BACKUP_STORE or backups/store)
+        compression_level: zlib level for section objects (1-9)
+    """
+
+    def __init__(self, root: Optional[str] = None, compression_level: int = 6):
+        self.root = Path(root or os.getenv("MCP_BACKUP_STORE", DEFAULT_STORE))
+        self.compression_level = compression_level
+        self._objects = self.root / "objects"
+        self._manifests = self.root / "manifests"
+        self._lock = threading.Lock()
+        self._known: Optional[set] = None
+        self._dirs: set = set()
+        # device -> (config sha256, snapshot id, section count) of LATEST
+        self._latest_cache: Dict[str, Optional[tuple]] = {}
+
+    # -------------------------------------------------------------------------
+    # Writing
+    # -------------------------------------------------------------------------
+
+    def backup(self, device: str, config: str) -> Dict[str, Any]:
+        """
+        Store a snapshot of a device config unless it is unchanged.
+
+        Args:
+            device: Device name
+            config: Running-config text
+
+        Returns:
+            Dictionary with status ("stored" or "unchanged"), snapshot id,
+            section counts and bytes written
+        """
+        config_digest = _digest(config)
+        latest = self._latest(device)
+        if latest is not None and latest[0] == config_digest:
+            return {
+                "device": device,
+                "status": "unchanged",
+                "snapshot": latest[1],
+                "sections": latest[2],
+                "new_sections": 0,
+                "bytes_written": 0,
+            }
+
+        sections = split_sections(config)
+        hashes = []
+        new_sections = 0
+        bytes_written = 0
+        for section in sections:
+            digest = _digest(section)
+            hashes.append(digest)
+            written = self._write_object(digest, section)
+            if written:
+                new_sections += 1
+                bytes_written += written
+
+        snapshot = self._new_snapshot_id(device)
+        manifest = {
+            "device": device,
+            "snapshot": snapshot,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "config_sha256": config_digest,
+            "size": len(config.encode()),
+            "sections": hashes,
+        }
+        # The hash list is most of what a changed snapshot costs; compress it
+        data = zlib.compress(json.dumps(manifest, separators=(",", ":")).encode(), 9)
+        device_dir = self._manifests / device
+        self._atomic_write(device_dir / f"{snapshot}.manifest", data)
+        self._atomic_write(device_dir / "LATEST", snapshot.encode())
+        with self._lock:
+            self._latest_cache[device] = (config_digest, snapshot, len(hashes))
+
+        return {
+            "device": device,
+            "status": "stored",
+            "snapshot": snapshot,
+            "sections": len(hashes),
+            "new_sections": new_sections,
+            "bytes_written": bytes_written + len(data),
+        }
+
+    def _latest(self, device: str) -> Optional[tuple]:
+        """(config sha256, snapshot id, section count) of the newest snapshot."""
+        with self._lock:
+            if device in self._latest_cache:
+                return self._latest_cache[device]
+        manifest = self.manifest(device)
+        latest = None
+        if manifest is not None:
+            latest = (manifest["config_sha256"], manifest["snapshot"], len(manifest["sections"]))
+        with self._lock:
+            self._latest_cache.setdefault(device, latest)
+        return latest
+
+    def _write_object(self, digest: str, section: str) -> int:
+        """Store a section if it is new; returns compressed bytes written."""
+        with self._lock:
+            if self._known is None:
+                self._known = {p.name for p in self._objects.glob("*/*")}
+            if digest in self._known:
+                return 0
+            self._known.add(digest)
+
+        payload = zlib.compress(section.encode(), self.compression_level)
+        try:
+            self._atomic_write(self._objects / digest[:2] / digest, payload)
+        except BaseException:
+            with self._lock:
+                self._known.discard(digest)
+            raise
+        return len(payload)
+
+    def _new_snapshot_id(self, device: str) -> str:
+        snapshot = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S.%f")
+        while (self._manifests / device / f"{snapshot}.manifest").exists():
+            snapshot += "0"
+        return snapshot
+
+    def _atomic_write(self, path: Path, data: bytes) -> None:
+        if path.parent not in self._dirs:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._dirs.add(path.parent)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    # -------------------------------------------------------------------------
+    # Reading
+    # -------------------------------------------------------------------------
+
+    def snapshots(self, device: str) -> List[str]:
+        """Snapshot ids for a device, oldest first."""
+        device_dir = self._manifests / device
+        if not device_dir.is_dir():
+            return []
+        return sorted(p.stem for p in device_dir.glob("*.manifest"))
+
+    def manifest(self, device: str, snapshot: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Load a snapshot manifest.
+
+        Args:
+            device: Device name
+            snapshot: Snapshot id; the latest snapshot if omitted
+
+        Returns:
+            Manifest dictionary, or None if there is no such snapshot
+        """
+        device_dir = self._manifests / device
+        if snapshot is None:
+            latest = device_dir / "LATEST"
+            if not latest.exists():
+                return None
+            snapshot = latest.read_text().strip()
+
+        path = device_dir / f"{snapshot}.manifest"
+        if not path.exists():
+            return None
+        return json.loads(zlib.decompress(path.read_bytes()))
+
+    def restore(self, device: str, snapshot: Optional[str] = None) -> str:
+        """
+        Rebuild the config text of a snapshot.
+
+        Raises:
+            KeyError: No such snapshot
+            ValueError: A section is missing or the result fails its checksum
+        """
+        manifest = self.manifest(device, snapshot)
+        if manifest is None:
+            raise KeyError(f"No backup '{snapshot or 'latest'}' for {device}")
+
+        try:
+            config = "".join(self.read_section(d) for d in manifest["sections"])
+        except KeyError as e:
+            raise ValueError(f"Backup {manifest['snapshot']} is missing section {e.args[0][:12]}")
+        if _digest(config) != manifest["config_sha256"]:
+            raise ValueError(f"Backup {manifest['snapshot']} failed checksum verification")
+        return config
+
+    def read_section(self, digest: str) -> str:
+        """Text of one stored section (KeyError if it is not in the store)."""
+        path = self._objects / digest[:2] / digest
+        if not path.exists():
+            raise KeyError(digest)
+        return zlib.decompress(path.read_bytes()).decode()
+
+    def diff(self, device: str, old: str, new: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Structured diff between two snapshots of a device.
+
+        Only sections whose hashes differ between the manifests are read
+        from disk (see config_tree.diff_chunks).
+
+        Args:
+            device: Device name
+            old: Snapshot id of the older config
+            new: Snapshot id of the newer config (latest if omitted)
+
+        Raises:
+            KeyError: Either snapshot does not exist
+        """
+        from .config_tree import diff_chunks
+
+        manifests = []
+        for snapshot in (old, new):
+            manifest = self.manifest(device, snapshot)
+            if manifest is None:
+                raise KeyError(f"No backup '{snapshot or 'latest'}' for {device}")
+            manifests.append(manifest)
+        return diff_chunks(manifests[0]["sections"], manifests[1]["sections"], self.read_section)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Storage used compared with keeping a full copy of every snapshot.
+
+        Returns:
+            Dictionary with snapshot/object counts, logical_bytes (sum of
+            snapshot sizes), stored_bytes (objects + manifests) and ratio
+        """
+        snapshots = 0
+        logical = 0
+        stored = 0
+        for path in self._manifests.glob("*/*.manifest"):
+            snapshots += 1
+            stored += path.stat().st_size
+            logical += json.loads(zlib.decompress(path.read_bytes()))["size"]
+
+        objects = 0
+        for path in self._objects.glob("*/*"):
+            objects += 1
+            stored += path.stat().st_size
+
+        return {
+            "snapshots": snapshots,
+            "objects": objects,
+            "logical_bytes": logical,
+            "stored_bytes": stored,
+            "ratio": round(logical / stored, 2) if stored else None,
+        }
+
+
+_STORE: Optional[BackupStore] = None
+
+
+def get_backup_store() -> BackupStore:
+    """Shared BackupStore instance used by the MCP tools (follows MCP_BACKUP_STORE)."""
+    global _STORE
+    root = Path(os.getenv("MCP_BACKUP_STORE", DEFAULT_STORE))
+    if _STORE is None or _STORE.root != root:
+        _STORE = BackupStore(str(root))
+    return _STORE
@@ -0,0 +1,184 @@
+"""
+Background state collector.
+
+Opt-in: set MCP_COLLECTOR_INTERVAL (seconds, e.g. 60) and the server polls
+device info, interfaces and BGP neighbors for every device on that interval
+and records the results in the snapshot store (helpers/snapshot_store.py).
+Tools such as get_state_snapshot and get_state_changes then answer from the
+store in milliseconds, with the age of the data, and can say what changed
+over time - which live polling alone cannot.
+
+Polling reuses the existing tools (and so the existing playbooks) unchanged.
+It runs in a daemon thread with its own event loop, so the server's event
+loop never waits on a collection round, and the polls of a round share
+playbook runs (helpers/show_batch.py). Its polls get full answers without
+delta tokens (helpers/delta_state.py), so they never evict a client's
+since-token. Interface polls also keep the link state of the fabric graph
+(helpers/fabric_graph.py) current.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .constants import VALID_DEVICES
+from .delta_state import without_tokens
+from .fabric_graph import observe_interfaces
+from .snapshot_store import SnapshotStore, get_snapshot_store
+
+COLLECTOR_INTERVAL = float(os.getenv("MCP_COLLECTOR_INTERVAL", "0"))
+COLLECTOR_WORKERS = int(os.getenv("MCP_COLLECTOR_WORKERS", "6"))
+
+
+def _device_rows(result: Dict[str, Any], ts: float) -> Dict[str, Dict[str, Any]]:
+    """get_device_info() -> one row; uptime becomes a boot time so it only changes on reboot."""
+    return {"": {
+        "hostname": result.get("hostname"),
+        "model": result.get("model"),
+        "version": result.get("version"),
+        "serial_number": result.get("serial_number"),
+        # Rounded so clock jitter between polls is not a change
+        "boot_time": round((ts - float(result.get("uptime_seconds") or 0)) / 60) * 60,
+    }}
+
+
+def _interface_rows(result: Dict[str, Any], ts: float) -> Dict[str, Dict[str, Any]]:
+    return dict(result.get("interfaces", {}))
+
+
+def _bgp_rows(result: Dict[str, Any], ts: float) -> Dict[str, Dict[str, Any]]:
+    return dict(result.get("neighbors", {}))
+
+
+def _collected_tools() -> Dict[str, Tuple[Callable, Callable]]:
+    """kind -> (tool function, rows extractor). Imported late: tools import helpers."""
+    from tools.get_bgp_neighbors import get_bgp_neighbors
+    from tools.get_device_info import get_device_info
+    from tools.get_interfaces import get_interfaces
+
+    return {
+        "device": (get_device_info, _device_rows),
+        "interfaces": (get_interfaces, _interface_rows),
+        "bgp": (get_bgp_neighbors, _bgp_rows),
+    }
+
+
+class StateCollector:
+    """
+    Polls every device on an interval and records state in a SnapshotStore.
+
+    Args:
+        store: Where results go (default: the shared store)
+        interval: Seconds between the start of two rounds
+        devices: Devices to poll (default: VALID_DEVICES)
+        workers: Polls running at the same time
+    """
+
+    def __init__(
+        self,
+        store: Optional[SnapshotStore] = None,
+        interval: float = COLLECTOR_INTERVAL,
+        devices: Optional[List[str]] = None,
+        workers: int = COLLECTOR_WORKERS
+    ):
+        self.store = store or get_snapshot_store()
+        self.interval = interval
+        self.devices = list(devices or VALID_DEVICES)
+        self.workers = workers
+        self.rounds = 0
+        self.last_round: Dict[str, Any] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    async def _poll(self, device: str, kind: str, tool: Callable, rows: Callable,
+                    slots: asyncio.Semaphore) -> Optional[int]:
+        """Run one tool for one device and record it; returns changed rows, None on error."""
+        async with slots:
+            start = time.time()
+            try:
+                with without_tokens():
+                    result = await tool(device)
+            except Exception as e:
+                result = {"error": str(e)}
+        if "error" in result:
+            self.store.record_error(device, kind, str(result["error"]) or "Poll failed", start)
+            return None
+        polled = rows(result, start)
+        if kind == "interfaces":
+            observe_interfaces(device, polled)  # link state for the blast-radius index
+        return self.store.record(device, kind, polled, start, (time.time() - start) * 1000)
+
+    def collect_once(self) -> Dict[str, Any]:
+        """Poll every device and kind once (blocking)."""
+        start = time.perf_counter()
+        tools = _collected_tools()
+        jobs = [(d, kind, tool, rows) for d in self.devices for kind, (tool, rows) in tools.items()]
+
+        async def poll_all() -> List[Optional[int]]:
+            slots = asyncio.Semaphore(self.workers)
+            return await asyncio.gather(*(self._poll(*job, slots) for job in jobs))
+
+        # A loop of its own, also when called from a coroutine (tests, benchmarks)
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            results = pool.submit(asyncio.run, poll_all()).result()
+
+        self.store.prune()
+        self.rounds += 1
+        self.last_round = {
+            "finished_at": time.time(),
+            "duration_seconds": round(time.perf_counter() - start, 3),
+            "polls": len(jobs),
+            "failed": sum(r is None for r in results),
+            "changed_rows": sum(r or 0 for r in results),
+        }
+        return self.last_round
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self.collect_once()
+            except Exception as e:  # keep collecting; the next round may succeed
+                self.last_round = {"finished_at": time.time(), "error": str(e)}
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def start(self) -> "StateCollector":
+        """Start polling in a daemon thread (first round immediately)."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="state-collector", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop after the current round."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+_COLLECTOR: Optional[StateCollector] = None
+
+
+def get_collector() -> Optional[StateCollector]:
+    """The running collector, or None when MCP_COLLECTOR_INTERVAL is not set."""
+    return _COLLECTOR
+
+
+def start_collector() -> Optional[float]:
+    """
+    Start the background collector if MCP_COLLECTOR_INTERVAL is set.
+
+    Returns:
+        The interval in seconds if started, else None
+    """
+    global _COLLECTOR
+    if COLLECTOR_INTERVAL <= 0:
+        return None
+    if _COLLECTOR is None:
+        _COLLECTOR = StateCollector().start()
+    return COLLECTOR_INTERVAL
@@ -0,0 +1,361 @@
+"""
+Declarative compliance rules checked against parsed running-configs.
+
+Checking fleet policy (SSH idle-timeout, eAPI enabled, BGP router-id set,
+no default admin/admin user) used to mean reading every config by hand.
+Rules are kept in YAML (compliance_rules.yml, or MCP_COMPLIANCE_RULES):
+
+    - id: ssh-idle-timeout
+      severity: medium
+      section: 'management ssh$'        # only lines beneath this section
+      require: '^idle-timeout (\\d+)$'  # some line must match ...
+      max: 60                           # ... with the captured number <= 60
+
+A rule can also forbid lines (forbid), bound the captured number from below
+(min) and decide what a config without the section gets (if_missing).
+
+Every verdict is cached by (rule digest, config sha256). Re-checking a
+device whose config did not change costs one hash; editing a rule only
+re-evaluates that rule. Configs that still need work are parsed once each
+(the last MCP_COMPLIANCE_PARSED_CONFIGS parsed configs are kept, default
+1024, so a new rule does not re-parse them) and evaluated in a process pool (MCP_COMPLIANCE_WORKERS, default: one per
+CPU) when there are at least MCP_COMPLIANCE_POOL_MIN of them; smaller
+batches are evaluated in-process, where starting workers would cost more
+than it saves.
+"""
+
+import bisect
+import functools
+import hashlib
+import itertools
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import yaml
+
+from .backup_store import _digest
+from .config_tree import ConfigNode, parse_config
+
+RULES_FILE = os.getenv(
+    "MCP_COMPLIANCE_RULES",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "compliance_rules.yml"),
+)
+COMPLIANCE_WORKERS = int(os.getenv("MCP_COMPLIANCE_WORKERS", "0") or 0) or (os.cpu_count() or 1)
+COMPLIANCE_POOL_MIN = int(os.getenv("MCP_COMPLIANCE_POOL_MIN", "32"))
+COMPLIANCE_CACHE_SIZE = int(os.getenv("MCP_COMPLIANCE_CACHE_SIZE", "200000"))
+COMPLIANCE_PARSED_CONFIGS = int(os.getenv("MCP_COMPLIANCE_PARSED_CONFIGS", "1024"))
+
+SEVERITIES = ("critical", "high", "medium", "low")
+IF_MISSING = ("fail", "pass")
+
+# Characters that match themselves in a regex
+_LITERAL = re.compile(r"[\w /:-]*")
+
+# (passed, detail)
+Verdict = Tuple[bool, str]
+
+
+def _lines(node: ConfigNode) -> Iterable[str]:
+    """Every stripped line beneath node."""
+    for child in node.children.values():
+        yield child.line.strip()
+        yield from _lines(child)
+
+
+def _literal_prefix(pattern: str) -> str:
+    """Text every match of pattern starts with ("interface Ethernet1$" -> "interface Ethernet1")."""
+    if "|" in pattern:
+        return ""
+    prefix = _LITERAL.match(pattern).group()
+    if pattern[len(prefix):len(prefix) + 1] in ("?", "*", "{"):
+        prefix = prefix[:-1]
+    return prefix
+
+
+class ConfigLines:
+    """
+    A parsed config flattened once, so rules only scan lines.
+
+    Top-level sections are kept sorted, so a rule's section regex is only
+    tried on sections starting with its literal prefix, and each section
+    regex is matched once per config however many rules share it.
+    """
+
+    def __init__(self, tree: ConfigNode):
+        self.sections = {key: list(_lines(node)) for key, node in tree.children.items()}
+        self.all = [line for key, lines in self.sections.items() for line in (key, *lines)]
+        self._keys = sorted(self.sections)
+        self._order = {key: i for i, key in enumerate(self.sections)}
+        self._scopes: Dict[str, Optional[List[str]]] = {}
+
+    def scope(self, section: "re.Pattern") -> Optional[List[str]]:
+        """Lines beneath the top-level sections matching section, None if there are none."""
+        if section.pattern not in self._scopes:
+            prefix = _literal_prefix(section.pattern)
+            keys = self._keys[bisect.bisect_left(self._keys, prefix):]
+            matched = [key for key in itertools.takewhile(lambda k: k.startswith(prefix), keys)
+                       if section.match(key)]
+            lines = [line for key in sorted(matched, key=self._order.__getitem__) for line in self.sections[key]]
+            self._scopes[section.pattern] = lines if matched else None
+        return self._scopes[section.pattern]
+
+
+class Rule:
+    """
+    One compliance rule.
+
+    Args:
+        id: Unique rule name
+        description: What the rule checks, for people
+        severity: "critical", "high", "medium" or "low"
+        section: Regex for top-level lines; only lines beneath matching
+            sections are checked (default: every line)
+        require: Regex some checked line must match
+        forbid: Regex no checked line may match
+        min, max: Bounds for the number captured by require's first group
+        if_missing: Verdict when no section matches ("fail" or "pass")
+
+    Raises:
+        ValueError: Invalid field or regex
+    """
+
+    def __init__(
+        self,
+        id: str,
+        description: str = "",
+        severity: str = "medium",
+        section: str = "",
+        require: str = "",
+        forbid: str = "",
+        min: Optional[float] = None,
+        max: Optional[float] = None,
+        if_missing: str = "fail"
+    ):
+        if not id:
+            raise ValueError("rule has no id")
+        if severity not in SEVERITIES:
+            raise ValueError(f"rule {id}: severity must be one of {list(SEVERITIES)}")
+        if if_missing not in IF_MISSING:
+            raise ValueError(f"rule {id}: if_missing must be one of {list(IF_MISSING)}")
+        if not require and not forbid:
+            raise ValueError(f"rule {id}: needs require or forbid")
+        if (min is not None or max is not None) and not require:
+            raise ValueError(f"rule {id}: min and max need a require pattern with a group")
+
+        self.id = id
+        self.description = description
+        self.severity = severity
+        self.if_missing = if_missing
+        self.min = min
+        self.max = max
+        self.spec = {
+            "section": section, "require": require, "forbid": forbid,
+            "min": min, "max": max, "if_missing": if_missing,
+        }
+        # Only what changes the verdict goes into the digest
+        self.digest = hashlib.sha256(json.dumps(self.spec, sort_keys=True).encode()).hexdigest()[:16]
+        try:
+            self.section = re.compile(section) if section else None
+            self.require = re.compile(require) if require else None
+            self.forbid = re.compile(forbid) if forbid else None
+        except re.error as e:
+            raise ValueError(f"rule {id}: bad regex: {e}")
+        if (min is not None or max is not None) and not self.require.groups:
+            raise ValueError(f"rule {id}: min and max need a group in require")
+
+    def evaluate(self, config: ConfigLines) -> Verdict:
+        """(passed, detail) for one flattened config."""
+        if self.section is None:
+            lines = config.all
+        else:
+            lines = config.scope(self.section)
+            if lines is None:
+                return self.if_missing == "pass", f"no section matching '{self.section.pattern}'"
+
+        if self.forbid is not None:
+            for line in lines:
+                if self.forbid.search(line):
+                    return False, f"found: {line}"
+
+        if self.require is not None:
+            found = [m for m in map(self.require.search, lines) if m]
+            if not found:
+                return False, f"missing: {self.require.pattern}"
+            if self.min is not None or self.max is not None:
+                for match in found:
+                    try:
+                        value = float(match.group(1))
+                    except (TypeError, ValueError):
+                        return False, f"not a number: {match.string}"
+                    if self.min is not None and value < self.min:
+                        return False, f"{match.string} (min {self.min:g})"
+                    if self.max is not None and value > self.max:
+                        return False, f"{match.string} (max {self.max:g})"
+        return True, ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        patterns = {k: v for k, v in self.spec.items() if v not in (None, "")}
+        return {"id": self.id, "description": self.description, "severity": self.severity, **patterns}
+
+
+def load_rules(path: str = RULES_FILE) -> List[Rule]:
+    """
+    Rules from a YAML file ({"rules": [...]} or a plain list).
+
+    Raises:
+        OSError: The file cannot be read
+        ValueError: A rule is invalid or ids repeat
+    """
+    with open(path) as f:
+        data = yaml.safe_load(f) or {}
+    items = data.get("rules", []) if isinstance(data, dict) else data
+    rules = []
+    for item in items:
+        if not isinstance(item, dict):
+            raise ValueError(f"rule must be a mapping, got {item!r}")
+        try:
+            rules.append(Rule(**item))
+        except TypeError as e:
+            raise ValueError(f"rule {item.get('id', '?')}: {e}")
+    ids = [r.id for r in rules]
+    repeated = sorted({i for i in ids if ids.count(i) > 1})
+    if repeated:
+        raise ValueError(f"repeated rule ids: {repeated}")
+    return rules
+
+
+@functools.lru_cache(maxsize=COMPLIANCE_PARSED_CONFIGS)
+def _config_lines(text: str) -> ConfigLines:
+    """Parsed and flattened once per process, so a new or edited rule does not re-parse."""
+    return ConfigLines(parse_config(text))
+
+
+def _evaluate_config(job: Tuple[str, List[Rule]]) -> List[Verdict]:
+    """Evaluate rules against one config (runs in a pool worker)."""
+    text, rules = job
+    config = _config_lines(text)
+    return [rule.evaluate(config) for rule in rules]
+
+
+class ComplianceEngine:
+    """
+    Evaluates rules against configs with a per-(rule, config) verdict cache.
+
+    Args:
+        workers: Pool processes (1 evaluates everything in-process)
+        pool_min: Configs needing evaluation before the pool is used
+        cache_size: Verdicts kept before the least recently used are dropped
+    """
+
+    def __init__(
+        self,
+        workers: int = COMPLIANCE_WORKERS,
+        pool_min: int = COMPLIANCE_POOL_MIN,
+        cache_size: int = COMPLIANCE_CACHE_SIZE
+    ):
+        self.workers = workers
+        self.pool_min = pool_min
+        self.cache_size = cache_size
+        self.evaluated = 0
+        self.cached = 0
+        self._verdicts: "OrderedDict[Tuple[str, str], Verdict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _map(self, jobs: List[Tuple[str, List[Rule]]]) -> List[List[Verdict]]:
+        if self.workers <= 1 or len(jobs) < self.pool_min:
+            return [_evaluate_config(job) for job in jobs]
+        with self._lock:
+            if self._pool is None:
+                import multiprocessing
+                # spawn: the server runs threads, which fork does not copy safely
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            pool = self._pool
+        chunksize = max(1, len(jobs) // (self.workers * 4))
+        return list(pool.map(_evaluate_config, jobs, chunksize=chunksize))
+
+    def check(self, configs: Dict[str, str], rules: List[Rule]) -> Dict[str, Any]:
+        """
+        Verdicts for every (device, rule).
+
+        Args:
+            configs: Device name -> running-config text
+            rules: Rules to check
+
+        Returns:
+            {"verdicts": {device: {rule id: (passed, detail)}},
+             "evaluated": n, "cached": n} - evaluated counts (rule, config)
+            pairs that were computed now, cached those served from the cache
+        """
+        hashes = {device: _digest(text) for device, text in configs.items()}
+        texts = {h: configs[d] for d, h in hashes.items()}
+        known: Dict[Tuple[str, str], Verdict] = {}
+        pending: Dict[str, List[Rule]] = {}
+        with self._lock:
+            for h in texts:
+                for rule in rules:
+                    verdict = self._verdicts.get((rule.digest, h))
+                    if verdict is None:
+                        pending.setdefault(h, []).append(rule)
+                    else:
+                        self._verdicts.move_to_end((rule.digest, h))
+                        known[(rule.digest, h)] = verdict
+
+        jobs = list(pending.items())
+        results = self._map([(texts[h], missing) for h, missing in jobs])
+        evaluated = 0
+        with self._lock:
+            for (h, missing), verdicts in zip(jobs, results):
+                for rule, verdict in zip(missing, verdicts):
+                    known[(rule.digest, h)] = self._verdicts[(rule.digest, h)] = verdict
+                    evaluated += 1
+            while len(self._verdicts) > self.cache_size:
+                self._verdicts.popitem(last=False)
+            cached = len(hashes) * len(rules) - evaluated
+            self.evaluated += evaluated
+            self.cached += cached
+
+        return {
+            "verdicts": {
+                device: {rule.id: known[(rule.digest, h)] for rule in rules}
+                for device, h in hashes.items()
+            },
+            "evaluated": evaluated,
+            "cached": cached,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._verdicts.clear()
+
+    def close(self) -> None:
+        """Stop the worker processes (they start again on the next large check)."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "verdicts_cached": len(self._verdicts),
+                "evaluated_total": self.evaluated,
+                "cached_total": self.cached,
+                "workers": self.workers,
+                "pool_running": self._pool is not None,
+            }
+
+
+_ENGINE: Optional[ComplianceEngine] = None
+
+
+def get_compliance_engine() -> ComplianceEngine:
+    global _ENGINE
+    if _ENGINE is None:
+        _ENGINE = ComplianceEngine()
+    return _ENGINE
@@ -0,0 +1,194 @@
+"""
+Cached, section-indexed copies of device running-configs.
+
+Reading config used to mean a full "show running-config" round trip on
+every request. fetch_running_config() keeps the last full config per
+device together with its parsed section tree (helpers/config_tree.py), so
+section lookups are served locally until the copy is older than
+MCP_CONFIG_CACHE_TTL seconds (default 300).
+
+Entries are dropped as soon as a config-changing playbook runs against the
+device (run_ansible_playbook() calls invalidate_config() for
+WRITE_PLAYBOOKS), and concurrent requests for the same device share a
+single fetch. With several server workers, configs and invalidations go
+through the shared store (helpers/shared_state.py), so a write seen by one
+worker drops the cached copy for all of them.
+
+Every fetched config is also handed to the config search index
+(helpers/config_index.py).
+"""
+
+import asyncio
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from .config_index import get_config_index
+from .config_tree import ConfigNode, parse_config
+from .shared_state import SharedKV, get_shared
+
+CONFIG_CACHE_TTL = float(os.getenv("MCP_CONFIG_CACHE_TTL", "300"))
+
+# Playbooks that change device configuration; running one invalidates the
+# cached config of its target_host (or every device when none is given)
+WRITE_PLAYBOOKS = {
+    "01-interfaces.yml",
+    "02-bgp.yml",
+    "03-vlans.yml",
+    "04-add-vlan.yml",
+    "10-batch-config.yml",
+    "12-push-rendered-config.yml",
+}
+
+
+class CachedConfig:
+    """A fetched running-config and its lazily parsed section tree."""
+
+    def __init__(self, text: str, fetched_at: float):
+        self.text = text
+        self.fetched_at = fetched_at
+        self._tree: Optional[ConfigNode] = None
+
+    @property
+    def tree(self) -> ConfigNode:
+        if self._tree is None:
+            self._tree = parse_config(self.text)
+        return self._tree
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+
+class ConfigCache:
+    """
+    Per-device running-config cache.
+
+    Args:
+        ttl: Seconds an entry is served before it is refetched
+        shared: Keep configs and generations in this cross-process store;
+            parsed trees stay per process
+    """
+
+    def __init__(self, ttl: float = CONFIG_CACHE_TTL, shared: Optional[SharedKV] = None):
+        self.ttl = ttl
+        self.shared = shared
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, CachedConfig] = {}
+        # Bumped on invalidation so a fetch that started before a write
+        # does not repopulate the cache with the old config
+        self._generation: Dict[str, int] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def get(self, device: str, max_age: Optional[float] = None) -> Optional[CachedConfig]:
+        """Return the entry if it is younger than max_age (default: ttl)."""
+        entry = self._entries.get(device)
+        if self.shared is not None:
+            stored = self.shared.get(f"config:{device}")
+            if stored is None:
+                entry = None
+            elif entry is None or entry.fetched_at != stored[1]:
+                # Another worker fetched it; keep a local copy for the parsed tree
+                entry = self._entries[device] = CachedConfig(*stored)
+        limit = self.ttl if max_age is None else max_age
+        if entry is not None and entry.age < limit:
+            return entry
+        return None
+
+    def put(self, device: str, text: str) -> CachedConfig:
+        """Store a freshly fetched config."""
+        entry = CachedConfig(text, time.monotonic())
+        self._entries[device] = entry
+        if self.shared is not None:
+            self.shared.put(f"config:{device}", (text, entry.fetched_at))
+        return entry
+
+    def generation(self, device: str) -> int:
+        """Changes whenever the device's entry (or the whole cache) is invalidated."""
+        if self.shared is not None:
+            return (self.shared.get(f"generation:{device}") or 0) + (self.shared.get("generation:*") or 0)
+        return self._generation.get(device, 0) + self._generation.get("*", 0)
+
+    def invalidate(self, device: Optional[str] = None) -> None:
+        """Drop one device's entry, or every entry when device is None."""
+        key = device or "*"
+        self._generation[key] = self._generation.get(key, 0) + 1
+        if device:
+            self._entries.pop(device, None)
+        else:
+            self._entries.clear()
+        if self.shared is not None:
+            self.shared.incr(f"generation:{key}")
+            if device:
+                self.shared.delete(f"config:{device}")
+            else:
+                self.shared.delete(prefix="config:")
+
+    def lock(self, device: str) -> asyncio.Lock:
+        if device not in self._locks:
+            self._locks[device] = asyncio.Lock()
+        return self._locks[device]
+
+
+_CACHE = ConfigCache(shared=get_shared("config"))
+
+
+def get_config_cache() -> ConfigCache:
+    """Shared ConfigCache instance used by the MCP tools."""
+    return _CACHE
+
+
+def invalidate_config(device: Optional[str] = None) -> None:
+    """Forget cached config for a device (or all devices) after a change."""
+    _CACHE.invalidate(device)
+
+
+async def fetch_running_config(
+    device: str,
+    max_age: Optional[float] = None
+) -> Tuple[Optional[CachedConfig], Optional[str]]:
+    """
+    Running-config for a device, from the cache when fresh enough.
+
+    Args:
+        device: Device name
+        max_age: Accept a cached copy up to this many seconds old
+            (default: the cache TTL; 0 always fetches from the device)
+
+    Returns:
+        Tuple of (entry, error); entry.fetched_at tells how old it is
+    """
+    from .ansible import run_ansible_playbook_async
+
+    cache = get_config_cache()
+    entry = cache.get(device, max_age)
+    if entry is not None:
+        cache.hits += 1
+        return entry, None
+
+    async with cache.lock(device):
+        # Another request may have fetched it while we waited
+        entry = cache.get(device, max_age)
+        if entry is not None:
+            cache.hits += 1
+            return entry, None
+
+        cache.misses += 1
+        generation = cache.generation(device)
+        result = await run_ansible_playbook_async(
+            "05-show-config.yml",
+            {"target_host": device},
+            text=True
+        )
+
+        if not result["success"]:
+            return None, result.get("error", result.get("stderr", "Playbook failed"))
+        if not result.get("data"):
+            return None, result.get("parse_error", "Empty configuration")
+
+        get_config_index().observe_live(device, result["data"])
+        if generation != cache.generation(device):
+            # A write ran while we were fetching; return it but do not cache it
+            return CachedConfig(result["data"], time.monotonic()), None
+        return cache.put(device, result["data"]), None
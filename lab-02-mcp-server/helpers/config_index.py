@@ -0,0 +1,299 @@
+"""
+Inverted index over stored running-configs.
+
+"Which devices have neighbor 10.0.5.2 configured?" used to mean fetching
+and scanning every config in turn. ConfigIndex keeps a word index over
+every config the server knows about:
+
+    backup   snapshots in the backup store (helpers/backup_store.py)
+    file     backups/<device>_<timestamp>.cfg from 06-backup-config.yml
+    live     running-configs fetched by the tools (helpers/config_cache.py)
+
+Configs are indexed by top-level section, using the same sha256 chunks the
+backup store deduplicates on. A section that many snapshots or devices
+share is parsed and indexed once. A new snapshot only costs its changed
+sections, plus a link from each unchanged section to the new document.
+Lines are normalized (whitespace collapsed, lower case) and indexed with
+their section path, e.g. ("router bgp 65100",) for a neighbor line. Lines
+holding secrets or passwords are not indexed.
+
+New backups and live fetches are queued as they happen and indexed by the
+next search. The backup store and the backup directory are scanned in
+full on the first search, and again with sync(full=True).
+"""
+
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .backup_store import BackupStore, _digest, get_backup_store, split_sections
+from .config_tree import ConfigNode, parse_config
+from .constants import ANSIBLE_DIR
+
+FILE_BACKUP_DIR = os.path.join(ANSIBLE_DIR, "backups")
+SOURCES = ("backup", "file", "live")
+
+# 06-backup-config.yml: <device>_<YYYYmmddTHHMMSS>.cfg
+_FILE_NAME = re.compile(r"(?P<device>.+)_(?P<stamp>\d{8}T\d{6})\.cfg$")
+_SECRET = re.compile(r"\b(secret|password|key)\b")
+
+Document = namedtuple("Document", "device source snapshot at chunks")
+Line = namedtuple("Line", "path text tokens")
+
+
+def normalize(line: str) -> str:
+    """Collapse whitespace and lower the case: "  Neighbor  10.0.5.2" -> "neighbor 10.0.5.2"."""
+    return " ".join(line.split()).lower()
+
+
+def _contains_phrase(tokens: Tuple[str, ...], phrase: Tuple[str, ...]) -> bool:
+    n = len(phrase)
+    return any(tokens[i:i + n] == phrase for i in range(len(tokens) - n + 1))
+
+
+def _walk(node: ConfigNode, path: Tuple[str, ...] = ()) -> Iterable[Tuple[Tuple[str, ...], str]]:
+    """(section path, line) for every line beneath node."""
+    for child in node.children.values():
+        line = child.line.strip()
+        yield path, line
+        yield from _walk(child, path + (line,))
+
+
+class ConfigIndex:
+    """
+    Word index over configs, by deduplicated top-level section.
+
+    Args:
+        store: Backup store to index (default: the shared store)
+        files_dir: Directory of 06-backup-config.yml backups
+    """
+
+    def __init__(self, store: Optional[BackupStore] = None, files_dir: str = FILE_BACKUP_DIR):
+        self._store = store
+        self.files_dir = Path(files_dir)
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Set[int]] = {}         # token -> line ids
+        self._lines: List[Line] = []
+        self._line_ids: Dict[Tuple[Tuple[str, ...], str], int] = {}
+        self._line_chunks: Dict[int, Set[str]] = {}      # line id -> chunk digests
+        self._chunks: Dict[str, List[int]] = {}          # chunk digest -> line ids
+        self._chunk_docs: Dict[str, Set[int]] = {}       # chunk digest -> document ids
+        self._docs: Dict[int, Document] = {}
+        self._doc_keys: Dict[Tuple[str, str, str], int] = {}
+        self._current: Dict[str, int] = {}               # device -> newest document
+        self._live: Dict[str, int] = {}                  # device -> live document
+        self._next_doc = 0
+        self._pending: List[Tuple] = []
+        self._scanned = False
+        self.chunks_indexed = 0
+
+    @property
+    def store(self) -> BackupStore:
+        return self._store or get_backup_store()
+
+    # -------------------------------------------------------------------------
+    # Indexing
+    # -------------------------------------------------------------------------
+
+    def _index_chunk(self, digest: str, text: str) -> None:
+        line_ids = []
+        for path, line in _walk(parse_config(text)):
+            normalized = normalize(line)
+            if _SECRET.search(normalized):
+                continue
+            key = (path, normalized)
+            line_id = self._line_ids.get(key)
+            if line_id is None:
+                line_id = self._line_ids[key] = len(self._lines)
+                tokens = tuple(normalized.split())
+                self._lines.append(Line(path, line, tokens))
+                for token in set(tokens):
+                    self._postings.setdefault(token, set()).add(line_id)
+            self._line_chunks.setdefault(line_id, set()).add(digest)
+            line_ids.append(line_id)
+        self._chunks[digest] = line_ids
+        self.chunks_indexed += 1
+
+    def _add_document(self, device: str, source: str, snapshot: str, at: float,
+                      chunks: List[str], read) -> Optional[int]:
+        """Link a document to its chunks, indexing the chunks not seen before."""
+        key = (device, source, snapshot)
+        if key in self._doc_keys:
+            return None
+        for digest in chunks:
+            if digest not in self._chunks:
+                self._index_chunk(digest, read(digest))
+        self._next_doc += 1
+        doc_id = self._next_doc
+        self._docs[doc_id] = Document(device, source, snapshot, at, tuple(chunks))
+        self._doc_keys[key] = doc_id
+        for digest in chunks:
+            self._chunk_docs.setdefault(digest, set()).add(doc_id)
+        current = self._docs.get(self._current.get(device))
+        if current is None or at >= current.at:
+            self._current[device] = doc_id
+        return doc_id
+
+    def _drop_document(self, doc_id: int) -> None:
+        doc = self._docs.pop(doc_id)
+        del self._doc_keys[(doc.device, doc.source, doc.snapshot)]
+        for digest in doc.chunks:
+            self._chunk_docs.get(digest, set()).discard(doc_id)
+        if self._current.get(doc.device) == doc_id:
+            newest = max((d for d in self._docs.values() if d.device == doc.device), key=lambda d: d.at, default=None)
+            if newest is None:
+                del self._current[doc.device]
+            else:
+                self._current[doc.device] = self._doc_keys[(newest.device, newest.source, newest.snapshot)]
+
+    def add_config(self, device: str, source: str, snapshot: str, text: str,
+                   at: Optional[float] = None) -> Optional[int]:
+        """Index one config text; a live config replaces the device's previous live one."""
+        sections = {_digest(s): s for s in split_sections(text)}
+        with self._lock:
+            if source == "live" and device in self._live:
+                self._drop_document(self._live.pop(device))
+            doc_id = self._add_document(device, source, snapshot, time.time() if at is None else at,
+                                        list(sections), sections.__getitem__)
+            if source == "live" and doc_id is not None:
+                self._live[device] = doc_id
+            return doc_id
+
+    def _add_manifest(self, manifest: Dict[str, Any]) -> None:
+        try:
+            at = datetime.fromisoformat(manifest["created"]).timestamp()
+        except (KeyError, ValueError):
+            at = 0.0
+        with self._lock:
+            self._add_document(manifest["device"], "backup", manifest["snapshot"], at,
+                               manifest["sections"], self.store.read_section)
+
+    def observe_live(self, device: str, text: str) -> None:
+        """Queue a freshly fetched running-config (indexed by the next search)."""
+        with self._lock:
+            self._pending.append(("live", device, text, time.time()))
+
+    def observe_backup(self, device: str, snapshot: str) -> None:
+        """Queue a new backup store snapshot (indexed by the next search)."""
+        with self._lock:
+            self._pending.append(("backup", device, snapshot, None))
+
+    def sync(self, full: bool = False) -> None:
+        """Index queued configs; on the first call (or full=True) scan the store and files too."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            scan = full or not self._scanned
+            self._scanned = True
+        for source, device, value, at in pending:
+            if source == "live":
+                self.add_config(device, "live", "live", value, at)
+            else:
+                manifest = self.store.manifest(device, value)
+                if manifest is not None:
+                    self._add_manifest(manifest)
+        if scan:
+            self._scan()
+
+    def _scan(self) -> None:
+        store = self.store
+        manifests = store.root / "manifests"
+        if manifests.is_dir():
+            for device_dir in sorted(p for p in manifests.iterdir() if p.is_dir()):
+                for snapshot in store.snapshots(device_dir.name):
+                    if (device_dir.name, "backup", snapshot) not in self._doc_keys:
+                        manifest = store.manifest(device_dir.name, snapshot)
+                        if manifest is not None:
+                            self._add_manifest(manifest)
+        if self.files_dir.is_dir():
+            for path in sorted(self.files_dir.glob("*.cfg")):
+                match = _FILE_NAME.match(path.name)
+                if match is None or (match["device"], "file", match["stamp"]) in self._doc_keys:
+                    continue
+                at = datetime.strptime(match["stamp"], "%Y%m%dT%H%M%S").timestamp()
+                self.add_config(match["device"], "file", match["stamp"], path.read_text(), at)
+
+    # -------------------------------------------------------------------------
+    # Searching
+    # -------------------------------------------------------------------------
+
+    def search(
+        self,
+        query: str,
+        devices: Optional[Iterable[str]] = None,
+        section: str = "",
+        history: bool = False,
+        limit: int = 50
+    ) -> Dict[str, Any]:
+        """
+        Lines containing query (whole words, in order, case-insensitive).
+
+        Args:
+            query: e.g. "neighbor 10.0.5.2" or "vlan 30"
+            devices: Only these devices (default: all)
+            section: Only lines in top-level sections starting with this
+                (e.g. "router bgp", "interface Ethernet1")
+            history: Search every stored snapshot, not only each device's newest config
+            limit: Matches returned (all are counted)
+        """
+        phrase = tuple(normalize(query).split())
+        section = normalize(section)
+        wanted = set(devices) if devices is not None else None
+        with self._lock:
+            postings = [self._postings.get(token, set()) for token in phrase]
+            candidates = set.intersection(*sorted(postings, key=len)) if postings else set()
+            scope = set(self._docs) if history else set(self._current.values())
+
+            matches = []
+            for line_id in candidates:
+                line = self._lines[line_id]
+                top = normalize((line.path or (line.text,))[0])
+                if section and not top.startswith(section):
+                    continue
+                if not _contains_phrase(line.tokens, phrase):
+                    continue
+                for digest in self._line_chunks[line_id]:
+                    for doc_id in self._chunk_docs.get(digest, ()):
+                        doc = self._docs[doc_id]
+                        if doc_id in scope and (wanted is None or doc.device in wanted):
+                            matches.append((doc, line))
+            searched = len(scope if wanted is None else [d for d in scope if self._docs[d].device in wanted])
+
+        matches.sort(key=lambda m: (m[0].device, -m[0].at, m[1].path, m[1].text))
+        return {
+            "total_matches": len(matches),
+            "devices": sorted({doc.device for doc, _ in matches}),
+            "matches": [
+                {"device": doc.device, "source": doc.source, "snapshot": doc.snapshot,
+                 "path": list(line.path), "line": line.text}
+                for doc, line in matches[:limit]
+            ],
+            "truncated": len(matches) > limit,
+            "documents_searched": searched,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            by_source = {s: sum(d.source == s for d in self._docs.values()) for s in SOURCES}
+            return {
+                "documents": len(self._docs),
+                "documents_by_source": by_source,
+                "devices": len(self._current),
+                "sections": len(self._chunks),
+                "lines": len(self._lines),
+                "words": len(self._postings),
+            }
+
+
+_INDEX: Optional[ConfigIndex] = None
+
+
+def get_config_index() -> ConfigIndex:
+    global _INDEX
+    if _INDEX is None:
+        _INDEX = ConfigIndex()
+    return _INDEX
@@ -0,0 +1,195 @@
+"""
+Offline rendering of each device's intended fabric configuration.
+
+01-interfaces.yml and 02-bgp.yml configure devices with one eos_config
+item per interface or neighbor, each a CLI round trip, so their run time
+grows with the number of peers. render_configs() instead builds the fabric
+sections of every device from the inventory (ASNs and router IDs, through
+helpers/topology.py) and FABRIC_LINKS (the /30 point-to-point addressing):
+
+    interface Ethernet<n>     one per fabric link: description, routed, address
+    router bgp <asn>          router-id, remote-as and description per peer
+
+The Jinja2 template (lab-01-copilots/ansible/templates/eos-fabric.j2) is
+compiled once and reused for every device, and the per-device variables
+come from one pass over the links. tools/push_rendered_config.py pushes the
+result with playbooks/12-push-rendered-config.yml: one EOS configuration
+session per device, all devices in parallel.
+
+Every rendered config carries an intended hash (the section tree hash of
+helpers/config_tree.py). A device is skipped when its last known
+running-config already has the rendered sections. That is either the cached
+copy (helpers/config_cache.py) or what was pushed last, if nothing has
+written to the device since.
+"""
+
+import functools
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import jinja2
+
+from .config_cache import get_config_cache
+from .config_tree import ConfigNode, parse_config
+from .constants import ANSIBLE_DIR, FABRIC_LINKS
+from .topology import TopologyCache, get_topology_cache
+
+TEMPLATE_DIR = os.path.join(ANSIBLE_DIR, "templates")
+FABRIC_TEMPLATE = "eos-fabric.j2"
+PREFIX_LENGTH = 30  # fabric point-to-point subnets (01-interfaces.yml)
+
+MODES = ("merge", "replace")
+
+
+@functools.lru_cache(maxsize=None)
+def _template(name: str = FABRIC_TEMPLATE) -> jinja2.Template:
+    """Compiled once per process; rendering reuses it for every device."""
+    env = jinja2.Environment(
+        loader=jinja2.FileSystemLoader(TEMPLATE_DIR),
+        trim_blocks=True,
+        lstrip_blocks=True,
+        undefined=jinja2.StrictUndefined,
+        keep_trailing_newline=True,
+    )
+    return env.get_template(name)
+
+
+def device_vars(topology: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Template variables for every device, from one pass over FABRIC_LINKS."""
+    devices = {d["name"]: d for d in topology["devices"]}
+    result = {
+        name: {"hostname": name, "asn": d.get("asn"), "router_id": d.get("router_id"),
+               "prefix_length": PREFIX_LENGTH, "interfaces": [], "neighbors": []}
+        for name, d in devices.items()
+    }
+    for link in FABRIC_LINKS:
+        for side, other in (("spine", "leaf"), ("leaf", "spine")):
+            device, peer = link[side], link[other]
+            if device not in result:
+                continue
+            result[device]["interfaces"].append(
+                {"name": link[f"{side}_interface"], "peer": peer, "address": link[f"{side}_ip"]}
+            )
+            remote_as = (devices.get(peer) or {}).get("asn")
+            if remote_as:
+                result[device]["neighbors"].append(
+                    {"ip": link[f"{other}_ip"], "remote_as": remote_as, "description": peer}
+                )
+    return result
+
+
+def _replace_lines(tree: ConfigNode) -> List[str]:
+    """Lines that clear the rendered sections first, so they end up exactly as rendered."""
+    lines = []
+    for key in tree.children:
+        if key.startswith("interface "):
+            lines.append(f"default {key}")
+        elif key.startswith("router bgp "):
+            lines.append("no router bgp")
+    return lines
+
+
+def _contains(running: ConfigNode, intended: ConfigNode) -> bool:
+    """Every intended line is present in running (extra running lines are allowed)."""
+    for key, child in intended.children.items():
+        found = running.children.get(key)
+        if found is None or (found.hash != child.hash and not _contains(found, child)):
+            return False
+    return True
+
+
+class RenderedConfig:
+    """One device's rendered fabric sections and their section tree."""
+
+    def __init__(self, device: str, text: str):
+        self.device = device
+        self.text = text
+        self.tree = parse_config(text)
+
+    @property
+    def intended_hash(self) -> str:
+        return self.tree.hash
+
+    def push_text(self, mode: str) -> str:
+        """The config to push: in replace mode, preceded by lines clearing the sections."""
+        if mode == "replace":
+            return "\n".join(_replace_lines(self.tree)) + "\n" + self.text
+        return self.text
+
+    def matches(self, running: ConfigNode, mode: str) -> bool:
+        """True if running already has these sections (exactly, in replace mode)."""
+        if mode == "replace":
+            return all(
+                key in running.children and running.children[key].hash == node.hash
+                for key, node in self.tree.children.items()
+            )
+        return _contains(running, self.tree)
+
+
+class ConfigRenderer:
+    """
+    Renders fabric configs and remembers what was pushed.
+
+    Args:
+        cache: Source of the inventory (devices, ASNs, router IDs)
+    """
+
+    def __init__(self, cache: Optional[TopologyCache] = None):
+        self.cache = cache or get_topology_cache()
+        self.renders = 0
+        # device -> (intended hash, mode, config cache generation) of the last push
+        self._pushed: Dict[str, Tuple[str, str, int]] = {}
+        self._lock = threading.Lock()
+
+    def render(self, devices: Optional[List[str]] = None) -> Dict[str, RenderedConfig]:
+        """
+        Render the fabric sections of devices (default: every inventory device).
+
+        Raises:
+            KeyError: A device is not in the inventory
+            ValueError: The inventory could not be read
+        """
+        topology = self.cache.topology()
+        if topology is None:
+            raise ValueError("Inventory could not be read; see topology://containerlab")
+        variables = device_vars(topology)
+        template = _template()
+        names = list(variables) if devices is None else devices
+        rendered = {name: RenderedConfig(name, template.render(**variables[name])) for name in names}
+        self.renders += 1
+        return rendered
+
+    def unchanged(self, rendered: RenderedConfig, mode: str) -> Optional[str]:
+        """
+        Why the push can be skipped ("running_config" or "last_push"), None if it cannot.
+        """
+        config_cache = get_config_cache()
+        entry = config_cache.get(rendered.device)
+        if entry is not None:
+            return "running_config" if rendered.matches(entry.tree, mode) else None
+        with self._lock:
+            pushed = self._pushed.get(rendered.device)
+        if pushed is None:
+            return None
+        digest, pushed_mode, generation = pushed
+        if (digest == rendered.intended_hash and generation == config_cache.generation(rendered.device)
+                and (mode == "merge" or pushed_mode == "replace")):
+            return "last_push"
+        return None
+
+    def record_push(self, rendered: RenderedConfig, mode: str) -> None:
+        """Remember a successful push until something else writes to the device."""
+        generation = get_config_cache().generation(rendered.device)
+        with self._lock:
+            self._pushed[rendered.device] = (rendered.intended_hash, mode, generation)
+
+
+_RENDERER: Optional[ConfigRenderer] = None
+
+
+def get_renderer() -> ConfigRenderer:
+    global _RENDERER
+    if _RENDERER is None:
+        _RENDERER = ConfigRenderer()
+    return _RENDERER
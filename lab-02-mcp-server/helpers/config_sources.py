@@ -0,0 +1,36 @@
+"""
+Device configs by source, for tools that compare or check configs.
+
+    running   - live running-config (helpers/config_cache.py, always refetched)
+    intended  - lab-01-copilots/config/<device>.cfg
+    latest    - newest snapshot in the backup store (see backup_configs)
+    <id>      - a specific backup snapshot id
+"""
+
+import asyncio
+import os
+from typing import Optional, Tuple
+
+from .backup_store import get_backup_store
+from .config_cache import fetch_running_config
+from .constants import INTENDED_CONFIG_DIR
+
+
+async def load_config(device: str, source: str) -> Tuple[Optional[str], Optional[str]]:
+    """Return (config_text, error) for one device and source."""
+    if source == "running":
+        entry, error = await fetch_running_config(device, max_age=0)
+        return (entry.text if entry else None), error
+
+    if source == "intended":
+        path = os.path.join(INTENDED_CONFIG_DIR, f"{device}.cfg")
+        if not os.path.exists(path):
+            return None, f"No intended config for {device} ({path})"
+        with open(path) as f:
+            return f.read(), None
+
+    snapshot = None if source == "latest" else source
+    try:
+        return await asyncio.to_thread(get_backup_store().restore, device, snapshot), None
+    except (KeyError, ValueError) as e:
+        return None, str(e).strip("'\"")
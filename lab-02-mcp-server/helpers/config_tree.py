@@ -0,0 +1,279 @@
+"""
+EOS running-config section tree, hash index and structured diff.
+
+parse_config() turns config text into a tree based on indentation:
+
+    interface Ethernet1              <- section
+       description to-spine1         <- child line
+    router bgp 65101                 <- section
+       neighbor 10.0.0.1 remote-as 65100
+       address-family ipv4           <- nested section
+          network 10.1.1.0/24
+
+Every node carries a hash of its line and its children's hashes, so two
+configs can be compared section by section: sections with equal hashes
+are skipped without looking inside them, and only changed blocks are
+walked and returned. Comment lines ("!") and blank lines are ignored.
+"""
+
+import functools
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+
+@dataclass
+class ConfigNode:
+    """
+    One config line and the lines indented beneath it.
+
+    Attributes:
+        line: The line as it appears in the config (trailing spaces removed)
+        children: Child nodes keyed by their stripped line, in config order
+        hash: Hash of line + children (set by parse_config)
+    """
+    line: str
+    children: Dict[str, "ConfigNode"] = field(default_factory=dict)
+    hash: str = ""
+
+    def lines(self) -> List[str]:
+        """This node and everything beneath it, as config lines."""
+        out = [self.line] if self.line else []
+        for child in self.children.values():
+            out.extend(child.lines())
+        return out
+
+
+def _hash_node(node: ConfigNode) -> str:
+    digest = hashlib.blake2b(node.line.strip().encode(), digest_size=16)
+    for child in node.children.values():
+        digest.update(_hash_node(child).encode())
+    node.hash = digest.hexdigest()
+    return node.hash
+
+
+def parse_config(config: str) -> ConfigNode:
+    """
+    Parse running-config text into a section tree.
+
+    Args:
+        config: Running-config text (e.g. lab-01-copilots/config/leaf1.cfg)
+
+    Returns:
+        Root node; its children are the top-level lines/sections
+    """
+    root = ConfigNode(line="")
+    stack = [(-1, root)]
+
+    for raw in config.splitlines():
+        line = raw.rstrip()
+        stripped = line.lstrip(" ")
+        if not stripped or stripped.startswith("!"):
+            continue
+        indent = len(line) - len(stripped)
+
+        while stack[-1][0] >= indent:
+            stack.pop()
+        parent = stack[-1][1]
+
+        key = stripped
+        if key in parent.children:
+            # Repeated lines (rare) are kept apart rather than merged
+            n = 2
+            while f"{stripped} [{n}]" in parent.children:
+                n += 1
+            key = f"{stripped} [{n}]"
+        node = ConfigNode(line=line)
+        parent.children[key] = node
+        stack.append((indent, node))
+
+    _hash_node(root)
+    return root
+
+
+def section_index(root: ConfigNode) -> Dict[str, str]:
+    """Top-level section -> hash, e.g. {"interface Ethernet1": "9f2c..."}."""
+    return {key: node.hash for key, node in root.children.items()}
+
+
+def find_section(root: ConfigNode, name: str) -> Optional[ConfigNode]:
+    """Look up a section by its header line ("router bgp 65101")."""
+    return root.children.get(name.strip())
+
+
+# Friendly names accepted by select_sections() (same as 05-show-config.yml's
+# "section" examples) mapped to the header prefix they select
+SECTION_ALIASES = {
+    "interfaces": "interface ",
+    "bgp": "router bgp",
+    "vlans": "vlan ",
+    "ospf": "router ospf",
+    "acls": "ip access-list",
+    "users": "username ",
+    "management": "management ",
+}
+
+
+def select_sections(root: ConfigNode, section: str) -> List[ConfigNode]:
+    """
+    Top-level sections matching a request, like "show running-config section".
+
+    Args:
+        root: Parsed config
+        section: An alias ("interfaces", "bgp", "vlans", ...), an exact
+            header ("interface Ethernet1"), or a regular expression matched
+            against every line of each section
+
+    Returns:
+        Matching top-level nodes in config order
+    """
+    section = section.strip()
+    alias = SECTION_ALIASES.get(section.lower())
+    if alias:
+        return [node for key, node in root.children.items() if key.startswith(alias)]
+
+    exact = root.children.get(section)
+    if exact is not None:
+        return [exact]
+
+    try:
+        pattern = re.compile(section)
+    except re.error:
+        pattern = re.compile(re.escape(section))
+    return [
+        node for node in root.children.values()
+        if any(pattern.search(line) for line in node.lines())
+    ]
+
+
+def render_sections(nodes: List[ConfigNode]) -> str:
+    """Config text for a list of sections, separated by "!" lines."""
+    return "\n!\n".join("\n".join(node.lines()) for node in nodes) + ("\n" if nodes else "")
+
+
+# =============================================================================
+# Diff
+# =============================================================================
+
+def diff_trees(old: ConfigNode, new: ConfigNode) -> List[Dict[str, Any]]:
+    """
+    Compare two parsed configs and return only the changed blocks.
+
+    Sections whose hashes match are skipped. Sections that exist on only
+    one side are returned whole; for sections present on both sides only
+    the added/removed lines are returned (nested sections get their own
+    entry). Line order inside a section is not compared.
+
+    Returns:
+        List of changes, e.g.
+            {"section": "interface Ethernet1", "status": "changed",
+             "added": ["   description new"], "removed": ["   description old"]}
+            {"section": "vlan 300", "status": "added", "lines": ["vlan 300", "   name APP"]}
+        Top-level single lines (hostname, ip routing, ...) are reported
+        under the section "global".
+    """
+    changes: List[Dict[str, Any]] = []
+    if old.hash != new.hash:
+        _diff_children(old, new, [], changes)
+    return changes
+
+
+def _diff_children(
+    old: ConfigNode,
+    new: ConfigNode,
+    path: List[str],
+    changes: List[Dict[str, Any]]
+) -> None:
+    added: List[str] = []
+    removed: List[str] = []
+    nested: List[tuple] = []
+
+    for key, new_child in new.children.items():
+        old_child = old.children.get(key)
+        if old_child is None:
+            if new_child.children:
+                changes.append(_whole_section(path + [key], "added", new_child))
+            else:
+                added.append(new_child.line)
+        elif old_child.hash != new_child.hash:
+            nested.append((key, old_child, new_child))
+
+    for key, old_child in old.children.items():
+        if key not in new.children:
+            if old_child.children:
+                changes.append(_whole_section(path + [key], "removed", old_child))
+            else:
+                removed.append(old_child.line)
+
+    if added or removed:
+        changes.append({
+            "section": " > ".join(path) or "global",
+            "status": "changed",
+            "added": added,
+            "removed": removed,
+        })
+
+    for key, old_child, new_child in nested:
+        _diff_children(old_child, new_child, path + [key], changes)
+
+
+def _whole_section(path: List[str], status: str, node: ConfigNode) -> Dict[str, Any]:
+    return {"section": " > ".join(path), "status": status, "lines": node.lines()}
+
+
+@functools.lru_cache(maxsize=32)
+def parse_config_cached(config: str) -> ConfigNode:
+    """
+    parse_config() with a small cache keyed by the config text.
+
+    Comparing against the same base (intended config, a backup) repeatedly
+    then only parses the side that changed. Returned trees are shared, so
+    callers must not modify them.
+    """
+    return parse_config(config)
+
+
+def diff_configs(old: str, new: str) -> List[Dict[str, Any]]:
+    """Parse two config texts and diff them (see diff_trees)."""
+    return diff_trees(parse_config_cached(old), parse_config_cached(new))
+
+
+def diff_chunks(
+    old_chunks: Iterable[str],
+    new_chunks: Iterable[str],
+    load: Any
+) -> List[Dict[str, Any]]:
+    """
+    Diff two configs stored as lists of section hashes (backup manifests).
+
+    Chunks present on both sides are skipped without being loaded; only
+    the chunks unique to either side are loaded, parsed and compared, so
+    the cost follows the number of changed sections rather than the size
+    of the config.
+
+    Args:
+        old_chunks: Section hashes of the old snapshot
+        new_chunks: Section hashes of the new snapshot
+        load: Callable returning the text of a section hash
+    """
+    old_list, new_list = list(old_chunks), list(new_chunks)
+    common = set(old_list) & set(new_list)
+    old_text = "".join(load(h) for h in old_list if h not in common)
+    new_text = "".join(load(h) for h in new_list if h not in common)
+    return diff_trees(parse_config(old_text), parse_config(new_text))
+
+
+def summarize(changes: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Count changes by status plus total lines added/removed."""
+    summary = {"added": 0, "removed": 0, "changed": 0, "lines_added": 0, "lines_removed": 0}
+    for change in changes:
+        summary[change["status"]] += 1
+        if change["status"] == "added":
+            summary["lines_added"] += len(change["lines"])
+        elif change["status"] == "removed":
+            summary["lines_removed"] += len(change["lines"])
+        else:
+            summary["lines_added"] += len(change["added"])
+            summary["lines_removed"] += len(change["removed"])
+    return summary
@@ -5,6 +5,7 @@ This module provides configuration values used across all tools.
 """
 
 import os
+from typing import List
 
 # Device credentials (in production, use environment variables!)
 DEVICE_USERNAME = os.getenv("DEVICE_USERNAME", "admin")
@@ -18,10 +19,32 @@ ANSIBLE_DIR = os.path.join(
     "ansible"
 )
 
+# Intended (startup) configs deployed by Containerlab
+INTENDED_CONFIG_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)),
+    "..",
+    "lab-01-copilots",
+    "config"
+)
+
 # Valid device names for validation
 VALID_DEVICES = ["spine1", "spine2", "leaf1", "leaf2", "leaf3", "leaf4"]
 VALID_LEAVES = ["leaf1", "leaf2", "leaf3", "leaf4"]
 
+# Group names tools accept wherever a device name is expected
+DEVICE_GROUPS = {
+    "all": VALID_DEVICES,
+    "leaves": VALID_LEAVES,
+    "spines": [d for d in VALID_DEVICES if d not in VALID_LEAVES],
+}
+
+
+def expand_devices(device: str) -> List[str]:
+    """A device name or group ("leaves", "spines", "all") -> device names ([] if unknown)."""
+    if device in DEVICE_GROUPS:
+        return list(DEVICE_GROUPS[device])
+    return [device] if device in VALID_DEVICES else []
+
 # Device name to IP mapping (for tools that receive IP but need device name)
 DEVICE_IPS = {
     "spine1": "198.18.1.11",
@@ -34,3 +57,20 @@ DEVICE_IPS = {
 
 # Reverse lookup: IP to device name
 IP_TO_DEVICE = {ip: name for name, ip in DEVICE_IPS.items()}
+
+# Spine-leaf links (lab-01-copilots/topology.clab.yml) with the point-to-point
+# addressing from playbooks/01-interfaces.yml and 02-bgp.yml:
+#   spine<s>:Ethernet<n> <-> leaf<n>:Ethernet<s>
+#   subnet 10.0.<(s - 1) * 4 + n>.0/30, spine .1, leaf .2, eBGP between them
+FABRIC_LINKS = [
+    {
+        "spine": f"spine{s}",
+        "spine_interface": f"Ethernet{n}",
+        "spine_ip": f"10.0.{(s - 1) * 4 + n}.1",
+        "leaf": f"leaf{n}",
+        "leaf_interface": f"Ethernet{s}",
+        "leaf_ip": f"10.0.{(s - 1) * 4 + n}.2",
+    }
+    for s in (1, 2)
+    for n in (1, 2, 3, 4)
+]
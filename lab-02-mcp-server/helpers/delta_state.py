@@ -0,0 +1,182 @@
+"""
+Delta responses for device state tools.
+
+get_interfaces and get_bgp_neighbors return a "token" with every answer.
+Passing it back as since=<token> makes the next answer contain only the
+rows that were added, removed or changed since that answer, which keeps
+repeated polling during a troubleshooting session cheap in tokens.
+
+A token is a short hash of (device, kind, rows), so identical states share
+one entry no matter how many clients saw them. Callers that never pass a
+token back (the background collector) answer inside without_tokens(), so
+their polls do not evict the clients' states. Entries are kept in an LRU of MCP_DELTA_MAX_STATES states for at most
+MCP_DELTA_TTL seconds; an unknown or expired token gets a full answer.
+Rows are kept as the tools' slotted models (helpers/models.py), not dicts.
+With several server workers the states live in the shared store
+(helpers/shared_state.py) so a token works on any worker.
+"""
+
+import base64
+import contextlib
+import contextvars
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from .shared_state import SharedKV, get_shared
+
+DELTA_MAX_STATES = int(os.getenv("MCP_DELTA_MAX_STATES", "512"))
+DELTA_TTL = float(os.getenv("MCP_DELTA_TTL", "1800"))
+
+Rows = Dict[str, Any]  # key -> model (or dict)
+
+
+def _plain(row: Any) -> Dict[str, Any]:
+    return row.as_dict() if hasattr(row, "as_dict") else row
+
+
+def state_token(device: str, kind: str, rows: Rows) -> str:
+    """Stable 12-character token for a device's state."""
+    payload = json.dumps([device, kind, rows], sort_keys=True, default=_plain).encode()
+    digest = hashlib.blake2b(payload, digest_size=9).digest()
+    return base64.urlsafe_b64encode(digest).decode()
+
+
+def diff_rows(old: Rows, new: Rows) -> Dict[str, Any]:
+    """Rows added, removed and changed between two states of one table."""
+    added = {k: _plain(v) for k, v in new.items() if k not in old}
+    removed = sorted(k for k in old if k not in new)
+    changed = {}
+    for key, row in new.items():
+        before = old.get(key)
+        if before is None or before == row:
+            continue
+        fields = {c: [before.get(c), v] for c, v in _plain(row).items() if before.get(c) != v}
+        deltas = {
+            c: n - o for c, (o, n) in fields.items()
+            if isinstance(o, (int, float)) and isinstance(n, (int, float))
+            and not isinstance(o, bool) and not isinstance(n, bool)
+        }
+        changed[key] = {"fields": fields, **({"delta": deltas} if deltas else {})}
+    return {
+        "added": added,
+        "removed": removed,
+        "changed": changed,
+        "unchanged": len(new) - len(added) - len(changed),
+    }
+
+
+class DeltaStore:
+    """
+    LRU of recently returned device states, keyed by token.
+
+    Args:
+        max_states: States kept before the least recently used is evicted
+        ttl: Seconds a state is kept after it was last returned
+        shared: Keep states in this cross-process store instead of memory
+    """
+
+    def __init__(
+        self,
+        max_states: int = DELTA_MAX_STATES,
+        ttl: float = DELTA_TTL,
+        shared: Optional[SharedKV] = None
+    ):
+        self.max_states = max_states
+        self.ttl = ttl
+        self.shared = shared
+        self._states: "OrderedDict[str, Tuple[str, str, Rows, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.shared) if self.shared is not None else len(self._states)
+
+    def remember(self, device: str, kind: str, rows: Rows) -> str:
+        """Store a returned state and return its token."""
+        token = state_token(device, kind, rows)
+        if self.shared is not None:
+            self.shared.put(token, (device, kind, rows))
+            return token
+        now = time.monotonic()
+        with self._lock:
+            self._states[token] = (device, kind, rows, now)
+            self._states.move_to_end(token)
+            while len(self._states) > self.max_states:
+                self._states.popitem(last=False)
+        return token
+
+    def recall(self, token: str, device: str, kind: str) -> Optional[Rows]:
+        """The state behind a token, or None if unknown, expired or for another table."""
+        if self.shared is not None:
+            entry = self.shared.get(token)
+            return entry[2] if entry is not None and entry[:2] == (device, kind) else None
+        with self._lock:
+            entry = self._states.get(token)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[3] > self.ttl:
+                del self._states[token]
+                return None
+        if entry[:2] != (device, kind):
+            return None
+        return entry[2]
+
+
+_STORE = DeltaStore(shared=get_shared("delta", DELTA_MAX_STATES, DELTA_TTL))
+
+# False while a caller that never uses tokens is polling (see without_tokens)
+_MINT_TOKENS: contextvars.ContextVar[bool] = contextvars.ContextVar("mint_delta_tokens", default=True)
+
+
+@contextlib.contextmanager
+def without_tokens() -> Iterator[None]:
+    """Answer tools in this context in full, without storing a state or returning a token."""
+    reset = _MINT_TOKENS.set(False)
+    try:
+        yield
+    finally:
+        _MINT_TOKENS.reset(reset)
+
+
+def delta_response(
+    kind: str,
+    device: str,
+    rows: Rows,
+    since: str,
+    full: Callable[[], Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Build a tool response: only the changes if `since` is a known token,
+    otherwise the full response. Either way a new token is included,
+    except inside without_tokens().
+
+    Args:
+        kind: Row type, "interface" or "neighbor" (also names the count field)
+        device: Device name
+        rows: The current table (row key -> fields)
+        since: Token from an earlier response, or "" for a full answer
+        full: Builds the tool's normal (full) response; only called when needed
+    """
+    if not _MINT_TOKENS.get():
+        return full()
+
+    previous = _STORE.recall(since, device, kind) if since else None
+    token = _STORE.remember(device, kind, rows)
+
+    if previous is None:
+        response = {**full(), "token": token}
+        if since:
+            response["since_expired"] = True
+        return response
+
+    return {
+        "device": device,
+        "since": since,
+        "token": token,
+        f"{kind}_count": len(rows),
+        **diff_rows(previous, rows),
+    }
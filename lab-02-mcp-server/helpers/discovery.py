@@ -0,0 +1,245 @@
+"""
+LLDP discovery of the cabling, compared with the declared topology.
+
+The topology is declared in topology.clab.yml, the inventory and
+FABRIC_LINKS, and nothing checked that the cables match. discover() reads
+"show lldp neighbors | json" from every inventory device and builds the
+adjacency graph. It then diffs the graph against the links in
+topology.clab.yml (helpers/topology.py):
+
+    matched     declared and seen
+    missing     declared, but neither end sees it
+    unexpected  seen, but not declared
+    miswired    a declared port sees a different neighbor than declared
+    one_sided   seen from one end only, though both ends were read
+
+Devices are split over MCP_DISCOVERY_RUNS (default 4) concurrent runs of
+11-show-commands.yml, each reading MCP_DISCOVERY_FORKS (default 20)
+devices at a time. At most runs x forks SSH sessions are open at once, and
+hundreds of devices take a few rounds of one command each instead of one
+playbook run per device.
+
+The result is cached for MCP_DISCOVERY_TTL seconds (default 300), and
+concurrent callers share one discovery. Each result is also handed to the
+topology resources, which then show the diff and each device's neighbors.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .show_batch import run_show_commands_async
+from .topology import TopologyCache, get_topology_cache
+
+LLDP_COMMAND = "show lldp neighbors | json"
+DISCOVERY_RUNS = int(os.getenv("MCP_DISCOVERY_RUNS", "4"))
+DISCOVERY_FORKS = int(os.getenv("MCP_DISCOVERY_FORKS", "20"))
+DISCOVERY_TTL = float(os.getenv("MCP_DISCOVERY_TTL", "300"))
+
+Endpoint = Tuple[str, str]  # (device, interface)
+
+
+def _short_name(name: str, devices: Dict[str, Any]) -> str:
+    """LLDP system name -> inventory name ("leaf1.lab" -> "leaf1")."""
+    if name in devices:
+        return name
+    short = name.split(".", 1)[0]
+    return short if short in devices else name
+
+
+def _link_key(a: Endpoint, b: Endpoint) -> Tuple[Endpoint, Endpoint]:
+    return (a, b) if a <= b else (b, a)
+
+
+def _link(key: Tuple[Endpoint, Endpoint], **extra: Any) -> Dict[str, Any]:
+    (a, a_if), (b, b_if) = key
+    return {"a": a, "a_interface": a_if, "b": b, "b_interface": b_if, **extra}
+
+
+def build_adjacency(outputs: Dict[str, Dict[str, Any]], devices: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    LLDP outputs -> adjacency graph.
+
+    Args:
+        outputs: Device -> {"data": show lldp neighbors output} or {"error": ...}
+        devices: Inventory devices (to map LLDP system names to device names)
+
+    Returns:
+        {"neighbors": {device: [{interface, peer, peer_interface}] or None},
+         "links": {link key: set of devices that reported it},
+         "failed": {device: error}}
+    """
+    neighbors: Dict[str, Optional[List[Dict[str, str]]]] = {}
+    links: Dict[Tuple[Endpoint, Endpoint], set] = {}
+    failed: Dict[str, str] = {}
+    for device, result in outputs.items():
+        if "error" in result:
+            failed[device] = result["error"]
+            neighbors[device] = None
+            continue
+        rows = []
+        for entry in result["data"].get("lldpNeighbors", []):
+            peer = _short_name(entry.get("neighborDevice", ""), devices)
+            row = {"interface": entry.get("port", ""), "peer": peer,
+                   "peer_interface": entry.get("neighborPort", "")}
+            rows.append(row)
+            key = _link_key((device, row["interface"]), (peer, row["peer_interface"]))
+            links.setdefault(key, set()).add(device)
+        neighbors[device] = sorted(rows, key=lambda r: r["interface"])
+    return {"neighbors": neighbors, "links": links, "failed": failed}
+
+
+def diff_topology(graph: Dict[str, Any], declared: List[Dict[str, str]]) -> Dict[str, Any]:
+    """Compare an adjacency graph with declared links (helpers.topology link dicts)."""
+    failed = graph["failed"]
+    read = {d for d, rows in graph["neighbors"].items() if rows is not None}
+    seen = graph["links"]
+    declared_keys = {
+        _link_key((link["a"], link["a_interface"]), (link["b"], link["b_interface"])) for link in declared
+    }
+
+    matched, missing, unknown = [], [], []
+    for key in sorted(declared_keys):
+        ends = {key[0][0], key[1][0]}
+        if key in seen:
+            matched.append(key)
+        elif ends & read:
+            missing.append(key)
+        else:
+            unknown.append(key)  # neither end could be read
+    unexpected = sorted(k for k in seen if k not in declared_keys)
+
+    # A missing link whose port sees something else is a miswire, not a gap
+    seen_on: Dict[Endpoint, Tuple[Endpoint, Endpoint]] = {}
+    for key in unexpected:
+        for end in key:
+            seen_on[end] = key
+    miswired = []
+    for key in list(missing):
+        for end in key:
+            found = seen_on.get(end)
+            if found is not None and found in unexpected:
+                miswired.append({"declared": _link(key), "found": _link(found)})
+                missing.remove(key)
+                unexpected.remove(found)
+                break
+
+    one_sided = [
+        _link(k, seen_by=sorted(seen[k])[0]) for k in sorted(seen)
+        if len(seen[k]) == 1 and {k[0][0], k[1][0]} <= read
+    ]
+    if missing or unexpected or miswired:
+        status = "mismatch"
+    elif failed or unknown:
+        status = "incomplete"  # nothing wrong among the devices that were read
+    else:
+        status = "matches"
+    return {
+        "status": status,
+        "links_declared": len(declared_keys),
+        "links_discovered": len(seen),
+        "matched": len(matched),
+        "missing": [_link(k) for k in missing],
+        "unexpected": [_link(k, seen_by=sorted(seen[k])) for k in unexpected],
+        "miswired": miswired,
+        "one_sided": one_sided,
+        "unknown": [_link(k) for k in unknown],
+    }
+
+
+def _chunks(devices: List[str], runs: int) -> List[List[str]]:
+    """Split devices into at most runs groups of nearly equal size."""
+    runs = max(1, min(runs, len(devices)))
+    return [devices[i::runs] for i in range(runs)]
+
+
+class LldpDiscovery:
+    """
+    Cached LLDP discovery of every inventory device.
+
+    Args:
+        cache: Source of the inventory and declared links
+        runs: Playbook runs at the same time
+        forks: Devices each run reads in parallel
+        ttl: Seconds a discovery is reused
+    """
+
+    def __init__(
+        self,
+        cache: Optional[TopologyCache] = None,
+        runs: int = DISCOVERY_RUNS,
+        forks: int = DISCOVERY_FORKS,
+        ttl: float = DISCOVERY_TTL
+    ):
+        self.cache = cache or get_topology_cache()
+        self.runs = runs
+        self.forks = forks
+        self.ttl = ttl
+        self.discoveries = 0
+        self._result: Optional[Dict[str, Any]] = None
+        self._at = 0.0
+        self._inflight: Optional[asyncio.Task] = None
+
+    async def discover(self, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """
+        The adjacency graph and its diff, reused when at most max_age seconds old.
+
+        Args:
+            max_age: Default: the TTL; 0 always reads the devices
+        """
+        max_age = self.ttl if max_age is None else max_age
+        if self._result is not None and time.monotonic() - self._at <= max_age:
+            return {**self._result, "cached": True, "age_seconds": round(time.monotonic() - self._at, 1)}
+
+        task = self._inflight
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = self._inflight = asyncio.get_running_loop().create_task(self._discover())
+        result = await asyncio.shield(task)
+        if "error" in result:
+            return result
+        return {**result, "cached": False, "age_seconds": round(time.monotonic() - self._at, 1)}
+
+    async def _discover(self) -> Dict[str, Any]:
+        topology = await asyncio.to_thread(self.cache.topology)
+        if topology is None:
+            return {"error": "Inventory could not be read; see topology://containerlab"}
+        devices = {d["name"]: d for d in topology["devices"]}
+
+        start = time.perf_counter()
+        runs = await asyncio.gather(*[
+            run_show_commands_async({d: [LLDP_COMMAND] for d in chunk}, forks=self.forks)
+            for chunk in _chunks(list(devices), self.runs)
+        ])
+        outputs = {
+            device: per_command.get(LLDP_COMMAND, {"error": "No result"})
+            for run in runs for device, per_command in run.items()
+        }
+
+        graph = build_adjacency(outputs, devices)
+        diff = diff_topology(graph, topology["links"])
+        result = {
+            **diff,
+            "devices": len(devices),
+            "devices_failed": graph["failed"],
+            "playbook_runs": len(runs),
+            "elapsed_seconds": round(time.perf_counter() - start, 3),
+            "adjacency": graph["neighbors"],
+        }
+        self.cache.set_discovery(
+            {k: diff[k] for k in ("status", "missing", "unexpected", "miswired", "one_sided")},
+            graph["neighbors"],
+        )
+        self._result, self._at = result, time.monotonic()
+        self.discoveries += 1
+        return result
+
+
+_DISCOVERY: Optional[LldpDiscovery] = None
+
+
+def get_discovery() -> LldpDiscovery:
+    global _DISCOVERY
+    if _DISCOVERY is None:
+        _DISCOVERY = LldpDiscovery()
+    return _DISCOVERY
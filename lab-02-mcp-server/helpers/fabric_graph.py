@@ -0,0 +1,314 @@
+"""
+Path and blast-radius index over the fabric graph.
+
+"What is affected if spine1 Ethernet3 fails?" used to be reasoned out from
+raw interface and BGP output. FabricGraph precomputes the answer's parts
+from the declared links (helpers/topology.py, from topology.clab.yml and
+the inventory) and the BGP addressing (FABRIC_LINKS):
+
+- every ECMP path between every pair of leaves: the shortest paths that
+  only transit non-leaf devices, as in a valley-free spine-leaf fabric
+- a reverse index: interface -> link -> BGP session -> paths -> leaf pairs
+
+Link state is applied incrementally. set_interface_state() touches only
+the paths through that link and keeps a count of working paths per leaf
+pair. An impact question walks the paths through the failed links, and
+the answer is memoized until the next state change. Paths that would only
+exist as detours after a failure are not considered.
+
+Interface state comes from the background collector (helpers/collector.py)
+after every interfaces poll, or from a refresh of all interfaces in one
+batched run (refresh_link_states()).
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .constants import FABRIC_LINKS
+from .topology import TopologyCache, get_topology_cache
+
+Link = Tuple[str, str, str, str]  # (a, a_interface, b, b_interface)
+
+
+def _bgp_addresses() -> Dict[Tuple[str, str], Tuple[str, str]]:
+    """(device, interface) -> (local IP, peer IP) of the eBGP session on it."""
+    addresses = {}
+    for link in FABRIC_LINKS:
+        addresses[(link["spine"], link["spine_interface"])] = (link["spine_ip"], link["leaf_ip"])
+        addresses[(link["leaf"], link["leaf_interface"])] = (link["leaf_ip"], link["spine_ip"])
+    return addresses
+
+
+class FabricGraph:
+    """
+    ECMP paths between leaves and which interfaces, sessions and leaves they depend on.
+
+    Args:
+        roles: Device -> role ("spine", "leaf", ...)
+        links: Point-to-point links; each carries one eBGP session (02-bgp.yml)
+        version: Topology version the graph was built from
+    """
+
+    def __init__(self, roles: Dict[str, str], links: Iterable[Link], version: int = 0):
+        self.roles = dict(roles)
+        self.version = version
+        self.links: List[Link] = list(links)
+        self.endpoints: Dict[Tuple[str, str], int] = {}
+        self.device_links: Dict[str, List[int]] = {}
+        for i, (a, a_if, b, b_if) in enumerate(self.links):
+            self.endpoints[(a, a_if)] = i
+            self.endpoints[(b, b_if)] = i
+            self.device_links.setdefault(a, []).append(i)
+            self.device_links.setdefault(b, []).append(i)
+        self.leaves = sorted(d for d, role in self.roles.items() if role == "leaf")
+
+        self.paths: List[Tuple[int, ...]] = []
+        self.path_pair: List[Tuple[str, str]] = []
+        self.pair_paths: Dict[Tuple[str, str], List[int]] = {}
+        self.link_paths: List[List[int]] = [[] for _ in self.links]
+        self._build_paths()
+
+        # State: a down interface takes its link down
+        self._down_ends: Dict[Tuple[str, str], bool] = {}
+        self.link_up = [True] * len(self.links)
+        self.path_down = [0] * len(self.paths)
+        self.pair_alive = {pair: len(ids) for pair, ids in self.pair_paths.items()}
+        self.state_version = 0
+        self._memo: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _build_paths(self) -> None:
+        """Every shortest leaf-to-leaf path, by breadth-first search from each leaf."""
+        for source in self.leaves:
+            distance = {source: 0}
+            parents: Dict[str, List[Tuple[int, str]]] = {}
+            queue = deque([source])
+            while queue:
+                node = queue.popleft()
+                if node != source and self.roles.get(node) == "leaf":
+                    continue  # leaves do not transit
+                for link in self.device_links.get(node, []):
+                    a, _, b, _ = self.links[link]
+                    peer = b if a == node else a
+                    if peer not in distance:
+                        distance[peer] = distance[node] + 1
+                        queue.append(peer)
+                    if distance[peer] == distance[node] + 1:
+                        parents.setdefault(peer, []).append((link, node))
+
+            for target in self.leaves:
+                if target <= source or target not in distance:
+                    continue
+                pair = (source, target)
+                ids = self.pair_paths.setdefault(pair, [])
+                for path in self._walk(parents, source, target):
+                    path_id = len(self.paths)
+                    self.paths.append(path)
+                    self.path_pair.append(pair)
+                    ids.append(path_id)
+                    for link in path:
+                        self.link_paths[link].append(path_id)
+
+    def _walk(self, parents: Dict[str, List[Tuple[int, str]]], source: str, node: str):
+        if node == source:
+            yield ()
+            return
+        for link, parent in parents.get(node, []):
+            for path in self._walk(parents, source, parent):
+                yield path + (link,)
+
+    # -------------------------------------------------------------------------
+    # State
+    # -------------------------------------------------------------------------
+
+    def set_interface_state(self, device: str, interface: str, up: bool) -> bool:
+        """
+        Apply one interface's state; only paths through its link are touched.
+
+        Returns:
+            True if the link changed state
+        """
+        link = self.endpoints.get((device, interface))
+        if link is None:
+            return False
+        with self._lock:
+            self._down_ends[(device, interface)] = not up
+            a, a_if, b, b_if = self.links[link]
+            link_up = not (self._down_ends.get((a, a_if)) or self._down_ends.get((b, b_if)))
+            if link_up == self.link_up[link]:
+                return False
+            self.link_up[link] = link_up
+            step = -1 if link_up else 1
+            for path in self.link_paths[link]:
+                before = self.path_down[path]
+                self.path_down[path] = before + step
+                if before == 0 or self.path_down[path] == 0:
+                    self.pair_alive[self.path_pair[path]] -= step
+            self.state_version += 1
+            self._memo.clear()
+            return True
+
+    def apply_interfaces(self, device: str, interfaces: Dict[str, Dict[str, Any]]) -> int:
+        """get_interfaces() rows for a device -> number of links that changed state."""
+        return sum(
+            self.set_interface_state(
+                device, name, row.get("status") == "connected" and row.get("line_protocol", "up") == "up"
+            )
+            for name, row in interfaces.items()
+            if (device, name) in self.endpoints
+        )
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+
+    def _link_dict(self, link: int) -> Dict[str, Any]:
+        a, a_if, b, b_if = self.links[link]
+        return {"a": a, "a_interface": a_if, "b": b, "b_interface": b_if, "up": self.link_up[link]}
+
+    def _session(self, link: int, addresses: Dict[Tuple[str, str], Tuple[str, str]]) -> Dict[str, Any]:
+        a, a_if, b, b_if = self.links[link]
+        a_ip, b_ip = addresses.get((a, a_if), (None, None))
+        return {"a": a, "b": b, "a_ip": a_ip, "b_ip": b_ip, "link_up": self.link_up[link]}
+
+    def impact(self, device: str, interface: str = "") -> Optional[Dict[str, Any]]:
+        """
+        What fails with an interface (or a whole device, without interface).
+
+        Returns:
+            The blast radius on top of the current state, None if the
+            device or interface is not part of the fabric
+        """
+        key = (device, interface)
+        with self._lock:
+            if key in self._memo:
+                return self._memo[key]
+            if interface:
+                links = [self.endpoints[key]] if key in self.endpoints else []
+            else:
+                links = list(self.device_links.get(device, []))
+            if not links:
+                return None
+
+            lost: Dict[Tuple[str, str], int] = {}
+            counted = set()
+            for link in links:
+                if not self.link_up[link]:
+                    continue
+                for path in self.link_paths[link]:
+                    if self.path_down[path] == 0 and path not in counted:
+                        counted.add(path)
+                        pair = self.path_pair[path]
+                        lost[pair] = lost.get(pair, 0) + 1
+
+            isolated, degraded = [], []
+            for pair, count in sorted(lost.items()):
+                before = self.pair_alive[pair]
+                row = {"leaves": list(pair), "paths_before": before, "paths_after": before - count}
+                (isolated if count >= before else degraded).append(row)
+
+            addresses = _bgp_addresses()
+            result = {
+                "target": f"{device} {interface}".strip(),
+                "links": [self._link_dict(link) for link in links],
+                "already_down": sum(not self.link_up[link] for link in links),
+                "bgp_sessions": [self._session(link, addresses) for link in links],
+                "leaves_affected": sorted({leaf for pair in lost for leaf in pair}),
+                "leaf_pairs_isolated": isolated,
+                "leaf_pairs_degraded": degraded,
+                "ecmp_paths_lost": len(counted),
+                "state_version": self.state_version,
+            }
+            self._memo[key] = result
+            return result
+
+    def leaf_paths(self, source: str, target: str) -> Optional[Dict[str, Any]]:
+        """The ECMP paths between two leaves, with the hops and whether each works."""
+        pair = (source, target) if source < target else (target, source)
+        ids = self.pair_paths.get(pair)
+        if ids is None:
+            return None
+        rows = []
+        for path_id in ids:
+            hops, node = [], pair[0]
+            for link in self.paths[path_id]:
+                a, a_if, b, b_if = self.links[link]
+                out_if, peer, in_if = (a_if, b, b_if) if a == node else (b_if, a, a_if)
+                hops.append({"from": node, "interface": out_if, "to": peer, "peer_interface": in_if})
+                node = peer
+            if source != pair[0]:
+                hops = [{"from": h["to"], "interface": h["peer_interface"], "to": h["from"],
+                         "peer_interface": h["interface"]} for h in reversed(hops)]
+            rows.append({"hops": hops, "up": self.path_down[path_id] == 0})
+        return {"source": source, "target": target, "paths": len(ids),
+                "paths_up": self.pair_alive[pair], "ecmp": rows}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "devices": len(self.roles),
+            "links": len(self.links),
+            "links_down": self.link_up.count(False),
+            "leaf_pairs": len(self.pair_paths),
+            "paths": len(self.paths),
+            "topology_version": self.version,
+            "state_version": self.state_version,
+        }
+
+
+def graph_from_topology(topology: Dict[str, Any], version: int = 0) -> FabricGraph:
+    """FabricGraph from a helpers.topology document (devices and declared links)."""
+    roles = {d["name"]: d["role"] for d in topology["devices"]}
+    links = [(link["a"], link["a_interface"], link["b"], link["b_interface"]) for link in topology["links"]]
+    return FabricGraph(roles, links, version)
+
+
+_GRAPH: Optional[FabricGraph] = None
+_GRAPH_LOCK = threading.Lock()
+
+
+def get_fabric_graph(cache: Optional[TopologyCache] = None) -> Optional[FabricGraph]:
+    """
+    The graph for the current topology version (rebuilt when the topology changes).
+
+    Link states known to the previous graph carry over. None if the
+    topology cannot be read.
+    """
+    global _GRAPH
+    cache = cache or get_topology_cache()
+    topology = cache.topology()
+    if topology is None:
+        return None
+    with _GRAPH_LOCK:
+        if _GRAPH is None or _GRAPH.version != cache.version:
+            previous, _GRAPH = _GRAPH, graph_from_topology(topology, cache.version)
+            if previous is not None:
+                for (device, interface), down in previous._down_ends.items():
+                    _GRAPH.set_interface_state(device, interface, not down)
+        return _GRAPH
+
+
+def observe_interfaces(device: str, interfaces: Dict[str, Dict[str, Any]]) -> int:
+    """Feed a device's interface rows into the graph, if it has been built."""
+    graph = _GRAPH
+    return graph.apply_interfaces(device, interfaces) if graph is not None else 0
+
+
+async def refresh_link_states(graph: FabricGraph) -> Dict[str, Any]:
+    """Read interfaces of every fabric device in one batched run and apply them."""
+    from .models import InterfaceStatus, as_dicts
+    from .show_batch import run_show_commands_async
+
+    command = "show interfaces status | json"
+    start = time.perf_counter()
+    outputs = await run_show_commands_async({d: [command] for d in graph.device_links})
+    changed, failed = 0, {}
+    for device, per_command in outputs.items():
+        result = per_command.get(command, {"error": "No result"})
+        if "error" in result:
+            failed[device] = result["error"]
+            continue
+        changed += graph.apply_interfaces(device, as_dicts(InterfaceStatus.table(result["data"])))
+    return {"links_changed": changed, "failed": failed,
+            "elapsed_seconds": round(time.perf_counter() - start, 3)}
@@ -0,0 +1,61 @@
+"""
+Per-device link and BGP state shared by the fabric tools.
+
+get_fabric_status and diagnose_bgp both need each device's interfaces and
+BGP neighbors, from the background collector (helpers/collector.py) when it
+has them fresh enough and from the device otherwise, and both judge a
+link or session from its two ends the same way.
+"""
+
+import asyncio
+from typing import Any, Dict, Optional, Tuple
+
+from .collector import get_collector
+
+
+def collected_state(device: str, kind: str, max_age: float) -> Optional[Tuple[Dict[str, Any], float]]:
+    """Collected (rows, age) for a device if the collector has it fresh enough."""
+    collector = get_collector()
+    if collector is None:
+        return None
+    fresh = collector.store.freshness(device, kind)
+    if fresh["age_seconds"] is None or fresh["age_seconds"] > max_age:
+        return None
+    return collector.store.current(device, kind), fresh["age_seconds"]
+
+
+async def device_state(device: str, max_age: float) -> Dict[str, Any]:
+    """Interfaces and BGP neighbors for one device, from the collector or live."""
+    # Imported late: tools import helpers
+    from tools.get_bgp_neighbors import get_bgp_neighbors
+    from tools.get_interfaces import get_interfaces
+
+    state: Dict[str, Any] = {"source": "snapshot", "age": 0.0}
+    live = []
+    for kind, key, tool in (("interfaces", "interfaces", get_interfaces),
+                            ("bgp", "neighbors", get_bgp_neighbors)):
+        collected = collected_state(device, kind, max_age) if max_age > 0 else None
+        if collected is not None:
+            state[key], age = collected
+            state["age"] = max(state["age"], age)
+        else:
+            live.append((key, tool))
+
+    if live:
+        state["source"] = "live"
+        results = await asyncio.gather(*[tool(device) for _key, tool in live])
+        for (key, _tool), result in zip(live, results):
+            if "error" in result:
+                state["error"] = result["error"] or "Poll failed"
+            else:
+                state[key] = result[key]
+    return state
+
+
+def pair_status(a_up: Optional[bool], b_up: Optional[bool]) -> str:
+    """"ok", "one_side_down", "down" or "unknown" for the two ends of a link or session."""
+    if a_up is None or b_up is None:
+        return "unknown"
+    if a_up and b_up:
+        return "ok"
+    return "one_side_down" if a_up or b_up else "down"
@@ -0,0 +1,251 @@
+"""
+Self-instrumentation metrics for the MCP server.
+
+Opt-in: set MCP_METRICS_PORT (e.g. 9097) to expose a Prometheus /metrics
+endpoint. When it is not set, or prometheus-client is not installed, tools
+are registered unwrapped and every helper here is a no-op.
+
+Metrics:
+    mcp_tool_duration_seconds{tool}          - Tool call latency
+    mcp_tool_in_flight{tool}                 - Tool calls currently running
+    mcp_tool_errors_total{tool,kind}         - Exceptions and {"error": ...} results
+    mcp_ansible_playbook_seconds{playbook,status} - ansible-playbook subprocess time
+    mcp_ansible_parse_seconds                - _extract_device_json() parse time
+    mcp_prefetch_total{outcome}              - Prefetched reads started, used, cancelled, expired, invalidated
+    mcp_prefetch_saved_seconds{tool}         - Latency a used prefetch saved a tool call
+    mcp_compliance_failures{device,rule,severity} - 1 if the device failed the rule when last checked, else 0
+    mcp_compliance_verdicts_total{outcome}   - Rule verdicts evaluated or served from the cache
+"""
+
+import functools
+import inspect
+import os
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Populated by enable_metrics(); None means metrics are disabled
+_METRICS: Optional[dict] = None
+
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60, 120)
+PARSE_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5)
+
+
+def enable_metrics() -> bool:
+    """
+    Create the metric objects (idempotent).
+
+    Returns:
+        True if metrics are enabled, False if prometheus-client is missing
+    """
+    global _METRICS
+    if _METRICS is not None:
+        return True
+
+    try:
+        from prometheus_client import Counter, Gauge, Histogram
+    except ImportError:
+        return False
+
+    _METRICS = {
+        "tool_duration": Histogram(
+            "mcp_tool_duration_seconds",
+            "MCP tool call latency",
+            ["tool"],
+            buckets=LATENCY_BUCKETS,
+        ),
+        "tool_in_flight": Gauge(
+            "mcp_tool_in_flight",
+            "MCP tool calls currently running",
+            ["tool"],
+        ),
+        "tool_errors": Counter(
+            "mcp_tool_errors_total",
+            "MCP tool calls that raised or returned an error",
+            ["tool", "kind"],
+        ),
+        "playbook_duration": Histogram(
+            "mcp_ansible_playbook_seconds",
+            "ansible-playbook subprocess wall time",
+            ["playbook", "status"],
+            buckets=LATENCY_BUCKETS,
+        ),
+        "parse_duration": Histogram(
+            "mcp_ansible_parse_seconds",
+            "Time to extract device JSON from Ansible output",
+            buckets=PARSE_BUCKETS,
+        ),
+        "prefetch": Counter(
+            "mcp_prefetch_total",
+            "Speculatively prefetched device reads by outcome",
+            ["outcome"],
+        ),
+        "prefetch_saved": Histogram(
+            "mcp_prefetch_saved_seconds",
+            "Latency saved by a prefetched read, per tool call",
+            ["tool"],
+            buckets=LATENCY_BUCKETS,
+        ),
+        "compliance_failures": Gauge(
+            "mcp_compliance_failures",
+            "1 if the device failed the compliance rule when it was last checked, else 0",
+            ["device", "rule", "severity"],
+        ),
+        "compliance_verdicts": Counter(
+            "mcp_compliance_verdicts_total",
+            "Compliance rule verdicts by outcome (evaluated, cached)",
+            ["outcome"],
+        ),
+    }
+    return True
+
+
+def metrics_enabled() -> bool:
+    """Return True if metrics have been enabled."""
+    return _METRICS is not None
+
+
+def start_metrics_server(port: Optional[int] = None) -> Optional[int]:
+    """
+    Start the /metrics HTTP endpoint if MCP_METRICS_PORT (or port) is set.
+
+    Args:
+        port: Port to listen on; defaults to the MCP_METRICS_PORT env var
+
+    Returns:
+        The port metrics are served on, or None if disabled
+    """
+    if port is None:
+        port = int(os.getenv("MCP_METRICS_PORT", "0") or 0)
+    if not port or not enable_metrics():
+        return None
+
+    from prometheus_client import start_http_server
+    start_http_server(port)
+    return port
+
+
+def observe_playbook(playbook: str, seconds: float, status: str) -> None:
+    """Record one ansible-playbook run (status: ok, failed, timeout, error)."""
+    if _METRICS is not None:
+        _METRICS["playbook_duration"].labels(playbook=playbook, status=status).observe(seconds)
+
+
+def observe_parse(seconds: float) -> None:
+    """Record one _extract_device_json() call."""
+    if _METRICS is not None:
+        _METRICS["parse_duration"].observe(seconds)
+
+
+def observe_prefetch(outcome: str, tool: str = "", saved: float = 0.0, amount: int = 1) -> None:
+    """Record prefetched reads (outcome: started, used, cancelled, expired, invalidated)."""
+    if _METRICS is not None:
+        _METRICS["prefetch"].labels(outcome=outcome).inc(amount)
+        if outcome == "used":
+            _METRICS["prefetch_saved"].labels(tool=tool).observe(saved)
+
+
+def observe_compliance(failed: Dict[Tuple[str, str, str], bool], evaluated: int, cached: int) -> None:
+    """
+    Record one compliance check.
+
+    Only the (device, rule, severity) series in failed are set, so checking
+    a few devices leaves the others' last results in place.
+    """
+    if _METRICS is not None:
+        for (device, rule, severity), is_failed in failed.items():
+            _METRICS["compliance_failures"].labels(device=device, rule=rule, severity=severity).set(int(is_failed))
+        _METRICS["compliance_verdicts"].labels(outcome="evaluated").inc(evaluated)
+        _METRICS["compliance_verdicts"].labels(outcome="cached").inc(cached)
+
+
+# =============================================================================
+# Tool wrapping
+# =============================================================================
+
+def instrument_tool(func: Callable, name: Optional[str] = None) -> Callable:
+    """
+    Wrap a tool function with latency, in-flight and error metrics.
+
+    The wrapper keeps the original signature and docstring (functools.wraps),
+    so FastMCP builds the same tool schema. Returns func unchanged when
+    metrics are disabled.
+    """
+    if _METRICS is None:
+        return func
+
+    tool = name or func.__name__
+    duration = _METRICS["tool_duration"].labels(tool=tool)
+    in_flight = _METRICS["tool_in_flight"].labels(tool=tool)
+    errors = _METRICS["tool_errors"]
+
+    def _record_result(result: Any) -> None:
+        if isinstance(result, dict) and "error" in result:
+            errors.labels(tool=tool, kind="error_result").inc()
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            in_flight.inc()
+            start = time.perf_counter()
+            try:
+                result = await func(*args, **kwargs)
+            except Exception:
+                errors.labels(tool=tool, kind="exception").inc()
+                raise
+            finally:
+                duration.observe(time.perf_counter() - start)
+                in_flight.dec()
+            _record_result(result)
+            return result
+        return async_wrapper
+
+    @functools.wraps(func)
+    def sync_wrapper(*args, **kwargs):
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            errors.labels(tool=tool, kind="exception").inc()
+            raise
+        finally:
+            duration.observe(time.perf_counter() - start)
+            in_flight.dec()
+        _record_result(result)
+        return result
+    return sync_wrapper
+
+
+class InstrumentedMCP:
+    """
+    Proxy around a FastMCP server whose tool() decorator instruments tools.
+
+    Passed to each module's register(mcp) by register_all_tools(), so tool
+    modules do not need to change. Everything else is forwarded to the
+    real server.
+
+    Args:
+        mcp: The FastMCP server instance
+        wrappers: Functions (func, name) -> func applied to each tool in
+            order, e.g. [instrument_tool, trace_tool]
+    """
+
+    def __init__(self, mcp, wrappers: Optional[list] = None):
+        self._mcp = mcp
+        self._wrappers = wrappers if wrappers is not None else [instrument_tool]
+
+    def tool(self, *args, **kwargs):
+        decorator = self._mcp.tool(*args, **kwargs)
+
+        def wrap(func: Callable) -> Callable:
+            name = kwargs.get("name") or (args[0] if args and isinstance(args[0], str) else None)
+            wrapped = func
+            for wrapper in self._wrappers:
+                wrapped = wrapper(wrapped, name or func.__name__)
+            decorator(wrapped)
+            return func
+
+        return wrap
+
+    def __getattr__(self, attr):
+        return getattr(self._mcp, attr)
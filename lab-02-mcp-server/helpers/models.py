@@ -0,0 +1,105 @@
+"""
+Typed, slotted result models for device state.
+
+get_device_info, get_interfaces and get_bgp_neighbors decode the EOS JSON
+straight into these models. Anything that keeps state around (delta states,
+the fabric rollup, benchmarks) holds the models rather than one dict per
+row: a slotted instance has no per-object __dict__, and repeated values such
+as "connected" or "Established" are interned, so 10k interfaces take about a
+third of the memory of the equivalent dicts.
+
+Tools still return plain dicts (as_dict()) so their output is unchanged.
+Models also answer row.get("field") like a dict, so code that reads rows
+(diff_rows, SnapshotStore.record) accepts either form.
+"""
+
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict
+
+
+def _intern(value: Any) -> Any:
+    """Share one copy of short, repeated strings (states, statuses, ASNs)."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class _Row:
+    """dict-style read access for slotted models."""
+
+    __slots__ = ()
+
+    def get(self, field: str, default: Any = None) -> Any:
+        return getattr(self, field, default)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__dataclass_fields__}
+
+
+@dataclass(slots=True)
+class DeviceInfo(_Row):
+    """show version"""
+
+    hostname: str = "unknown"
+    model: str = "unknown"
+    version: str = "unknown"
+    uptime_seconds: float = 0
+    serial_number: str = "unknown"
+    mac_address: str = "unknown"
+
+    @classmethod
+    def from_eos(cls, data: Dict[str, Any]) -> "DeviceInfo":
+        return cls(
+            data.get("hostname", "unknown"),
+            _intern(data.get("modelName", "unknown")),
+            _intern(data.get("version", "unknown")),
+            data.get("uptime", 0),
+            data.get("serialNumber", "unknown"),
+            data.get("systemMacAddress", "unknown"),
+        )
+
+
+@dataclass(slots=True)
+class InterfaceStatus(_Row):
+    """One entry of show interfaces status"""
+
+    status: str = "unknown"
+    description: str = ""
+    line_protocol: str = "unknown"
+
+    @classmethod
+    def table(cls, data: Dict[str, Any]) -> Dict[str, "InterfaceStatus"]:
+        """show interfaces status | json -> {name: InterfaceStatus}"""
+        return {
+            name: cls(
+                _intern(info.get("linkStatus", "unknown")),
+                info.get("description", ""),
+                _intern(info.get("lineProtocolStatus", "unknown")),
+            )
+            for name, info in data.get("interfaceStatuses", {}).items()
+        }
+
+
+@dataclass(slots=True)
+class BgpNeighbor(_Row):
+    """One peer of show ip bgp summary"""
+
+    remote_asn: str = "unknown"
+    state: str = "unknown"
+    prefixes_received: int = 0
+
+    @classmethod
+    def table(cls, vrf: Dict[str, Any]) -> Dict[str, "BgpNeighbor"]:
+        """One VRF of show ip bgp summary | json -> {peer address: BgpNeighbor}"""
+        return {
+            peer: cls(
+                _intern(info.get("asn", "unknown")),
+                _intern(info.get("peerState", "unknown")),
+                info.get("prefixReceived", 0),
+            )
+            for peer, info in vrf.get("peers", {}).items()
+        }
+
+
+def as_dicts(rows: Dict[str, _Row]) -> Dict[str, Dict[str, Any]]:
+    """{key: model} -> {key: dict} for tool responses."""
+    return {key: row.as_dict() for key, row in rows.items()}
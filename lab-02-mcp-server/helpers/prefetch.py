@@ -0,0 +1,308 @@
+"""
+Speculative prefetch of device state.
+
+Some requests tell us which tools come next. Rendering the troubleshoot_bgp
+prompt is followed by get_device_info, get_interfaces and get_bgp_neighbors
+(or diagnose_bgp) on the device and its BGP peers, and a client that reads
+topology://containerlab usually goes on to poll the devices. prefetch()
+starts reading that state in the background, so the tool call finds it
+ready (or already in flight) instead of starting a playbook of its own.
+
+- Low priority: a prefetch waits MCP_PREFETCH_DELAY_MS (default 100) so the
+  client's own calls go first, and keeps waiting while MCP_PREFETCH_MAX_BUSY
+  or more playbooks are running.
+- Used once: show() (helpers/show_batch.py) takes a prefetched result for
+  its device and command instead of running the command, at most once and
+  within MCP_PREFETCH_TTL seconds (default 30) of the trigger.
+- Cancelled when nobody asks: a prefetch that has not started when the TTL
+  passes is dropped, and so is an unused result. A config-changing playbook
+  drops the prefetched results of its device.
+
+stats() (also the prefetch://stats resource and, with MCP_METRICS_PORT, the
+mcp_prefetch_* metrics) reports how often prefetched data was used and how
+much latency it saved per tool. Prefetched data is kept per process: with
+several workers (serve_http.py) only calls to the same worker benefit. Set
+MCP_PREFETCH=0 to turn prefetching off.
+"""
+
+import contextvars
+import functools
+import inspect
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .ansible import PLAYBOOK_THREADS, playbooks_in_flight
+from .constants import FABRIC_LINKS, VALID_DEVICES
+from .metrics import observe_prefetch
+
+PREFETCH_ENABLED = os.getenv("MCP_PREFETCH", "1") != "0"
+PREFETCH_TTL = float(os.getenv("MCP_PREFETCH_TTL", "30"))
+PREFETCH_DELAY = float(os.getenv("MCP_PREFETCH_DELAY_MS", "100")) / 1000
+PREFETCH_MAX_BUSY = int(os.getenv("MCP_PREFETCH_MAX_BUSY", str(max(1, PLAYBOOK_THREADS // 2))))
+
+# The read tools' commands (COMMAND_PLAYBOOKS in helpers/show_batch.py)
+PREFETCH_COMMANDS = (
+    "show version | json",
+    "show interfaces status | json",
+    "show ip bgp summary | json",
+)
+
+# Tool call a show() belongs to, for stats per tool (set by track_tool)
+_TOOL: contextvars.ContextVar = contextvars.ContextVar("prefetch_tool", default="")
+
+
+def bgp_peers(device: str) -> List[str]:
+    """Devices the device has fabric BGP sessions with (helpers.constants.FABRIC_LINKS)."""
+    peers = [link["leaf"] for link in FABRIC_LINKS if link["spine"] == device]
+    peers += [link["spine"] for link in FABRIC_LINKS if link["leaf"] == device]
+    return peers
+
+
+class _Entry:
+    """One speculative (device, command) read."""
+
+    __slots__ = ("source", "expires", "future", "started", "finished")
+
+    def __init__(self, source: str, expires: float):
+        self.source = source
+        self.expires = expires
+        self.future: Optional[Future] = None  # None until the read starts
+        self.started = 0.0
+        self.finished: Optional[float] = None
+
+
+class Prefetcher:
+    """
+    Speculative reads keyed by (device, command), each used at most once.
+
+    Args:
+        ttl: Seconds a prefetch may wait to start, and its result may wait to be used
+        delay: Seconds to wait before starting, and between checks while busy
+        max_busy: Playbooks in flight at which prefetches wait
+        submit: (device, command) -> Future of {"data"} or {"error"};
+            default: the show-command batcher
+    """
+
+    def __init__(
+        self,
+        ttl: float = PREFETCH_TTL,
+        delay: float = PREFETCH_DELAY,
+        max_busy: int = PREFETCH_MAX_BUSY,
+        submit: Optional[Callable[[str, str], Future]] = None
+    ):
+        self.ttl = ttl
+        self.delay = delay
+        self.max_busy = max_busy
+        self._submit = submit
+        self._entries: Dict[Tuple[str, str], _Entry] = {}
+        self._lock = threading.Lock()
+        self.counts = {"triggered": 0, "started": 0, "used": 0, "cancelled": 0, "expired": 0, "invalidated": 0}
+        self.saved: Dict[str, List[float]] = {}  # tool -> [calls served, seconds saved]
+
+    def prefetch(self, devices: Iterable[str], source: str,
+                 commands: Iterable[str] = PREFETCH_COMMANDS) -> int:
+        """
+        Queue background reads of commands on devices.
+
+        Returns:
+            Number of (device, command) reads queued; ones already queued
+            or fetched are not queued again
+        """
+        now = time.monotonic()
+        keys = []
+        with self._lock:
+            self._sweep(now)
+            for device in dict.fromkeys(devices):
+                for command in commands:
+                    if device in VALID_DEVICES and (device, command) not in self._entries:
+                        self._entries[(device, command)] = _Entry(source, now + self.ttl)
+                        keys.append((device, command))
+            self.counts["triggered"] += len(keys)
+        if keys:
+            self._later(keys)
+        return len(keys)
+
+    def _later(self, keys: List[Tuple[str, str]]) -> None:
+        timer = threading.Timer(self.delay, self._start, args=(keys,))
+        timer.daemon = True
+        timer.start()
+
+    def _start(self, keys: List[Tuple[str, str]]) -> None:
+        """Start the reads that are still wanted, or wait while the server is busy."""
+        submit = self._submit or _batch_submit
+        with self._lock:
+            now = time.monotonic()
+            self._sweep(now)
+            keys = [k for k in keys if k in self._entries and self._entries[k].future is None]
+            if not keys:
+                return
+            busy = playbooks_in_flight() >= self.max_busy
+            if not busy:
+                # Submitting only queues the read (the batcher never calls back
+                # into the prefetcher), so it is done under the lock: take()
+                # sees either a queued entry or one with its future
+                for device, command in keys:
+                    entry = self._entries[(device, command)]
+                    entry.started = now
+                    entry.future = submit(device, command)
+                    entry.future.add_done_callback(functools.partial(_finished, entry))
+                self.counts["started"] += len(keys)
+        if busy:
+            self._later(keys)
+            return
+        observe_prefetch("started", amount=len(keys))
+
+    def take(self, device: str, command: str) -> Optional[Tuple[Future, float]]:
+        """
+        Claim the prefetched read of a command, if there is one.
+
+        Returns:
+            (future, seconds saved) or None; a prefetch that has not started
+            yet is cancelled, as the caller reads the device itself
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._sweep(now)
+            entry = self._entries.pop((device, command), None)
+            if entry is None:
+                return None
+            if entry.future is None:
+                self.counts["cancelled"] += 1
+                outcome = "cancelled"
+            else:
+                self.counts["used"] += 1
+                outcome = "used"
+        if outcome == "cancelled":
+            observe_prefetch("cancelled")
+            return None
+
+        # The time the prefetch had already spent is time the call does not wait
+        saved = (entry.finished if entry.finished is not None else now) - entry.started
+        tool = _TOOL.get() or "other"
+        with self._lock:
+            served = self.saved.setdefault(tool, [0, 0.0])
+            served[0] += 1
+            served[1] += saved
+        observe_prefetch("used", tool, saved)
+        return entry.future, saved
+
+    def invalidate(self, device: Optional[str] = None) -> None:
+        """Drop prefetched state of a device (or all devices) after a config change."""
+        with self._lock:
+            keys = [k for k in self._entries if device is None or k[0] == device]
+            for key in keys:
+                entry = self._entries.pop(key)
+                if entry.future is not None:
+                    entry.future.cancel()
+            self.counts["invalidated"] += len(keys)
+        if keys:
+            observe_prefetch("invalidated", amount=len(keys))
+
+    def _sweep(self, now: float) -> None:
+        """Drop expired entries (lock held): queued ones are cancelled, fetched ones unused."""
+        for key in [k for k, e in self._entries.items() if e.expires <= now]:
+            entry = self._entries.pop(key)
+            outcome = "expired" if entry.started else "cancelled"
+            if entry.future is not None:
+                entry.future.cancel()  # no-op once the batch has started
+            self.counts[outcome] += 1
+            observe_prefetch(outcome)
+
+    def stats(self) -> Dict[str, Any]:
+        """How often prefetched state was used, and latency saved per tool."""
+        with self._lock:
+            self._sweep(time.monotonic())
+            counts = dict(self.counts)
+            pending = len(self._entries)
+            tools = {
+                tool: {
+                    "calls_served": calls,
+                    "saved_seconds": round(seconds, 3),
+                    "avg_saved_ms": round(seconds / calls * 1000, 1),
+                }
+                for tool, (calls, seconds) in sorted(self.saved.items())
+            }
+        done = counts["used"] + counts["expired"] + counts["invalidated"]
+        return {
+            "enabled": PREFETCH_ENABLED,
+            **counts,
+            "pending": pending,
+            "use_rate": round(counts["used"] / done, 3) if done else None,
+            "tools": tools,
+        }
+
+
+def _finished(entry: _Entry, future: Future) -> None:
+    entry.finished = time.monotonic()
+
+
+def _batch_submit(device: str, command: str) -> Future:
+    # Lazy: show_batch imports this module
+    from .show_batch import _BATCHER
+    return _BATCHER.submit(device, command)
+
+
+_PREFETCHER = Prefetcher()
+
+
+def get_prefetcher() -> Prefetcher:
+    return _PREFETCHER
+
+
+def prefetch(devices: Iterable[str], source: str, with_peers: bool = False) -> int:
+    """
+    Warm the read tools' state for devices in the background.
+
+    Args:
+        devices: Device names
+        source: What triggered it (prompt or resource name), for stats
+        with_peers: Also the devices' BGP peers
+
+    Returns:
+        Number of reads queued (0 when prefetching is off)
+    """
+    if not PREFETCH_ENABLED:
+        return 0
+    devices = list(devices)
+    if with_peers:
+        devices += [peer for device in devices for peer in bgp_peers(device)]
+    return _PREFETCHER.prefetch(devices, source)
+
+
+def take_prefetched(device: str, command: str) -> Optional[Tuple[Future, float]]:
+    """The prefetched read of a command on a device, claimed by the caller (or None)."""
+    if not PREFETCH_ENABLED:
+        return None
+    return _PREFETCHER.take(device, command)
+
+
+def invalidate_prefetched(device: Optional[str] = None) -> None:
+    """Drop prefetched state after a config change on a device (or all devices)."""
+    _PREFETCHER.invalidate(device)
+
+
+def track_tool(func: Callable, name: Optional[str] = None) -> Callable:
+    """Wrap a tool so prefetched reads it uses are counted under its name."""
+    tool = name or func.__name__
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            token = _TOOL.set(tool)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                _TOOL.reset(token)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def sync_wrapper(*args, **kwargs):
+        token = _TOOL.set(tool)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _TOOL.reset(token)
+    return sync_wrapper
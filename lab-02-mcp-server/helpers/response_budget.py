@@ -0,0 +1,329 @@
+"""
+Response size budgeting for MCP tools.
+
+Every tool registered through register_all_tools() is wrapped with
+budget_tool(), so that what goes back to the client stays small:
+
+- Raw Ansible output ("stdout", "stderr", "stdout_lines", "stderr_lines")
+  is dropped and long error strings are cut to their last lines, unless
+  MCP_DEBUG_OUTPUT=1.
+- fields="status,description" keeps only those fields of each row in the
+  answer's tables (interfaces, neighbors, ...).
+- An answer over the byte budget (MCP_RESPONSE_MAX_BYTES, or per tool with
+  MCP_RESPONSE_BUDGETS="get_interfaces=8000,get_config_backup=50000") is
+  split into pages along its largest table or text. It carries a "page"
+  summary and a "next_cursor"; calling the tool again with cursor=<it>
+  returns the next page from the server's copy without running the tool,
+  so the tool's other arguments become optional.
+
+Write tools (WRITE_TOOLS) are not wrapped: their answers are short
+reports, and a cursor must never stand in for a change's arguments.
+
+Pages are kept in an in-memory LRU (like the delta store), or in the
+shared store when several server workers run; an expired cursor returns
+an error asking to call the tool again.
+"""
+
+import functools
+import inspect
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Annotated, Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import Field
+
+from .shared_state import SharedKV, get_shared
+
+RESPONSE_MAX_BYTES = int(os.getenv("MCP_RESPONSE_MAX_BYTES", "20000"))
+DEBUG_OUTPUT = os.getenv("MCP_DEBUG_OUTPUT", "").lower() in ("1", "true", "yes")
+RAW_OUTPUT_KEYS = ("stdout", "stderr", "stdout_lines", "stderr_lines")
+ERROR_MAX_CHARS = 1500
+PAGE_CACHE_SIZE = 256
+PAGE_CACHE_TTL = 600.0
+
+FieldsArg = Annotated[str, Field(
+    description="Comma-separated row fields to return (e.g. 'status,description'); empty for all"
+)]
+CursorArg = Annotated[str, Field(
+    description="next_cursor from an earlier call to get the next page; other arguments are not needed"
+)]
+
+# Tools that change devices; budget_tool() leaves them as they are
+WRITE_TOOLS = {"push_config_batch", "push_rendered_config"}
+
+
+def _parse_budgets(spec: str) -> Dict[str, int]:
+    """"tool=bytes,tool=bytes" -> {tool: bytes}"""
+    budgets = {}
+    for item in spec.split(","):
+        tool, _, size = item.partition("=")
+        if tool.strip() and size.strip().isdigit():
+            budgets[tool.strip()] = int(size)
+    return budgets
+
+
+TOOL_BUDGETS = _parse_budgets(os.getenv("MCP_RESPONSE_BUDGETS", ""))
+
+
+def tool_budget(tool: str) -> int:
+    """Byte budget for a tool's answer (0 = unlimited)."""
+    return TOOL_BUDGETS.get(tool, RESPONSE_MAX_BYTES)
+
+
+def _size(value: Any) -> int:
+    return len(json.dumps(value, default=str, separators=(",", ":")))
+
+
+# =============================================================================
+# Shaping
+# =============================================================================
+
+def strip_raw_output(result: Dict[str, Any], depth: int = 3) -> Dict[str, Any]:
+    """Drop raw Ansible output from a result (and nested dicts); cut long errors."""
+    if any(key in result for key in RAW_OUTPUT_KEYS):
+        result = {k: v for k, v in result.items() if k not in RAW_OUTPUT_KEYS}
+    error = result.get("error")
+    if isinstance(error, str) and len(error) > ERROR_MAX_CHARS:
+        result = {**result, "error": f"[{len(error) - ERROR_MAX_CHARS} chars cut] " + error[-ERROR_MAX_CHARS:]}
+    if depth > 1:
+        for key, value in result.items():
+            if isinstance(value, dict):
+                stripped = strip_raw_output(value, depth - 1)
+                if stripped is not value:
+                    result = {**result, key: stripped}
+    return result
+
+
+def select_fields(result: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """Keep only `fields` in each row of the answer's tables (dicts or lists of dicts)."""
+    def row(value: Any) -> Any:
+        return {f: value[f] for f in fields if f in value} if isinstance(value, dict) else value
+
+    shaped = {}
+    for key, value in result.items():
+        if isinstance(value, dict) and value and all(isinstance(v, dict) for v in value.values()):
+            value = {k: row(v) for k, v in value.items()}
+        elif isinstance(value, list) and value and all(isinstance(v, dict) for v in value):
+            value = [row(v) for v in value]
+        shaped[key] = value
+    return shaped
+
+
+def _pageable(result: Dict[str, Any], sizes: Dict[str, int]) -> Optional[Tuple[str, str, list]]:
+    """(key, kind, items) of the largest table or text in an answer."""
+    for key in sorted(sizes, key=sizes.get, reverse=True):
+        value = result[key]
+        if isinstance(value, dict) and len(value) > 1:
+            return key, "dict", list(value.items())
+        if isinstance(value, list) and len(value) > 1:
+            return key, "list", value
+        if isinstance(value, str) and value.count("\n") > 1:
+            return key, "text", value.splitlines(keepends=True)
+    return None
+
+
+def _split(items: list, kind: str, size: int, room: int) -> List[Tuple[int, int]]:
+    """
+    Page boundaries so each page's items fit in about `room` bytes (at least one item).
+
+    Text is split on exact line lengths; tables use the average row size,
+    which avoids serializing every row separately.
+    """
+    if kind != "text":
+        per_page = max(1, room * len(items) // max(1, size))
+        return [(i, min(i + per_page, len(items))) for i in range(0, len(items), per_page)]
+    bounds, start, used = [], 0, 0
+    for i, line in enumerate(items):
+        if i > start and used + len(line) > room:
+            bounds.append((start, i))
+            start, used = i, 0
+        used += len(line)
+    bounds.append((start, len(items)))
+    return bounds
+
+
+def _rebuild(kind: str, items: list) -> Any:
+    if kind == "dict":
+        return dict(items)
+    if kind == "text":
+        return "".join(items)
+    return list(items)
+
+
+class PageStore:
+    """
+    LRU of answers split into pages, keyed by a random id.
+
+    Args:
+        max_entries: Answers kept before the least recently used is dropped
+        ttl: Seconds an answer is kept after it was created
+        shared: Keep answers in this cross-process store instead of memory
+    """
+
+    def __init__(
+        self,
+        max_entries: int = PAGE_CACHE_SIZE,
+        ttl: float = PAGE_CACHE_TTL,
+        shared: Optional[SharedKV] = None
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.shared = shared
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.shared) if self.shared is not None else len(self._entries)
+
+    def add(self, entry: Dict[str, Any]) -> str:
+        key = secrets.token_urlsafe(6)
+        if self.shared is not None:
+            self.shared.put(key, entry)
+            return key
+        with self._lock:
+            self._entries[key] = {**entry, "created": time.monotonic()}
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return key
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.shared is not None:
+            return self.shared.get(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry["created"] > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+
+_PAGES = PageStore(shared=get_shared("pages", PAGE_CACHE_SIZE, PAGE_CACHE_TTL))
+
+
+def _page(entry_id: str, entry: Dict[str, Any], number: int) -> Dict[str, Any]:
+    start, end = entry["bounds"][number]
+    total = len(entry["items"])
+    response = {
+        **entry["base"],
+        entry["key"]: _rebuild(entry["kind"], entry["items"][start:end]),
+        "page": {
+            "field": entry["key"],
+            "number": number + 1,
+            "pages": len(entry["bounds"]),
+            "items": f"{start + 1}-{end} of {total}",
+        },
+    }
+    if number + 1 < len(entry["bounds"]):
+        response["next_cursor"] = f"{entry_id}.{number + 1}"
+    return response
+
+
+def shape_response(tool: str, result: Any, fields: str = "", budget: Optional[int] = None) -> Any:
+    """
+    Apply raw-output stripping, field selection and the byte budget to an answer.
+
+    Args:
+        tool: Tool name (for the budget and the cursor)
+        result: What the tool returned; only dicts are shaped
+        fields: Comma-separated row fields to keep, or "" for all
+        budget: Byte budget (default: tool_budget(tool))
+
+    Returns:
+        The answer, or its first page with "page" and "next_cursor"
+    """
+    if not isinstance(result, dict):
+        return result
+    if not DEBUG_OUTPUT:
+        result = strip_raw_output(result)
+    wanted = [f.strip() for f in fields.split(",") if f.strip()]
+    if wanted:
+        result = select_fields(result, wanted)
+
+    budget = tool_budget(tool) if budget is None else budget
+    if budget <= 0 or "error" in result:
+        return result
+    sizes = {key: _size(value) + len(key) + 4 for key, value in result.items()}
+    total = sum(sizes.values())
+    if total <= budget:
+        return result
+    table = _pageable(result, sizes)
+    if table is None:
+        return result
+
+    key, kind, items = table
+    base = {k: v for k, v in result.items() if k != key}
+    room = max(1, budget - (total - sizes[key]) - 200)  # 200: page summary and cursor
+    entry = {"tool": tool, "base": base, "key": key, "kind": kind, "items": items,
+             "bounds": _split(items, kind, sizes[key], room)}
+    return _page(_PAGES.add(entry), entry, 0)
+
+
+def next_page(tool: str, cursor: str) -> Dict[str, Any]:
+    """The page a cursor points to."""
+    entry_id, _, number = cursor.partition(".")
+    entry = _PAGES.get(entry_id)
+    if entry is None or entry["tool"] != tool or not number.isdigit() \
+            or int(number) >= len(entry["bounds"]):
+        return {"error": f"Unknown or expired cursor '{cursor}'. Call {tool} again without cursor."}
+    return _page(entry_id, entry, int(number))
+
+
+# =============================================================================
+# Tool wrapping
+# =============================================================================
+
+def budget_tool(func: Callable, name: Optional[str] = None) -> Callable:
+    """
+    Wrap a tool so its answers are shaped by shape_response().
+
+    Adds optional `fields` and `cursor` arguments to the tool's signature
+    (and so to its MCP schema). The tool's required arguments become
+    optional, as a cursor alone is enough; without a cursor, a missing one
+    is an error. Write tools and tools that already take `fields` or
+    `cursor` are returned unchanged.
+    """
+    tool = name or func.__name__
+    signature = inspect.signature(func)
+    if tool in WRITE_TOOLS or {"fields", "cursor"} & set(signature.parameters):
+        return func
+
+    added = [
+        inspect.Parameter("fields", inspect.Parameter.KEYWORD_ONLY, default="", annotation=FieldsArg),
+        inspect.Parameter("cursor", inspect.Parameter.KEYWORD_ONLY, default="", annotation=CursorArg),
+    ]
+    named = (inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY)
+    required = [p.name for p in signature.parameters.values()
+                if p.default is inspect.Parameter.empty and p.kind in named]
+    params = [p.replace(default=None) if p.name in required else p for p in signature.parameters.values()]
+    var_kw = [p for p in params if p.kind is inspect.Parameter.VAR_KEYWORD]
+    params = [p for p in params if p.kind is not inspect.Parameter.VAR_KEYWORD] + added + var_kw
+
+    def _missing(args: tuple, kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        given = signature.bind_partial(*args, **kwargs).arguments
+        missing = [n for n in required if given.get(n) is None]
+        return {"error": f"Missing argument(s): {', '.join(missing)}"} if missing else None
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, fields: str = "", cursor: str = "", **kwargs):
+            if cursor:
+                return next_page(tool, cursor)
+            return _missing(args, kwargs) or shape_response(tool, await func(*args, **kwargs), fields)
+        wrapper = async_wrapper
+    else:
+        @functools.wraps(func)
+        def sync_wrapper(*args, fields: str = "", cursor: str = "", **kwargs):
+            if cursor:
+                return next_page(tool, cursor)
+            return _missing(args, kwargs) or shape_response(tool, func(*args, **kwargs), fields)
+        wrapper = sync_wrapper
+
+    wrapper.__signature__ = signature.replace(parameters=params)
+    return wrapper
@@ -0,0 +1,185 @@
+"""
+State shared between server worker processes (SQLite, stdlib only).
+
+serve_http.py can run several uvicorn workers, and any worker may get a
+client's next request. Some state outlives a single request:
+
+    pages   response pages behind cursor= (helpers/response_budget.py)
+    delta   states behind since= tokens (helpers/delta_state.py)
+    config  cached running-configs and their invalidations (helpers/config_cache.py)
+
+When MCP_SHARED_STATE names a SQLite file (serve_http.py sets it for more
+than one worker), these stores keep their entries there so that every
+worker sees them. Otherwise, and in the default stdio mode, they stay in
+process memory and nothing here is used.
+
+claim_primary() picks the one process that runs the background collector
+and the /metrics endpoint; watch_primary() lets another worker take over
+those duties when that process exits.
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+SHARED_STATE = os.getenv("MCP_SHARED_STATE", "")
+PRUNE_EVERY = 100
+PRIMARY_RETRY = float(os.getenv("MCP_PRIMARY_RETRY", "30"))
+
+
+class SharedKV:
+    """
+    A namespaced key-value table in a SQLite file, usable from many processes.
+
+    Values are pickled. Entries expire `ttl` seconds after they were stored;
+    past `max_entries` the oldest are dropped. Counters (incr()) are kept
+    apart from both: they have no stored time and never expire.
+
+    Args:
+        path: Database file (created if missing)
+        namespace: Keeps different stores apart in one file
+        max_entries: Entries kept in this namespace
+        ttl: Seconds an entry lives (0 = until dropped)
+    """
+
+    def __init__(self, path: str, namespace: str, max_entries: int = 1024, ttl: float = 0):
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl = ttl
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._lock = threading.Lock()
+        self._puts = 0
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS kv (ns TEXT, key TEXT, value BLOB, "
+                "stored REAL, expires REAL, PRIMARY KEY (ns, key))"
+            )
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, expires FROM kv WHERE ns = ? AND key = ?", (self.namespace, key)
+            ).fetchone()
+        if row is None or (row[1] and row[1] < time.time()):
+            return None
+        return pickle.loads(row[0])
+
+    def put(self, key: str, value: Any) -> None:
+        now = time.time()
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO kv VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, blob, now, now + self.ttl if self.ttl else None)
+            )
+            self._puts += 1
+            if self._puts % PRUNE_EVERY == 0:
+                self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        self._db.execute("DELETE FROM kv WHERE ns = ? AND expires < ?", (self.namespace, now))
+        self._db.execute(
+            "DELETE FROM kv WHERE ns = ? AND stored IS NOT NULL AND key NOT IN "
+            "(SELECT key FROM kv WHERE ns = ? AND stored IS NOT NULL ORDER BY stored DESC LIMIT ?)",
+            (self.namespace, self.namespace, self.max_entries)
+        )
+
+    def delete(self, key: Optional[str] = None, prefix: str = "") -> None:
+        """Delete one key, every key starting with `prefix`, or (no arguments) the namespace."""
+        with self._lock, self._db:
+            if key is not None:
+                self._db.execute("DELETE FROM kv WHERE ns = ? AND key = ?", (self.namespace, key))
+            else:
+                self._db.execute(
+                    "DELETE FROM kv WHERE ns = ? AND key LIKE ? ESCAPE '\\'",
+                    (self.namespace, prefix.replace("%", "\\%").replace("_", "\\_") + "%")
+                )
+
+    def incr(self, key: str) -> int:
+        """Atomically add one to a counter and return the new value."""
+        with self._lock, self._db:
+            # Take the write lock before reading, or two processes can both read n
+            self._db.execute("BEGIN IMMEDIATE")
+            row = self._db.execute(
+                "SELECT value FROM kv WHERE ns = ? AND key = ?", (self.namespace, key)
+            ).fetchone()
+            value = (pickle.loads(row[0]) if row else 0) + 1
+            self._db.execute(
+                "INSERT OR REPLACE INTO kv VALUES (?, ?, ?, NULL, NULL)",
+                (self.namespace, key, pickle.dumps(value))
+            )
+        return value
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM kv WHERE ns = ?", (self.namespace,)
+            ).fetchone()[0]
+
+
+_SHARED: Dict[str, SharedKV] = {}
+
+
+def get_shared(namespace: str, max_entries: int = 1024, ttl: float = 0) -> Optional[SharedKV]:
+    """The shared store for a namespace, or None when MCP_SHARED_STATE is not set."""
+    path = os.getenv("MCP_SHARED_STATE", SHARED_STATE)
+    if not path:
+        return None
+    if namespace not in _SHARED:
+        _SHARED[namespace] = SharedKV(path, namespace, max_entries, ttl)
+    return _SHARED[namespace]
+
+
+_PRIMARY_LOCK = None
+
+
+def claim_primary() -> bool:
+    """
+    True in exactly one of the processes sharing MCP_SHARED_STATE.
+
+    Uses an exclusive lock on "<state file>.primary" that is held for the
+    life of the process. Without shared state every process is primary.
+    """
+    global _PRIMARY_LOCK
+    path = os.getenv("MCP_SHARED_STATE", SHARED_STATE)
+    if not path or _PRIMARY_LOCK is not None:
+        return True
+    try:
+        import fcntl
+    except ImportError:  # Windows: no multi-worker serving
+        return True
+
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    handle = open(f"{path}.primary", "w")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return False
+    _PRIMARY_LOCK = handle
+    return True
+
+
+def watch_primary(on_primary: Callable[[], None], every: float = PRIMARY_RETRY) -> threading.Thread:
+    """
+    Retry claim_primary() every `every` seconds in a daemon thread and call
+    on_primary() once it succeeds.
+
+    The primary lock is released by the OS when its process exits (or is
+    killed), so a waiting worker takes over within `every` seconds.
+    """
+    def _wait() -> None:
+        while not claim_primary():
+            time.sleep(every)
+        on_primary()
+
+    thread = threading.Thread(target=_wait, name="primary-watch", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,245 @@
+"""
+Batched show commands: several commands on several devices in one playbook run.
+
+Each read tool used to start one playbook (one process, one SSH session)
+per show command. 11-show-commands.yml runs a list of commands per device
+in a single eos_command task instead, so one session returns them all.
+
+- run_show_commands() / run_show_commands_async() run given commands on
+  given devices (the show_commands tool).
+- show() is what the read tools call for their one command. Requests made
+  by coroutines started together (asyncio.gather) share one run, and so do
+  requests from other threads made within MCP_SHOW_BATCH_WINDOW_MS
+  (default 10 ms) of each other. For example, fabric_status,
+  health_check_all and the collector then read every device in one round
+  trip. A request that comes alone runs the tool's own playbook
+  (07/08/09), as before, without waiting for the window. A read
+  prefetched in the background (helpers/prefetch.py) is used instead of
+  running the command again.
+
+A run made for one caller is traced inside that caller's span; a run
+shared by several callers gets a "show batch" span linked to each of them.
+"""
+
+import asyncio
+import contextvars
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+from .ansible import run_ansible_playbook, run_ansible_playbook_async, task_message
+from .prefetch import take_prefetched
+from .tracing import linked_span
+
+SHOW_PLAYBOOK = "11-show-commands.yml"
+BATCH_WINDOW = float(os.getenv("MCP_SHOW_BATCH_WINDOW_MS", "10")) / 1000
+
+# Commands with a playbook of their own, used when a request comes alone
+COMMAND_PLAYBOOKS = {
+    "show version | json": "07-device-info.yml",
+    "show interfaces status | json": "08-interfaces-status.yml",
+    "show ip bgp summary | json": "09-bgp-neighbors.yml",
+}
+
+
+def _decode(output: Any) -> Dict[str, Any]:
+    """eos_command output of a "| json" command -> {"data": ...} or {"error": ...}."""
+    if isinstance(output, str):
+        try:
+            output = json.loads(output)
+        except json.JSONDecodeError as e:
+            return {"error": f"Failed to parse device response: JSON decode error at position {e.pos}: {e.msg}"}
+    if not output:
+        return {"error": "Failed to parse device response: empty output"}
+    return {"data": output}
+
+
+def _outputs(result: Dict[str, Any], commands: Dict[str, List[str]]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """11-show-commands.yml result -> device -> command -> {"data"} or {"error"}."""
+    summary = task_message(result.get("stdout", ""), "Show command results")
+    if summary is None:
+        error = result.get("error") or result.get("stderr") or "Playbook failed"
+        return {d: {c: {"error": error} for c in cmds} for d, cmds in commands.items()}
+
+    outputs: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for device, cmds in commands.items():
+        host = summary.get(device) or {"error": "No result from device"}
+        stdout = host.get("stdout") or []
+        # Same wording as single-command runs (_device_data_from_callback)
+        failure = host.get("error") and (
+            f"Host {device} unreachable: {host['error']}" if host.get("unreachable")
+            else f"Host {device} task failed: {host['error']}"
+        )
+        outputs[device] = {
+            command: ({"error": failure} if failure
+                      else _decode(stdout[i]) if i < len(stdout)
+                      else {"error": "No output for command"})
+            for i, command in enumerate(cmds)
+        }
+    return outputs
+
+
+def _extra_vars(commands: Dict[str, List[str]]) -> Dict[str, Any]:
+    return {"target_hosts": ",".join(commands), "commands": commands}
+
+
+def run_show_commands(
+    commands: Dict[str, List[str]],
+    forks: Optional[int] = None
+) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    Run show commands over one session per device (blocking).
+
+    Args:
+        commands: Device name -> "| json" show commands for it
+        forks: Devices read in parallel (default: ansible.cfg)
+
+    Returns:
+        Device -> command -> {"data": parsed output} or {"error": message}
+    """
+    commands = {d: cmds for d, cmds in commands.items() if cmds}
+    if not commands:
+        return {}
+    return _outputs(run_ansible_playbook(SHOW_PLAYBOOK, _extra_vars(commands), forks=forks), commands)
+
+
+async def run_show_commands_async(
+    commands: Dict[str, List[str]],
+    forks: Optional[int] = None
+) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """run_show_commands() without blocking the event loop."""
+    commands = {d: cmds for d, cmds in commands.items() if cmds}
+    if not commands:
+        return {}
+    result = await run_ansible_playbook_async(SHOW_PLAYBOOK, _extra_vars(commands), forks=forks)
+    return _outputs(result, commands)
+
+
+def _run_alone(device: str, command: str) -> Dict[str, Any]:
+    """One command on one device, through its own playbook when there is one."""
+    playbook = COMMAND_PLAYBOOKS.get(command)
+    if playbook is None:
+        return run_show_commands({device: [command]})[device][command]
+    result = run_ansible_playbook(playbook, {"target_host": device}, parse_json=True)
+    if not result["success"]:
+        return {"error": result.get("error", result.get("stderr", "Playbook failed"))}
+    if not result.get("data"):
+        return {"error": f"Failed to parse device response: {result.get('parse_error', 'Unknown parsing error')}"}
+    return {"data": result["data"]}
+
+
+class ShowBatcher:
+    """
+    Collects (device, command) requests, then runs them together.
+
+    A request made on an event loop is run as soon as a loop iteration
+    passes without new requests (at most `window` seconds later), together
+    with whatever the coroutines scheduled alongside it asked for; one made
+    from another thread waits `window` seconds for more.
+
+    Args:
+        window: Seconds to wait for more requests after the first one
+            (0 = run every request on its own)
+    """
+
+    def __init__(self, window: float = BATCH_WINDOW):
+        self.window = window
+        self.batches = 0
+        self._pending: Dict[Tuple[str, str], List[Future]] = {}
+        self._contexts: List[contextvars.Context] = []
+        self._submitted = 0
+        self._lock = threading.Lock()
+
+    def submit(self, device: str, command: str) -> Future:
+        """Queue a command; the future resolves to {"data": ...} or {"error": ...}."""
+        future: Future = Future()
+        context = contextvars.copy_context()  # the caller's trace span
+        if self.window <= 0:
+            self._start({(device, command): [future]}, [context])
+            return future
+        with self._lock:
+            first = not self._pending
+            self._pending.setdefault((device, command), []).append(future)
+            self._contexts.append(context)
+            self._submitted += 1
+        if first:
+            try:
+                asyncio.get_running_loop().call_soon(self._flush_when_idle, -1, time.monotonic() + self.window)
+            except RuntimeError:  # not on an event loop
+                timer = threading.Timer(self.window, self._flush)
+                timer.daemon = True
+                timer.start()
+        return future
+
+    @staticmethod
+    def _execute(pending: Dict[Tuple[str, str], List[Future]]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Run the pending commands: device -> command -> {"data"} or {"error"}."""
+        if len(pending) == 1:
+            (device, command), = pending
+            return {device: {command: _run_alone(device, command)}}
+        commands: Dict[str, List[str]] = {}
+        for device, command in pending:
+            commands.setdefault(device, []).append(command)
+        return run_show_commands(commands)
+
+    def _flush_when_idle(self, seen: int, deadline: float) -> None:
+        """Flush once a loop iteration adds no requests (nested gathers submit a step later)."""
+        with self._lock:
+            submitted = self._submitted
+        if submitted != seen and time.monotonic() < deadline:
+            asyncio.get_running_loop().call_soon(self._flush_when_idle, submitted, deadline)
+        else:
+            self._flush()
+
+    def _flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            contexts, self._contexts = self._contexts, []
+        if pending:
+            self._start(pending, contexts)
+
+    def _start(self, pending: Dict[Tuple[str, str], List[Future]], contexts: List[contextvars.Context]) -> None:
+        threading.Thread(target=self._run, args=(pending, contexts), daemon=True).start()
+
+    def _run(self, pending: Dict[Tuple[str, str], List[Future]], contexts: List[contextvars.Context]) -> None:
+        pending = {
+            key: futures for key, futures in pending.items()
+            if any([f.set_running_or_notify_cancel() for f in futures])
+        }
+        if not pending:
+            return
+        self.batches += 1
+        failed = {"error": "No result"}
+        try:
+            # Traced under the caller's span, or linked to each caller's span
+            if len(contexts) == 1:
+                results = contexts[0].run(self._execute, pending)
+            else:
+                with linked_span("show batch", contexts, **{"show.requests": len(contexts)}):
+                    results = self._execute(pending)
+        except Exception as e:
+            results, failed = {}, {"error": str(e)}
+        for (device, command), futures in pending.items():
+            outcome = results.get(device, {}).get(command) or failed
+            for future in futures:
+                if future.running():
+                    future.set_result(outcome)
+
+
+_BATCHER = ShowBatcher()
+
+
+async def show(device: str, command: str) -> Dict[str, Any]:
+    """
+    Run one "| json" show command, batched with other requests made at the same time.
+
+    Returns:
+        {"data": parsed output} or {"error": message}
+    """
+    prefetched = take_prefetched(device, command)
+    if prefetched is not None:
+        return await asyncio.wrap_future(prefetched[0])
+    return await asyncio.wrap_future(_BATCHER.submit(device, command))
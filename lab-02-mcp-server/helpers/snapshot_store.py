@@ -0,0 +1,303 @@
+"""
+Local time-series store for collected device state (SQLite, stdlib only).
+
+The background collector (helpers/collector.py) records device info,
+interface status and BGP neighbors for every device on a fixed interval.
+Storing every poll would repeat the same rows thousands of times, so each
+kind of state is kept as change intervals instead:
+
+    state_interfaces(device, key, status, line_protocol, description,
+                     first_seen, last_seen)
+
+A poll that finds a row unchanged only moves its last_seen forward; a new
+row is written when any value changes. Storage grows with the number of
+changes, not the number of polls, and "what changed since T" is a query
+on first_seen.
+
+Layout:
+    polls             one row per (device, kind) poll: time, ok/error, duration
+    state_device      key "" - hostname, model, version, serial, boot time
+    state_interfaces  key = interface name
+    state_bgp         key = peer address
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "snapshots.sqlite")
+RETENTION_HOURS = float(os.getenv("MCP_SNAPSHOT_RETENTION_HOURS", "24"))
+
+# kind -> value columns (besides device, key, first_seen, last_seen)
+KINDS: Dict[str, Tuple[str, ...]] = {
+    "device": ("hostname", "model", "version", "serial_number", "boot_time"),
+    "interfaces": ("status", "line_protocol", "description"),
+    "bgp": ("remote_asn", "state", "prefixes_received"),
+}
+
+
+class SnapshotStore:
+    """
+    SQLite-backed store of device state change intervals.
+
+    Safe to use from the collector thread and tool calls at the same time.
+
+    Args:
+        path: Database file (created if missing); ":memory:" for tests
+        retention_hours: Rows last seen longer ago than this are pruned
+    """
+
+    def __init__(self, path: Optional[str] = None, retention_hours: float = RETENTION_HOURS):
+        self.path = path or DEFAULT_DB
+        self.retention = retention_hours * 3600
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        # (device, kind) -> {key: (rowid, values)} for rows seen in the last poll
+        self._open: Dict[Tuple[str, str], Dict[str, Tuple[int, tuple]]] = {}
+        self._create()
+
+    def _create(self) -> None:
+        with self._lock, self._db:
+            if self.path != ":memory:":
+                self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS polls (device TEXT, kind TEXT, ts REAL, "
+                "ok INTEGER, error TEXT, duration_ms REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS polls_idx ON polls (device, kind, ts)")
+            for kind, columns in KINDS.items():
+                self._db.execute(
+                    f"CREATE TABLE IF NOT EXISTS state_{kind} (device TEXT, key TEXT, "
+                    f"{', '.join(columns)}, first_seen REAL, last_seen REAL)"
+                )
+                self._db.execute(
+                    f"CREATE INDEX IF NOT EXISTS state_{kind}_key ON state_{kind} (device, key, first_seen)"
+                )
+                self._db.execute(
+                    f"CREATE INDEX IF NOT EXISTS state_{kind}_seen ON state_{kind} (first_seen)"
+                )
+
+    # -------------------------------------------------------------------------
+    # Writing
+    # -------------------------------------------------------------------------
+
+    def _last_poll(self, device: str, kind: str) -> Optional[float]:
+        row = self._db.execute(
+            "SELECT MAX(ts) FROM polls WHERE device = ? AND kind = ? AND ok = 1", (device, kind)
+        ).fetchone()
+        return row[0]
+
+    def _open_rows(self, device: str, kind: str) -> Dict[str, Tuple[int, tuple]]:
+        """Rows seen in the last successful poll (loaded from disk once)."""
+        if (device, kind) not in self._open:
+            last = self._last_poll(device, kind)
+            columns = KINDS[kind]
+            rows = self._db.execute(
+                f"SELECT rowid, key, {', '.join(columns)} FROM state_{kind} "
+                "WHERE device = ? AND last_seen = ?", (device, last)
+            ).fetchall() if last is not None else []
+            self._open[(device, kind)] = {r[1]: (r[0], tuple(r[2:])) for r in rows}
+        return self._open[(device, kind)]
+
+    def record(
+        self,
+        device: str,
+        kind: str,
+        rows: Dict[str, Dict[str, Any]],
+        ts: Optional[float] = None,
+        duration_ms: float = 0.0
+    ) -> int:
+        """
+        Record one successful poll.
+
+        Args:
+            device: Device name
+            kind: One of KINDS
+            rows: key -> {column: value}
+            ts: Poll time (default: now)
+            duration_ms: How long the poll took
+
+        Returns:
+            Number of rows that changed (new intervals written)
+        """
+        ts = time.time() if ts is None else ts
+        columns = KINDS[kind]
+        with self._lock, self._db:
+            previous = self._open_rows(device, kind)
+            current: Dict[str, Tuple[int, tuple]] = {}
+            extend = []
+            for key, data in rows.items():
+                values = tuple(data.get(c) for c in columns)
+                seen = previous.get(key)
+                if seen is not None and seen[1] == values:
+                    extend.append((ts, seen[0]))
+                    current[key] = seen
+                else:
+                    cursor = self._db.execute(
+                        f"INSERT INTO state_{kind} (device, key, {', '.join(columns)}, first_seen, last_seen) "
+                        f"VALUES (?, ?, {', '.join('?' * len(columns))}, ?, ?)",
+                        (device, key, *values, ts, ts)
+                    )
+                    current[key] = (cursor.lastrowid, values)
+            self._db.executemany(f"UPDATE state_{kind} SET last_seen = ? WHERE rowid = ?", extend)
+            self._db.execute(
+                "INSERT INTO polls VALUES (?, ?, ?, 1, NULL, ?)", (device, kind, ts, duration_ms)
+            )
+            self._open[(device, kind)] = current
+        return len(rows) - len(extend)
+
+    def record_error(self, device: str, kind: str, error: str, ts: Optional[float] = None) -> None:
+        """Record a failed poll; the last good state stays queryable."""
+        ts = time.time() if ts is None else ts
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO polls VALUES (?, ?, ?, 0, ?, NULL)", (device, kind, ts, error)
+            )
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Delete polls and rows older than the retention window."""
+        cutoff = (time.time() if now is None else now) - self.retention
+        deleted = 0
+        with self._lock, self._db:
+            deleted += self._db.execute("DELETE FROM polls WHERE ts < ?", (cutoff,)).rowcount
+            for kind in KINDS:
+                deleted += self._db.execute(
+                    f"DELETE FROM state_{kind} WHERE last_seen < ?", (cutoff,)
+                ).rowcount
+            if deleted:
+                # A device that was down for the whole window may have lost its open rows
+                self._open.clear()
+        return deleted
+
+    # -------------------------------------------------------------------------
+    # Reading
+    # -------------------------------------------------------------------------
+
+    def devices(self) -> List[str]:
+        """Devices with at least one poll."""
+        with self._lock:
+            return [r[0] for r in self._db.execute("SELECT DISTINCT device FROM polls ORDER BY device")]
+
+    def freshness(self, device: str, kind: str) -> Dict[str, Any]:
+        """When the state was last collected, and the last error if the newest poll failed."""
+        with self._lock:
+            last_ok = self._last_poll(device, kind)
+            latest = self._db.execute(
+                "SELECT ts, ok, error FROM polls WHERE device = ? AND kind = ? ORDER BY ts DESC LIMIT 1",
+                (device, kind)
+            ).fetchone()
+        info: Dict[str, Any] = {
+            "collected_at": last_ok,
+            "age_seconds": round(time.time() - last_ok, 1) if last_ok else None,
+        }
+        if latest and not latest[1]:
+            info["last_error"] = latest[2]
+        return info
+
+    def current(self, device: str, kind: str) -> Dict[str, Dict[str, Any]]:
+        """State as of the last successful poll: key -> {column: value}."""
+        columns = KINDS[kind]
+        with self._lock:
+            rows = self._open_rows(device, kind)
+            return {key: dict(zip(columns, values)) for key, (_rowid, values) in sorted(rows.items())}
+
+    def changes(
+        self,
+        since: float,
+        device: Optional[str] = None,
+        kinds: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        What changed after `since`, oldest first.
+
+        Returns:
+            List of {"time", "device", "kind", "key", "change": "added" |
+            "changed" | "removed", "fields": {column: [old, new]}}; removed
+            entries carry the last time they were seen.
+            State found by a device's first poll is the baseline and is not
+            reported as added.
+        """
+        events = []
+        with self._lock:
+            for kind in kinds or list(KINDS):
+                events += self._changes(kind, since, device)
+        return sorted(events, key=lambda e: e["time"])
+
+    def _changes(self, kind: str, since: float, device: Optional[str]) -> List[Dict[str, Any]]:
+        columns = KINDS[kind]
+        table = f"state_{kind}"
+        only_device = "AND n.device = ?" if device else ""
+        params = (device,) if device else ()
+        polls = self._db.execute(
+            f"SELECT device, MIN(ts), MAX(ts) FROM polls WHERE kind = ? AND ok = 1 "
+            f"{'AND device = ?' if device else ''} GROUP BY device", (kind, *params)
+        ).fetchall()
+        first_poll = {d: first for d, first, _last in polls}
+        last_poll = {d: last for d, _first, last in polls}
+        events = []
+
+        # Intervals that started after `since`, each with the one before it
+        rows = self._db.execute(
+            f"SELECT n.device, n.key, n.first_seen, p.rowid IS NOT NULL, "
+            f"{', '.join('n.' + c for c in columns)}, {', '.join('p.' + c for c in columns)} "
+            f"FROM {table} n LEFT JOIN {table} p ON p.rowid = ("
+            f"  SELECT rowid FROM {table} WHERE device = n.device AND key = n.key "
+            f"  AND first_seen < n.first_seen ORDER BY first_seen DESC LIMIT 1) "
+            f"WHERE n.first_seen > ? {only_device}", (since, *params)
+        ).fetchall()
+        for dev, key, first, has_previous, *values in rows:
+            new, old = values[:len(columns)], values[len(columns):]
+            event = {"time": first, "device": dev, "kind": kind, "key": key}
+            if has_previous:
+                events.append({**event, "change": "changed", "fields": {
+                    c: [o, n] for c, o, n in zip(columns, old, new) if o != n
+                }})
+            elif first > first_poll.get(dev, first):
+                events.append({**event, "change": "added", "fields": dict(zip(columns, new))})
+
+        # Intervals that ended after `since` without a successor at the next poll
+        rows = self._db.execute(
+            f"SELECT n.device, n.key, n.last_seen, {', '.join('n.' + c for c in columns)} "
+            f"FROM {table} n WHERE n.last_seen >= ? {only_device} AND NOT EXISTS ("
+            f"  SELECT 1 FROM {table} s WHERE s.device = n.device AND s.key = n.key "
+            f"  AND s.first_seen > n.last_seen AND s.first_seen <= ("
+            f"    SELECT MIN(ts) FROM polls WHERE device = n.device AND kind = ? "
+            f"    AND ok = 1 AND ts > n.last_seen))", (since, *params, kind)
+        ).fetchall()
+        for dev, key, last, *values in rows:
+            if last < last_poll.get(dev, last):
+                events.append({"time": last, "device": dev, "kind": kind, "key": key,
+                               "change": "removed", "fields": dict(zip(columns, values))})
+        return events
+
+    def stats(self) -> Dict[str, Any]:
+        """Row counts and database size."""
+        with self._lock:
+            counts = {
+                kind: self._db.execute(f"SELECT COUNT(*) FROM state_{kind}").fetchone()[0]
+                for kind in KINDS
+            }
+            polls = self._db.execute("SELECT COUNT(*) FROM polls").fetchone()[0]
+        size = os.path.getsize(self.path) if self.path != ":memory:" and os.path.exists(self.path) else 0
+        return {"polls": polls, "state_rows": counts, "db_bytes": size}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_STORE: Optional[SnapshotStore] = None
+
+
+def get_snapshot_store() -> SnapshotStore:
+    """Shared SnapshotStore instance (follows MCP_SNAPSHOT_DB)."""
+    global _STORE
+    path = os.getenv("MCP_SNAPSHOT_DB", DEFAULT_DB)
+    if _STORE is None or _STORE.path != path:
+        _STORE = SnapshotStore(path)
+    return _STORE
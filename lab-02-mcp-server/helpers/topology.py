@@ -0,0 +1,337 @@
+"""
+Lab topology built from the Ansible inventory and the Containerlab file.
+
+topology://containerlab used to rebuild and pretty-print a hardcoded list
+of six devices on every read. TopologyCache builds it from
+lab-01-copilots/ansible/inventory/hosts.yml (devices, roles, addresses,
+ASNs) and lab-01-copilots/topology.clab.yml (lab name, node kinds, links),
+and serializes it once per version. A read only stats the two files; the
+document is rebuilt when one of them changes.
+
+Each document starts with "version" and "content_hash" (a hash of the
+rest), so a client can tell at a glance whether anything changed. Every
+device also has a document of its own, topology://device/{name}, with its
+own hash, so large fleets need not be read whole. Once LLDP discovery
+has run (helpers/discovery.py), the documents also say how the cabling
+compares with the declared links.
+
+TopologySubscriptions handles resources/subscribe: while any client is
+subscribed, the files are checked every MCP_TOPOLOGY_POLL seconds
+(default 5), and subscribers get notifications/resources/updated for each
+URI whose content changed, instead of re-reading to find out.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import weakref
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import yaml
+
+from .constants import ANSIBLE_DIR, DEVICE_USERNAME
+
+INVENTORY_FILE = os.getenv("MCP_INVENTORY_FILE", os.path.join(ANSIBLE_DIR, "inventory", "hosts.yml"))
+CLAB_FILE = os.getenv("MCP_CLAB_FILE", os.path.join(ANSIBLE_DIR, "..", "topology.clab.yml"))
+POLL_INTERVAL = float(os.getenv("MCP_TOPOLOGY_POLL", "5"))
+
+TOPOLOGY_URI = "topology://containerlab"
+DEVICE_URI = "topology://device/{name}"
+
+# Inventory group -> device role
+ROLES = {"spines": "spine", "leaves": "leaf"}
+
+
+def _load_yaml(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return yaml.safe_load(f) or {}
+
+
+def _interface(name: str) -> str:
+    """Containerlab endpoint interface -> device interface (cEOS: eth1 -> Ethernet1)."""
+    match = re.fullmatch(r"eth(\d+)", name)
+    return f"Ethernet{match.group(1)}" if match else name
+
+
+def _inventory_hosts(group: Dict[str, Any], name: str = "all",
+                     hosts: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Dict[str, Any]]:
+    """Host vars from an inventory group and its children, with "role" from the group name."""
+    hosts = {} if hosts is None else hosts
+    for host, host_vars in (group.get("hosts") or {}).items():
+        entry = hosts.setdefault(host, {})
+        entry.update(host_vars or {})
+        if name in ROLES:
+            entry.setdefault("role", ROLES[name])
+    for child, child_group in (group.get("children") or {}).items():
+        _inventory_hosts(child_group or {}, child, hosts)
+    return hosts
+
+
+def build_topology(inventory_path: str = INVENTORY_FILE, clab_path: str = CLAB_FILE) -> Dict[str, Any]:
+    """
+    Topology document from the inventory and (if present) the Containerlab file.
+
+    Raises:
+        OSError, yaml.YAMLError: inventory missing or unreadable
+    """
+    inventory = _load_yaml(inventory_path)
+    clab = _load_yaml(clab_path) if os.path.exists(clab_path) else {}
+    nodes = (clab.get("topology") or {}).get("nodes") or {}
+
+    devices = []
+    for name, host_vars in _inventory_hosts(inventory.get("all") or {}).items():
+        node = nodes.get(name) or {}
+        devices.append({
+            "name": name,
+            "role": host_vars.get("role", "device"),
+            "ip": host_vars.get("ansible_host") or node.get("mgmt-ipv4"),
+            "asn": host_vars.get("bgp_asn"),
+            "router_id": host_vars.get("router_id"),
+            "kind": node.get("kind"),
+        })
+
+    links = []
+    for link in (clab.get("topology") or {}).get("links") or []:
+        (a, a_if), (b, b_if) = (endpoint.split(":", 1) for endpoint in link["endpoints"])
+        links.append({"a": a, "a_interface": _interface(a_if), "b": b, "b_interface": _interface(b_if)})
+
+    roles = [d["role"] for d in devices]
+    return {
+        "lab_name": clab.get("name", "netops-workshop"),
+        "description": f"Spine-leaf topology with {roles.count('spine')} spines and {roles.count('leaf')} leaves",
+        "devices": devices,
+        "links": links,
+        "credentials": {
+            "username": DEVICE_USERNAME,
+            "note": "Same password for all devices (DEVICE_PASSWORD)"
+        },
+    }
+
+
+def _device_document(topology: Dict[str, Any], device: Dict[str, Any],
+                     discovery: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """One device and its links (declared, and LLDP-discovered if known), seen from the device."""
+    name = device["name"]
+    links = [
+        {"interface": link[f"{side}_interface"], "peer": link[other], "peer_interface": link[f"{other}_interface"]}
+        for link in topology["links"]
+        for side, other in (("a", "b"), ("b", "a"))
+        if link[side] == name
+    ]
+    document = {"lab_name": topology["lab_name"], **device, "links": links}
+    if discovery is not None:
+        document["lldp_neighbors"] = discovery["neighbors"].get(name)
+    return document
+
+
+def _serialize(document: Dict[str, Any], version: int) -> Tuple[str, str]:
+    """(content hash, JSON text with version and content_hash first)."""
+    body = json.dumps(document, separators=(",", ":"))
+    digest = hashlib.sha256(body.encode()).hexdigest()[:16]
+    header = f'{{"version":{version},"content_hash":"{digest}"'
+    return digest, header + ("," + body[1:] if body != "{}" else "}")
+
+
+class TopologyCache:
+    """
+    Topology documents, serialized once per version.
+
+    Args:
+        inventory_path: Ansible inventory (hosts.yml)
+        clab_path: Containerlab topology file
+    """
+
+    def __init__(self, inventory_path: str = INVENTORY_FILE, clab_path: str = CLAB_FILE):
+        self.paths = (inventory_path, clab_path)
+        self.version = 0
+        self.builds = 0
+        self._stamp: Optional[Tuple] = None
+        self._hash: Optional[str] = None
+        self._text: Optional[str] = None
+        self._devices: Dict[str, Tuple[str, str]] = {}  # name -> (hash, text)
+        self._error: Optional[str] = None
+        self._changed: Set[str] = set()  # URIs changed since pop_changes()
+        self._declared: Optional[Dict[str, Any]] = None
+        self._discovery: Optional[Dict[str, Any]] = None
+        self._discovery_gen = 0
+        self._lock = threading.Lock()
+
+    def _file_stamp(self) -> Tuple:
+        stamp = []
+        for path in self.paths:
+            try:
+                st = os.stat(path)
+                stamp.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                stamp.append(None)
+        return (*stamp, self._discovery_gen)
+
+    def refresh(self) -> bool:
+        """Rebuild if a source file or the discovery changed; True if the content changed."""
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return False
+        with self._lock:
+            if stamp == self._stamp:
+                return False
+            try:
+                topology = build_topology(*self.paths)
+            except (OSError, yaml.YAMLError, KeyError, ValueError) as e:
+                # Keep serving the last good version; retried on the next read
+                self._error = f"Failed to load topology: {type(e).__name__}: {e}"
+                return False
+            self._error = None
+            self._stamp = stamp
+            self.builds += 1
+            self._declared = topology
+            discovery = self._discovery
+            if discovery is not None:
+                topology = {**topology, "discovery": discovery["summary"]}
+
+            # Device documents carry the LLDP neighbors, which the summary in
+            # the top-level document does not, so each is compared on its own hash
+            documents = {d["name"]: _device_document(topology, d, discovery) for d in topology["devices"]}
+            changed = set()
+            if _serialize(topology, 0)[0] != self._hash:
+                changed.add(TOPOLOGY_URI)
+            for name in set(documents) | set(self._devices):
+                old = self._devices.get(name)
+                new = _serialize(documents[name], 0)[0] if name in documents else None
+                if (old and old[0]) != new:
+                    changed.add(DEVICE_URI.format(name=name))
+            if not changed:
+                return False  # touched, not changed
+            first = self._text is None
+            self.version += 1
+            self._hash, self._text = _serialize(topology, self.version)
+            self._devices = {name: _serialize(doc, self.version) for name, doc in documents.items()}
+            if not first:
+                self._changed |= changed
+            return True
+
+    def document(self) -> str:
+        """topology://containerlab as JSON text."""
+        self.refresh()
+        if self._text is None:
+            return json.dumps({"error": self._error})
+        return self._text
+
+    def device_document(self, name: str) -> str:
+        """topology://device/{name} as JSON text."""
+        self.refresh()
+        if self._text is None:
+            return json.dumps({"error": self._error})
+        entry = self._devices.get(name)
+        if entry is None:
+            return json.dumps({"error": f"Unknown device '{name}'. Devices: {sorted(self._devices)}"})
+        return entry[1]
+
+    def topology(self) -> Optional[Dict[str, Any]]:
+        """The declared topology (inventory + Containerlab) as a dict, None if unreadable."""
+        self.refresh()
+        return self._declared
+
+    def set_discovery(self, summary: Dict[str, Any], neighbors: Dict[str, Any]) -> None:
+        """
+        Add what discovery found to the documents (helpers/discovery.py).
+
+        Args:
+            summary: Goes into topology://containerlab as "discovery"
+            neighbors: Device -> LLDP neighbors, for topology://device/{name}
+                (None for a device that could not be read)
+        """
+        with self._lock:
+            self._discovery = {"summary": summary, "neighbors": neighbors}
+            self._discovery_gen += 1
+
+    def pop_changes(self) -> List[str]:
+        """URIs whose content changed since the last call."""
+        with self._lock:
+            changed, self._changed = sorted(self._changed), set()
+        return changed
+
+
+class TopologySubscriptions:
+    """
+    resources/subscribe bookkeeping and change notifications for topology URIs.
+
+    Args:
+        cache: The TopologyCache whose documents are watched
+        interval: Seconds between file checks while anyone is subscribed
+    """
+
+    def __init__(self, cache: TopologyCache, interval: float = POLL_INTERVAL):
+        self.cache = cache
+        self.interval = interval
+        self._sessions: Dict[str, "weakref.WeakSet"] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, uri: str, session: Any) -> None:
+        self._sessions.setdefault(str(uri), weakref.WeakSet()).add(session)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._watch())
+
+    def unsubscribe(self, uri: str, session: Any) -> None:
+        self._sessions.get(str(uri), weakref.WeakSet()).discard(session)
+
+    def subscribed(self) -> bool:
+        return any(len(sessions) for sessions in self._sessions.values())
+
+    async def check(self) -> List[str]:
+        """Check the files once and notify subscribers; returns the URIs notified."""
+        await asyncio.to_thread(self.cache.refresh)
+        notified = []
+        for uri in self.cache.pop_changes():
+            for session in list(self._sessions.get(uri, ())):
+                try:
+                    await session.send_resource_updated(uri)
+                except Exception:
+                    self._sessions[uri].discard(session)  # client went away
+                    continue
+                if uri not in notified:
+                    notified.append(uri)
+        return notified
+
+    async def _watch(self) -> None:
+        while self.subscribed():
+            await asyncio.sleep(self.interval)
+            await self.check()
+
+
+def enable_subscriptions(mcp, subscriptions: TopologySubscriptions) -> None:
+    """Handle resources/subscribe and resources/unsubscribe on a FastMCP server."""
+    server = mcp._mcp_server
+
+    @server.subscribe_resource()
+    async def _subscribe(uri) -> None:
+        subscriptions.subscribe(str(uri), server.request_context.session)
+
+    @server.unsubscribe_resource()
+    async def _unsubscribe(uri) -> None:
+        subscriptions.unsubscribe(str(uri), server.request_context.session)
+
+    # The SDK advertises subscribe=False even with handlers registered
+    get_capabilities = server.get_capabilities
+
+    def capabilities(*args, **kwargs):
+        result = get_capabilities(*args, **kwargs)
+        if result.resources is not None:
+            result.resources.subscribe = True
+        return result
+
+    server.get_capabilities = capabilities
+
+
+_CACHE = TopologyCache()
+_SUBSCRIPTIONS = TopologySubscriptions(_CACHE)
+
+
+def get_topology_cache() -> TopologyCache:
+    return _CACHE
+
+
+def get_topology_subscriptions() -> TopologySubscriptions:
+    return _SUBSCRIPTIONS
@@ -0,0 +1,255 @@
+"""
+Optional OpenTelemetry tracing for the MCP server.
+
+Profiles end-to-end tool latency as a span tree:
+
+    tool: troubleshoot_...            (MCP tool call)
+      └─ ansible-playbook 07-...      (subprocess wall time)
+           ├─ ansible.task Get ...    (task timings from the JSON callback)
+           └─ ansible.parse           (device JSON extraction)
+
+Show commands that several tool calls share (helpers/show_batch.py) run
+under a "show batch" span of their own, linked to each caller's tool span.
+
+The gap between the ansible-playbook span and its task spans is Python +
+Ansible startup; the first task that touches a device also includes the
+SSH connect.
+
+Enable with MCP_TRACING:
+    MCP_TRACING=console                     # print spans to stderr
+    MCP_TRACING=file MCP_TRACE_FILE=traces.jsonl  # one JSON span per line
+    MCP_TRACING=otlp                        # OTLP to a local collector (localhost:4317)
+
+Requirements:
+    pip install opentelemetry-api opentelemetry-sdk
+    pip install opentelemetry-exporter-otlp   # only for MCP_TRACING=otlp
+"""
+
+import contextlib
+import contextvars
+import functools
+import inspect
+import os
+import sys
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Optional
+
+try:
+    from opentelemetry import context as otel_context
+    from opentelemetry import trace
+except ImportError:
+    otel_context = trace = None
+
+# Set by start_tracing(); spans are only created once an exporter is configured
+_TRACER = None
+
+
+def start_tracing(mode: Optional[str] = None) -> Optional[str]:
+    """
+    Configure the OpenTelemetry SDK from MCP_TRACING (or mode).
+
+    Args:
+        mode: "console", "file" or "otlp"; defaults to the MCP_TRACING env var
+
+    Returns:
+        The exporter mode in use, or None if tracing is disabled/unavailable
+    """
+    global _TRACER
+    mode = (mode if mode is not None else os.getenv("MCP_TRACING", "")).lower()
+    if not mode or trace is None:
+        return None
+
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import (
+            BatchSpanProcessor,
+            ConsoleSpanExporter,
+            SimpleSpanProcessor,
+        )
+    except ImportError:
+        print("  [SKIP] Tracing: opentelemetry-sdk not installed", file=sys.stderr)
+        return None
+
+    if mode == "console":
+        # stderr keeps stdout free for the stdio MCP transport
+        processor = SimpleSpanProcessor(ConsoleSpanExporter(out=sys.stderr))
+    elif mode == "file":
+        path = os.getenv("MCP_TRACE_FILE", "traces.jsonl")
+        exporter = ConsoleSpanExporter(
+            out=open(path, "a"),
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+        processor = BatchSpanProcessor(exporter)
+    elif mode == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            print("  [SKIP] Tracing: opentelemetry-exporter-otlp not installed", file=sys.stderr)
+            return None
+        processor = BatchSpanProcessor(OTLPSpanExporter())
+    else:
+        print(f"  [SKIP] Tracing: unknown MCP_TRACING mode '{mode}'", file=sys.stderr)
+        return None
+
+    provider = TracerProvider(resource=Resource.create({"service.name": "network-mcp-server"}))
+    provider.add_span_processor(processor)
+    trace.set_tracer_provider(provider)
+    _TRACER = trace.get_tracer("network-mcp-server")
+    return mode
+
+
+def tracing_enabled() -> bool:
+    """Return True if start_tracing() configured an exporter."""
+    return _TRACER is not None
+
+
+def span(name: str, **attributes: Any):
+    """
+    Context manager for a span; a no-op when tracing is disabled.
+
+    Example:
+        with span("ansible-playbook", playbook="07-device-info.yml"):
+            ...
+    """
+    if _TRACER is None:
+        return contextlib.nullcontext()
+    return _TRACER.start_as_current_span(name, attributes=_clean(attributes))
+
+
+def linked_span(name: str, contexts: Iterable[contextvars.Context], **attributes: Any):
+    """
+    Context manager for work done for several callers at once (a batch).
+
+    The span starts a trace of its own, linked to the span current in each
+    of `contexts` (contextvars.copy_context() of the callers); a no-op when
+    tracing is disabled.
+    """
+    if _TRACER is None:
+        return contextlib.nullcontext()
+    links = []
+    for ctx in contexts:
+        caller = ctx.run(trace.get_current_span).get_span_context()
+        if caller.is_valid:
+            links.append(trace.Link(caller))
+    return _TRACER.start_as_current_span(
+        name, context=otel_context.Context(), links=links, attributes=_clean(attributes)
+    )
+
+
+def set_attributes(current, **attributes: Any) -> None:
+    """Set attributes on a span returned by span(); ignored when disabled."""
+    if current is not None:
+        current.set_attributes(_clean(attributes))
+
+
+def _clean(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    """OpenTelemetry attributes must be str/bool/int/float."""
+    return {
+        k: v if isinstance(v, (str, bool, int, float)) else str(v)
+        for k, v in attributes.items() if v is not None
+    }
+
+
+# =============================================================================
+# Ansible task timings
+# =============================================================================
+
+def _iso_to_ns(timestamp: str) -> Optional[int]:
+    """Convert an Ansible JSON callback timestamp to epoch nanoseconds."""
+    try:
+        parsed = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
+    return int(parsed.timestamp() * 1_000_000_000)
+
+
+def record_ansible_tasks(callback_data: Dict[str, Any]) -> float:
+    """
+    Emit one child span per Ansible task using the JSON callback timings.
+
+    Must be called inside the ansible-playbook span so the task spans nest
+    under it.
+
+    Args:
+        callback_data: Parsed ANSIBLE_STDOUT_CALLBACK=json output
+
+    Returns:
+        Total seconds spent inside plays (0.0 if no timings were found)
+    """
+    in_plays = 0.0
+    for play in callback_data.get("plays", []):
+        duration = play.get("play", {}).get("duration", {})
+        start, end = _iso_to_ns(duration.get("start")), _iso_to_ns(duration.get("end"))
+        if start and end:
+            in_plays += (end - start) / 1e9
+
+        if _TRACER is None:
+            continue
+
+        for task in play.get("tasks", []):
+            info = task.get("task", {})
+            timing = info.get("duration", {})
+            start, end = _iso_to_ns(timing.get("start")), _iso_to_ns(timing.get("end"))
+            if not (start and end):
+                continue
+
+            hosts = task.get("hosts", {})
+            task_span = _TRACER.start_span(
+                f"ansible.task {info.get('name', 'unnamed')}",
+                start_time=start,
+                attributes=_clean({
+                    "ansible.task": info.get("name", "unnamed"),
+                    "ansible.hosts": ",".join(hosts),
+                    "ansible.failed": any(h.get("failed") for h in hosts.values()),
+                    "ansible.unreachable": any(h.get("unreachable") for h in hosts.values()),
+                }),
+            )
+            task_span.end(end_time=end)
+
+    return in_plays
+
+
+# =============================================================================
+# Tool wrapping
+# =============================================================================
+
+def trace_tool(func: Callable, name: Optional[str] = None) -> Callable:
+    """
+    Wrap a tool function in a "tool: <name>" span.
+
+    Keeps the original signature (functools.wraps). Returns func unchanged
+    when tracing is disabled.
+    """
+    if _TRACER is None:
+        return func
+
+    tool = name or func.__name__
+
+    def _tool_attributes(tool: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        return _clean({"mcp.tool": tool, **{f"mcp.arg.{k}": v for k, v in kwargs.items()}})
+
+    def _finish(current, result: Any) -> None:
+        if isinstance(result, dict) and "error" in result:
+            current.set_attribute("mcp.tool.error", str(result["error"])[:200])
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with _TRACER.start_as_current_span(
+                f"tool: {tool}", attributes=_tool_attributes(tool, kwargs)
+            ) as current:
+                result = await func(*args, **kwargs)
+                _finish(current, result)
+                return result
+        return async_wrapper
+
+    @functools.wraps(func)
+    def sync_wrapper(*args, **kwargs):
+        with _TRACER.start_as_current_span(
+            f"tool: {tool}", attributes=_tool_attributes(tool, kwargs)
+        ) as current:
+            result = func(*args, **kwargs)
+            _finish(current, result)
+            return result
+    return sync_wrapper
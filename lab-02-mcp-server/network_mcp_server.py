@@ -17,9 +17,15 @@ EXTENSION TASKS:
 - See prompts/ folder for AI assistance
 
 Run with: mcp dev network_mcp_server.py
+Serve many clients: python serve_http.py --workers 4
 Test with: python -m pytest tests/test_mcp_server.py
 """
 
+from helpers.collector import start_collector
+from helpers.metrics import start_metrics_server
+from helpers.prefetch import prefetch
+from helpers.shared_state import claim_primary, watch_primary
+from helpers.tracing import start_tracing
 from mcp.server.fastmcp import FastMCP
 from mcp.server.transport_security import TransportSecuritySettings
 
@@ -41,6 +47,32 @@ mcp = FastMCP(
 
 print("\n=== Registering MCP Components ===")
 
+# Opt-in OpenTelemetry tracing: MCP_TRACING=console|file|otlp
+tracing_mode = start_tracing()
+if tracing_mode:
+    print(f"\nTracing: {tracing_mode}")
+
+
+def start_primary_duties() -> None:
+    """Start /metrics and the background collector, if they are enabled."""
+    # Opt-in self-instrumentation: MCP_METRICS_PORT=9097 exposes /metrics
+    metrics_port = start_metrics_server()
+    if metrics_port:
+        print(f"\nMetrics: http://0.0.0.0:{metrics_port}/metrics")
+
+    # Opt-in background collector: MCP_COLLECTOR_INTERVAL=60 polls every device
+    collector_interval = start_collector()
+    if collector_interval:
+        print(f"\nCollector: every {collector_interval:g}s")
+
+
+# With several workers (serve_http.py) only one of them serves /metrics
+# and runs the collector; the others wait to take over if it exits
+if claim_primary():
+    start_primary_duties()
+else:
+    watch_primary(start_primary_duties)
+
 print("\nTools:")
 from tools import register_all_tools
 registered_tools = register_all_tools(mcp)
@@ -66,15 +98,21 @@ def troubleshoot_bgp(device: str) -> str:
     Args:
         device: Device name to troubleshoot (e.g., 'spine1')
     """
+    # The tools this prompt asks for read the device and its BGP peers;
+    # start reading them now (helpers/prefetch.py)
+    prefetch([device], source="troubleshoot_bgp", with_peers=True)
+
     return f"""Help me troubleshoot BGP on {device}.
 
 Please follow these steps:
-1. First, use get_device_info() to verify the device is responding
-2. Then use get_interfaces() to check interface status
-3. Analyze the results:
-   - Are all interfaces up?
-   - Is the device healthy?
-4. Suggest next steps based on findings
+1. First, use diagnose_bgp() to collect device info, interfaces, BGP
+   sessions (from both ends) and Prometheus history in one call
+2. Analyze the results:
+   - Which sessions have an issue, and is the link or BGP at fault?
+   - Are the findings consistent with the metrics and alerts?
+3. Only if something is still unclear, drill down with get_interfaces(),
+   get_bgp_neighbors() or show_commands() on the device or its peer
+4. Suggest next steps based on findings (diagnose_bgp lists some)
 
 Device IP mapping:
 - spine1: 198.18.1.11
@@ -100,14 +138,16 @@ Device IP mapping:
 # =============================================================================
 # LAB 3 EXTENSION: Alerting Tools (uncomment after Lab 3 setup)
 # =============================================================================
-# After completing Lab 3, uncomment these lines to add alerting tools:
+# After completing Lab 3, uncomment these lines to add alerting tools
+# (registered like the tools/ modules, so large query results are paged):
 #
 # import os
 # import sys
 # sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "lab-03-observability"))
 # from alerting_tools import query_prometheus, get_active_alerts
-# mcp.tool()(query_prometheus)
-# mcp.tool()(get_active_alerts)
+# from tools import tool_registrar
+# tool_registrar(mcp).tool()(query_prometheus)
+# tool_registrar(mcp).tool()(get_active_alerts)
 
 
 if __name__ == "__main__":
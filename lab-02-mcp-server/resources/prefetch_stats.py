@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+MCP Resource: Prefetch Statistics
+
+How often state prefetched by the troubleshoot_bgp prompt and the topology
+resource was used, and the latency it saved per tool (helpers/prefetch.py).
+"""
+
+import json
+
+from helpers.prefetch import get_prefetcher
+
+
+def get_prefetch_stats() -> str:
+    """
+    Returns prefetch counts and latency saved per tool.
+    """
+    return json.dumps(get_prefetcher().stats(), indent=2)
+
+
+def register(mcp):
+    """Register the prefetch statistics resource with the MCP server."""
+    mcp.resource("prefetch://stats")(get_prefetch_stats)
@@ -4,9 +4,25 @@ MCP Resource: Network Topology
 
 Provides the lab network topology information as a resource.
 The AI can use this to understand what devices are available.
+
+The topology is built from the Ansible inventory and the Containerlab file,
+and rebuilt only when one of them changes (helpers/topology.py). Each
+device also has its own resource, topology://device/{name}. Clients can
+subscribe to both and are notified when they change.
+
+A client that reads the topology usually polls the devices next, so
+reading it starts a low-priority prefetch of their state (helpers/prefetch.py).
 """
 
-import json
+from helpers import VALID_DEVICES
+from helpers.prefetch import prefetch
+from helpers.topology import (
+    DEVICE_URI,
+    TOPOLOGY_URI,
+    enable_subscriptions,
+    get_topology_cache,
+    get_topology_subscriptions,
+)
 
 
 def get_topology() -> str:
@@ -15,25 +31,19 @@ def get_topology() -> str:
 
     This resource provides context about the lab network structure.
     """
-    topology = {
-        "lab_name": "netops-workshop",
-        "description": "Spine-leaf topology with 2 spines and 4 leaves",
-        "devices": [
-            {"name": "spine1", "role": "spine", "ip": "198.18.1.11", "asn": 65100},
-            {"name": "spine2", "role": "spine", "ip": "198.18.1.12", "asn": 65100},
-            {"name": "leaf1", "role": "leaf", "ip": "198.18.1.21", "asn": 65101},
-            {"name": "leaf2", "role": "leaf", "ip": "198.18.1.22", "asn": 65102},
-            {"name": "leaf3", "role": "leaf", "ip": "198.18.1.23", "asn": 65103},
-            {"name": "leaf4", "role": "leaf", "ip": "198.18.1.24", "asn": 65104},
-        ],
-        "credentials": {
-            "username": "admin",
-            "note": "Password is 'admin' for all devices"
-        }
-    }
-    return json.dumps(topology, indent=2)
+    prefetch(VALID_DEVICES, source=TOPOLOGY_URI)
+    return get_topology_cache().document()
+
+
+def get_device_topology(name: str) -> str:
+    """
+    Returns one device from the topology: role, addresses, ASN and links.
+    """
+    return get_topology_cache().device_document(name)
 
 
 def register(mcp):
-    """Register the topology resource with the MCP server."""
-    mcp.resource("topology://containerlab")(get_topology)
+    """Register the topology resources with the MCP server."""
+    mcp.resource(TOPOLOGY_URI)(get_topology)
+    mcp.resource(DEVICE_URI)(get_device_topology)
+    enable_subscriptions(mcp, get_topology_subscriptions())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Serve the Network Operations MCP server to many clients at once.
+
+`mcp run -t sse network_mcp_server.py` runs a single process, which is fine
+for one engineer. When several people share one server, use this instead:
+streamable HTTP on uvicorn with several worker processes.
+
+    python serve_http.py                      # 4 workers on 0.0.0.0:8000
+    python serve_http.py --workers 8 --port 8080
+
+Clients connect to http://<host>:8000/mcp (streamable HTTP transport).
+
+- Stateless HTTP: with more than one worker, no request depends on the
+  worker that served the previous one, so uvicorn can spread requests over
+  all workers. There are no sessions then, so resource subscriptions and
+  their notifications (resources/topology.py) do not work; clients compare
+  content_hash instead. A single worker keeps sessions and notifications.
+- Shared state: with more than one worker, response pages, delta tokens and
+  the config cache live in a SQLite file (MCP_SHARED_STATE, default
+  data/shared_state.sqlite; see helpers/shared_state.py). Only one worker
+  runs the background collector and the /metrics endpoint; if it exits,
+  another worker takes over within MCP_PRIMARY_RETRY seconds (default 30).
+- Graceful shutdown: on Ctrl-C or SIGTERM the workers stop accepting
+  requests, finish the ones in progress, then wait up to MCP_DRAIN_SECONDS
+  (default 120) for playbooks that are still running. Playbooks run in their
+  own session, so Ctrl-C does not interrupt a configuration change.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+DEFAULT_SHARED_STATE = HERE / "data" / "shared_state.sqlite"
+DRAIN_SECONDS = float(os.getenv("MCP_DRAIN_SECONDS", "120"))
+
+
+def create_app():
+    """ASGI app for one worker (uvicorn calls this in every worker process)."""
+    from helpers.ansible import wait_for_playbooks
+    from helpers.collector import get_collector
+    from network_mcp_server import mcp
+
+    # Sessions are tied to one worker, so only a single worker keeps them
+    stateless = os.getenv("MCP_HTTP_WORKERS", "2") != "1"
+    mcp.settings.stateless_http = stateless
+    mcp.settings.json_response = stateless
+    app = mcp.streamable_http_app()
+    session_manager = app.router.lifespan_context
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        async with session_manager(app):
+            yield
+        # uvicorn has already waited for open requests; now the playbooks
+        # they (or the collector) started
+        collector = get_collector()
+        if collector is not None:
+            await asyncio.to_thread(collector.stop, DRAIN_SECONDS)
+        left = await asyncio.to_thread(wait_for_playbooks, DRAIN_SECONDS)
+        if left:
+            print(f"[WARN] Shutting down with {left} playbook(s) still running", file=sys.stderr)
+
+    app.router.lifespan_context = lifespan
+    return app
+
+
+def serve(
+    host: str = "0.0.0.0",
+    port: int = 8000,
+    workers: int = 4,
+    app: str = "serve_http:create_app",
+    log_level: str = "info"
+) -> None:
+    """
+    Run uvicorn with `workers` processes, each serving `app` (a factory).
+
+    Sets MCP_DETACH_PLAYBOOKS, MCP_HTTP_WORKERS and, for more than one
+    worker, MCP_SHARED_STATE before the workers start so they inherit them.
+    """
+    import uvicorn
+
+    os.environ.setdefault("MCP_DETACH_PLAYBOOKS", "1")
+    os.environ["MCP_HTTP_WORKERS"] = str(workers)
+    if workers > 1:
+        os.environ.setdefault("MCP_SHARED_STATE", str(DEFAULT_SHARED_STATE))
+    uvicorn.run(
+        app,
+        factory=True,
+        host=host,
+        port=port,
+        workers=workers,
+        app_dir=str(HERE),
+        timeout_graceful_shutdown=int(DRAIN_SECONDS),
+        log_level=log_level,
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Serve the MCP server over streamable HTTP")
+    parser.add_argument("--host", default="0.0.0.0", help="Bind address (default: 0.0.0.0)")
+    parser.add_argument("--port", type=int, default=8000, help="Port (default: 8000)")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes (default: 4)")
+    parser.add_argument("--log-level", default="info", help="uvicorn log level")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, log_level=args.log_level)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
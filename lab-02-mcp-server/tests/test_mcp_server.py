@@ -4,19 +4,23 @@ Tests for Network MCP Server
 Run with: python -m pytest tests/test_mcp_server.py -v
 """
 
-import pytest
 import json
-import sys
 import os
+import sys
+
+import pytest
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# No background device reads when tests render the topology resource
+os.environ.setdefault("MCP_PREFETCH", "0")
+
 # Import tools and resources from the modular structure
+from helpers import DEVICE_PASSWORD, DEVICE_USERNAME
+from resources.topology import get_topology
 from tools.get_device_info import get_device_info
 from tools.get_interfaces import get_interfaces
-from resources.topology import get_topology
-from helpers import DEVICE_USERNAME, DEVICE_PASSWORD
 
 
 class TestTopologyResource:
@@ -44,6 +48,55 @@ class TestTopologyResource:
             assert "ip" in device
             assert "role" in device
 
+    async def test_topology_versions_follow_the_inventory(self, tmp_path):
+        """Rebuilt only when a file changes; subscribers hear about changed URIs only"""
+        import shutil
+
+        from helpers.topology import CLAB_FILE, INVENTORY_FILE, TopologyCache, TopologySubscriptions
+
+        inventory = tmp_path / "hosts.yml"
+        shutil.copy(INVENTORY_FILE, inventory)
+        cache = TopologyCache(str(inventory), CLAB_FILE)
+        subscriptions = TopologySubscriptions(cache, interval=60)
+
+        class Session:
+            updated = []
+
+            async def send_resource_updated(self, uri):
+                self.updated.append(uri)
+
+        first = json.loads(cache.document())
+        assert cache.document() is cache.document() and cache.builds == 1
+        leaf2 = json.loads(cache.device_document("leaf2"))
+        assert [link["peer"] for link in leaf2["links"]] == ["spine1", "spine2"]
+
+        session = Session()
+        subscriptions.subscribe("topology://device/leaf4", session)
+        subscriptions.subscribe("topology://device/leaf1", session)
+        inventory.write_text(inventory.read_text().replace("bgp_asn: 65104", "bgp_asn: 65199"))
+        notified = await subscriptions.check()
+
+        second = json.loads(cache.document())
+        assert second["version"] == first["version"] + 1
+        assert second["content_hash"] != first["content_hash"]
+        assert notified == session.updated == ["topology://device/leaf4"]
+        assert "error" in json.loads(cache.device_document("leaf9"))
+
+    def test_device_documents_follow_discovery_neighbors(self):
+        """New LLDP neighbors update device documents even when the summary is the same"""
+        from helpers.topology import TopologyCache
+
+        cache = TopologyCache()
+        summary = {"status": "partial", "unreachable": 1}
+        cache.set_discovery(summary, {"leaf1": None, "leaf2": []})
+        cache.document()
+        cache.pop_changes()
+        cache.set_discovery(dict(summary), {"leaf1": [], "leaf2": None})
+
+        assert json.loads(cache.device_document("leaf1"))["lldp_neighbors"] == []
+        assert json.loads(cache.device_document("leaf2"))["lldp_neighbors"] is None
+        assert cache.pop_changes() == ["topology://device/leaf1", "topology://device/leaf2"]
+
 
 @pytest.mark.asyncio
 class TestDeviceTools:
@@ -84,6 +137,1061 @@ class TestHelperFunctions:
         assert DEVICE_USERNAME == "admin"
         assert DEVICE_PASSWORD == "admin"
 
+    def test_extract_device_json_from_callback(self):
+        """Device JSON should be pulled out of the Ansible JSON callback output"""
+        from helpers.ansible import _extract_device_json
+
+        output = "Using ansible.cfg\n" + json.dumps({"plays": [{"tasks": [
+            {"task": {"name": "Get device version info"}, "hosts": {"spine1": {"changed": False}}},
+            {"task": {"name": "Display"}, "hosts": {"spine1": {"msg": '{"hostname": "spine1"}'}}},
+        ]}]})
+        data, error = _extract_device_json(output)
+        assert error is None
+        assert data == {"hostname": "spine1"}
+
+    def test_extract_device_json_reports_unreachable(self):
+        """Unreachable hosts should produce a descriptive error"""
+        from helpers.ansible import _extract_device_json
+
+        output = json.dumps({"plays": [{"tasks": [
+            {"hosts": {"leaf1": {"unreachable": True, "msg": "timed out"}}},
+        ]}]})
+        data, error = _extract_device_json(output)
+        assert data is None
+        assert error == "Host leaf1 unreachable: timed out"
+
+
+class TestMetrics:
+    """Tests for opt-in tool instrumentation (no network required)"""
+
+    async def test_instrumented_tool_keeps_signature_and_counts_errors(self):
+        """Wrapped tools keep their signature and count error results"""
+        prometheus_client = pytest.importorskip("prometheus_client")
+        import inspect
+
+        from helpers.metrics import enable_metrics, instrument_tool
+
+        async def sample_tool(device: str) -> dict:
+            return {"error": f"Invalid device '{device}'"}
+
+        assert enable_metrics()
+        wrapped = instrument_tool(sample_tool)
+        assert inspect.signature(wrapped) == inspect.signature(sample_tool)
+
+        result = await wrapped("bogus")
+        assert result == {"error": "Invalid device 'bogus'"}
+
+        registry = prometheus_client.REGISTRY
+        assert registry.get_sample_value(
+            "mcp_tool_errors_total", {"tool": "sample_tool", "kind": "error_result"}
+        ) == 1.0
+        assert registry.get_sample_value(
+            "mcp_tool_duration_seconds_count", {"tool": "sample_tool"}
+        ) == 1.0
+        assert registry.get_sample_value("mcp_tool_in_flight", {"tool": "sample_tool"}) == 0.0
+
+
+class TestTracing:
+    """Tests for the span tree of traced tools (no network required)"""
+
+    @pytest.fixture
+    def spans(self, monkeypatch):
+        """Spans recorded in memory, as if MCP_TRACING were set"""
+        pytest.importorskip("opentelemetry.sdk")
+        from helpers import tracing
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        monkeypatch.setattr(tracing, "_TRACER", provider.get_tracer("test"))
+        return exporter
+
+    async def test_batched_reads_keep_their_tool_span(self, spans):
+        """A read run alone nests under its tool; a shared run is linked to every caller"""
+        import asyncio
+
+        from benchmarks.fake_backend import FakeDeviceBackend
+        from helpers.tracing import trace_tool
+        from tools.get_bgp_neighbors import get_bgp_neighbors
+
+        info, neighbors = trace_tool(get_device_info), trace_tool(get_bgp_neighbors)
+        with FakeDeviceBackend(fabric=True):
+            await info("leaf1")
+            alone = spans.get_finished_spans()
+            spans.clear()
+            await asyncio.gather(info("spine1"), neighbors("spine1"))
+            shared = spans.get_finished_spans()
+
+        tool = next(s for s in alone if s.name == "tool: get_device_info")
+        playbook = next(s for s in alone if s.name == "ansible-playbook 07-device-info.yml")
+        assert playbook.parent.span_id == tool.context.span_id
+        assert all(s.parent is not None for s in alone if s.name.startswith("ansible."))
+
+        tools = {s.context.span_id for s in shared if s.name.startswith("tool: ")}
+        batch = next(s for s in shared if s.name == "show batch")
+        playbook = next(s for s in shared if s.name == "ansible-playbook 11-show-commands.yml")
+        assert batch.parent is None and playbook.parent.span_id == batch.context.span_id
+        assert {link.context.span_id for link in batch.links} == tools and len(tools) == 2
+
+    async def test_async_playbook_runs_nest_under_their_tool(self, spans):
+        """run_ansible_playbook_async keeps the tool span across the worker thread"""
+        from benchmarks.fake_backend import FakeDeviceBackend
+        from helpers.tracing import trace_tool
+        from tools.push_config_batch import push_config_batch
+
+        with FakeDeviceBackend():
+            await trace_tool(push_config_batch)([{"device": "leaf1", "vlan_id": 100, "vlan_name": "V100"}])
+        finished = {s.context.span_id: s for s in spans.get_finished_spans()}
+
+        tool = next(s for s in finished.values() if s.name == "tool: push_config_batch")
+        playbook = next(s for s in finished.values() if s.name == "ansible-playbook 10-batch-config.yml")
+        tasks = [s for s in finished.values() if s.name.startswith("ansible.task ")]
+        assert playbook.parent.span_id == tool.context.span_id
+        assert tasks and all(s.parent.span_id == playbook.context.span_id for s in tasks)
+        assert len({s.context.trace_id for s in finished.values()}) == 1
+
+
+class TestOfflineBackend:
+    """Tools against the simulated device backend (no network required)"""
+
+    async def test_tools_parse_canned_device_output(self):
+        """Canned EOS output should flow through the real parsing path"""
+        from benchmarks.fake_backend import FakeDeviceBackend
+        from tools.get_bgp_neighbors import get_bgp_neighbors
+
+        with FakeDeviceBackend(interfaces=8, bgp_peers=3, unreachable=["leaf4"]) as backend:
+            interfaces = await get_interfaces("leaf1")
+            neighbors = await get_bgp_neighbors("spine1")
+            unreachable = await get_device_info("leaf4")
+
+        assert interfaces["interface_count"] == 9  # Ethernet1-8 + Management0
+        assert neighbors["neighbor_count"] == 3
+        assert "error" in unreachable
+        assert backend.calls == {
+            "08-interfaces-status.yml": 1, "09-bgp-neighbors.yml": 1, "07-device-info.yml": 1
+        }
+
+
+class TestShowCommands:
+    """Tests for batched show commands (no network required)"""
+
+    async def test_commands_share_one_run_per_batch(self):
+        """Tools called together and show_commands each take a single playbook run"""
+        import asyncio
+
+        from benchmarks.fake_backend import FakeDeviceBackend
+        from tools.show_commands import show_commands
+
+        with FakeDeviceBackend(interfaces=4, bgp_peers=2, unreachable=["leaf4"]) as backend:
+            info, interfaces = await asyncio.gather(get_device_info("leaf1"), get_interfaces("leaf1"))
+            assert backend.calls == {"11-show-commands.yml": 1}
+            result = await show_commands(["show version", "show ip bgp summary | json"], "spine1,leaf4")
+            rejected = await show_commands(["reload now"], "spine1")
+
+        assert info["hostname"] == "leaf1" and interfaces["interface_count"] == 5
+        assert backend.calls == {"11-show-commands.yml": 2}
+        assert result["commands"] == ["show version | json", "show ip bgp summary | json"]
+        assert result["devices"]["spine1"]["show version | json"]["hostname"] == "spine1"
+        assert result["devices"]["leaf4"]["error"].startswith("Host leaf4 unreachable")
+        assert result["failed"] == ["leaf4"]
+        assert "error" in rejected
+
+
+class TestDeltaResponses:
+    """Tests for since-token delta responses (no network required)"""
+
+    async def test_since_token_returns_only_changes(self):
+        """A known token gets only changed rows; an unknown one gets the full table"""
+        from benchmarks.fake_backend import FakeDeviceBackend
+        from tools.get_bgp_neighbors import get_bgp_neighbors
+
+        with FakeDeviceBackend(interfaces=8, bgp_peers=3) as backend:
+            full = await get_interfaces("leaf2")
+            same = await get_interfaces("leaf2", since=full["token"])
+            backend.bgp_peers = 2
+            backend._cache.clear()
+            peers = await get_bgp_neighbors("leaf2")
+            backend.bgp_peers = 3
+            backend._cache.clear()
+            delta = await get_bgp_neighbors("leaf2", since=peers["token"])
+            wrong = await get_interfaces("leaf2", since=peers["token"])
+
+        assert "interfaces" not in same
+        assert same["token"] == full["token"]
+        assert (same["unchanged"], same["changed"], same["removed"]) == (9, {}, [])
+        assert list(delta["added"]) == ["10.0.2.3"] and delta["unchanged"] == 2
+        assert wrong["since_expired"] is True and wrong["interface_count"] == 9
+
+
+class TestResultModels:
+    """Tests for the slotted result models (no network required)"""
+
+    def test_models_decode_eos_json_and_share_values(self):
+        """Models read like the old row dicts, intern repeated values and diff like dicts"""
+        from helpers.delta_state import diff_rows
+        from helpers.models import InterfaceStatus
+
+        data = json.loads(json.dumps({"interfaceStatuses": {
+            "Ethernet1": {"linkStatus": "connected", "lineProtocolStatus": "up", "description": "a"},
+            "Ethernet2": {"linkStatus": "connected", "lineProtocolStatus": "up"},
+        }}))
+        rows = InterfaceStatus.table(data)
+
+        assert not hasattr(rows["Ethernet1"], "__dict__")
+        assert rows["Ethernet2"].as_dict() == {
+            "status": "connected", "description": "", "line_protocol": "up"
+        }
+        assert rows["Ethernet1"].status is rows["Ethernet2"].status
+        changed = diff_rows(rows, {**rows, "Ethernet2": InterfaceStatus("notconnect", "", "down")})
+        assert changed["changed"]["Ethernet2"]["fields"]["status"] == ["connected", "notconnect"]
+
+
+class TestResponseBudget:
+    """Tests for response budgeting and pagination (no network required)"""
+
+    async def test_large_answers_are_paged_and_raw_output_dropped(self, monkeypatch):
+        """Over-budget answers come back in pages; cursors walk them without re-running the tool"""
+        import inspect
+
+        from helpers import response_budget
+        from helpers.response_budget import budget_tool
+
+        calls = []
+
+        async def sample_tool(device: str) -> dict:
+            calls.append(device)
+            rows = {f"Ethernet{i}": {"status": "connected", "description": "x" * 40} for i in range(300)}
+            return {"device": device, "stdout": "PLAY RECAP " * 500, "interfaces": rows}
+
+        monkeypatch.setitem(response_budget.TOOL_BUDGETS, "sample_tool", 4000)
+        tool = budget_tool(sample_tool)
+        assert list(inspect.signature(tool).parameters) == ["device", "fields", "cursor"]
+
+        pages = [await tool("leaf1")]
+        while "next_cursor" in pages[-1]:
+            pages.append(await tool(cursor=pages[-1]["next_cursor"]))
+        slim = await tool("leaf1", fields="status")
+
+        assert calls == ["leaf1", "leaf1"]
+        assert all("stdout" not in page and len(json.dumps(page)) < 4400 for page in pages)
+        assert sum(len(page["interfaces"]) for page in pages) == 300
+        assert pages[0]["page"]["pages"] == len(pages) > 1
+        assert slim["interfaces"]["Ethernet0"] == {"status": "connected"}
+        assert "error" in await tool(cursor="expired.1")
+
+    async def test_cursor_makes_arguments_optional_write_tools_unwrapped(self):
+        """Required arguments are only required without a cursor; write tools keep their schema"""
+        import inspect
+
+        from helpers.response_budget import budget_tool
+        from tools.push_config_batch import push_config_batch
+
+        async def sample_tool(device: str, since: str = "") -> dict:
+            return {"device": device}
+
+        tool = budget_tool(sample_tool)
+        assert inspect.signature(tool).parameters["device"].default is None
+        assert await tool("leaf1") == {"device": "leaf1"}
+        assert await tool() == {"error": "Missing argument(s): device"}
+        assert budget_tool(push_config_batch) is push_config_batch
+
+
+def _incr_many(path: str) -> None:
+    """Worker process for the shared counter test."""
+    from helpers.shared_state import SharedKV
+
+    store = SharedKV(path, "config")
+    for _ in range(50):
+        store.incr("generation:*")
+
+
+class TestSharedState:
+    """Tests for state shared between server workers (no network required)"""
+
+    def test_workers_share_tokens_pages_and_invalidations(self, tmp_path):
+        """Two stores on one file behave like two workers seeing the same state"""
+        from helpers.config_cache import ConfigCache
+        from helpers.delta_state import DeltaStore
+        from helpers.models import BgpNeighbor
+        from helpers.response_budget import PageStore
+        from helpers.shared_state import SharedKV
+
+        path = str(tmp_path / "shared.sqlite")
+        worker_a, worker_b = (
+            {
+                "delta": DeltaStore(shared=SharedKV(path, "delta")),
+                "pages": PageStore(shared=SharedKV(path, "pages")),
+                "config": ConfigCache(shared=SharedKV(path, "config")),
+            }
+            for _ in range(2)
+        )
+
+        rows = {"10.0.1.2": BgpNeighbor("65101", "Established", 5)}
+        token = worker_a["delta"].remember("spine1", "neighbor", rows)
+        cursor = worker_a["pages"].add({"tool": "get_interfaces", "items": [1, 2]})
+        worker_a["config"].put("leaf1", "hostname leaf1\n")
+        generation = worker_b["config"].generation("leaf1")
+
+        assert worker_b["delta"].recall(token, "spine1", "neighbor") == rows
+        assert worker_b["delta"].recall(token, "spine2", "neighbor") is None
+        assert worker_b["pages"].get(cursor)["items"] == [1, 2]
+        assert worker_b["config"].get("leaf1").tree.children
+        worker_a["config"].invalidate("leaf1")
+        assert worker_b["config"].get("leaf1") is None
+        assert worker_b["config"].generation("leaf1") == generation + 1
+
+    def test_counters_are_atomic_and_never_pruned(self, tmp_path):
+        """incr() from many processes loses no updates; counters survive pruning"""
+        from concurrent.futures import ProcessPoolExecutor
+
+        from helpers import shared_state
+        from helpers.shared_state import SharedKV
+
+        path = str(tmp_path / "shared.sqlite")
+        with ProcessPoolExecutor(4) as pool:
+            list(pool.map(_incr_many, [path] * 4))
+        store = SharedKV(path, "config", max_entries=2)
+        assert store.get("generation:*") == 200
+
+        for n in range(shared_state.PRUNE_EVERY):
+            store.put(f"leaf{n}", n)
+        assert store.get("generation:*") == 200 and len(store) == 3
+
+    def test_primary_duties_are_taken_over(self, tmp_path, monkeypatch):
+        """A waiting worker becomes primary once the primary process exits"""
+        import subprocess
+        import threading
+
+        from helpers import shared_state
+
+        path = str(tmp_path / "shared.sqlite")
+        monkeypatch.setenv("MCP_SHARED_STATE", path)
+        monkeypatch.setattr(shared_state, "_PRIMARY_LOCK", None)
+        primary = subprocess.Popen(
+            [sys.executable, "-c", "import time; from helpers.shared_state import claim_primary; "
+             "print(claim_primary(), flush=True); time.sleep(60)"],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            stdout=subprocess.PIPE, text=True,
+        )
+        try:
+            assert primary.stdout.readline().strip() == "True"
+            assert shared_state.claim_primary() is False
+            took_over = threading.Event()
+            shared_state.watch_primary(took_over.set, every=0.05)
+            assert not took_over.wait(0.2)
+        finally:
+            primary.kill()
+            primary.wait()
+        try:
+            assert took_over.wait(5)
+        finally:
+            shared_state._PRIMARY_LOCK.close()
+
+
+class TestAnsibleWorker:
+    """Tests for the pre-forked Ansible worker (no Ansible or network required)"""
+
+    def test_runs_forked_and_falls_back_without_worker(self, tmp_path, monkeypatch):
+        """Runs go to a forked child while the worker is up, to a process otherwise"""
+        import subprocess
+        import time
+
+        from helpers import ansible, ansible_worker
+
+        sock = str(tmp_path / "worker.sock")
+        # builtins:print stands in for ansible-playbook's main(): it echoes the command line
+        worker = subprocess.Popen(
+            [sys.executable, "-m", "helpers.ansible_worker", "--socket", sock, "--entry", "builtins:print"],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        )
+        try:
+            deadline = time.monotonic() + 10
+            while not os.path.exists(sock) and time.monotonic() < deadline:
+                time.sleep(0.05)
+            cmd = ["ansible-playbook", "playbooks/07-device-info.yml", "-v"]
+            result = ansible_worker.run_in_worker(cmd, dict(os.environ), 10, sock)
+            assert result.returncode == 0
+            assert result.stdout.strip() == str(cmd)
+        finally:
+            worker.terminate()
+            worker.wait(10)
+
+        started, ran = [], []
+        monkeypatch.setattr(ansible_worker, "WORKER_ENABLED", True)
+        monkeypatch.setattr(ansible_worker, "SOCKET_PATH", sock)
+        monkeypatch.setattr(ansible_worker, "ensure_worker", lambda: started.append(True))
+        monkeypatch.setattr(subprocess, "run", lambda cmd, **kwargs: ran.append(cmd))
+        ansible._run_process("07-device-info.yml", {}, cmd, {})
+        assert started and ran == [cmd]
+
+
+class TestBackupStore:
+    """Tests for the deduplicated backup store (no network required)"""
+
+    def test_backup_dedupes_and_restores(self, tmp_path):
+        """Unchanged configs are skipped and every snapshot restores exactly"""
+        from helpers.backup_store import BackupStore, split_sections
+
+        config = "hostname leaf1\n!\ninterface Ethernet1\n   description a\n!\nend\n"
+        changed = config.replace("description a", "description b")
+        assert "".join(split_sections(config)) == config
+
+        store = BackupStore(str(tmp_path))
+        first = store.backup("leaf1", config)
+        assert first["status"] == "stored"
+        assert store.backup("leaf1", config)["status"] == "unchanged"
+
+        second = store.backup("leaf1", changed)
+        assert second["new_sections"] == 1
+        assert store.restore("leaf1", first["snapshot"]) == config
+        assert store.restore("leaf1") == changed
+        assert store.stats()["snapshots"] == 2
+
+    async def test_backup_configs_tool(self, tmp_path, monkeypatch):
+        """backup_configs stores configs fetched through Ansible"""
+        from benchmarks.fake_backend import FakeDeviceBackend
+        from tools.config_backups import backup_configs, get_config_backup
+
+        monkeypatch.setenv("MCP_BACKUP_STORE", str(tmp_path))
+        with FakeDeviceBackend(interfaces=4, bgp_peers=2):
+            first = await backup_configs("leaf1,leaf2")
+            again = await backup_configs("leaf1")
+        restored = await get_config_backup("leaf1")
+
+        assert first["stored"] == 2
+        assert again["unchanged"] == 1
+        assert restored["config"].splitlines()[-1] == "end"
+        assert "error" in await backup_configs("leaf1,bogus")
+
+
+class TestConfigDiff:
+    """Tests for the config section tree and diff (no network required)"""
+
+    OLD = (
+        "hostname leaf1\n!\ninterface Ethernet1\n   description a\n!\n"
+        "router bgp 65101\n   neighbor 10.0.0.1 remote-as 65100\n"
+        "   address-family ipv4\n      network 10.1.1.0/24\n!\nvlan 20\n   name OLD\n!\n"
+    )
+    NEW = (
+        "hostname leaf1-new\n!\ninterface Ethernet1\n   description a\n!\n"
+        "router bgp 65101\n   neighbor 10.0.0.1 remote-as 65100\n"
+        "   address-family ipv4\n      network 10.1.2.0/24\n!\nvlan 30\n   name NEW\n!\n"
+    )
+
+    def test_diff_returns_only_changed_blocks(self):
+        """Unchanged sections are skipped; nested changes keep their path"""
+        from helpers.config_tree import diff_configs, parse_config
+
+        assert parse_config(self.OLD).children["interface Ethernet1"].hash == \
+            parse_config(self.NEW).children["interface Ethernet1"].hash
+
+        changes = {c["section"]: c for c in diff_configs(self.OLD, self.NEW)}
+        assert set(changes) == {
+            "global", "router bgp 65101 > address-family ipv4", "vlan 30", "vlan 20"
+        }
+        assert changes["global"]["added"] == ["hostname leaf1-new"]
+        assert changes["router bgp 65101 > address-family ipv4"]["removed"] == [
+            "      network 10.1.1.0/24"
+        ]
+        assert changes["vlan 30"] == {
+            "section": "vlan 30", "status": "added", "lines": ["vlan 30", "   name NEW"]
+        }
+        assert diff_configs(self.OLD, self.OLD) == []
+
+    def test_snapshot_diff_matches_full_diff(self, tmp_path):
+        """Diffing backup manifests gives the same result as a full diff"""
+        from helpers.backup_store import BackupStore
+        from helpers.config_tree import diff_configs
+
+        store = BackupStore(str(tmp_path))
+        old = store.backup("leaf1", self.OLD)["snapshot"]
+        store.backup("leaf1", self.NEW)
+
+        def key(change):
+            return change["section"]
+
+        assert sorted(store.diff("leaf1", old), key=key) == \
+            sorted(diff_configs(self.OLD, self.NEW), key=key)
+
+
+class TestConfigCache:
+    """Tests for cached, section-scoped config reads (no network required)"""
+
+    async def test_sections_served_from_cache_until_write(self):
+        """Repeated reads hit the device once; a write playbook forces a refetch"""
+        from benchmarks.fake_backend import FakeDeviceBackend
+        from helpers.ansible import run_ansible_playbook
+        from helpers.config_cache import invalidate_config
+        from tools.get_config_section import get_config_section
+
+        invalidate_config()
+        with FakeDeviceBackend(interfaces=4, bgp_peers=2) as backend:
+            bgp = await get_config_section("leaf1", "bgp")
+            eth1 = await get_config_section("leaf1", "interface Ethernet1")
+            assert backend.calls["05-show-config.yml"] == 1
+
+            run_ansible_playbook("04-add-vlan.yml", {"target_host": "leaf1"})
+            await get_config_section("leaf1", "vlans")
+            assert backend.calls["05-show-config.yml"] == 2
+
+        assert bgp["config"].startswith("router bgp")
+        assert eth1["matched_sections"] == 1
+        assert "error" in await get_config_section("bogus")
+
+
+class TestBatchConfig:
+    """Tests for the batch config push (no network required)"""
+
+    def test_changes_merge_per_device(self):
+        """Items are merged and de-duplicated into one command list per device"""
+        from tools.push_config_batch import build_change_sets
+
+        change_sets, errors = build_change_sets([
+            {"device": "leaves", "vlan_id": 30, "vlan_name": "Management"},
+            {"device": "leaf1", "vlan_id": 20, "vlan_name": "Servers"},
+            {"device": "leaf1", "lines": "interface Ethernet5\n   description server5"},
+            {"device": "leaf1", "vlan_id": 30, "vlan_name": "Management"},
+        ])
+        assert errors == []
+        assert set(change_sets) == {"leaf1", "leaf2", "leaf3", "leaf4"}
+        assert change_sets["leaf1"] == [
+            "vlan 20", "   name Servers", "vlan 30", "   name Management",
+            "interface Ethernet5", "   description server5",
+        ]
+        assert change_sets["leaf2"] == ["vlan 30", "   name Management"]
+
+        _, errors = build_change_sets([{"device": "leaf9", "vlan_id": 5000}])
+        assert len(errors) == 1
+
+    def test_commands_are_verified_under_their_section(self):
+        """Verify paths keep each command's parent sections; removals are not checked"""
+        from tools.push_config_batch import build_change_sets, section_paths
+
+        change_sets, _ = build_change_sets([{"device": "leaf1", "lines": [
+            "  router bgp 65101",
+            "     address-family ipv4",
+            "        network 10.1.1.0/24",
+            "     no neighbor 10.0.0.9",
+            "  ip routing",
+        ]}])
+        assert change_sets["leaf1"][0] == "router bgp 65101"
+        assert section_paths(change_sets["leaf1"]) == [
+            "router bgp 65101",
+            "router bgp 65101 > address-family ipv4",
+            "router bgp 65101 > address-family ipv4 > network 10.1.1.0/24",
+            "ip routing",
+        ]
+
+    async def test_batch_is_one_run_and_rolls_back_together(self):
+        """The whole batch is one playbook run; one failed device rolls back all"""
+        from benchmarks.fake_backend import FakeDeviceBackend
+        from tools.push_config_batch import push_config_batch
+
+        changes = [{"device": "leaves", "vlan_id": v, "vlan_name": f"V{v}"} for v in range(100, 150)]
+        with FakeDeviceBackend() as backend:
+            committed = await push_config_batch(changes)
+        with FakeDeviceBackend(unreachable=["leaf3"]):
+            rolled_back = await push_config_batch(changes)
+
+        assert backend.calls == {"10-batch-config.yml": 1}
+        assert committed["status"] == "committed"
+        assert committed["devices"]["leaf1"] == {"status": "committed", "commands": 100}
+        assert rolled_back["status"] == "rolled_back"
+        assert rolled_back["failed_devices"] == ["leaf3"]
+        assert rolled_back["devices"]["leaf1"]["status"] == "rolled_back"
+        assert "error" in await push_config_batch([{"device": "leaf1"}])
+
+    async def test_device_left_changed_is_reported(self):
+        """A changed device missing from the rollback fails the rollback"""
+        from benchmarks.fake_backend import FakeDeviceBackend
+        from tools.push_config_batch import push_config_batch
+
+        changes = [{"device": "leaves", "vlan_id": 100, "vlan_name": "V100"}]
+        with FakeDeviceBackend(unreachable=["leaf3"], not_restored=["leaf2"]):
+            result = await push_config_batch(changes)
+
+        assert result["status"] == "rollback_incomplete"
+        assert result["devices"]["leaf1"]["status"] == "rolled_back"
+        assert result["devices"]["leaf2"]["status"] == "rollback_failed"
+        assert sorted(result["failed_devices"]) == ["leaf2", "leaf3"]
+
+
+class TestStateSnapshots:
+    """Tests for the background collector and snapshot store (no network required)"""
+
+    async def test_collector_stores_changes_only(self, tmp_path, monkeypatch):
+        """Unchanged polls add no rows; tools report state and changes from the store"""
+        from benchmarks.fake_backend import FakeDeviceBackend
+        from helpers.collector import StateCollector
+        from tools.state_snapshots import get_state_changes, get_state_snapshot
+
+        monkeypatch.setenv("MCP_SNAPSHOT_DB", str(tmp_path / "snapshots.sqlite"))
+        assert "error" in await get_state_snapshot()
+
+        with FakeDeviceBackend(interfaces=4, bgp_peers=2) as backend:
+            collector = StateCollector(interval=60, devices=["leaf1"])
+            first = collector.collect_once()
+            assert collector.collect_once()["changed_rows"] == 0
+            backend.bgp_peers = 1
+            backend._cache.clear()
+            collector.collect_once()
+
+        snapshot = await get_state_snapshot("leaf1", "bgp")
+        changes = await get_state_changes("leaf1", minutes=5)
+
+        assert first["changed_rows"] == 1 + 5 + 2  # device, Ethernet1-4 + Management0, peers
+        assert len(snapshot["devices"]["leaf1"]["bgp"]["state"]) == 1
+        assert snapshot["devices"]["leaf1"]["bgp"]["stale"] is False
+        assert [(c["kind"], c["change"]) for c in changes["changes"]] == [("bgp", "removed")]
+
+    async def test_collector_polls_do_not_mint_delta_tokens(self, tmp_path, monkeypatch):
+        """Collector rounds leave the since-token LRU to the clients"""
+        from benchmarks.fake_backend import FakeDeviceBackend
+        from helpers import delta_state
+        from helpers.collector import StateCollector
+
+        monkeypatch.setenv("MCP_SNAPSHOT_DB", str(tmp_path / "snapshots.sqlite"))
+        monkeypatch.setattr(delta_state, "_STORE", delta_state.DeltaStore(max_states=2))
+
+        with FakeDeviceBackend(interfaces=4, bgp_peers=2) as backend:
+            token = (await get_interfaces("leaf1"))["token"]
+            for peers in (1, 2, 3):
+                backend.bgp_peers = peers
+                backend._cache.clear()
+                StateCollector(interval=60, devices=["leaf1", "leaf2"]).collect_once()
+            since = await get_interfaces("leaf1", since=token)
+
+        assert "since_expired" not in since and since["unchanged"] == 5
+
+
+class TestFabricStatus:
+    """Tests for the fabric-wide rollup (no network required)"""
+
+    async def test_rollup_joins_both_ends_concurrently(self):
+        """Every device and kind in one batched poll; only mismatched pairs are reported"""
+        from benchmarks.fake_backend import FakeDeviceBackend
+        from tools.fabric_status import get_fabric_status
+
+        faults = {("leaf3", "10.0.3.1"): "down", ("leaf2", "10.0.6.1"): 9}
+        with FakeDeviceBackend(fabric=True, faults=faults, latency=0.2) as backend:
+            status = await get_fabric_status(max_age=0)
+
+        assert backend.calls == {"11-show-commands.yml": 1}
+        assert status["elapsed_seconds"] < 1.0
+        assert status["summary"]["sessions_established"] == 7
+        assert status["matrix"]["rows"] == {
+            "spine1": ["ok", "bgp:asymmetric_prefixes", "bgp:one_side_down", "ok"],
+            "spine2": ["ok", "bgp:asymmetric_prefixes", "ok", "ok"],
+        }
+        assert status["mismatches"][0]["detail"] == {"spine1": "Established", "leaf3": "Active"}
+        assert status["mismatches"][1]["detail"] == {"received_by_leaf": {"spine1": 6, "spine2": 9}}
+
+
+class TestDiagnoseBgp:
+    """Tests for the composite BGP troubleshooting tool (no network required)"""
+
+    async def test_one_call_correlates_both_ends(self):
+        """Device and peers are read in one run; faults are named with next steps"""
+        from benchmarks.fake_backend import FakeDeviceBackend
+        from tools.diagnose_bgp import diagnose_bgp
+
+        faults = {("leaf3", "10.0.3.1"): "down", ("spine1", "Ethernet2"): "down"}
+        with FakeDeviceBackend(fabric=True, faults=faults) as backend:
+            result = await diagnose_bgp("spine1", include_metrics=False)
+        with FakeDeviceBackend(fabric=True, unreachable=["leaf1"]):
+            unreachable = await diagnose_bgp("leaf1", include_metrics=False)
+
+        assert backend.calls == {"11-show-commands.yml": 1}
+        assert result["status"] == "degraded"
+        assert [r["issue"] for r in result["sessions"]] == [None, "link_down", "one_side_down", None]
+        assert result["sessions"][2]["peer_state"] == "Active"
+        assert len(result["next_steps"]) == 2
+        assert result["metrics"] == {"skipped": True}
+        assert unreachable["status"] == "unreachable"
+        assert "error" in await diagnose_bgp("router9")
+
+
+class TestPrefetch:
+    """Tests for speculative prefetch (no network required)"""
+
+    async def test_prefetched_reads_are_used_once_and_expire(self, monkeypatch):
+        """Tools use reads started by a trigger; unused ones are dropped after the TTL"""
+        import asyncio
+
+        from benchmarks.fake_backend import FakeDeviceBackend
+        from helpers import prefetch as prefetch_module
+        from helpers.prefetch import Prefetcher, track_tool
+        from tools.get_bgp_neighbors import get_bgp_neighbors
+
+        prefetcher = Prefetcher(ttl=0.5, delay=0.01)
+        monkeypatch.setattr(prefetch_module, "PREFETCH_ENABLED", True)
+        monkeypatch.setattr(prefetch_module, "_PREFETCHER", prefetcher)
+        tool = track_tool(get_bgp_neighbors)
+
+        with FakeDeviceBackend(fabric=True, latency=0.1) as backend:
+            assert prefetch_module.prefetch(["spine1"], "troubleshoot_bgp", with_peers=True) == 15
+            await asyncio.sleep(0.2)
+            first = await tool("spine1")
+            again = await tool("spine1")
+            await asyncio.sleep(0.5)
+            stats = prefetcher.stats()
+
+        assert "error" not in first and first["neighbors"] == again["neighbors"]
+        assert backend.calls == {"11-show-commands.yml": 1, "09-bgp-neighbors.yml": 1}
+        assert stats["used"] == 1 and stats["expired"] == 14
+        assert stats["tools"]["get_bgp_neighbors"]["calls_served"] == 1
+        assert stats["tools"]["get_bgp_neighbors"]["avg_saved_ms"] >= 100
+
+    def test_queued_prefetch_is_cancelled_when_the_call_comes_first(self):
+        """A prefetch that has not started is dropped, not run"""
+        from helpers.prefetch import Prefetcher
+
+        submitted = []
+        prefetcher = Prefetcher(ttl=5, delay=60, submit=lambda d, c: submitted.append(d))
+        prefetcher.prefetch(["leaf1"], "test", commands=["show version | json"])
+
+        assert prefetcher.take("leaf1", "show version | json") is None
+        assert prefetcher.stats()["cancelled"] == 1
+        assert not submitted
+
+
+class TestLldpDiscovery:
+    """Tests for LLDP cabling discovery (no network required)"""
+
+    async def test_diff_finds_missing_and_miswired_links(self):
+        """A down port is missing, a moved cable is miswired; the topology resources show both"""
+        from benchmarks.fake_backend import FakeDeviceBackend
+        from helpers.constants import FABRIC_LINKS
+        from helpers.discovery import LldpDiscovery
+        from helpers.topology import TopologyCache
+
+        cabling = [(link["spine"], link["spine_interface"], link["leaf"], link["leaf_interface"]) for link in FABRIC_LINKS]
+        cabling[4] = ("spine1", "Ethernet9", "leaf1", "Ethernet2")  # instead of spine2 Ethernet1
+        cache = TopologyCache()
+        discovery = LldpDiscovery(cache)
+        with FakeDeviceBackend(links=cabling, faults={("leaf3", "Ethernet1"): "down"}) as backend:
+            result = await discovery.discover()
+            again = await discovery.discover()
+
+        assert backend.calls == {"11-show-commands.yml": 4}
+        assert (result["status"], result["matched"], again["cached"]) == ("mismatch", 6, True)
+        assert [(link["a"], link["b"]) for link in result["missing"]] == [("leaf3", "spine1")]
+        assert result["miswired"][0]["found"]["b_interface"] == "Ethernet9"
+        assert json.loads(cache.document())["discovery"]["status"] == "mismatch"
+        leaf1 = json.loads(cache.device_document("leaf1"))
+        assert leaf1["lldp_neighbors"][1] == {"interface": "Ethernet2", "peer": "spine1", "peer_interface": "Ethernet9"}
+
+    async def test_large_inventory_is_read_in_a_few_runs(self, tmp_path):
+        """Hundreds of devices take MCP_DISCOVERY_RUNS playbook runs, not one per device"""
+        import yaml
+        from benchmarks.fake_backend import FakeDeviceBackend
+        from helpers.discovery import LldpDiscovery
+        from helpers.topology import TopologyCache
+
+        spines, leaves = [f"s{i}" for i in range(1, 9)], [f"l{i}" for i in range(1, 233)]
+        cabling = [(s, f"Ethernet{j}", leaf, f"Ethernet{i}")
+                   for i, s in enumerate(spines, 1) for j, leaf in enumerate(leaves, 1)]
+        inventory = {"all": {"children": {
+            "spines": {"hosts": {s: {"ansible_host": "198.18.0.1"} for s in spines}},
+            "leaves": {"hosts": {leaf: {"ansible_host": "198.18.0.2"} for leaf in leaves}},
+        }}}
+        clab = {"name": "big", "topology": {"links": [
+            {"endpoints": [f"{a}:eth{ai[8:]}", f"{b}:eth{bi[8:]}"]} for a, ai, b, bi in cabling
+        ]}}
+        (tmp_path / "hosts.yml").write_text(yaml.safe_dump(inventory))
+        (tmp_path / "big.clab.yml").write_text(yaml.safe_dump(clab))
+
+        discovery = LldpDiscovery(TopologyCache(str(tmp_path / "hosts.yml"), str(tmp_path / "big.clab.yml")))
+        with FakeDeviceBackend(links=cabling, latency=0.2) as backend:
+            result = await discovery.discover()
+
+        assert result["devices"] == 240 and result["playbook_runs"] == 4
+        assert backend.calls == {"11-show-commands.yml": 4}
+        assert (result["status"], result["matched"]) == ("matches", 8 * 232)
+        assert result["elapsed_seconds"] < 2
+
+
+class TestFabricImpact:
+    """Tests for the path and blast-radius index (no network required)"""
+
+    async def test_impact_follows_link_state(self):
+        """A spine port costs each pair a path; with a leaf uplink already down, it isolates the leaf"""
+        from benchmarks.fake_backend import FakeDeviceBackend
+        from helpers.fabric_graph import graph_from_topology, refresh_link_states
+        from helpers.topology import TopologyCache
+
+        graph = graph_from_topology(TopologyCache().topology())
+        before = graph.impact("spine2", "Ethernet3")
+        assert before["bgp_sessions"][0] == {"a": "spine2", "b": "leaf3", "a_ip": "10.0.7.1",
+                                             "b_ip": "10.0.7.2", "link_up": True}
+        assert [r["paths_after"] for r in before["leaf_pairs_degraded"]] == [1, 1, 1]
+        assert graph.impact("spine2", "Ethernet3") is before  # memoized
+
+        with FakeDeviceBackend(fabric=True, faults={("leaf3", "Ethernet1"): "down"}) as backend:
+            refreshed = await refresh_link_states(graph)
+        assert backend.calls == {"11-show-commands.yml": 1}
+        assert refreshed["links_changed"] == 1 and graph.stats()["links_down"] == 1
+
+        after = graph.impact("spine2", "Ethernet3")
+        assert [r["leaves"] for r in after["leaf_pairs_isolated"]] == [["leaf1", "leaf3"], ["leaf2", "leaf3"], ["leaf3", "leaf4"]]
+        assert after["leaf_pairs_degraded"] == []
+        assert graph.leaf_paths("leaf3", "leaf1")["paths_up"] == 1
+
+    def test_large_fabric_updates_incrementally(self):
+        """Hundreds of leaves: state changes touch only their paths and undo exactly"""
+        from helpers.fabric_graph import FabricGraph
+
+        spines, leaves = [f"s{i}" for i in range(1, 5)], [f"l{i:03d}" for i in range(1, 201)]
+        roles = {**{s: "spine" for s in spines}, **{leaf: "leaf" for leaf in leaves}}
+        graph = FabricGraph(roles, [(s, f"Ethernet{j}", leaf, f"Ethernet{i}")
+                                    for i, s in enumerate(spines, 1) for j, leaf in enumerate(leaves, 1)])
+        assert graph.stats()["paths"] == 4 * 200 * 199 // 2
+        alive = dict(graph.pair_alive)
+
+        for i in range(1, 4):
+            graph.set_interface_state("l007", f"Ethernet{i}", False)
+        impact = graph.impact("s4")
+        assert len(impact["leaf_pairs_isolated"]) == 199 and impact["leaves_affected"] == leaves
+        assert len(impact["leaf_pairs_degraded"]) == 200 * 199 // 2 - 199
+
+        for i in range(1, 4):
+            graph.set_interface_state("l007", f"Ethernet{i}", True)
+        assert graph.pair_alive == alive and graph.stats()["links_down"] == 0
+
+
+class TestRenderedConfigPush:
+    """Tests for offline-rendered config pushes (no network required)"""
+
+    async def test_render_and_skip_matching_devices(self, monkeypatch):
+        """Configs come from the inventory; devices already running them are not pushed"""
+        from benchmarks.fake_backend import FakeDeviceBackend
+        from helpers import config_render
+        from helpers.config_cache import get_config_cache
+        from tools.push_rendered_config import push_rendered_config
+
+        monkeypatch.setattr(config_render, "_RENDERER", config_render.ConfigRenderer())
+        dry = await push_rendered_config("leaf1", dry_run=True)
+        config = dry["devices"]["leaf1"]["config"]
+        assert "router bgp 65101\n   router-id 10.0.1.1\n" in config
+        assert "   neighbor 10.0.5.1 remote-as 65100\n" in config
+        assert "   ip address 10.0.5.2/30\n" in config
+
+        # leaf1 runs it already, with one extra line: enough for merge, not for replace
+        running = config.replace("   no switchport\n", "   mtu 9214\n   no switchport\n", 1)
+        get_config_cache().put("leaf1", "hostname leaf1\n" + running)
+        try:
+            merge = await push_rendered_config("leaf1", dry_run=True)
+            replace = await push_rendered_config("leaf1", mode="replace", dry_run=True)
+        finally:
+            get_config_cache().invalidate("leaf1")
+        assert merge["devices"]["leaf1"]["would_push"] is False
+        assert replace["devices"]["leaf1"]["would_push"] is True
+        assert replace["devices"]["leaf1"]["config"].startswith("default interface Ethernet1\n")
+
+        with FakeDeviceBackend(fabric=True) as backend:
+            first = await push_rendered_config("spines")
+            second = await push_rendered_config("all")
+        assert backend.calls == {"12-push-rendered-config.yml": 2}
+        assert first["pushed"] == 2 and backend.pushed["spine2"].count("neighbor") == 8
+        assert (second["pushed"], second["unchanged"]) == (4, 2)
+        assert second["devices"]["spine1"]["reason"] == "last_push"
+
+    async def test_failed_devices_are_pushed_again(self, monkeypatch):
+        """An unreachable device is reported and retried; a later write voids the skip"""
+        from benchmarks.fake_backend import FakeDeviceBackend
+        from helpers import config_render
+        from helpers.config_cache import invalidate_config
+        from tools.push_rendered_config import push_rendered_config
+
+        monkeypatch.setattr(config_render, "_RENDERER", config_render.ConfigRenderer())
+        with FakeDeviceBackend(fabric=True, unreachable={"leaf4"}):
+            first = await push_rendered_config("leaves")
+        assert first["failed_devices"] == ["leaf4"]
+        assert first["devices"]["leaf4"]["status"] == "unreachable"
+
+        invalidate_config("leaf2")  # something else changed leaf2
+        with FakeDeviceBackend(fabric=True) as backend:
+            second = await push_rendered_config("leaves")
+        assert sorted(backend.pushed) == ["leaf2", "leaf4"]
+        assert second["unchanged"] == 2 and second["failed_devices"] == []
+        assert (await push_rendered_config("leaf1", mode="sideways"))["error"].startswith("Invalid mode")
+
+
+class TestConfigSearch:
+    """Tests for the config search index (no network required)"""
+
+    def test_index_covers_backups_files_and_live(self, tmp_path):
+        """Every source is searchable; a new snapshot only indexes its changed sections"""
+        from helpers.backup_store import BackupStore
+        from helpers.config_index import ConfigIndex
+
+        config = ("hostname spine2\n!\nusername admin secret s3cret\n!\nvlan 30\n   name Management\n!\n"
+                  "interface Vlan30\n   ip address 10.30.0.1/24\n!\n"
+                  "router bgp 65100\n   neighbor 10.0.5.2 remote-as 65101\n   neighbor 10.0.6.2 remote-as 65102\n!\nend\n")
+        store = BackupStore(str(tmp_path / "store"))
+        old = store.backup("spine2", config)["snapshot"]
+        (tmp_path / "files").mkdir()
+        (tmp_path / "files" / "leaf1_20250124T103000.cfg").write_text(
+            "! Backup of leaf1\n!\nhostname leaf1\n!\nrouter bgp 65101\n   neighbor 10.0.5.1 remote-as 65100\n!\n")
+
+        index = ConfigIndex(store, str(tmp_path / "files"))
+        index.add_config("leaf2", "live", "live", "hostname leaf2\n!\nvlan 30\n   name Management\n!\n")
+        index.sync()
+        found = index.search("Neighbor  10.0.5.2")
+        assert found["devices"] == ["spine2"] and found["matches"][0]["path"] == ["router bgp 65100"]
+        assert index.search("vlan 30", section="vlan")["devices"] == ["leaf2", "spine2"]
+        assert index.search("remote-as 65100")["matches"][0]["source"] == "file"
+        assert index.search("secret")["total_matches"] == 0
+
+        indexed = index.chunks_indexed
+        store.backup("spine2", config.replace("10.0.5.2 remote-as 65101", "10.0.5.9 remote-as 65101"))
+        index.observe_backup("spine2", store.snapshots("spine2")[-1])
+        index.sync()
+        assert index.chunks_indexed == indexed + 1
+        assert index.search("neighbor 10.0.5.2")["total_matches"] == 0
+        history = index.search("neighbor 10.0.5.2", history=True)
+        assert [m["snapshot"] for m in history["matches"]] == [old]
+
+    async def test_search_tool_sees_backups_and_fetches(self, tmp_path, monkeypatch):
+        """Configs fetched by backup_configs are found without touching a device again"""
+        from benchmarks.fake_backend import FakeDeviceBackend
+        from helpers import config_index
+        from tools.config_backups import backup_configs
+        from tools.search_configs import search_configs
+
+        monkeypatch.setenv("MCP_BACKUP_STORE", str(tmp_path / "store"))
+        monkeypatch.setattr(config_index, "_INDEX", config_index.ConfigIndex(files_dir=str(tmp_path)))
+        with FakeDeviceBackend(interfaces=4, bgp_peers=2) as backend:
+            await backup_configs("leaf1,leaf2")
+            result = await search_configs("router bgp")
+        assert backend.calls == {"05-show-config.yml": 2}
+        assert result["devices"] == ["leaf1", "leaf2"] and result["documents_searched"] == 2
+        only = await search_configs("description to-spine1", devices="leaf2", section="interface Ethernet1")
+        assert [m["path"] for m in only["matches"]] == [["interface Ethernet1"]]
+        assert "error" in await search_configs("  ")
+
+    def test_thousands_of_configs_search_in_milliseconds(self, tmp_path):
+        """2,000 configs share their sections; a search stays in milliseconds"""
+        import time
+
+        from benchmarks.fake_backend import FakeDeviceBackend, running_config
+        from helpers.backup_store import BackupStore
+        from helpers.config_index import ConfigIndex
+
+        base = running_config("leaf1", FakeDeviceBackend())
+        index = ConfigIndex(BackupStore(str(tmp_path)), str(tmp_path))
+        for n in range(2000):
+            index.add_config(f"dev{n}", "file", "1", base.replace("hostname leaf1", f"hostname dev{n}"), at=n)
+        assert index.stats()["sections"] < 2100
+
+        start = time.perf_counter()
+        one = index.search("hostname dev1234")
+        many = index.search("router bgp", limit=10)
+        elapsed = time.perf_counter() - start
+        assert one["devices"] == ["dev1234"]
+        assert many["total_matches"] == 2000 and many["truncated"]
+        assert elapsed < 0.1
+
+
+class TestCompliance:
+    """Tests for the compliance rule engine (no network required)"""
+
+    def test_rules_and_verdict_cache(self):
+        """Rules check sections and values; unchanged configs and rules come from the cache"""
+        from helpers.compliance import ComplianceEngine, Rule
+
+        rules = [
+            Rule("ssh-idle-timeout", section="management ssh$", require=r"^idle-timeout (\d+)$", max=60),
+            Rule("no-default-admin", forbid=r"^username admin\b.*\bsecret (0 )?admin$", severity="critical"),
+            Rule("vty-ssh-only", section="line vty$", forbid=r"telnet", if_missing="pass"),
+        ]
+        good = "username admin privilege 15 secret sha512 $6$x\n!\nmanagement ssh\n   idle-timeout 30\n!\n"
+        bad = "username admin privilege 15 role network-admin secret admin\n!\nmanagement ssh\n   idle-timeout 120\n!\n"
+        engine = ComplianceEngine(workers=1)
+
+        first = engine.check({"leaf1": good, "leaf2": bad}, rules)
+        assert first["evaluated"] == 6 and first["cached"] == 0
+        assert all(passed for passed, _ in first["verdicts"]["leaf1"].values())
+        assert first["verdicts"]["leaf2"]["ssh-idle-timeout"] == (False, "idle-timeout 120 (max 60)")
+        assert first["verdicts"]["leaf2"]["no-default-admin"][1].startswith("found: username admin")
+        assert first["verdicts"]["leaf2"]["vty-ssh-only"][0]
+
+        again = engine.check({"leaf1": good, "leaf2": bad.replace("120", "45")}, rules)
+        assert again["evaluated"] == 3 and again["cached"] == 3
+        rules[0] = Rule("ssh-idle-timeout", section="management ssh$", require=r"^idle-timeout (\d+)$", max=40)
+        edited = engine.check({"leaf1": good, "leaf2": bad.replace("120", "45")}, rules)
+        assert edited["evaluated"] == 2 and not edited["verdicts"]["leaf2"]["ssh-idle-timeout"][0]
+
+        with pytest.raises(ValueError):
+            Rule("broken", require="([")
+        with pytest.raises(ValueError):
+            Rule("no-group", require="idle-timeout", max=60)
+
+    def test_pool_matches_in_process(self):
+        """Worker processes return the same verdicts as evaluating in-process"""
+        from benchmarks.fake_backend import FakeDeviceBackend, running_config
+        from helpers.compliance import ComplianceEngine, load_rules
+
+        backend = FakeDeviceBackend(interfaces=8, bgp_peers=4)
+        configs = {f"leaf{n}": running_config(f"leaf{n}", backend) for n in range(12)}
+        configs["leaf3"] = configs["leaf3"].replace("idle-timeout 60", "idle-timeout 90")
+        rules = load_rules()
+        pool = ComplianceEngine(workers=2, pool_min=4)
+        try:
+            in_pool = pool.check(configs, rules)
+            assert pool.stats()["pool_running"]
+        finally:
+            pool.close()
+        assert in_pool["verdicts"] == ComplianceEngine(workers=1).check(configs, rules)["verdicts"]
+        failing = [d for d, v in in_pool["verdicts"].items() if not v["ssh-idle-timeout"][0]]
+        assert failing == ["leaf3"]
+
+    async def test_tool_flags_default_admin_in_lab_configs(self, monkeypatch):
+        """The lab-01 configs keep admin/admin; a second check is served from the cache"""
+        from helpers import compliance
+        from tools.check_compliance import check_compliance
+
+        monkeypatch.setattr(compliance, "_ENGINE", compliance.ComplianceEngine(workers=1))
+        result = await check_compliance(source="intended")
+        assert sorted(result["failures_by_rule"]["no-default-admin"]) == sorted(result["devices"])
+        assert "ssh-idle-timeout" not in result["failures_by_rule"]
+        assert result["devices"]["leaf1"]["failed"][0]["severity"] == "critical"
+
+        again = await check_compliance("leaves", source="intended", rules="no-default-admin")
+        assert again["verdicts"] == {"evaluated": 0, "cached": 4}
+        assert "error" in await check_compliance(rules="no-such-rule")
+        assert "error" in await check_compliance(source="bogus")
+
+    async def test_one_device_check_keeps_fleet_metrics(self, monkeypatch, tmp_path):
+        """Checking one device updates only its series of mcp_compliance_failures"""
+        prometheus_client = pytest.importorskip("prometheus_client")
+        from helpers import compliance
+        from helpers.metrics import enable_metrics
+        from tools import check_compliance as tool
+
+        rules = tmp_path / "rules.yml"
+        rules.write_text("rules:\n  - id: admin-metric-test\n    severity: critical\n"
+                         "    forbid: '^username admin .*secret admin$'\n")
+        monkeypatch.setattr(tool, "load_rules", lambda: compliance.load_rules(str(rules)))
+        monkeypatch.setattr(compliance, "_ENGINE", compliance.ComplianceEngine(workers=1))
+        assert enable_metrics()
+
+        def failing() -> float:
+            return sum(
+                prometheus_client.REGISTRY.get_sample_value(
+                    "mcp_compliance_failures",
+                    {"device": d, "rule": "admin-metric-test", "severity": "critical"}) or 0
+                for d in ("spine1", "spine2", "leaf1", "leaf2", "leaf3", "leaf4")
+            )
+
+        await tool.check_compliance(source="intended")
+        assert failing() == 6
+        await tool.check_compliance("leaf1", source="intended")
+        assert failing() == 6
+
 
 class TestAutoDiscovery:
     """Tests for the auto-discovery mechanism"""
@@ -8,6 +8,13 @@ that don't start with underscore (_).
 Usage in network_mcp_server.py:
     from tools import register_all_tools
     register_all_tools(mcp)
+
+Every tool registered through mcp.tool() is wrapped so its answers stay
+within a byte budget, with optional fields/cursor arguments (see
+helpers/response_budget.py), and the prefetched reads it uses are counted
+under its name (helpers/prefetch.py). When metrics (MCP_METRICS_PORT) or
+tracing (MCP_TRACING) are enabled, tools are also wrapped with latency,
+in-flight and error metrics and/or a "tool: <name>" span.
 """
 
 import importlib
@@ -15,6 +22,27 @@ import sys
 from pathlib import Path
 
 
+def tool_registrar(mcp):
+    """
+    The object passed to each module's register(mcp).
+
+    Its tool() decorator applies response budgeting and prefetch
+    accounting, then metrics and tracing when enabled. Use it to register
+    tools defined elsewhere too:
+        tool_registrar(mcp).tool()(query_prometheus)
+    """
+    from helpers.metrics import InstrumentedMCP, instrument_tool, metrics_enabled
+    from helpers.prefetch import track_tool
+    from helpers.response_budget import budget_tool
+    from helpers.tracing import trace_tool, tracing_enabled
+    wrappers = [budget_tool, track_tool]
+    if metrics_enabled():
+        wrappers.append(instrument_tool)
+    if tracing_enabled():
+        wrappers.append(trace_tool)
+    return InstrumentedMCP(mcp, wrappers)
+
+
 def register_all_tools(mcp):
     """
     Auto-discover and register all tools with the MCP server.
@@ -37,6 +65,9 @@ def register_all_tools(mcp):
     if parent_dir not in sys.path:
         sys.path.insert(0, parent_dir)
 
+    # Budget responses, and instrument tools when metrics and/or tracing are enabled
+    registrar = tool_registrar(mcp)
+
     # Find all .py files (skip __init__.py and _prefixed files)
     for tool_file in sorted(tools_dir.glob("*.py")):
         module_name = tool_file.stem
@@ -49,7 +80,7 @@ def register_all_tools(mcp):
             module = importlib.import_module(f"tools.{module_name}")
 
             if hasattr(module, "register"):
-                module.register(mcp)
+                module.register(registrar)
                 registered.append(module_name)
                 print(f"  [OK] Registered tool: {module_name}")
             else:
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+MCP Tool: Check Compliance
+
+Checks every device's configuration against the declarative rules in
+compliance_rules.yml (SSH idle-timeout, eAPI enabled, BGP router-id, no
+default admin/admin user, ...) with helpers/compliance.py.
+
+By default the configs already on hand are used: the cached running-config
+(helpers/config_cache.py), otherwise the newest backup store snapshot.
+Verdicts are cached per rule and config hash, so checking devices whose
+configs did not change does not evaluate anything again.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from helpers import VALID_DEVICES, expand_devices
+from helpers.backup_store import get_backup_store
+from helpers.compliance import RULES_FILE, SEVERITIES, get_compliance_engine, load_rules
+from helpers.config_cache import get_config_cache
+from helpers.config_sources import load_config
+from helpers.metrics import observe_compliance
+
+SOURCES = ("cached", "running", "intended", "latest")
+
+
+async def _config(device: str, source: str) -> Tuple[Optional[str], str, Optional[str]]:
+    """(config_text, where it came from, error) for one device."""
+    if source != "cached":
+        text, error = await load_config(device, source)
+        return text, source, error
+
+    entry = get_config_cache().get(device, max_age=float("inf"))
+    if entry is not None:
+        return entry.text, f"cache ({round(entry.age)}s old)", None
+    manifest = await asyncio.to_thread(get_backup_store().manifest, device)
+    if manifest is None:
+        return None, "", "No cached config or backup; run backup_configs or use source='running'"
+    try:
+        text = await asyncio.to_thread(get_backup_store().restore, device, manifest["snapshot"])
+    except (KeyError, ValueError) as e:
+        return None, "", str(e).strip("'\"")
+    return text, f"backup {manifest['snapshot']}", None
+
+
+async def check_compliance(
+    devices: str = "all",
+    source: str = "cached",
+    rules: str = ""
+) -> Dict[str, Any]:
+    """
+    Check device configs against the compliance rules.
+
+    Args:
+        devices: "all", "spines", "leaves" or device names, comma-separated
+        source: Configs to check: "cached" (cached running-config, else the
+            newest backup; no device access), "running" (fetch now),
+            "intended" (lab-01-copilots/config) or "latest" (newest backup)
+        rules: Only these rule ids, comma-separated (default: every rule)
+
+    Returns:
+        Dictionary with each device's failed rules, the devices failing
+        each rule and how many verdicts came from the cache
+
+    Example output:
+        {
+            "source": "cached",
+            "rules_checked": 6,
+            "devices": {
+                "leaf1": {"config": "cache (42s old)", "passed": 5, "failed": [
+                    {"rule": "no-default-admin", "severity": "critical",
+                     "detail": "found: username admin privilege 15 role network-admin secret admin"}
+                ]}
+            },
+            "failures_by_rule": {"no-default-admin": ["leaf1"]},
+            "compliant_devices": [],
+            "missing_configs": {},
+            "verdicts": {"evaluated": 0, "cached": 6},
+            "elapsed_ms": 1.4
+        }
+    """
+    if source not in SOURCES:
+        return {"error": f"Invalid source '{source}'. Valid sources: {list(SOURCES)}"}
+
+    names = []
+    for name in (n.strip() for n in devices.split(",") if n.strip()):
+        expanded = expand_devices(name)
+        if not expanded:
+            return {"error": f"Invalid device '{name}'. Valid: {VALID_DEVICES}, 'all', 'spines', 'leaves'"}
+        names += [d for d in expanded if d not in names]
+    if not names:
+        return {"error": "No devices given"}
+
+    try:
+        all_rules = await asyncio.to_thread(load_rules)
+    except (OSError, ValueError, TypeError) as e:
+        return {"error": f"Could not load compliance rules from {RULES_FILE}: {e}"}
+    wanted = [r.strip() for r in rules.split(",") if r.strip()]
+    unknown = sorted(set(wanted) - {r.id for r in all_rules})
+    if unknown:
+        return {"error": f"Unknown rules {unknown}. Valid: {[r.id for r in all_rules]}"}
+    selected = [r for r in all_rules if not wanted or r.id in wanted]
+
+    start = time.perf_counter()
+    loaded = await asyncio.gather(*(_config(d, source) for d in names))
+    configs, origins, missing = {}, {}, {}
+    for device, (text, origin, error) in zip(names, loaded):
+        if text is None:
+            missing[device] = error
+        else:
+            configs[device], origins[device] = text, origin
+
+    engine = get_compliance_engine()
+    result = await asyncio.to_thread(engine.check, configs, selected)
+
+    results, by_rule = {}, {r.id: [] for r in selected}
+    for device, verdicts in result["verdicts"].items():
+        failed = []
+        for rule in selected:
+            passed, detail = verdicts[rule.id]
+            if not passed:
+                failed.append({"rule": rule.id, "severity": rule.severity, "detail": detail})
+                by_rule[rule.id].append(device)
+        failed.sort(key=lambda f: SEVERITIES.index(f["severity"]))
+        results[device] = {"config": origins[device], "passed": len(selected) - len(failed), "failed": failed}
+
+    observe_compliance(
+        {(device, r.id, r.severity): device in by_rule[r.id] for device in results for r in selected},
+        result["evaluated"], result["cached"]
+    )
+    return {
+        "source": source,
+        "rules_checked": len(selected),
+        "devices": results,
+        "failures_by_rule": {rule: devs for rule, devs in by_rule.items() if devs},
+        "compliant_devices": [d for d, r in results.items() if not r["failed"]],
+        "missing_configs": missing,
+        "verdicts": {"evaluated": result["evaluated"], "cached": result["cached"]},
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+def register(mcp):
+    """Register check_compliance tool with the MCP server."""
+    mcp.tool()(check_compliance)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+MCP Tool: Config Backups
+
+Backs up running configurations into the deduplicated backup store
+(helpers/backup_store.py) and restores any stored snapshot.
+
+Unlike playbooks/06-backup-config.yml, which writes a full file per device
+per run, unchanged devices cost nothing and changed devices only store
+the sections that changed.
+"""
+
+import asyncio
+import os
+from typing import Any, Dict
+
+from helpers import VALID_DEVICES
+from helpers.backup_store import get_backup_store
+from helpers.config_cache import fetch_running_config
+from helpers.config_index import get_config_index
+
+# How many devices are fetched at the same time
+BACKUP_CONCURRENCY = int(os.getenv("MCP_BACKUP_CONCURRENCY", "6"))
+
+
+async def _backup_device(device: str, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    """Fetch one running-config and store it."""
+    async with semaphore:
+        # Always live; also refreshes the get_config_section cache
+        entry, error = await fetch_running_config(device, max_age=0)
+
+    if error:
+        return {"status": "failed", "error": error}
+
+    stored = await asyncio.to_thread(get_backup_store().backup, device, entry.text)
+    stored.pop("device")
+    if stored["status"] == "stored":
+        get_config_index().observe_backup(device, stored["snapshot"])
+    return stored
+
+
+async def backup_configs(devices: str = "all") -> Dict[str, Any]:
+    """
+    Back up running configurations into the deduplicated backup store.
+
+    Args:
+        devices: Comma-separated device names, or "all" (default)
+
+    Returns:
+        Dictionary with per-device results and store usage
+
+    Example output:
+        {
+            "stored": 1,
+            "unchanged": 5,
+            "failed": 0,
+            "devices": {
+                "leaf1": {"status": "stored", "snapshot": "20250124T103000.123456",
+                          "sections": 42, "new_sections": 1, "bytes_written": 2310},
+                "spine1": {"status": "unchanged", "snapshot": "20250124T090000.654321", ...}
+            },
+            "store": {"snapshots": 12, "logical_bytes": 110340, "stored_bytes": 9120, "ratio": 12.1}
+        }
+    """
+    if devices.strip().lower() == "all":
+        targets = list(VALID_DEVICES)
+    else:
+        targets = [d.strip() for d in devices.split(",") if d.strip()]
+
+    invalid = [d for d in targets if d not in VALID_DEVICES]
+    if invalid or not targets:
+        return {
+            "error": f"Invalid device(s) {invalid}. Valid devices: {VALID_DEVICES}"
+        }
+
+    semaphore = asyncio.Semaphore(BACKUP_CONCURRENCY)
+    results = await asyncio.gather(*[_backup_device(d, semaphore) for d in targets])
+    per_device = dict(zip(targets, results))
+
+    counts = {"stored": 0, "unchanged": 0, "failed": 0}
+    for result in per_device.values():
+        counts[result["status"]] += 1
+
+    return {
+        **counts,
+        "devices": per_device,
+        "store": await asyncio.to_thread(get_backup_store().stats),
+    }
+
+
+async def get_config_backup(device: str, snapshot: str = "") -> Dict[str, Any]:
+    """
+    Restore a configuration snapshot from the backup store.
+
+    Args:
+        device: Device name (spine1, spine2, leaf1-leaf4)
+        snapshot: Snapshot id from backup_configs(); latest if empty
+
+    Returns:
+        Dictionary with the snapshot id, configuration text and the
+        device's available snapshots (newest first, up to 20)
+
+    Example output:
+        {
+            "device": "leaf1",
+            "snapshot": "20250124T103000.123456",
+            "created": "2025-01-24T10:30:00+00:00",
+            "config": "! Command: show running-config\\n...",
+            "available_snapshots": ["20250124T103000.123456", "20250123T103000.000001"]
+        }
+    """
+    if device not in VALID_DEVICES:
+        return {
+            "error": f"Invalid device '{device}'. Valid devices: {VALID_DEVICES}"
+        }
+
+    store = get_backup_store()
+    manifest = store.manifest(device, snapshot or None)
+    if manifest is None:
+        return {"error": f"No backup '{snapshot or 'latest'}' for {device}. Run backup_configs first."}
+
+    try:
+        config = store.restore(device, manifest["snapshot"])
+    except (KeyError, ValueError) as e:
+        return {"error": str(e)}
+
+    return {
+        "device": device,
+        "snapshot": manifest["snapshot"],
+        "created": manifest["created"],
+        "config": config,
+        "available_snapshots": store.snapshots(device)[::-1][:20],
+    }
+
+
+def register(mcp):
+    """Register backup store tools with the MCP server."""
+    mcp.tool()(backup_configs)
+    mcp.tool()(get_config_backup)
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+MCP Tool: Diagnose BGP
+
+Runs the whole BGP troubleshooting collection for one device on the server
+and returns one correlated answer. The troubleshoot_bgp prompt used to walk
+the model through get_device_info, get_interfaces and more, one round trip
+and one playbook run per step.
+
+Everything is gathered at the same time:
+- device info, interfaces and BGP neighbors of the device
+- interfaces and BGP neighbors of its fabric peers (helpers.constants.FABRIC_LINKS)
+- Lab 3's Prometheus series for the device, when Prometheus is reachable
+
+The show commands share one playbook run (helpers/show_batch.py), so a call
+takes about as long as the slowest device. Each fabric session is then
+checked from both ends: link state, session state, prefixes and flaps.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from helpers import VALID_DEVICES
+from helpers.constants import FABRIC_LINKS
+from helpers.fabric_state import device_state, pair_status
+
+from tools.get_device_info import get_device_info
+
+PROMETHEUS_URL = os.getenv("PROMETHEUS_URL", "http://localhost:9090")
+PROMETHEUS_TIMEOUT = 3.0
+
+# Lab 3 exporter series (lab-03-observability/network_exporter.py)
+PROMETHEUS_QUERIES = {
+    "session_state": 'bgp_session_state{{device="{device}"}}',
+    "flaps_1h": 'changes(bgp_session_state{{device="{device}"}}[1h])',
+    "prefixes": 'bgp_prefixes_received{{device="{device}"}}',
+    "interface_errors_per_second": 'rate(interface_errors_total{{device="{device}"}}[5m])',
+    "alerts": 'ALERTS{{device="{device}",alertstate="firing"}}',
+}
+
+NEXT_STEPS = {
+    "device_unreachable": "Check management reachability of {device} (containerlab status, SSH on the management IP)",
+    "link_down": "Check {interface} on {device} and {peer_interface} on {peer}: show interfaces {interface} status, cabling",
+    "peer_not_configured": "Add neighbor {peer_ip} under router bgp on {device}",
+    "not_configured_on_peer": "Add neighbor {local_ip} under router bgp on {peer}",
+    "session_down": "Link is up but BGP is not: compare remote-as on both ends, check show ip bgp neighbors {peer_ip} on {device}",
+    "one_side_down": "Session is up on one end only: clear ip bgp {peer_ip} on {device} and watch both ends",
+    "no_prefixes": "Session is up with 0 prefixes: check network statements and route-maps on {peer}",
+    "flapping": "Session is flapping: look for interface errors on {interface} and hold-timer expiries in the logs",
+}
+
+
+def _fabric_sessions(device: str) -> List[Dict[str, str]]:
+    """The device's fabric links, seen from the device."""
+    sessions = []
+    for link in FABRIC_LINKS:
+        for local, remote in (("spine", "leaf"), ("leaf", "spine")):
+            if link[local] == device:
+                sessions.append({
+                    "peer": link[remote],
+                    "interface": link[f"{local}_interface"],
+                    "peer_interface": link[f"{remote}_interface"],
+                    "local_ip": link[f"{local}_ip"],
+                    "peer_ip": link[f"{remote}_ip"],
+                })
+    return sessions
+
+
+def _query(promql: str, device: str) -> Dict[str, float]:
+    """One instant query -> {peer, interface or alert name: value}."""
+    import requests
+
+    response = requests.get(
+        f"{PROMETHEUS_URL}/api/v1/query", params={"query": promql}, timeout=PROMETHEUS_TIMEOUT
+    )
+    response.raise_for_status()
+    series = {}
+    for item in response.json().get("data", {}).get("result", []):
+        labels = item.get("metric", {})
+        key = labels.get("peer") or labels.get("interface") or labels.get("alertname") or device
+        series[key] = float(item["value"][1])
+    return series
+
+
+async def _prometheus(device: str, enabled: bool = True) -> Dict[str, Any]:
+    """Lab 3 series for a device: {query name: {label: value}}, or an error."""
+    if not enabled:
+        return {"skipped": True}
+    try:
+        # In threads, like the playbooks: nothing here may hold up the event loop
+        results = await asyncio.gather(*[
+            asyncio.to_thread(_query, promql.format(device=device), device)
+            for promql in PROMETHEUS_QUERIES.values()
+        ])
+    except Exception as e:
+        return {"error": f"Prometheus at {PROMETHEUS_URL} not available: {type(e).__name__}"}
+    return dict(zip(PROMETHEUS_QUERIES, results))
+
+
+def _link_up(state: Dict[str, Any], interface: str) -> Optional[bool]:
+    row = state.get("interfaces", {}).get(interface) if "interfaces" in state else None
+    if row is None:
+        return None
+    return row.get("status") == "connected" and row.get("line_protocol", "up") == "up"
+
+
+def _check_session(
+    device: str,
+    session: Dict[str, str],
+    states: Dict[str, Dict[str, Any]],
+    metrics: Dict[str, Any]
+) -> Dict[str, Any]:
+    """One fabric session from both ends -> row with an "issue" (None when healthy)."""
+    peer = session["peer"]
+    local, remote = states[device], states[peer]
+    local_view = local.get("neighbors", {}).get(session["peer_ip"]) if "neighbors" in local else None
+    peer_view = remote.get("neighbors", {}).get(session["local_ip"]) if "neighbors" in remote else None
+    link = pair_status(_link_up(local, session["interface"]), _link_up(remote, session["peer_interface"]))
+    flaps = metrics.get("flaps_1h", {}).get(peer)
+
+    row = {
+        **session,
+        "link": link,
+        "state": local_view.get("state") if local_view else ("not configured" if "neighbors" in local else "unknown"),
+        "peer_state": peer_view.get("state") if peer_view else ("not configured" if "neighbors" in remote else "unknown"),
+        "prefixes_received": local_view.get("prefixes_received") if local_view else None,
+        "flaps_1h": flaps,
+    }
+    established = [v.get("state") == "Established" if v else None for v in (local_view, peer_view)]
+    if link in ("down", "one_side_down"):
+        issue = "link_down"
+    elif "neighbors" in local and local_view is None:
+        issue = "peer_not_configured"
+    elif "neighbors" in remote and peer_view is None:
+        issue = "not_configured_on_peer"
+    elif pair_status(*established) == "down":
+        issue = "session_down"
+    elif pair_status(*established) == "one_side_down":
+        issue = "one_side_down"
+    elif local_view and local_view.get("state") == "Established" and not local_view.get("prefixes_received"):
+        issue = "no_prefixes"
+    elif flaps is not None and flaps >= 2:
+        issue = "flapping"
+    else:
+        issue = None
+    row["issue"] = issue
+    return row
+
+
+async def diagnose_bgp(device: str, include_metrics: bool = True) -> Dict[str, Any]:
+    """
+    Collect and correlate everything needed to troubleshoot BGP on a device, in one call.
+
+    Args:
+        device: Device name (spine1, spine2, leaf1-leaf4)
+        include_metrics: Also query Lab 3's Prometheus (PROMETHEUS_URL) for
+            session history, interface errors and firing alerts
+
+    Returns:
+        Dictionary with the device's health, every fabric session checked
+        from both ends, findings and suggested next steps
+
+    Example output:
+        {
+            "device": "spine1",
+            "status": "degraded",
+            "device_info": {"hostname": "spine1", "version": "4.35.0.1F", ...},
+            "summary": {"sessions": 4, "established": 3, "issues": 1},
+            "sessions": [
+                {"peer": "leaf3", "interface": "Ethernet3", "peer_ip": "10.0.3.2",
+                 "link": "ok", "state": "Active", "peer_state": "Active",
+                 "prefixes_received": 0, "flaps_1h": 4.0, "issue": "session_down"},
+                ...
+            ],
+            "findings": ["leaf3 (10.0.3.2): session_down - link ok, spine1 Active, leaf3 Active"],
+            "next_steps": ["Link is up but BGP is not: compare remote-as on both ends, ..."],
+            "other_neighbors": {},
+            "metrics": {"alerts": {"BGPSessionDown": 1.0}, ...},
+            "errors": {},
+            "elapsed_seconds": 1.4
+        }
+    """
+    if device not in VALID_DEVICES:
+        return {"error": f"Invalid device '{device}'. Valid devices: {VALID_DEVICES}"}
+
+    start = time.perf_counter()
+    sessions = _fabric_sessions(device)
+    peers = [s["peer"] for s in sessions]
+    info, metrics, *state_list = await asyncio.gather(
+        get_device_info(device),
+        _prometheus(device, include_metrics),
+        *[device_state(d, 0) for d in [device, *peers]],
+    )
+    states = dict(zip([device, *peers], state_list))
+    errors = {d: s["error"] for d, s in states.items() if "error" in s}
+
+    if "error" in info and device in errors:
+        return {
+            "device": device,
+            "status": "unreachable",
+            "findings": [f"{device} is not responding: {info['error']}"],
+            "next_steps": [NEXT_STEPS["device_unreachable"].format(device=device)],
+            "errors": errors,
+            "elapsed_seconds": round(time.perf_counter() - start, 3),
+        }
+
+    series = metrics if "error" not in metrics else {}
+    rows = [_check_session(device, s, states, series) for s in sessions]
+    findings, next_steps = [], []
+    for row in rows:
+        if row["issue"]:
+            findings.append(
+                f"{row['peer']} ({row['peer_ip']}): {row['issue']} - link {row['link']}, "
+                f"{device} {row['state']}, {row['peer']} {row['peer_state']}"
+            )
+            step = NEXT_STEPS[row["issue"]].format(device=device, **row)
+            if step not in next_steps:
+                next_steps.append(step)
+    for peer, error in errors.items():
+        if peer != device:
+            findings.append(f"{peer} could not be read, its side is unknown: {error}")
+
+    fabric_ips = {s["peer_ip"] for s in sessions}
+    other = {
+        ip: {"state": n.get("state"), "prefixes_received": n.get("prefixes_received")}
+        for ip, n in states[device].get("neighbors", {}).items() if ip not in fabric_ips
+    }
+    established = sum(r["state"] == "Established" for r in rows)
+    issues = sum(bool(r["issue"]) for r in rows)
+
+    return {
+        "device": device,
+        "status": "healthy" if not issues and not errors else "degraded",
+        "device_info": info if "error" not in info else {"error": info["error"]},
+        "summary": {"sessions": len(rows), "established": established, "issues": issues},
+        "sessions": rows,
+        "findings": findings,
+        "next_steps": next_steps,
+        "other_neighbors": other,
+        "metrics": metrics,
+        "errors": errors,
+        "elapsed_seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def register(mcp):
+    """Register diagnose_bgp tool with the MCP server."""
+    mcp.tool()(diagnose_bgp)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+MCP Tool: Diff Config
+
+Compares two versions of a device configuration and returns only the
+changed sections, instead of handing full running-configs to the model.
+
+Each side can be:
+    running   - live running-config (via 05-show-config.yml)
+    intended  - lab-01-copilots/config/<device>.cfg
+    latest    - newest snapshot in the backup store (see backup_configs)
+    <id>      - a specific backup snapshot id
+"""
+
+import asyncio
+from typing import Any, Dict
+
+from helpers import VALID_DEVICES
+from helpers.backup_store import get_backup_store
+from helpers.config_sources import load_config
+from helpers.config_tree import diff_configs, summarize
+
+LIVE_SOURCES = ("running", "intended")
+
+
+async def diff_config(device: str, base: str = "intended", target: str = "running") -> Dict[str, Any]:
+    """
+    Show what changed between two versions of a device's configuration.
+
+    Args:
+        device: Device name (spine1, spine2, leaf1-leaf4)
+        base: "intended", "running", "latest" or a backup snapshot id
+        target: Same choices as base (default: "running")
+
+    Returns:
+        Dictionary with a change summary and only the changed blocks
+
+    Example output:
+        {
+            "device": "leaf1",
+            "base": "intended",
+            "target": "running",
+            "identical": false,
+            "summary": {"added": 1, "removed": 0, "changed": 1, "lines_added": 3, "lines_removed": 1},
+            "changes": [
+                {"section": "interface Ethernet1", "status": "changed",
+                 "added": ["   description uplink"], "removed": ["   description old"]},
+                {"section": "vlan 30", "status": "added", "lines": ["vlan 30", "   name Management"]}
+            ]
+        }
+    """
+    if device not in VALID_DEVICES:
+        return {
+            "error": f"Invalid device '{device}'. Valid devices: {VALID_DEVICES}"
+        }
+
+    if base not in LIVE_SOURCES and target not in LIVE_SOURCES:
+        # Both are backups: compare manifests and read only differing sections
+        store = get_backup_store()
+        try:
+            changes = await asyncio.to_thread(
+                store.diff, device,
+                None if base == "latest" else base,
+                None if target == "latest" else target
+            )
+        except (KeyError, ValueError) as e:
+            return {"error": str(e).strip("'\"")}
+    else:
+        (old, old_error), (new, new_error) = await asyncio.gather(
+            load_config(device, base), load_config(device, target)
+        )
+        if old_error or new_error:
+            return {"error": f"{base}: {old_error}" if old_error else f"{target}: {new_error}"}
+        changes = await asyncio.to_thread(diff_configs, old, new)
+
+    return {
+        "device": device,
+        "base": base,
+        "target": target,
+        "identical": not changes,
+        "summary": summarize(changes),
+        "changes": changes,
+    }
+
+
+def register(mcp):
+    """Register diff_config tool with the MCP server."""
+    mcp.tool()(diff_config)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+MCP Tool: Discover Topology
+
+Reads LLDP neighbors from every device in the inventory at the same time,
+builds the adjacency graph and compares it with the links declared in
+topology.clab.yml (helpers/discovery.py). The answer says whether the
+cabling matches, and which links are missing, unexpected or miswired.
+"""
+
+from typing import Any, Dict, Optional
+
+from helpers.discovery import get_discovery
+
+
+async def discover_topology(max_age: Optional[float] = None, include_adjacency: bool = False) -> Dict[str, Any]:
+    """
+    Discover the cabling with LLDP and compare it with the declared topology.
+
+    Args:
+        max_age: Reuse a discovery at most this many seconds old
+            (default: MCP_DISCOVERY_TTL, 300; 0 reads the devices now)
+        include_adjacency: Also return every device's LLDP neighbors
+
+    Returns:
+        Dictionary with the comparison, devices that could not be read and,
+        optionally, the adjacency graph
+
+    Example output:
+        {
+            "status": "mismatch",
+            "links_declared": 8,
+            "links_discovered": 8,
+            "matched": 6,
+            "missing": [{"a": "leaf3", "a_interface": "Ethernet1", "b": "spine1", "b_interface": "Ethernet3"}],
+            "unexpected": [],
+            "miswired": [{"declared": {"a": "leaf1", "a_interface": "Ethernet2", "b": "spine2", ...},
+                          "found": {"a": "leaf1", "a_interface": "Ethernet2", "b": "spine1", ...}}],
+            "one_sided": [],
+            "unknown": [],
+            "devices": 6,
+            "devices_failed": {},
+            "playbook_runs": 4,
+            "elapsed_seconds": 3.1,
+            "cached": false,
+            "age_seconds": 0.0
+        }
+    """
+    if max_age is not None and max_age < 0:
+        return {"error": "max_age must be 0 or more seconds"}
+
+    result = await get_discovery().discover(max_age)
+    if "error" in result or include_adjacency:
+        return result
+    return {k: v for k, v in result.items() if k != "adjacency"}
+
+
+def register(mcp):
+    """Register discover_topology tool with the MCP server."""
+    mcp.tool()(discover_topology)
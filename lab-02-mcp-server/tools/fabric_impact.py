@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+MCP Tool: Fabric Impact
+
+Answers "what is affected if spine1 Ethernet3 fails?" from a precomputed
+index of the fabric (helpers/fabric_graph.py), without reasoning it out of
+raw interface and BGP output. It covers the BGP session on the link, the
+leaves affected, and the leaf pairs that lose ECMP paths or lose every path.
+get_leaf_paths lists the ECMP paths between two leaves and which of them
+work.
+
+Link state comes from the background collector's interface polls, or from
+refresh=True, which reads every device's interfaces in one batched run.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict
+
+from helpers.fabric_graph import get_fabric_graph, refresh_link_states
+
+NO_TOPOLOGY = "Fabric topology could not be read; see topology://containerlab"
+
+
+async def _graph(refresh: bool):
+    graph = await asyncio.to_thread(get_fabric_graph)
+    refreshed = None
+    if graph is not None and refresh:
+        refreshed = await refresh_link_states(graph)
+    return graph, refreshed
+
+
+async def get_failure_impact(device: str, interface: str = "", refresh: bool = False) -> Dict[str, Any]:
+    """
+    Get what fails if an interface (or a whole device) goes down.
+
+    Args:
+        device: Device name (e.g. "spine1")
+        interface: Fabric interface (e.g. "Ethernet3"); empty for the whole device
+        refresh: Read the current link state of every device first
+
+    Returns:
+        Dictionary with the affected links, BGP sessions and leaves, and the
+        leaf pairs that would be isolated (no path left) or degraded (fewer
+        ECMP paths). Links that are already down are taken into account.
+
+    Example output:
+        {
+            "target": "spine1 Ethernet3",
+            "links": [{"a": "spine1", "a_interface": "Ethernet3", "b": "leaf3", "b_interface": "Ethernet1", "up": true}],
+            "already_down": 0,
+            "bgp_sessions": [{"a": "spine1", "b": "leaf3", "a_ip": "10.0.3.1", "b_ip": "10.0.3.2", "link_up": true}],
+            "leaves_affected": ["leaf1", "leaf2", "leaf3", "leaf4"],
+            "leaf_pairs_isolated": [],
+            "leaf_pairs_degraded": [{"leaves": ["leaf1", "leaf3"], "paths_before": 2, "paths_after": 1}, ...],
+            "ecmp_paths_lost": 3,
+            "state_version": 0,
+            "query_microseconds": 8.1
+        }
+    """
+    graph, refreshed = await _graph(refresh)
+    if graph is None:
+        return {"error": NO_TOPOLOGY}
+
+    start = time.perf_counter()
+    result = graph.impact(device, interface)
+    elapsed = (time.perf_counter() - start) * 1e6
+    if result is None:
+        if device not in graph.device_links:
+            return {"error": f"Unknown fabric device '{device}'. Devices: {sorted(graph.device_links)}"}
+        interfaces = sorted(i for d, i in graph.endpoints if d == device)
+        return {"error": f"'{interface}' is not a fabric link on {device}. Fabric interfaces: {interfaces}"}
+
+    response = {**result, "query_microseconds": round(elapsed, 1)}
+    if refreshed is not None:
+        response["refresh"] = refreshed
+    return response
+
+
+async def get_leaf_paths(source: str, destination: str, refresh: bool = False) -> Dict[str, Any]:
+    """
+    Get the ECMP paths between two leaves and whether each is up.
+
+    Args:
+        source: Leaf name (e.g. "leaf1")
+        destination: Leaf name (e.g. "leaf4")
+        refresh: Read the current link state of every device first
+
+    Returns:
+        Dictionary with every equal-cost path as a list of hops
+
+    Example output:
+        {
+            "source": "leaf1",
+            "target": "leaf4",
+            "paths": 2,
+            "paths_up": 2,
+            "ecmp": [
+                {"hops": [{"from": "leaf1", "interface": "Ethernet1", "to": "spine1", "peer_interface": "Ethernet1"},
+                          {"from": "spine1", "interface": "Ethernet4", "to": "leaf4", "peer_interface": "Ethernet1"}],
+                 "up": true},
+                ...
+            ]
+        }
+    """
+    graph, refreshed = await _graph(refresh)
+    if graph is None:
+        return {"error": NO_TOPOLOGY}
+    if source == destination or {source, destination} - set(graph.leaves):
+        return {"error": f"source and destination must be two different leaves: {graph.leaves}"}
+
+    result = graph.leaf_paths(source, destination)
+    if result is None:
+        return {"error": f"No path between {source} and {destination} in the declared topology"}
+    if refreshed is not None:
+        result["refresh"] = refreshed
+    return result
+
+
+def register(mcp):
+    """Register fabric impact tools with the MCP server."""
+    mcp.tool()(get_failure_impact)
+    mcp.tool()(get_leaf_paths)
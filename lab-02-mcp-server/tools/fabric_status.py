@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+MCP Tool: Fabric Status
+
+One call for fabric health. Collects interfaces and BGP neighbors from every
+device at the same time, joins both ends of each spine-leaf link and eBGP
+session (helpers.constants.FABRIC_LINKS), and reports only what does not
+match: a link or session down on one side, a peer missing on one side,
+unequal prefix counts across the two spines, and - when the background
+collector is running - interfaces and sessions that keep flapping.
+
+Devices with fresh state from the collector (helpers/collector.py) are not
+polled again, so a call costs at most one device round trip.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from helpers import VALID_DEVICES, VALID_LEAVES
+from helpers.collector import get_collector
+from helpers.constants import FABRIC_LINKS
+from helpers.fabric_state import device_state, pair_status
+
+SPINES = sorted({link["spine"] for link in FABRIC_LINKS})
+
+
+def _flaps(minutes: int) -> Optional[Dict[Tuple[str, str], int]]:
+    """(device, interface or peer) -> up/down transitions in the window; None without history."""
+    collector = get_collector()
+    if collector is None or minutes <= 0:
+        return None
+    counts: Dict[Tuple[str, str], int] = {}
+    for change in collector.store.changes(time.time() - minutes * 60, kinds=["interfaces", "bgp"]):
+        if change["change"] == "changed" and {"status", "state"} & set(change["fields"]):
+            key = (change["device"], change["key"])
+            counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def rollup(states: Dict[str, Dict[str, Any]], flaps: Optional[Dict[Tuple[str, str], int]]) -> Dict[str, Any]:
+    """Join both ends of every fabric link and session; return counts, matrix and mismatches."""
+    mismatches: List[Dict[str, Any]] = []
+    cells: Dict[Tuple[str, str], List[str]] = {}
+    links_up = sessions_up = 0
+
+    def report(spine: str, leaf: str, check: str, issue: str, detail: Dict[str, Any]) -> None:
+        cells.setdefault((spine, leaf), []).append(f"{check}:{issue}")
+        mismatches.append({"pair": f"{spine}-{leaf}", "check": check, "issue": issue, "detail": detail})
+
+    for link in FABRIC_LINKS:
+        spine, leaf = link["spine"], link["leaf"]
+        ends = ((spine, link["spine_interface"], link["leaf_ip"]),
+                (leaf, link["leaf_interface"], link["spine_ip"]))
+
+        # Physical link: interface status on both ends
+        seen = {}
+        for device, interface, _peer in ends:
+            row = states[device].get("interfaces", {}).get(interface) if "interfaces" in states[device] else None
+            seen[device] = None if row is None else (
+                row.get("status") == "connected" and row.get("line_protocol", "up") == "up"
+            )
+        status = pair_status(seen[spine], seen[leaf])
+        if status == "ok":
+            links_up += 1
+        else:
+            report(spine, leaf, "link", status, {
+                f"{d}:{i}": ("unknown" if seen[d] is None else "up" if seen[d] else "down")
+                for d, i, _p in ends
+            })
+
+        # eBGP session: each side's view of the other's address
+        peers = {}
+        for device, _interface, peer in ends:
+            neighbors = states[device].get("neighbors")
+            peers[device] = None if neighbors is None else neighbors.get(peer, "missing")
+        missing = [d for d, p in peers.items() if p == "missing"]
+        if missing:
+            report(spine, leaf, "bgp", "missing_peer", {
+                d: ("not configured" if p == "missing" else p["state"] if p else "unknown")
+                for d, p in peers.items()
+            })
+        else:
+            status = pair_status(*[None if p is None else p.get("state") == "Established"
+                                    for p in peers.values()])
+            if status == "ok":
+                sessions_up += 1
+            else:
+                report(spine, leaf, "bgp", status, {
+                    d: (p["state"] if p else "unknown") for d, p in peers.items()
+                })
+
+        # Flapping: several up/down transitions on either end in the window
+        for device, interface, peer in ends:
+            for key, check in ((interface, "link"), (peer, "bgp")):
+                count = (flaps or {}).get((device, key), 0)
+                if count >= 2:
+                    report(spine, leaf, check, "flapping", {f"{device}:{key}": f"{count} transitions"})
+
+    # ECMP symmetry: both spines should exchange the same prefixes with a leaf
+    for leaf in VALID_LEAVES:
+        links = [link for link in FABRIC_LINKS if link["leaf"] == leaf]
+        views = {
+            "received_by_leaf": {
+                link["spine"]: states[leaf].get("neighbors", {}).get(link["spine_ip"]) for link in links
+            },
+            "received_by_spines": {
+                link["spine"]: states[link["spine"]].get("neighbors", {}).get(link["leaf_ip"]) for link in links
+            },
+        }
+        for direction, by_spine in views.items():
+            counts = {
+                spine: peer.get("prefixes_received") for spine, peer in by_spine.items()
+                if peer and peer.get("state") == "Established"
+            }
+            if len(counts) == len(links) and len(set(counts.values())) > 1:
+                for spine in counts:
+                    cells.setdefault((spine, leaf), []).append("bgp:asymmetric_prefixes")
+                mismatches.append({
+                    "pair": f"*-{leaf}", "check": "bgp", "issue": "asymmetric_prefixes",
+                    "detail": {direction: counts},
+                })
+
+    return {
+        "summary": {
+            "links": len(FABRIC_LINKS),
+            "links_up": links_up,
+            "sessions": len(FABRIC_LINKS),
+            "sessions_established": sessions_up,
+            "mismatches": len(mismatches),
+        },
+        "matrix": {
+            "columns": VALID_LEAVES,
+            "rows": {
+                spine: [",".join(cells.get((spine, leaf), [])) or "ok" for leaf in VALID_LEAVES]
+                for spine in SPINES
+            },
+        },
+        "mismatches": mismatches,
+    }
+
+
+async def get_fabric_status(max_age: int = 120, flap_minutes: int = 15) -> Dict[str, Any]:
+    """
+    Check every spine-leaf link and BGP session in one call.
+
+    Args:
+        max_age: Use collected state up to this many seconds old instead of
+            polling (needs MCP_COLLECTOR_INTERVAL); 0 always polls live
+        flap_minutes: Window for flap detection (needs the collector)
+
+    Returns:
+        Dictionary with fabric counts, a spine x leaf matrix ("ok" or the
+        problems on that pair) and details for each mismatch only
+
+    Example output:
+        {
+            "status": "degraded",
+            "summary": {"links": 8, "links_up": 8, "sessions": 8,
+                        "sessions_established": 7, "mismatches": 1},
+            "matrix": {
+                "columns": ["leaf1", "leaf2", "leaf3", "leaf4"],
+                "rows": {"spine1": ["ok", "ok", "bgp:one_side_down", "ok"],
+                         "spine2": ["ok", "ok", "ok", "ok"]}
+            },
+            "mismatches": [
+                {"pair": "spine1-leaf3", "check": "bgp", "issue": "one_side_down",
+                 "detail": {"spine1": "Established", "leaf3": "Active"}}
+            ],
+            "sources": {"live": ["leaf3"], "snapshot": ["spine1", "spine2", "leaf1", "leaf2", "leaf4"]},
+            "oldest_data_seconds": 42.0,
+            "flap_detection": true,
+            "errors": {}
+        }
+    """
+    start = time.perf_counter()
+    states_list = await asyncio.gather(*[device_state(d, max_age) for d in VALID_DEVICES])
+    states = dict(zip(VALID_DEVICES, states_list))
+    flaps = _flaps(flap_minutes)
+
+    result = rollup(states, flaps)
+    errors = {d: s["error"] for d, s in states.items() if "error" in s}
+    healthy = not result["mismatches"] and not errors
+
+    sources: Dict[str, List[str]] = {"live": [], "snapshot": []}
+    for device, state in states.items():
+        sources[state["source"]].append(device)
+
+    return {
+        "status": "healthy" if healthy else "degraded",
+        **result,
+        "sources": sources,
+        "oldest_data_seconds": max(s["age"] for s in states.values()),
+        "flap_detection": flaps is not None,
+        "errors": errors,
+        "elapsed_seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def register(mcp):
+    """Register get_fabric_status tool with the MCP server."""
+    mcp.tool()(get_fabric_status)
@@ -6,15 +6,20 @@ Retrieves BGP neighbor status from a network device using Ansible.
 """
 
 from typing import Dict, Any
-from helpers import run_ansible_playbook, VALID_DEVICES
+from helpers import VALID_DEVICES
+from helpers.show_batch import show
+from helpers.delta_state import delta_response
+from helpers.models import BgpNeighbor, as_dicts
 
 
-async def get_bgp_neighbors(device: str) -> Dict[str, Any]:
+async def get_bgp_neighbors(device: str, since: str = "") -> Dict[str, Any]:
     """
     Retrieve BGP neighbor status from a network device.
 
     Args:
         device: Device name (spine1, spine2, leaf1-leaf4)
+        since: "token" from an earlier call on this device; if given, only
+            neighbors that were added, removed or changed since then are returned
 
     Returns:
         Dictionary with router_id, local_asn, neighbor_count, and neighbors
@@ -31,7 +36,21 @@ async def get_bgp_neighbors(device: str) -> Dict[str, Any]:
                     "state": "Established",
                     "prefixes_received": 5
                 }
-            }
+            },
+            "token": "q3Zp0c1xR8sK"
+        }
+
+        With since="q3Zp0c1xR8sK", only the differences:
+        {
+            "device": "spine1",
+            "since": "q3Zp0c1xR8sK",
+            "token": "Jm2b7XkQ4aVe",
+            "neighbor_count": 4,
+            "added": {},
+            "removed": [],
+            "changed": {"10.0.1.2": {"fields": {"prefixes_received": [5, 8]},
+                                     "delta": {"prefixes_received": 3}}},
+            "unchanged": 3
         }
     """
     # Validate device name
@@ -40,42 +59,25 @@ async def get_bgp_neighbors(device: str) -> Dict[str, Any]:
             "error": f"Invalid device '{device}'. Valid devices: {VALID_DEVICES}"
         }
 
-    # Run the Ansible playbook with JSON parsing
-    result = run_ansible_playbook(
-        "09-bgp-neighbors.yml",
-        {"target_host": device},
-        parse_json=True
-    )
-
-    if not result["success"]:
-        return {"error": result.get("error", result.get("stderr", "Playbook failed"))}
+    # Run the show command (09-bgp-neighbors.yml, or one run shared with
+    # other tools called at the same time - see helpers/show_batch.py)
+    result = await show(device, "show ip bgp summary | json")
+    if "error" in result:
+        return {"error": result["error"]}
 
-    # Extract BGP data from parsed JSON
-    data = result.get("data", {})
-    if not data:
-        error_detail = result.get("parse_error", "Unknown parsing error")
-        return {"error": f"Failed to parse device response: {error_detail}"}
+    data = result["data"]
 
     # Extract default VRF data
     vrf_data = data.get("vrfs", {}).get("default", {})
-    peers = vrf_data.get("peers", {})
-
-    # Build neighbors dict
-    neighbors = {}
-    for peer_ip, peer_data in peers.items():
-        neighbors[peer_ip] = {
-            "remote_asn": peer_data.get("asn", "unknown"),
-            "state": peer_data.get("peerState", "unknown"),
-            "prefixes_received": peer_data.get("prefixReceived", 0)
-        }
+    neighbors = BgpNeighbor.table(vrf_data)
 
-    return {
+    return delta_response("neighbor", device, neighbors, since, lambda: {
         "device": device,
         "router_id": vrf_data.get("routerId", "unknown"),
         "local_asn": vrf_data.get("asn", "unknown"),
         "neighbor_count": len(neighbors),
-        "neighbors": neighbors
-    }
+        "neighbors": as_dicts(neighbors)
+    })
 
 
 def register(mcp):
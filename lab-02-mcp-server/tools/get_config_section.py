@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+MCP Tool: Get Config Section
+
+Returns part of a device's running configuration (interfaces, bgp, vlans,
+a single "interface Ethernet1" block, ...) from a locally cached, indexed
+copy of the full config (helpers/config_cache.py). The device is only
+contacted when the copy is older than MCP_CONFIG_CACHE_TTL, after a
+config-changing playbook has run, or when refresh=True.
+"""
+
+from typing import Any, Dict
+
+from helpers import VALID_DEVICES
+from helpers.config_cache import fetch_running_config, get_config_cache
+from helpers.config_tree import SECTION_ALIASES, render_sections, select_sections
+
+
+async def get_config_section(device: str, section: str = "", refresh: bool = False) -> Dict[str, Any]:
+    """
+    Get a section of a device's running configuration.
+
+    Args:
+        device: Device name (spine1, spine2, leaf1-leaf4)
+        section: "interfaces", "bgp", "vlans", "ospf", "acls", "users",
+            "management", an exact header such as "interface Ethernet1",
+            or a regular expression; empty returns the full config
+        refresh: Fetch from the device even if a cached copy is fresh
+
+    Returns:
+        Dictionary with the matching configuration text and cache age
+
+    Example output:
+        {
+            "device": "leaf1",
+            "section": "bgp",
+            "matched_sections": 1,
+            "age_seconds": 12.4,
+            "config": "router bgp 65101\\n   router-id 10.0.1.1\\n   ..."
+        }
+    """
+    if device not in VALID_DEVICES:
+        return {
+            "error": f"Invalid device '{device}'. Valid devices: {VALID_DEVICES}"
+        }
+
+    entry, error = await fetch_running_config(device, max_age=0 if refresh else None)
+    if error:
+        return {"error": error}
+
+    response = {
+        "device": device,
+        "section": section or "all",
+        "age_seconds": round(entry.age, 1),
+        "cache_ttl_seconds": get_config_cache().ttl,
+    }
+
+    if not section:
+        return {**response, "config": entry.text}
+
+    nodes = select_sections(entry.tree, section)
+    if not nodes:
+        headers = sorted({key.split()[0] for key in entry.tree.children})
+        return {
+            **response,
+            "matched_sections": 0,
+            "config": "",
+            "hint": f"No section matched. Try one of {sorted(SECTION_ALIASES)} "
+                    f"or a header starting with {headers}",
+        }
+
+    return {**response, "matched_sections": len(nodes), "config": render_sections(nodes)}
+
+
+def register(mcp):
+    """Register get_config_section tool with the MCP server."""
+    mcp.tool()(get_config_section)
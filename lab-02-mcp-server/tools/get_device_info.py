@@ -7,7 +7,9 @@ Uses Ansible for consistent device access.
 """
 
 from typing import Dict, Any
-from helpers import run_ansible_playbook, VALID_DEVICES
+from helpers import VALID_DEVICES
+from helpers.show_batch import show
+from helpers.models import DeviceInfo
 
 
 async def get_device_info(device: str) -> Dict[str, Any]:
@@ -34,30 +36,13 @@ async def get_device_info(device: str) -> Dict[str, Any]:
             "error": f"Invalid device '{device}'. Valid devices: {VALID_DEVICES}"
         }
 
-    # Run the Ansible playbook with JSON parsing
-    result = run_ansible_playbook(
-        "07-device-info.yml",
-        {"target_host": device},
-        parse_json=True
-    )
+    # Run the show command (07-device-info.yml, or one run shared with
+    # other tools called at the same time - see helpers/show_batch.py)
+    result = await show(device, "show version | json")
+    if "error" in result:
+        return {"error": result["error"]}
 
-    if not result["success"]:
-        return {"error": result.get("error", result.get("stderr", "Playbook failed"))}
-
-    # Extract device data from parsed JSON
-    data = result.get("data", {})
-    if not data:
-        error_detail = result.get("parse_error", "Unknown parsing error")
-        return {"error": f"Failed to parse device response: {error_detail}"}
-
-    return {
-        "hostname": data.get("hostname", "unknown"),
-        "model": data.get("modelName", "unknown"),
-        "version": data.get("version", "unknown"),
-        "uptime_seconds": data.get("uptime", 0),
-        "serial_number": data.get("serialNumber", "unknown"),
-        "mac_address": data.get("systemMacAddress", "unknown")
-    }
+    return DeviceInfo.from_eos(result["data"]).as_dict()
 
 
 def register(mcp):
@@ -6,15 +6,20 @@ Retrieves interface status from a network device using Ansible.
 """
 
 from typing import Dict, Any
-from helpers import run_ansible_playbook, VALID_DEVICES
+from helpers import VALID_DEVICES
+from helpers.show_batch import show
+from helpers.delta_state import delta_response
+from helpers.models import InterfaceStatus, as_dicts
 
 
-async def get_interfaces(device: str) -> Dict[str, Any]:
+async def get_interfaces(device: str, since: str = "") -> Dict[str, Any]:
     """
     Get status of all interfaces on a device.
 
     Args:
         device: Device name (spine1, spine2, leaf1-leaf4)
+        since: "token" from an earlier call on this device; if given, only
+            interfaces that were added, removed or changed since then are returned
 
     Returns:
         Dictionary with interface names and their status
@@ -26,7 +31,20 @@ async def get_interfaces(device: str) -> Dict[str, Any]:
             "interfaces": {
                 "Ethernet1": {"status": "connected", "description": "Link to leaf1"},
                 "Ethernet2": {"status": "connected", "description": "Link to leaf2"}
-            }
+            },
+            "token": "vT0k3nX9aB1c"
+        }
+
+        With since="vT0k3nX9aB1c", only the differences:
+        {
+            "device": "spine1",
+            "since": "vT0k3nX9aB1c",
+            "token": "Pq8rS2dLm4Ha",
+            "interface_count": 4,
+            "added": {},
+            "removed": [],
+            "changed": {"Ethernet2": {"fields": {"status": ["connected", "notconnect"]}}},
+            "unchanged": 3
         }
     """
     # Validate device name
@@ -35,38 +53,22 @@ async def get_interfaces(device: str) -> Dict[str, Any]:
             "error": f"Invalid device '{device}'. Valid devices: {VALID_DEVICES}"
         }
 
-    # Run the Ansible playbook with JSON parsing
-    result = run_ansible_playbook(
-        "08-interfaces-status.yml",
-        {"target_host": device},
-        parse_json=True
-    )
-
-    if not result["success"]:
-        return {"error": result.get("error", result.get("stderr", "Playbook failed"))}
+    # Run the show command (08-interfaces-status.yml, or one run shared with
+    # other tools called at the same time - see helpers/show_batch.py)
+    result = await show(device, "show interfaces status | json")
+    if "error" in result:
+        return {"error": result["error"]}
 
-    # Extract interface data from parsed JSON
-    data = result.get("data", {})
-    if not data:
-        error_detail = result.get("parse_error", "Unknown parsing error")
-        return {"error": f"Failed to parse interface data: {error_detail}"}
+    data = result["data"]
 
     # Arista "show interfaces status | json" structure
-    interface_statuses = data.get("interfaceStatuses", {})
-
-    interfaces = {}
-    for name, info in interface_statuses.items():
-        interfaces[name] = {
-            "status": info.get("linkStatus", "unknown"),
-            "description": info.get("description", ""),
-            "line_protocol": info.get("lineProtocolStatus", "unknown")
-        }
+    interfaces = InterfaceStatus.table(data)
 
-    return {
+    return delta_response("interface", device, interfaces, since, lambda: {
         "device": device,
         "interface_count": len(interfaces),
-        "interfaces": interfaces
-    }
+        "interfaces": as_dicts(interfaces)
+    })
 
 
 def register(mcp):
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+MCP Tool: Push Config Batch
+
+Applies many configuration changes to many devices as one all-or-nothing
+batch. Items are merged into one change set per device and pushed with a
+single run of playbooks/10-batch-config.yml. That run applies each device's
+change set in an EOS configuration session, up to MCP_BATCH_CONCURRENCY
+devices at a time, checks every device's running-config afterwards, and
+restores every device if any of them failed.
+
+Commands are checked under their section: "description server5" given
+indented below "interface Ethernet5" must appear in that interface, not
+just somewhere in the running-config.
+
+Adding VLAN 30 to four leaves with 04-add-vlan.yml takes four playbook
+runs; here it takes one, and 50 VLANs take the same one.
+"""
+
+import os
+import re
+import textwrap
+import time
+import uuid
+from typing import Any, Dict, List, Tuple
+
+from helpers import (
+    DEVICE_GROUPS,
+    VALID_DEVICES,
+    expand_devices,
+    run_ansible_playbook_async,
+    task_message,
+)
+from helpers.config_tree import parse_config
+
+# How many devices are changed at the same time
+BATCH_CONCURRENCY = int(os.getenv("MCP_BATCH_CONCURRENCY", "5"))
+
+# Commands that remove config, so there is nothing to find afterwards
+_NOT_VERIFIED = re.compile(r"^(no |default |exit$|end$)")
+
+
+def build_change_sets(changes: List[Dict[str, Any]]) -> Tuple[Dict[str, List[str]], List[str]]:
+    """
+    Merge change items into one ordered command list per device.
+
+    Each item has a "device" (name or group) and either "vlan_id" (with an
+    optional "vlan_name") or "lines" (config commands, list or newline
+    separated, indented as in the running-config). VLANs come first, then
+    line blocks in request order; duplicates are dropped.
+
+    Returns:
+        Tuple of (change_sets, errors)
+    """
+    vlans: Dict[str, Dict[int, str]] = {}
+    blocks: Dict[str, List[Tuple[str, ...]]] = {}
+    errors = []
+
+    for n, item in enumerate(changes, 1):
+        if not isinstance(item, dict):
+            errors.append(f"item {n}: expected an object, got {item!r}")
+            continue
+        devices = expand_devices(str(item.get("device", "")))
+        if not devices:
+            errors.append(
+                f"item {n}: invalid device '{item.get('device')}'. "
+                f"Valid: {VALID_DEVICES} or {sorted(DEVICE_GROUPS)}"
+            )
+            continue
+
+        if "vlan_id" in item:
+            try:
+                vlan_id = int(item["vlan_id"])
+            except (TypeError, ValueError):
+                vlan_id = 0
+            if not 1 <= vlan_id <= 4094:
+                errors.append(f"item {n}: vlan_id must be 1-4094, got {item['vlan_id']!r}")
+                continue
+            name = str(item.get("vlan_name") or f"VLAN{vlan_id}")
+            for device in devices:
+                existing = vlans.setdefault(device, {}).get(vlan_id)
+                if existing is not None and existing != name:
+                    errors.append(
+                        f"item {n}: VLAN {vlan_id} on {device} is already named '{existing}'"
+                    )
+                vlans[device][vlan_id] = name
+
+        elif "lines" in item:
+            lines = item["lines"]
+            if isinstance(lines, str):
+                lines = lines.splitlines()
+            block = tuple(textwrap.dedent("\n".join(line.rstrip() for line in lines if line.strip())).splitlines())
+            if not block:
+                errors.append(f"item {n}: 'lines' is empty")
+                continue
+            for device in devices:
+                if block not in blocks.setdefault(device, []):
+                    blocks[device].append(block)
+
+        else:
+            errors.append(f"item {n}: needs 'vlan_id' or 'lines'")
+
+    change_sets: Dict[str, List[str]] = {}
+    for device in VALID_DEVICES:
+        commands = []
+        for vlan_id, name in sorted(vlans.get(device, {}).items()):
+            commands += [f"vlan {vlan_id}", f"   name {name}"]
+        for block in blocks.get(device, []):
+            commands += block
+        if commands:
+            change_sets[device] = commands
+
+    return change_sets, errors
+
+
+def section_paths(commands: List[str]) -> List[str]:
+    """
+    Each command with the sections it is in, as 10-batch-config.yml looks
+    for it in the running-config ("interface Ethernet5 > description server5").
+    Commands that remove config are left out.
+    """
+    paths = []
+
+    def walk(node, parents: List[str]) -> None:
+        for child in node.children.values():
+            line = child.line.strip()
+            if _NOT_VERIFIED.match(line):
+                continue
+            paths.append(" > ".join(parents + [line]))
+            walk(child, parents + [line])
+
+    walk(parse_config("\n".join(commands)), [])
+    return paths
+
+
+async def push_config_batch(changes: List[Dict[str, Any]], dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Apply a batch of configuration changes to one or more devices, all or nothing.
+
+    Args:
+        changes: List of changes, each with a "device" (spine1, spine2,
+            leaf1-leaf4, or "leaves", "spines", "all") and either
+            "vlan_id" + "vlan_name", or "lines" (config commands indented
+            as in the running-config, e.g. ["interface Ethernet5",
+            "   description server5"])
+        dry_run: Only return the merged per-device commands
+
+    Returns:
+        Dictionary with the batch status and per-device results. If any
+        device fails, every device is restored to its previous config
+        and status is "rolled_back"; "rollback_incomplete" if a changed
+        device could not be restored (its status is "rollback_failed").
+
+    Example output:
+        {
+            "batch_id": "20250124T103000-3f9a1c",
+            "status": "committed",
+            "devices": {
+                "leaf1": {"status": "committed", "commands": 100},
+                "leaf2": {"status": "committed", "commands": 100}
+            },
+            "failed_devices": [],
+            "elapsed_seconds": 6.3
+        }
+    """
+    change_sets, errors = build_change_sets(changes)
+    if errors:
+        return {"error": "; ".join(errors)}
+    if not change_sets:
+        return {"error": "No changes given"}
+
+    if dry_run:
+        return {
+            "dry_run": True,
+            "devices": {d: {"commands": c} for d, c in change_sets.items()},
+        }
+
+    batch_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    start = time.perf_counter()
+    result = await run_ansible_playbook_async(
+        "10-batch-config.yml",
+        {
+            "target_hosts": ",".join(change_sets),
+            "batch_id": batch_id,
+            "batch_concurrency": BATCH_CONCURRENCY,
+            "changes": change_sets,
+            "verify_paths": {d: section_paths(c) for d, c in change_sets.items()},
+        },
+        parse_json=True
+    )
+    elapsed = round(time.perf_counter() - start, 2)
+
+    summary = task_message(result.get("stdout", ""), "Batch summary")
+    if not summary:
+        return {
+            "error": result.get("error") or result.get("stderr") or "No batch summary in Ansible output",
+            "batch_id": batch_id,
+            "devices": sorted(change_sets),
+            "hint": "The batch did not finish; check these devices with diff_config",
+        }
+
+    committed = bool(summary.get("committed"))
+    rolled_back = set(summary.get("rolled_back", []))
+    devices = {}
+    failed = []
+    for device, outcome in summary.get("devices", {}).items():
+        outcome = outcome or {}
+        entry = {"commands": int(outcome.get("commands", 0))}
+        if committed:
+            entry["status"] = "committed"
+        elif outcome.get("status") == "verified" and device in rolled_back:
+            entry["status"] = "rolled_back"
+        elif outcome.get("status") == "verified":
+            failed.append(device)
+            entry["status"] = "rollback_failed"
+        else:
+            failed.append(device)
+            entry["status"] = outcome.get("status", "failed")
+            entry["rolled_back"] = device in rolled_back
+            if outcome.get("missing"):
+                entry["missing"] = outcome["missing"]
+            if outcome.get("error"):
+                entry["error"] = outcome["error"]
+        devices[device] = entry
+
+    if committed:
+        status = "committed"
+    elif any(d["status"] == "rollback_failed" for d in devices.values()):
+        status = "rollback_incomplete"
+    else:
+        status = "rolled_back"
+    return {
+        "batch_id": batch_id,
+        "status": status,
+        "devices": devices,
+        "failed_devices": failed,
+        "elapsed_seconds": elapsed,
+    }
+
+
+def register(mcp):
+    """Register push_config_batch tool with the MCP server."""
+    mcp.tool()(push_config_batch)
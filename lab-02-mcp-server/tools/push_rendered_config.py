@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+MCP Tool: Push Rendered Config
+
+Renders every device's intended fabric configuration (interfaces and eBGP
+underlay) offline from the inventory (helpers/config_render.py) and pushes
+it with one run of playbooks/12-push-rendered-config.yml. Each device gets
+its whole config in one EOS configuration session, and devices are pushed
+in parallel (MCP_RENDER_FORKS, default 20).
+
+01-interfaces.yml and 02-bgp.yml take one CLI round trip per interface or
+neighbor; here a device takes one, whatever its number of peers. Devices
+whose last known running-config already has the rendered sections are
+skipped.
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from helpers import run_ansible_playbook_async, task_message
+from helpers.config_render import MODES, get_renderer
+from helpers.topology import ROLES
+
+# Devices pushed at the same time (ansible-playbook --forks)
+RENDER_FORKS = int(os.getenv("MCP_RENDER_FORKS", "20"))
+
+
+def _select(devices: str, roles: Dict[str, str]) -> List[str]:
+    """"all", role groups ("spines", "leaves") and names, comma-separated -> device names."""
+    selected = []
+    for name in (n.strip() for n in devices.split(",") if n.strip()):
+        if name == "all":
+            matches = list(roles)
+        elif name in ROLES:
+            matches = [d for d, role in roles.items() if role == ROLES[name]]
+        else:
+            matches = [name]
+        selected += [d for d in matches if d not in selected]
+    return selected
+
+
+async def push_rendered_config(
+    devices: str = "all",
+    mode: str = "merge",
+    dry_run: bool = False,
+    force: bool = False
+) -> Dict[str, Any]:
+    """
+    Render each device's fabric config from the inventory and push it in one session per device.
+
+    Args:
+        devices: "all", "spines", "leaves" or device names, comma-separated
+        mode: "merge" adds the rendered lines; "replace" also removes
+            anything else in the rendered sections (interfaces, router bgp)
+        dry_run: Only return the rendered configs
+        force: Push even to devices that already have the rendered config
+
+    Returns:
+        Dictionary with per-device status ("pushed", "unchanged" or the
+        failure) and the hash of each device's intended config
+
+    Example output:
+        {
+            "mode": "merge",
+            "devices": {
+                "leaf1": {"status": "pushed", "intended_hash": "5f0c...", "lines": 17},
+                "leaf2": {"status": "unchanged", "intended_hash": "a81e...", "lines": 17,
+                          "reason": "running_config"}
+            },
+            "pushed": 5,
+            "unchanged": 1,
+            "failed_devices": [],
+            "render_ms": 1.9,
+            "elapsed_seconds": 4.2
+        }
+    """
+    if mode not in MODES:
+        return {"error": f"Invalid mode '{mode}'. Valid modes: {list(MODES)}"}
+
+    renderer = get_renderer()
+    start = time.perf_counter()
+    topology = await asyncio.to_thread(renderer.cache.topology)
+    if topology is None:
+        return {"error": "Inventory could not be read; see topology://containerlab"}
+    roles = {d["name"]: d["role"] for d in topology["devices"]}
+    names = _select(devices, roles)
+    unknown = [d for d in names if d not in roles]
+    if unknown or not names:
+        return {"error": f"Invalid devices {unknown or devices!r}. Valid: {sorted(roles)}, 'all', 'spines', 'leaves'"}
+
+    rendered = await asyncio.to_thread(renderer.render, names)
+    render_ms = round((time.perf_counter() - start) * 1000, 1)
+    results = {
+        d: {"intended_hash": r.intended_hash, "lines": len(r.push_text(mode).splitlines())}
+        for d, r in rendered.items()
+    }
+
+    if dry_run:
+        for d, r in rendered.items():
+            results[d]["config"] = r.push_text(mode)
+            reason = None if force else renderer.unchanged(r, mode)
+            results[d]["would_push"] = reason is None
+        return {"dry_run": True, "mode": mode, "devices": results, "render_ms": render_ms}
+
+    to_push = {}
+    for d, r in rendered.items():
+        reason = None if force else renderer.unchanged(r, mode)
+        if reason:
+            results[d].update(status="unchanged", reason=reason)
+        else:
+            to_push[d] = r
+
+    failed = []
+    if to_push:
+        with tempfile.TemporaryDirectory(prefix="mcp-render-") as tmp:
+            paths = {}
+            for d, r in to_push.items():
+                paths[d] = os.path.join(tmp, f"{d}.cfg")
+                with open(paths[d], "w") as f:
+                    f.write(r.push_text(mode))
+            result = await run_ansible_playbook_async(
+                "12-push-rendered-config.yml",
+                {"target_hosts": ",".join(to_push), "configs": paths},
+                parse_json=True,
+                forks=RENDER_FORKS
+            )
+
+        summary = task_message(result.get("stdout", ""), "Push summary")
+        if not summary:
+            return {
+                "error": result.get("error") or result.get("stderr") or "No push summary in Ansible output",
+                "devices": sorted(to_push),
+                "hint": "The push did not finish; check these devices with diff_config",
+            }
+        for d, r in to_push.items():
+            outcome = summary.get(d) or {"status": "not_run", "error": "Missing from the push summary"}
+            results[d]["status"] = outcome.get("status", "failed")
+            if results[d]["status"] == "pushed":
+                renderer.record_push(r, mode)
+            else:
+                failed.append(d)
+                if outcome.get("error"):
+                    results[d]["error"] = outcome["error"]
+
+    return {
+        "mode": mode,
+        "devices": results,
+        "pushed": sum(r.get("status") == "pushed" for r in results.values()),
+        "unchanged": sum(r.get("status") == "unchanged" for r in results.values()),
+        "failed_devices": failed,
+        "render_ms": render_ms,
+        "elapsed_seconds": round(time.perf_counter() - start, 2),
+    }
+
+
+def register(mcp):
+    """Register push_rendered_config tool with the MCP server."""
+    mcp.tool()(push_rendered_config)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+MCP Tool: Search Configs
+
+Finds config lines across every stored config - backup store snapshots,
+06-backup-config.yml files and running-configs the tools have fetched -
+from an inverted index (helpers/config_index.py), instead of fetching and
+scanning each device's config. "Which devices have neighbor 10.0.5.2?"
+or "where is VLAN 30 defined?" is answered without touching a device.
+
+Only configs the server has seen are searched; run backup_configs or a
+config tool first to bring the index up to date with the devices.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict
+
+from helpers.config_index import get_config_index
+
+
+def _search(query: str, devices, section: str, history: bool, limit: int, refresh: bool) -> Dict[str, Any]:
+    index = get_config_index()
+    index.sync(full=refresh)
+    start = time.perf_counter()
+    result = index.search(query, devices, section, history, limit)
+    result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return result
+
+
+async def search_configs(
+    query: str,
+    devices: str = "all",
+    section: str = "",
+    history: bool = False,
+    limit: int = 50,
+    refresh: bool = False
+) -> Dict[str, Any]:
+    """
+    Search stored device configs for lines containing some words.
+
+    Args:
+        query: Words to find, in order (case-insensitive), e.g.
+            "neighbor 10.0.5.2" or "vlan 30"
+        devices: Comma-separated device names, or "all" (default)
+        section: Only lines in top-level sections starting with this,
+            e.g. "router bgp" or "interface Ethernet"
+        history: Search every stored snapshot, not only each device's newest config
+        limit: Most matches to return (all are counted)
+        refresh: Rescan the backup store and backup files first
+
+    Returns:
+        Dictionary with matching lines, each with its device, source
+        ("backup", "file" or "live"), snapshot and section path
+
+    Example output:
+        {
+            "query": "neighbor 10.0.5.2",
+            "total_matches": 2,
+            "devices": ["spine2"],
+            "matches": [
+                {"device": "spine2", "source": "live", "snapshot": "live",
+                 "path": ["router bgp 65100"], "line": "neighbor 10.0.5.2 remote-as 65101"},
+                {"device": "spine2", "source": "live", "snapshot": "live",
+                 "path": ["router bgp 65100"], "line": "neighbor 10.0.5.2 description leaf1"}
+            ],
+            "truncated": false,
+            "documents_searched": 6,
+            "elapsed_ms": 0.21
+        }
+    """
+    if not query.split():
+        return {"error": "query must contain at least one word"}
+    if limit < 1:
+        return {"error": "limit must be 1 or more"}
+
+    wanted = None if devices == "all" else [d.strip() for d in devices.split(",") if d.strip()]
+    result = await asyncio.to_thread(_search, query, wanted, section, history, limit, refresh)
+    return {"query": query, **result}
+
+
+def register(mcp):
+    """Register search_configs tool with the MCP server."""
+    mcp.tool()(search_configs)
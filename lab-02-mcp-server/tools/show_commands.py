@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+MCP Tool: Show Commands
+
+Runs several show commands on one or more devices and returns each
+command's parsed JSON. All commands for a device go over one session, and
+all devices are read in one run of playbooks/11-show-commands.yml, so three
+facts from six switches cost one playbook run instead of eighteen.
+"""
+
+import time
+from typing import Any, Dict, List
+
+from helpers import expand_devices
+from helpers.show_batch import run_show_commands_async
+
+MAX_COMMANDS = 20
+
+
+def _normalize(command: Any) -> str:
+    """A show command with "| json" appended; "" if it is not a single show command."""
+    command = str(command).strip()
+    if not command.lower().startswith("show ") or any(c in command for c in ";\n\r"):
+        return ""
+    return command if command.replace(" ", "").endswith("|json") else f"{command} | json"
+
+
+async def show_commands(commands: List[str], devices: str = "all") -> Dict[str, Any]:
+    """
+    Run several show commands on one or more devices in one round trip.
+
+    Args:
+        commands: Show commands, e.g. ["show version", "show ip route summary"];
+            "| json" is added when missing (up to 20 commands)
+        devices: Comma-separated device names or groups ("all", "spines", "leaves")
+
+    Returns:
+        Dictionary with per-device, per-command parsed output
+
+    Example output:
+        {
+            "commands": ["show version | json", "show ip bgp summary | json"],
+            "device_count": 2,
+            "devices": {
+                "spine1": {
+                    "show version | json": {"hostname": "spine1", ...},
+                    "show ip bgp summary | json": {"vrfs": {...}}
+                },
+                "leaf4": {"error": "Host leaf4 unreachable: ..."}
+            },
+            "failed": ["leaf4"],
+            "elapsed_seconds": 1.2
+        }
+    """
+    if not commands:
+        return {"error": "No commands given"}
+    if len(commands) > MAX_COMMANDS:
+        return {"error": f"Too many commands ({len(commands)}); at most {MAX_COMMANDS} per call"}
+    normalized = [_normalize(c) for c in commands]
+    invalid = [c for c, n in zip(commands, normalized) if not n]
+    if invalid:
+        return {"error": f"Only single show commands are allowed: {invalid}"}
+    normalized = list(dict.fromkeys(normalized))
+
+    targets: List[str] = []
+    for name in devices.split(","):
+        expanded = expand_devices(name.strip())
+        if not expanded:
+            return {"error": f"Unknown device or group '{name.strip()}'. Use a device name, 'all', 'spines' or 'leaves'"}
+        targets.extend(d for d in expanded if d not in targets)
+
+    start = time.perf_counter()
+    outputs = await run_show_commands_async({device: normalized for device in targets})
+
+    results: Dict[str, Any] = {}
+    failed = []
+    for device in targets:
+        per_command = outputs.get(device, {})
+        errors = {r.get("error") for r in per_command.values()}
+        if per_command and None not in errors and len(errors) == 1:
+            results[device] = {"error": errors.pop()}  # the whole device failed
+            failed.append(device)
+        else:
+            results[device] = {c: r.get("data", r) for c, r in per_command.items()}
+
+    return {
+        "commands": normalized,
+        "device_count": len(targets),
+        "devices": results,
+        "failed": failed,
+        "elapsed_seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def register(mcp):
+    """Register show_commands tool with the MCP server."""
+    mcp.tool()(show_commands)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+MCP Tool: State Snapshots
+
+Answers from the state the background collector (helpers/collector.py)
+records, instead of polling devices: current device info, interfaces and
+BGP neighbors with the age of the data, and what changed over a time window.
+
+Requires MCP_COLLECTOR_INTERVAL to be set (e.g. 60) when the server starts.
+"""
+
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from helpers import VALID_DEVICES
+from helpers.collector import COLLECTOR_INTERVAL, get_collector
+from helpers.snapshot_store import KINDS, get_snapshot_store
+
+NOT_COLLECTING = (
+    "No collected state yet. Start the server with MCP_COLLECTOR_INTERVAL=60 "
+    "to enable the background collector, or use the live tools."
+)
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat(timespec="seconds") if ts else None
+
+
+def _select(device: str, kind: str):
+    """Validate arguments -> (devices, kinds, error)."""
+    devices = VALID_DEVICES if device == "all" else [device]
+    kinds = list(KINDS) if kind == "all" else [kind]
+    if device != "all" and device not in VALID_DEVICES:
+        return None, None, f"Invalid device '{device}'. Valid devices: {VALID_DEVICES} or 'all'"
+    if kind != "all" and kind not in KINDS:
+        return None, None, f"Invalid kind '{kind}'. Valid kinds: {list(KINDS)} or 'all'"
+    return devices, kinds, None
+
+
+async def get_state_snapshot(device: str = "all", kind: str = "all") -> Dict[str, Any]:
+    """
+    Get the most recently collected state of devices, without polling them.
+
+    Args:
+        device: Device name (spine1, spine2, leaf1-leaf4) or "all"
+        kind: "device", "interfaces", "bgp" or "all"
+
+    Returns:
+        Dictionary with per-device state and when it was collected. "stale"
+        is true when the data is older than two collection intervals.
+
+    Example output:
+        {
+            "collection_interval_seconds": 60,
+            "devices": {
+                "leaf1": {
+                    "interfaces": {
+                        "collected_at": "2025-01-24T10:30:00+00:00",
+                        "age_seconds": 12.4,
+                        "stale": false,
+                        "state": {"Ethernet1": {"status": "connected", "line_protocol": "up", ...}}
+                    }
+                }
+            }
+        }
+    """
+    devices, kinds, error = _select(device, kind)
+    if error:
+        return {"error": error}
+
+    store = get_snapshot_store()
+    collector = get_collector()
+    interval = collector.interval if collector else COLLECTOR_INTERVAL
+    result: Dict[str, Any] = {}
+    for name in devices:
+        for k in kinds:
+            fresh = store.freshness(name, k)
+            if fresh["collected_at"] is None and "last_error" not in fresh:
+                continue
+            entry = {
+                "collected_at": _iso(fresh["collected_at"]),
+                "age_seconds": fresh["age_seconds"],
+                "stale": fresh["age_seconds"] is None or (
+                    interval > 0 and fresh["age_seconds"] > 2 * interval
+                ),
+                "state": store.current(name, k),
+            }
+            if "last_error" in fresh:
+                entry["last_error"] = fresh["last_error"]
+            result.setdefault(name, {})[k] = entry
+
+    if not result:
+        return {"error": NOT_COLLECTING}
+    return {"collection_interval_seconds": interval, "devices": result}
+
+
+async def get_state_changes(device: str = "all", minutes: int = 60, kind: str = "all") -> Dict[str, Any]:
+    """
+    List what changed on devices over the last N minutes, from collected state.
+
+    Args:
+        device: Device name (spine1, spine2, leaf1-leaf4) or "all"
+        minutes: How far back to look (default: 60)
+        kind: "device", "interfaces", "bgp" or "all"
+
+    Returns:
+        Dictionary with changes, oldest first. "fields" holds [old, new]
+        for changed values, or the values of an added/removed entry.
+
+    Example output:
+        {
+            "since": "2025-01-24T09:30:00+00:00",
+            "change_count": 2,
+            "changes": [
+                {"time": "2025-01-24T09:41:00+00:00", "device": "leaf3", "kind": "interfaces",
+                 "key": "Ethernet2", "change": "changed",
+                 "fields": {"status": ["connected", "notconnect"], "line_protocol": ["up", "down"]}},
+                {"time": "2025-01-24T09:42:00+00:00", "device": "leaf3", "kind": "bgp",
+                 "key": "10.0.0.4", "change": "changed", "fields": {"state": ["Established", "Active"]}}
+            ]
+        }
+    """
+    devices, kinds, error = _select(device, kind)
+    if error:
+        return {"error": error}
+
+    store = get_snapshot_store()
+    if not store.devices():
+        return {"error": NOT_COLLECTING}
+
+    since = time.time() - max(minutes, 0) * 60
+    changes: List[Dict[str, Any]] = store.changes(
+        since, None if device == "all" else device, kinds
+    )
+    for change in changes:
+        change["time"] = _iso(change["time"])
+
+    return {
+        "since": _iso(since),
+        "devices": devices,
+        "change_count": len(changes),
+        "changes": changes,
+    }
+
+
+def register(mcp):
+    """Register state snapshot tools with the MCP server."""
+    mcp.tool()(get_state_snapshot)
+    mcp.tool()(get_state_changes)
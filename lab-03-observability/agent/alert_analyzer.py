@@ -11,8 +11,9 @@ EXTENSION TASK: Add Slack notifications, new alert rules, or custom dashboard pa
 See prompts/ folder for AI assistance.
 
 Usage:
-    python alert_analyzer.py          # Run continuous monitoring
-    python alert_analyzer.py --test   # Run single analysis
+    python alert_analyzer.py            # Run continuous monitoring
+    python alert_analyzer.py --test     # Run single analysis
+    python alert_analyzer.py --webhook  # Receive Alertmanager webhooks (event-driven)
 
 Requirements:
     pip install requests openai anthropic python-dotenv
@@ -21,11 +22,11 @@ Environment Variables:
     OPENAI_API_KEY - Your OpenAI API key (or ANTHROPIC_API_KEY for Claude)
 """
 
+import asyncio
 import requests
 import json
 import os
 import sys
-import time
 import logging
 from datetime import datetime
 from typing import Dict, List, Any, Optional
@@ -50,17 +51,31 @@ logger = logging.getLogger(__name__)
 PROMETHEUS_URL = os.getenv("PROMETHEUS_URL", "http://localhost:9090")
 CHECK_INTERVAL = int(os.getenv("CHECK_INTERVAL", "60"))  # seconds
 
+# Webhook mode (Alertmanager -> analyzer)
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "9095"))
+DEBOUNCE_SECONDS = float(os.getenv("DEBOUNCE_SECONDS", "2"))
+DEBOUNCE_MAX_WAIT = float(os.getenv("DEBOUNCE_MAX_WAIT", "10"))
+
+# Analysis pipeline (see pipeline.py)
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "2"))
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "16"))
+PIPELINE_OVERFLOW = os.getenv("PIPELINE_OVERFLOW", "drop_oldest")  # or "block"
+PIPELINE_GROUP_BY = os.getenv("PIPELINE_GROUP_BY", "")  # e.g. "device"; empty = whole fabric
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9096"))  # 0 disables /metrics
+
 
 # =============================================================================
 # WORKING EXAMPLE: Fetch Alerts from Prometheus
 # =============================================================================
 
-def get_prometheus_alerts() -> List[Dict[str, Any]]:
+def get_prometheus_alerts() -> Optional[List[Dict[str, Any]]]:
     """
     Fetch active alerts from Prometheus.
 
     Returns:
-        List of alert dictionaries from Prometheus API
+        List of alert dictionaries from Prometheus API, or None if
+        Prometheus could not be queried (not the same as no alerts)
 
     Example response structure:
         [
@@ -84,7 +99,7 @@ def get_prometheus_alerts() -> List[Dict[str, Any]]:
 
     except requests.exceptions.RequestException as e:
         logger.error(f"Failed to fetch alerts: {e}")
-        return []
+        return None
 
 
 # =============================================================================
@@ -291,13 +306,8 @@ def _call_ollama(prompt: str) -> str:
 # WORKING EXAMPLE: Main Analysis Functions
 # =============================================================================
 
-def run_single_analysis() -> None:
-    """Run a single alert analysis."""
-    logger.info("Running single alert analysis...")
-
-    alerts = get_prometheus_alerts()
-    analysis = analyze_alerts_with_llm(alerts)
-
+def print_analysis(alerts: List[Dict[str, Any]], analysis: str) -> None:
+    """Print an analysis report to stdout."""
     print("\n" + "=" * 60)
     print("AI ALERT ANALYSIS")
     print("=" * 60)
@@ -308,21 +318,106 @@ def run_single_analysis() -> None:
     print("=" * 60 + "\n")
 
 
+def run_single_analysis() -> None:
+    """Run a single alert analysis."""
+    logger.info("Running single alert analysis...")
+
+    alerts = get_prometheus_alerts()
+    if alerts is None:
+        return
+    analysis = analyze_alerts_with_llm(alerts)
+    print_analysis(alerts, analysis)
+
+
+def print_batch(batch, analysis: str) -> None:
+    """Pipeline output sink: print the analysis report."""
+    print_analysis(batch.alerts, analysis)
+
+
+def _build_pipeline(fetch=None):
+    """Create the staged analysis pipeline from environment settings."""
+    from pipeline import AlertPipeline, start_metrics_server
+
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT)
+
+    return AlertPipeline(
+        analyze=analyze_alerts_with_llm,
+        sinks=[print_batch],
+        fetch=fetch,
+        interval=CHECK_INTERVAL,
+        workers=ANALYSIS_WORKERS,
+        queue_size=PIPELINE_QUEUE_SIZE,
+        overflow=PIPELINE_OVERFLOW,
+        group_by=PIPELINE_GROUP_BY,
+    )
+
+
 def run_continuous_monitoring() -> None:
-    """Run continuous monitoring loop."""
-    logger.info(f"Starting continuous monitoring (interval: {CHECK_INTERVAL}s)")
+    """
+    Run continuous monitoring through the staged pipeline.
+
+    Alerts are fetched every CHECK_INTERVAL seconds on a fixed schedule;
+    analysis runs in ANALYSIS_WORKERS parallel workers, so a slow LLM call
+    never delays the next fetch. Unchanged alert groups are not re-analyzed.
+    """
+    async def serve() -> None:
+        pipeline = _build_pipeline(fetch=get_prometheus_alerts)
+        await pipeline.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await pipeline.stop()
+
+    logger.info(f"Starting continuous monitoring (interval: {CHECK_INTERVAL}s, "
+                f"workers: {ANALYSIS_WORKERS})")
     logger.info("Press Ctrl+C to stop")
 
     try:
-        while True:
-            run_single_analysis()
-            logger.info(f"Sleeping for {CHECK_INTERVAL} seconds...")
-            time.sleep(CHECK_INTERVAL)
-
+        asyncio.run(serve())
     except KeyboardInterrupt:
         logger.info("Monitoring stopped by user")
 
 
+def run_webhook_mode() -> None:
+    """
+    Event-driven monitoring: analyze alerts as Alertmanager pushes them.
+
+    Bursts are debounced for DEBOUNCE_SECONDS and fed into the analysis
+    pipeline. If no webhook arrives for CHECK_INTERVAL seconds, Prometheus
+    is polled as a fallback.
+    """
+    from webhook_receiver import AlertWebhookReceiver
+
+    async def serve() -> None:
+        pipeline = _build_pipeline()
+        receiver = AlertWebhookReceiver(
+            pipeline.submit,
+            fetch_alerts=get_prometheus_alerts,
+            host=WEBHOOK_HOST,
+            port=WEBHOOK_PORT,
+            debounce_window=DEBOUNCE_SECONDS,
+            max_wait=DEBOUNCE_MAX_WAIT,
+            fallback_interval=CHECK_INTERVAL,
+        )
+        await pipeline.start()
+        await receiver.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await receiver.stop()
+            await pipeline.stop()
+
+    logger.info(f"Starting webhook mode (debounce: {DEBOUNCE_SECONDS}s, "
+                f"fallback poll: {CHECK_INTERVAL}s)")
+    logger.info("Press Ctrl+C to stop")
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        logger.info("Webhook receiver stopped by user")
+
+
 # =============================================================================
 # EXTENSION TASKS: Add new features below
 # =============================================================================
@@ -350,6 +445,8 @@ def main():
     # Check for test mode
     if "--test" in sys.argv or "-t" in sys.argv:
         run_single_analysis()
+    elif "--webhook" in sys.argv or "-w" in sys.argv:
+        run_webhook_mode()
     else:
         run_continuous_monitoring()
 
@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+Alert Analysis Pipeline
+Workshop: Build Intelligent Networks with AI
+
+Staged replacement for the fetch -> analyze -> print -> sleep loop:
+
+    fetch ──▶ [raw queue] ──▶ group ──▶ [analysis queue] ──▶ analyze (N workers)
+                                                                   │
+                                        output sinks ◀── [output queue]
+
+- Queues are bounded, so a slow stage pushes back on the one before it.
+- The analysis queue is keyed by alert group: a newer snapshot of a group
+  replaces one still waiting (coalesce), and when the queue is full the
+  oldest waiting group is dropped (or the producer blocks, if configured).
+- Fetching runs on a fixed schedule, so a slow LLM call no longer delays
+  the next fetch or makes cycles drift.
+- Stage latency histograms and queue depths are exported as Prometheus
+  metrics when prometheus-client is installed.
+
+Requirements:
+    pip install prometheus-client  (optional, for metrics)
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from webhook_receiver import AlertBatch, alert_fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# Metrics (optional)
+# =============================================================================
+
+# Metrics in the default registry, created once for every pipeline in the process
+_DEFAULT_METRICS: Optional[Dict[str, Any]] = None
+
+
+def _create_metrics(registry) -> Dict[str, Any]:
+    from prometheus_client import Counter, Gauge, Histogram
+
+    return {
+        "stage_seconds": Histogram(
+            "alert_analyzer_stage_seconds",
+            "Time spent in each pipeline stage",
+            ["stage"],
+            buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+            registry=registry,
+        ),
+        "queue_depth": Gauge(
+            "alert_analyzer_queue_depth",
+            "Items waiting in each pipeline queue",
+            ["queue"],
+            registry=registry,
+        ),
+        "dropped": Counter(
+            "alert_analyzer_dropped_total",
+            "Alert batches not analyzed",
+            ["reason"],
+            registry=registry,
+        ),
+        "coalesced": Counter(
+            "alert_analyzer_coalesced_total",
+            "Alert batches merged into one already waiting for the same group",
+            registry=registry,
+        ),
+        "batches": Counter(
+            "alert_analyzer_batches_total",
+            "Alert batches completed per stage",
+            ["stage"],
+            registry=registry,
+        ),
+    }
+
+
+class PipelineMetrics:
+    """
+    Prometheus metrics for the pipeline; no-ops if prometheus-client is missing.
+
+    Args:
+        registry: CollectorRegistry for the metrics (default: the global
+            registry, whose metrics every pipeline in the process shares)
+    """
+
+    def __init__(self, registry=None):
+        global _DEFAULT_METRICS
+        try:
+            import prometheus_client
+        except ImportError:
+            self.enabled = False
+            return
+
+        self.enabled = True
+        if registry is None or registry is prometheus_client.REGISTRY:
+            if _DEFAULT_METRICS is None:
+                _DEFAULT_METRICS = _create_metrics(prometheus_client.REGISTRY)
+            metrics = _DEFAULT_METRICS
+        else:
+            metrics = _create_metrics(registry)
+        for name, metric in metrics.items():
+            setattr(self, name, metric)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        if self.enabled:
+            self.stage_seconds.labels(stage=stage).observe(seconds)
+            self.batches.labels(stage=stage).inc()
+
+    def depth(self, queue: str, value: int) -> None:
+        if self.enabled:
+            self.queue_depth.labels(queue=queue).set(value)
+
+    def drop(self, reason: str) -> None:
+        if self.enabled:
+            self.dropped.labels(reason=reason).inc()
+
+    def coalesce(self) -> None:
+        if self.enabled:
+            self.coalesced.inc()
+
+
+def start_metrics_server(port: int) -> bool:
+    """Expose /metrics on the given port. Returns False if unavailable."""
+    try:
+        from prometheus_client import start_http_server
+    except ImportError:
+        logger.warning("prometheus-client not installed; pipeline metrics disabled")
+        return False
+
+    start_http_server(port)
+    logger.info(f"Pipeline metrics available at http://localhost:{port}/metrics")
+    return True
+
+
+# =============================================================================
+# Keyed, bounded queue with coalescing
+# =============================================================================
+
+class CoalescingQueue:
+    """
+    Bounded queue of AlertBatches keyed by group.
+
+    - put() for a key that is already waiting is coalesced with it: a poll
+      snapshot replaces the waiting batch, webhook deltas are merged
+      (reported to on_coalesce; nothing is lost).
+    - put() when full drops the oldest waiting key ("drop_oldest") or
+      waits for space ("block").
+    - get() never hands out a key that a worker is still analyzing, so
+      results for one group stay in order.
+    """
+
+    def __init__(self, maxsize: int, overflow: str = "drop_oldest",
+                 on_drop: Optional[Callable[[str], None]] = None,
+                 on_coalesce: Optional[Callable[[], None]] = None):
+        if overflow not in ("drop_oldest", "block"):
+            raise ValueError(f"Unknown overflow policy '{overflow}'")
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.on_drop = on_drop or (lambda reason: None)
+        self.on_coalesce = on_coalesce or (lambda: None)
+        self._items: "OrderedDict[str, AlertBatch]" = OrderedDict()
+        self._in_flight: set = set()
+        self._changed = asyncio.Condition()
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    async def put(self, batch: AlertBatch) -> None:
+        async with self._changed:
+            if batch.group in self._items:
+                self._items[batch.group] = _coalesce(self._items[batch.group], batch)
+                self.on_coalesce()
+                return
+
+            while len(self._items) >= self.maxsize:
+                if self.overflow == "drop_oldest":
+                    self._items.popitem(last=False)
+                    self.on_drop("overflow")
+                else:
+                    await self._changed.wait()
+
+            self._items[batch.group] = batch
+            self._changed.notify_all()
+
+    async def get(self) -> AlertBatch:
+        async with self._changed:
+            while True:
+                for key in self._items:
+                    if key not in self._in_flight:
+                        self._in_flight.add(key)
+                        batch = self._items.pop(key)
+                        self._changed.notify_all()
+                        return batch
+                await self._changed.wait()
+
+    async def task_done(self, batch: AlertBatch) -> None:
+        async with self._changed:
+            self._in_flight.discard(batch.group)
+            self._changed.notify_all()
+
+
+# =============================================================================
+# Pipeline
+# =============================================================================
+
+Sink = Callable[[AlertBatch, str], None]
+
+
+def group_alerts(alerts: List[Dict[str, Any]], group_by: str = "") -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Split alerts into analysis groups.
+
+    Args:
+        alerts: Alerts in Prometheus API shape
+        group_by: Label to group on (e.g. "device"). Empty keeps all alerts
+            in one fabric-wide group so the LLM can correlate across devices.
+
+    Returns:
+        Dictionary of group key -> alerts
+    """
+    if not group_by:
+        return {"fabric": list(alerts)}
+
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for alert in alerts:
+        labels = alert.get("labels", {})
+        key = labels.get(group_by) or labels.get("instance") or "unlabeled"
+        groups.setdefault(key, []).append(alert)
+    return groups
+
+
+class AlertPipeline:
+    """
+    Staged alert analysis pipeline with bounded queues.
+
+    Args:
+        analyze: Sync callable taking a list of alerts and returning analysis text
+        sinks: Sync callables invoked with (batch, analysis) for each result
+        fetch: Optional sync callable returning Prometheus alerts (None if
+            Prometheus could not be queried); when set, it is called every
+            `interval` seconds on a fixed schedule
+        interval: Fetch interval in seconds
+        workers: Number of concurrent analysis workers
+        queue_size: Capacity of each queue between stages
+        overflow: "drop_oldest" or "block" when the analysis queue is full
+        group_by: Alert label to split analysis groups on ("" = whole fabric)
+        registry: Prometheus CollectorRegistry for the pipeline metrics
+            (default: the global registry)
+    """
+
+    def __init__(
+        self,
+        analyze: Callable[[List[Dict[str, Any]]], str],
+        sinks: List[Sink],
+        fetch: Optional[Callable[[], Optional[List[Dict[str, Any]]]]] = None,
+        interval: float = 60.0,
+        workers: int = 2,
+        queue_size: int = 16,
+        overflow: str = "drop_oldest",
+        group_by: str = "",
+        registry=None,
+    ):
+        self.analyze = analyze
+        self.sinks = sinks
+        self.fetch = fetch
+        self.interval = interval
+        self.workers = workers
+        self.group_by = group_by
+        self.metrics = PipelineMetrics(registry)
+
+        self.raw_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.analysis_queue = CoalescingQueue(queue_size, overflow, self.metrics.drop, self.metrics.coalesce)
+        self.output_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+        self._last_fingerprints: Dict[str, frozenset] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    # -------------------------------------------------------------------------
+    # Entry points
+    # -------------------------------------------------------------------------
+
+    async def submit(self, batch: AlertBatch) -> None:
+        """Feed alerts into the group stage (blocks if the raw queue is full)."""
+        await self.raw_queue.put(batch)
+        self._report_depths()
+
+    async def start(self) -> None:
+        """Start all stage tasks."""
+        if self.fetch is not None:
+            self._tasks.append(asyncio.create_task(self._fetch_stage()))
+        self._tasks.append(asyncio.create_task(self._group_stage()))
+        for _ in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._analyze_stage()))
+        self._tasks.append(asyncio.create_task(self._output_stage()))
+
+    async def stop(self) -> None:
+        """Cancel all stage tasks."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    # -------------------------------------------------------------------------
+    # Stages
+    # -------------------------------------------------------------------------
+
+    async def _fetch_stage(self) -> None:
+        """Fetch alerts on a fixed schedule; skip ticks rather than drift."""
+        next_tick = time.monotonic()
+        while True:
+            started = time.monotonic()
+            try:
+                alerts = await asyncio.to_thread(self.fetch)
+            except Exception as e:
+                logger.error(f"Fetch failed: {e}")
+                alerts = None
+            self.metrics.observe("fetch", time.monotonic() - started)
+
+            if alerts is None:
+                # Not an empty result: treating it as one would resolve every group
+                self.metrics.drop("fetch_error")
+                logger.warning("Could not fetch alerts, skipping this tick")
+            else:
+                received = time.monotonic()
+                batch = AlertBatch(alerts, [received] * len(alerts), source="poll")
+                try:
+                    self.raw_queue.put_nowait(batch)
+                except asyncio.QueueFull:
+                    # Grouping is behind; the next fetch supersedes this one anyway
+                    self.metrics.drop("fetch_backpressure")
+                    logger.warning("Group stage is behind, skipping this fetch")
+                self._report_depths()
+
+            next_tick += self.interval
+            now = time.monotonic()
+            if next_tick < now:
+                skipped = int((now - next_tick) // self.interval) + 1
+                next_tick += skipped * self.interval
+                logger.warning(f"Fetch fell behind schedule, skipped {skipped} tick(s)")
+            await asyncio.sleep(next_tick - now)
+
+    async def _group_stage(self) -> None:
+        """Split batches into groups and drop groups that did not change."""
+        while True:
+            batch = await self.raw_queue.get()
+            started = time.monotonic()
+            try:
+                await self._group(batch, started)
+            except Exception as e:
+                # One malformed batch must not stop grouping for good
+                self.metrics.drop("group_error")
+                logger.error(f"Grouping batch failed: {e}")
+            self.metrics.observe("group", time.monotonic() - started)
+            self._report_depths()
+
+    async def _group(self, batch: AlertBatch, started: float) -> None:
+        """Queue each changed group of one batch for analysis."""
+        arrival = dict(zip((id(a) for a in batch.alerts), batch.received_at))
+        groups = group_alerts(batch.alerts, self.group_by)
+
+        # A poll returns the full picture, so groups that vanished are resolved
+        if batch.source == "poll":
+            for key in list(self._last_fingerprints):
+                if key not in groups and self._last_fingerprints[key]:
+                    groups[key] = []
+
+        for key, alerts in groups.items():
+            fingerprints = frozenset(_alert_key(a) for a in alerts)
+            if batch.source == "poll" and self._last_fingerprints.get(key) == fingerprints:
+                self.metrics.drop("unchanged")
+                continue
+            self._last_fingerprints[key] = fingerprints
+
+            received = [arrival.get(id(a), started) for a in alerts]
+            await self.analysis_queue.put(
+                AlertBatch(alerts, received, source=batch.source, group=key)
+            )
+
+    async def _analyze_stage(self) -> None:
+        """Worker: run the (blocking) LLM analysis in a thread."""
+        while True:
+            batch = await self.analysis_queue.get()
+            self._report_depths()
+            started = time.monotonic()
+            try:
+                analysis = await asyncio.to_thread(self.analyze, batch.alerts)
+            except Exception as e:
+                analysis = f"Error analyzing alerts: {e}"
+            finally:
+                await self.analysis_queue.task_done(batch)
+            self.metrics.observe("analyze", time.monotonic() - started)
+
+            await self.output_queue.put((batch, analysis))
+            self._report_depths()
+
+    async def _output_stage(self) -> None:
+        """Deliver results to every sink."""
+        while True:
+            batch, analysis = await self.output_queue.get()
+            started = time.monotonic()
+            for sink in self.sinks:
+                try:
+                    await asyncio.to_thread(sink, batch, analysis)
+                except Exception as e:
+                    logger.error(f"Output sink {getattr(sink, '__name__', sink)} failed: {e}")
+            done = time.monotonic()
+            self.metrics.observe("output", done - started)
+            if batch.received_at:
+                self.metrics.observe("end_to_end", done - min(batch.received_at))
+            self._report_depths()
+
+    def _report_depths(self) -> None:
+        self.metrics.depth("raw", self.raw_queue.qsize())
+        self.metrics.depth("analysis", self.analysis_queue.qsize())
+        self.metrics.depth("output", self.output_queue.qsize())
+
+
+def _coalesce(waiting: AlertBatch, newer: AlertBatch) -> AlertBatch:
+    """Combine a waiting batch with a newer one for the same group."""
+    # Polls are full snapshots, so the newer one supersedes; webhooks are deltas
+    if newer.source == "poll":
+        base_alerts, base_times = [], []
+    else:
+        base_alerts, base_times = waiting.alerts, waiting.received_at
+
+    # Keyed by identity, so a newer state (e.g. resolved) replaces the waiting one
+    merged: Dict[str, Any] = {}
+    for alert, received in zip(base_alerts, base_times):
+        merged[alert_fingerprint(alert)] = (alert, received)
+
+    earlier = {_alert_key(a): t for a, t in zip(waiting.alerts, waiting.received_at)}
+    for alert, received in zip(newer.alerts, newer.received_at):
+        # Alerts already waiting keep their original arrival time
+        merged[alert_fingerprint(alert)] = (alert, min(received, earlier.get(_alert_key(alert), received)))
+
+    return AlertBatch(
+        alerts=[a for a, _ in merged.values()],
+        received_at=[t for _, t in merged.values()],
+        source=newer.source,
+        group=newer.group,
+    )
+
+
+def _alert_key(alert: Dict[str, Any]) -> str:
+    """Identity of an alert (and its state) for change detection."""
+    return f"{alert_fingerprint(alert)}|{alert.get('state', 'unknown')}"
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Alertmanager Webhook Receiver
+Workshop: Build Intelligent Networks with AI
+
+Event-driven alternative to polling Prometheus every CHECK_INTERVAL seconds.
+Alertmanager POSTs alert notifications to this receiver, bursts are debounced
+over a short window, and the batch is handed to the analysis pipeline right
+away. Polling Prometheus is kept as a fallback when no webhook has been seen
+for a while (e.g. Alertmanager is not deployed).
+
+Alertmanager configuration (alertmanager/alertmanager.yml):
+    receivers:
+      - name: ai-analyzer
+        webhook_configs:
+          - url: http://host.docker.internal:9095/webhook
+
+Requirements:
+    pip install aiohttp
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# Alert batches
+# =============================================================================
+
+@dataclass
+class AlertBatch:
+    """
+    A debounced group of alerts ready for analysis.
+
+    Attributes:
+        alerts: Alerts in Prometheus API shape (labels, annotations, state)
+        received_at: time.monotonic() when each alert arrived (same order)
+        source: "webhook" or "poll"
+        group: Analysis group key (see pipeline.group_alerts)
+    """
+    alerts: List[Dict[str, Any]]
+    received_at: List[float] = field(default_factory=list)
+    source: str = "webhook"
+    group: str = "fabric"
+
+
+def normalize_alertmanager_alert(alert: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert an Alertmanager webhook alert to the Prometheus /api/v1/alerts shape.
+
+    Alertmanager uses "status" ("firing"/"resolved") and "startsAt", while the
+    rest of the analyzer expects "state" and "activeAt".
+
+    Args:
+        alert: One entry from the webhook payload's "alerts" list
+
+    Returns:
+        Alert dictionary compatible with format_alerts_for_llm()
+    """
+    return {
+        "labels": alert.get("labels", {}),
+        "annotations": alert.get("annotations", {}),
+        "state": alert.get("status", "unknown"),
+        "activeAt": alert.get("startsAt", "unknown"),
+        "fingerprint": alert_fingerprint(alert),
+    }
+
+
+def alert_fingerprint(alert: Dict[str, Any]) -> str:
+    """
+    Identity of an alert from its labels.
+
+    Used for webhook and polled alerts alike: Prometheus' /api/v1/alerts has
+    no fingerprint, so Alertmanager's own cannot be matched against it.
+    """
+    return ",".join(f"{k}={v}" for k, v in sorted(alert.get("labels", {}).items()))
+
+
+# =============================================================================
+# Debouncing
+# =============================================================================
+
+class AlertDebouncer:
+    """
+    Coalesce bursts of alerts into a single analysis batch.
+
+    A batch is flushed once no new alert has arrived for `window` seconds,
+    or `max_wait` seconds after the first alert of the burst, whichever
+    comes first. Repeated notifications for the same alert (same
+    fingerprint) inside a burst are merged, and a "resolved" notification
+    cancels a pending "firing" one. Resolved notifications for alerts that
+    were already flushed are flushed as a batch of their own, so the
+    pipeline hears that they cleared without waiting for a poll.
+
+    A flushed alert is remembered for `forget_after` seconds after it was
+    last flushed as firing. Alertmanager re-sends alerts that are still
+    firing every repeat_interval (4h in alertmanager/alertmanager.yml), so
+    an alert not heard of for longer has cleared without a notification
+    reaching us.
+    """
+
+    def __init__(
+        self,
+        on_flush: Callable[[AlertBatch], Awaitable[None]],
+        window: float = 2.0,
+        max_wait: float = 10.0,
+        forget_after: float = 5 * 3600,
+    ):
+        self.on_flush = on_flush
+        self.window = window
+        self.max_wait = max_wait
+        self.forget_after = forget_after
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._received: Dict[str, float] = {}
+        self._resolved: Dict[str, Dict[str, Any]] = {}
+        self._flushed: Dict[str, float] = {}  # fingerprint flushed as firing -> when, until resolved
+        self._source = "webhook"
+        self._first_at: Optional[float] = None
+        self._last_at: Optional[float] = None
+        self._timer: Optional[asyncio.Task] = None
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending) + len(self._resolved)
+
+    def add(self, alerts: List[Dict[str, Any]], source: str = "webhook") -> None:
+        """Queue normalized alerts and (re)arm the flush timer."""
+        now = time.monotonic()
+        for alert in alerts:
+            key = alert_fingerprint(alert)
+            if alert.get("state") == "resolved":
+                self._pending.pop(key, None)
+                self._received.pop(key, None)
+                if key in self._flushed:
+                    self._resolved[key] = alert
+                    self._received[key] = now
+                continue
+            self._resolved.pop(key, None)
+            self._pending[key] = alert
+            self._received.setdefault(key, now)
+
+        if not self._pending and not self._resolved:
+            return
+
+        self._source = source
+        if self._first_at is None:
+            self._first_at = now
+        self._last_at = now
+
+        if self._timer is None or self._timer.done():
+            self._timer = asyncio.create_task(self._flush_when_quiet())
+
+    async def _flush_when_quiet(self) -> None:
+        """Sleep until the burst goes quiet (or max_wait expires), then flush."""
+        # Loop so alerts that arrive while on_flush is running get their own batch
+        while self._pending or self._resolved:
+            now = time.monotonic()
+            quiet_deadline = self._last_at + self.window
+            hard_deadline = self._first_at + self.max_wait
+            delay = min(quiet_deadline, hard_deadline) - now
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Hand everything pending to on_flush immediately."""
+        batches = [
+            AlertBatch(
+                alerts=list(alerts.values()),
+                received_at=[self._received[k] for k in alerts],
+                source=self._source,
+            )
+            for alerts in (self._pending, self._resolved) if alerts
+        ]
+        now = time.monotonic()
+        self._flushed = {
+            key: at for key, at in self._flushed.items()
+            if key not in self._resolved and now - at < self.forget_after
+        }
+        self._flushed.update(dict.fromkeys(self._pending, now))
+        self._pending, self._resolved = {}, {}
+        self._received.clear()
+        self._first_at = self._last_at = None
+
+        for batch in batches:
+            try:
+                await self.on_flush(batch)
+            except Exception as e:
+                logger.error(f"Alert batch handler failed: {e}")
+
+
+# =============================================================================
+# HTTP receiver
+# =============================================================================
+
+class AlertWebhookReceiver:
+    """
+    aiohttp server accepting Alertmanager webhook notifications.
+
+    Args:
+        handle_batch: Async callable invoked with each debounced AlertBatch
+        fetch_alerts: Optional sync callable returning Prometheus alerts,
+            used for fallback polling when no webhook arrives
+        host: Address to bind
+        port: Port to bind (0 picks a free port)
+        debounce_window: Quiet period before a burst is flushed (seconds)
+        max_wait: Upper bound on how long a burst can be held (seconds)
+        fallback_interval: Poll Prometheus if no webhook for this long (seconds)
+    """
+
+    def __init__(
+        self,
+        handle_batch: Callable[[AlertBatch], Awaitable[None]],
+        fetch_alerts: Optional[Callable[[], List[Dict[str, Any]]]] = None,
+        host: str = "0.0.0.0",
+        port: int = 9095,
+        debounce_window: float = 2.0,
+        max_wait: float = 10.0,
+        fallback_interval: float = 60.0,
+    ):
+        self.fetch_alerts = fetch_alerts
+        self.host = host
+        self.port = port
+        self.fallback_interval = fallback_interval
+        self.debouncer = AlertDebouncer(handle_batch, debounce_window, max_wait)
+        self.last_event = time.monotonic()
+        self.webhooks_received = 0
+        self._runner = None
+        self._poll_task: Optional[asyncio.Task] = None
+
+    async def handle_webhook(self, request):
+        """POST /webhook - accept an Alertmanager notification."""
+        from aiohttp import web
+
+        try:
+            payload = await request.json()
+        except Exception:
+            return web.json_response({"error": "Invalid JSON"}, status=400)
+
+        alerts = payload.get("alerts") if isinstance(payload, dict) else None
+        if not isinstance(alerts, list):
+            return web.json_response({"error": "Payload missing 'alerts' list"}, status=400)
+
+        self.last_event = time.monotonic()
+        self.webhooks_received += 1
+        self.debouncer.add([normalize_alertmanager_alert(a) for a in alerts])
+
+        return web.json_response({"status": "accepted", "alerts": len(alerts)})
+
+    async def handle_health(self, request):
+        """GET /healthz - liveness probe."""
+        from aiohttp import web
+
+        return web.json_response({
+            "status": "ok",
+            "webhooks_received": self.webhooks_received,
+            "pending_alerts": self.debouncer.pending_count,
+        })
+
+    async def _fallback_poll(self) -> None:
+        """Poll Prometheus only while the webhook has been silent."""
+        while True:
+            await asyncio.sleep(self.fallback_interval)
+            if time.monotonic() - self.last_event < self.fallback_interval:
+                continue
+
+            logger.info("No webhook activity, falling back to polling Prometheus")
+            alerts = await asyncio.to_thread(self.fetch_alerts)
+            if alerts:
+                self.debouncer.add(alerts, source="poll")
+
+    async def start(self) -> None:
+        """Start the HTTP server and the fallback poller."""
+        try:
+            from aiohttp import web
+        except ImportError:
+            raise RuntimeError("aiohttp package not installed. Run: pip install aiohttp")
+
+        app = web.Application()
+        app.router.add_post("/webhook", self.handle_webhook)
+        app.router.add_get("/healthz", self.handle_health)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+
+        # Resolve the real port when 0 was requested
+        sockets = site._server.sockets if site._server else []
+        if sockets:
+            self.port = sockets[0].getsockname()[1]
+
+        if self.fetch_alerts is not None and self.fallback_interval > 0:
+            self._poll_task = asyncio.create_task(self._fallback_poll())
+
+        logger.info(f"Webhook receiver listening on http://{self.host}:{self.port}/webhook")
+
+    async def stop(self) -> None:
+        """Flush pending alerts and shut the server down."""
+        if self._poll_task:
+            self._poll_task.cancel()
+        await self.debouncer.flush()
+        if self._runner:
+            await self._runner.cleanup()
@@ -17,15 +17,32 @@ Usage:
     mcp.tool()(get_active_alerts)
 """
 
+import contextlib
 import requests
 import os
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
+# Optional OpenTelemetry spans. Only the API is used here: spans are no-ops
+# until the host process (e.g. the Lab 2 MCP server with MCP_TRACING) sets
+# up an exporter.
+try:
+    from opentelemetry import trace
+    _tracer = trace.get_tracer("alerting_tools")
+except ImportError:
+    _tracer = None
+
 # Configuration
 PROMETHEUS_URL = os.getenv("PROMETHEUS_URL", "http://localhost:9090")
 
 
+def _span(name: str, **attributes):
+    """Start a tracing span for a Prometheus call (no-op without OpenTelemetry)."""
+    if _tracer is None:
+        return contextlib.nullcontext()
+    return _tracer.start_as_current_span(name, attributes=attributes)
+
+
 # =============================================================================
 # WORKING EXAMPLE: Query Prometheus
 # =============================================================================
@@ -55,12 +72,13 @@ async def query_prometheus(query: str) -> Dict[str, Any]:
     """
     try:
         url = f"{PROMETHEUS_URL}/api/v1/query"
-        response = requests.get(
-            url,
-            params={"query": query},
-            timeout=10
-        )
-        response.raise_for_status()
+        with _span("prometheus.query", **{"prometheus.query": query, "http.url": url}):
+            response = requests.get(
+                url,
+                params={"query": query},
+                timeout=10
+            )
+            response.raise_for_status()
 
         data = response.json()
 
@@ -124,8 +142,9 @@ async def get_active_alerts() -> Dict[str, Any]:
     """
     try:
         url = f"{PROMETHEUS_URL}/api/v1/alerts"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
+        with _span("prometheus.alerts", **{"http.url": url}):
+            response = requests.get(url, timeout=10)
+            response.raise_for_status()
 
         data = response.json()
 
@@ -9,6 +9,11 @@ on port 8888.
 Simulates a spine-leaf topology with 6 devices:
 - spine1, spine2 (BGP ASN 65100)
 - leaf1-4 (BGP ASN 65101-65104)
+
+Nothing is decoded from device JSON here, so the exporter keeps one flag
+per session/interface instead of the lab-02 result models
+(lab-02-mcp-server/helpers/models.py), and its container needs nothing but
+this file and prometheus-client.
 """
 
 import random
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Tests for the AI alert analyzer's webhook receiver and pipeline
+Run with: python -m pytest tests/test_alert_agent.py -v
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+LAB_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The agent's modules import each other by name (python agent/alert_analyzer.py)
+sys.path.insert(0, os.path.join(LAB_DIR, "agent"))
+
+from webhook_receiver import AlertDebouncer, normalize_alertmanager_alert  # noqa: E402
+
+
+def _alert(name: str, state: str = "firing", **labels) -> dict:
+    """A normalized alert, as the debouncer and pipeline see it."""
+    return normalize_alertmanager_alert({
+        "status": state,
+        "labels": {"alertname": name, **labels},
+        "fingerprint": f"am-{name}-{state}",
+    })
+
+
+def _debouncer(**kwargs):
+    batches = []
+
+    async def on_flush(batch):
+        batches.append([(a["labels"]["alertname"], a["state"]) for a in batch.alerts])
+
+    return AlertDebouncer(on_flush, **kwargs), batches
+
+
+class TestAlertDebouncer:
+    """Tests for webhook burst debouncing (no Alertmanager required)"""
+
+    async def test_burst_becomes_one_batch_without_duplicates(self):
+        """Alerts within the window are flushed together, each alert once"""
+        debouncer, batches = _debouncer(window=0.05, max_wait=1)
+        debouncer.add([_alert("BGPSessionDown"), _alert("InterfaceDown")])
+        await asyncio.sleep(0.02)
+        debouncer.add([_alert("BGPSessionDown")])
+        assert debouncer.pending_count == 2
+        await asyncio.sleep(0.15)
+
+        assert batches == [[("BGPSessionDown", "firing"), ("InterfaceDown", "firing")]]
+
+    async def test_max_wait_bounds_a_continuous_burst(self):
+        """A burst that never goes quiet is still flushed after max_wait"""
+        debouncer, batches = _debouncer(window=0.05, max_wait=0.12)
+        for n in range(8):
+            debouncer.add([_alert(f"Alert{n}")])
+            await asyncio.sleep(0.03)
+        await debouncer.flush()
+
+        assert len(batches) == 2 and len(batches[0]) < 8
+
+    async def test_resolved_in_burst_cancels_resolved_after_flush_is_forwarded(self):
+        """A resolve cancels a pending alert; for a flushed one it is a batch of its own"""
+        debouncer, batches = _debouncer(window=0.02, max_wait=1)
+        debouncer.add([_alert("HighCPU"), _alert("HighMemory")])
+        debouncer.add([_alert("HighMemory", "resolved")])
+        await asyncio.sleep(0.08)
+        debouncer.add([_alert("HighCPU", "resolved"), _alert("NeverFired", "resolved")])
+        await asyncio.sleep(0.08)
+
+        assert batches == [[("HighCPU", "firing")], [("HighCPU", "resolved")]]
+
+    async def test_polled_alert_is_recognized_when_resolved_by_webhook(self):
+        """Polled alerts (no fingerprint) and webhook alerts share one identity"""
+        debouncer, batches = _debouncer(window=0.02, max_wait=1)
+        polled = {"labels": {"alertname": "InterfaceDown", "device": "leaf1"}, "state": "firing"}
+        debouncer.add([polled], source="poll")
+        await asyncio.sleep(0.06)
+        debouncer.add([_alert("InterfaceDown", "resolved", device="leaf1")])
+        await asyncio.sleep(0.06)
+
+        assert batches[-1] == [("InterfaceDown", "resolved")]
+
+    async def test_flushed_alerts_are_forgotten(self):
+        """Alerts not heard of for forget_after are no longer tracked"""
+        debouncer, batches = _debouncer(window=0.01, max_wait=1, forget_after=0.05)
+        debouncer.add([_alert("HighCPU")])
+        await asyncio.sleep(0.1)
+        debouncer.add([_alert("HighMemory")])
+        await asyncio.sleep(0.05)
+        debouncer.add([_alert("HighCPU", "resolved")])
+        await asyncio.sleep(0.05)
+
+        assert "alertname=HighCPU" not in debouncer._flushed
+        assert batches == [[("HighCPU", "firing")], [("HighMemory", "firing")]]
+
+
+class TestCoalescingQueue:
+    """Tests for the analysis queue's overflow and coalescing policies"""
+
+    async def test_drop_oldest_when_full(self):
+        """A full queue drops its oldest waiting group"""
+        from pipeline import CoalescingQueue
+        from webhook_receiver import AlertBatch
+
+        drops = []
+        queue = CoalescingQueue(2, "drop_oldest", on_drop=drops.append)
+        for group in ("leaf1", "leaf2", "leaf3"):
+            await queue.put(AlertBatch([_alert("InterfaceDown")], [0.0], group=group))
+
+        assert drops == ["overflow"]
+        assert [(await queue.get()).group for _ in range(2)] == ["leaf2", "leaf3"]
+
+    async def test_block_waits_for_space(self):
+        """With "block", put() waits until a worker takes a group"""
+        from pipeline import CoalescingQueue
+        from webhook_receiver import AlertBatch
+
+        queue = CoalescingQueue(1, "block")
+        await queue.put(AlertBatch([_alert("HighCPU")], [0.0], group="leaf1"))
+        blocked = asyncio.ensure_future(queue.put(AlertBatch([_alert("HighCPU")], [0.0], group="leaf2")))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+
+        assert (await queue.get()).group == "leaf1"
+        await asyncio.wait_for(blocked, 1)
+        assert queue.qsize() == 1
+
+    async def test_coalesce_merges_deltas_and_replaces_snapshots(self):
+        """Same-group puts merge (webhook) or replace (poll), and are not counted as drops"""
+        from pipeline import CoalescingQueue
+        from webhook_receiver import AlertBatch
+
+        drops, coalesced = [], []
+        queue = CoalescingQueue(4, on_drop=drops.append, on_coalesce=lambda: coalesced.append(1))
+        await queue.put(AlertBatch([_alert("HighCPU")], [1.0], group="leaf1"))
+        await queue.put(AlertBatch([_alert("HighMemory"), _alert("HighCPU", "resolved")], [2.0, 2.0], group="leaf1"))
+        await queue.put(AlertBatch([_alert("HighMemory")], [3.0], group="leaf1"))
+        merged = await queue.get()
+        await queue.task_done(merged)
+        await queue.put(AlertBatch([_alert("HighCPU")], [3.0], group="leaf2"))
+        await queue.put(AlertBatch([_alert("HighMemory")], [4.0], source="poll", group="leaf2"))
+        replaced = await queue.get()
+
+        # A re-sent alert keeps its first arrival time, a resolve is a new arrival
+        assert sorted((a["labels"]["alertname"], a["state"], t) for a, t in zip(merged.alerts, merged.received_at)) == [
+            ("HighCPU", "resolved", 2.0), ("HighMemory", "firing", 2.0)]
+        assert [a["labels"]["alertname"] for a in replaced.alerts] == ["HighMemory"]
+        assert drops == [] and len(coalesced) == 3
+
+
+class TestAlertPipeline:
+    """Tests for the staged pipeline (no Prometheus or LLM required)"""
+
+    async def test_stages_survive_errors_and_failed_fetches_are_skipped(self):
+        """A failed fetch resolves nothing; a bad batch or fetch does not stop its stage"""
+        from pipeline import AlertPipeline
+        from prometheus_client import CollectorRegistry
+
+        firing = [_alert("BGPSessionDown")]
+        replies = [firing, None, RuntimeError("Prometheus down"), firing, []]
+        results = []
+
+        def fetch():
+            reply = replies.pop(0) if replies else []
+            if isinstance(reply, Exception):
+                raise reply
+            return reply
+
+        registry = CollectorRegistry()
+        pipeline = AlertPipeline(
+            analyze=lambda alerts: f"{len(alerts)} alerts",
+            sinks=[lambda batch, analysis: results.append(analysis)],
+            fetch=fetch, interval=0.02, registry=registry,
+        )
+        await pipeline.start()
+        await pipeline.raw_queue.put(None)  # malformed batch
+        await asyncio.sleep(0.3)
+        await pipeline.stop()
+
+        # Analyzed when it fired and when it cleared, not on the failed fetches
+        assert results[:2] == ["1 alerts", "0 alerts"]
+        assert registry.get_sample_value("alert_analyzer_dropped_total", {"reason": "fetch_error"}) == 2
+        assert registry.get_sample_value("alert_analyzer_dropped_total", {"reason": "group_error"}) == 1
+
+    def test_pipelines_share_the_default_registry(self):
+        """A second pipeline in the same process does not register its metrics again"""
+        from pipeline import AlertPipeline
+
+        first = AlertPipeline(analyze=len, sinks=[])
+        second = AlertPipeline(analyze=len, sinks=[])
+        assert first.metrics.dropped is second.metrics.dropped
+
+
+class TestAlertingToolsTracing:
+    """Tests for the Prometheus client spans (no Prometheus required)"""
+
+    async def test_prometheus_calls_nest_under_the_caller(self, monkeypatch):
+        """prometheus.query and prometheus.alerts are children of the calling tool's span"""
+        pytest.importorskip("opentelemetry.sdk")
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+        monkeypatch.syspath_prepend(LAB_DIR)
+        import alerting_tools
+
+        class Reply:
+            def raise_for_status(self):
+                pass
+
+            def json(self):
+                return {"status": "success", "data": {"resultType": "vector", "result": [], "alerts": []}}
+
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        tracer = provider.get_tracer("test")
+        monkeypatch.setattr(alerting_tools, "_tracer", tracer)
+        monkeypatch.setattr(alerting_tools.requests, "get", lambda *args, **kwargs: Reply())
+
+        with tracer.start_as_current_span("tool: get_active_alerts") as tool:
+            assert (await alerting_tools.query_prometheus("up"))["status"] == "success"
+            await alerting_tools.get_active_alerts()
+
+        children = [s for s in exporter.get_finished_spans() if s.name.startswith("prometheus.")]
+        assert sorted(s.name for s in children) == ["prometheus.alerts", "prometheus.query"]
+        assert all(s.parent.span_id == tool.get_span_context().span_id for s in children)